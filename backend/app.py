@@ -28,18 +28,31 @@ License Terms and Copyright:
 
 from model.ds.search_filters import SearchFilters, DateFilter
 from model.ds.report_types import ReportResult
-from model.constants import FIXED_KEYWORDS
+from model.ds.pagination import ReportPage
+from model.constants import (
+    AUTOCOMPLETE_DEFAULT_LIMIT,
+    AUTOCOMPLETE_MAX_LIMIT,
+    DEFAULT_GRAPH_HOPS,
+    FIXED_KEYWORDS,
+    MAX_GRAPH_NODES,
+    SEARCH_DEADLINE_SECONDS,
+)
 from typing import Tuple
 
 import json
 import jwt
 from datetime import datetime, timedelta
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 import os
 
 from controller.importer.importer import *
+from controller.importer.import_jobs import import_worker, queue_import_job
+from model.ds.import_job import ImportJob
 from controller.search.search import *
+from controller.search.result_cache import search_cache
+from controller.search.snippets import make_snippet
+from controller.helper.resilience import Deadline
 from astropy.coordinates import SkyCoord
 from view.web_interface import *
 from view.vis import *
@@ -58,11 +71,6 @@ from controller.authentication import (
     login,
 )
 
-from multiprocessing import Process
-from NamedAtomicLock import NamedAtomicLock
-
-lock = NamedAtomicLock("importer")
-
 app = Flask(__name__)
 jwt = JWTManager(app)
 CORS(app)
@@ -71,6 +79,17 @@ app.config["JWT_SECRET_KEY"] = os.environ["JWT_SECRET_KEY"]
 app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(days=365)
 
 
+@app.before_request
+def start_background_tasks():
+    """Starts the background refresher for stale objects in this worker if it is not already running,
+    so searches serve stored data instead of waiting on SIMBAD updates, and the import worker,
+    which runs queued import jobs. Proactive scans for stale objects are only made by the worker
+    holding the scan lease.
+    """
+    refresher.start()
+    import_worker.start()
+
+
 @app.route("/")
 def index():
     return jsonify("")
@@ -144,11 +163,22 @@ def imports() -> json:
     """Called by the web interface with the flag auto or manual (determining
     whether a specific report is to be added, or to just import any new reports since last import)
 
+    In auto mode, a job importing every new report is queued and run in the background,
+    and its progress can be followed through /import/status. If a job is already queued
+    or running, that job is returned instead of queueing another.
+
     Args:
         json (json): A JSON object. See SAS for breakdown of objects fields.
+            delay_seconds (float): the number of seconds to wait between reports in auto mode,
+                to throttle the import (optional).
+            range_size (int): in auto mode, the number of ATel numbers leased to each worker at a time,
+                so the workers of every host import in parallel (optional, defaults to a single worker).
+            sharded (bool): in auto mode, whether the workers of every host import in parallel, with
+                a range size chosen from the number of waiting reports if none is given (optional).
 
     Returns:
         json: JSON flag – Flag that states whether the import was successful or unsuccessful.
+        job: the queued or running import job in auto mode, see /import/status.
 
     """
 
@@ -156,6 +186,7 @@ def imports() -> json:
     # set initial flag
     flag = 1
     message = ""
+    job = None
 
     # retrieve json imports
     import_mode_in = request.json.get("import_mode", None)
@@ -171,13 +202,22 @@ def imports() -> json:
     ):  # check if import mode set to manual but correct atel number was not provided
         flag = 2
         message = "The ATel number provided is invalid."
+    elif import_mode_in == "auto":
+        try:
+            delay_seconds = parse_import_delay(request.json.get("delay_seconds", None))
+            range_size = parse_import_range_size(request.json.get("range_size", None))
+            sharded = parse_flag(request.json.get("sharded", False))
+        except ValueError as e:
+            flag = 2  # user error
+            message = str(e)
 
     if flag == 1:  # if all tests have passed so far
         try:
             if import_mode_in == "manual":
                 import_report(atel_num_in)  # call manual import
             elif import_mode_in == "auto":
-                background_import()
+                job = import_job_to_dict(queue_import_job(delay_seconds, range_size, sharded))
+                import_worker.wake()
         except ReportAlreadyExistsError as e:
             flag = 2
             message = str(e)
@@ -191,7 +231,132 @@ def imports() -> json:
             flag = 0
             message = str(e)
 
-    return jsonify({"flag": flag, "message": message})
+    return jsonify({"flag": flag, "message": message, "job": job})
+
+
+@app.route("/import/status", methods=["GET"])
+@jwt_required()
+def import_status() -> json:
+    """Finds the progress of an import job.
+
+    Args:
+        job_id (int): the ID of the job, as a query parameter (optional, defaults to the most recent job).
+
+    Returns:
+        flag: 1 if successful, 2 if the job ID is invalid or there is no such job.
+        job: the job's ID, state (queued, running, cancelling, cancelled, completed or failed),
+            starting and next ATel numbers, numbers of imported, skipped and failed reports,
+            rate in reports per second, rate of requests per second to the AT website, last error,
+            throttling delay, range size and timestamps,
+            and the newest report found when the job was queued with the number of reports
+            still waiting before it.
+            For a sharded job, the next ATel number only advances across completed ranges, and
+            a range's reports are counted once it is completed.
+    """
+    flag = 1
+    message = ""
+    job = None
+
+    try:
+        job_id = parse_job_id(request.args.get("job_id"))
+    except ValueError as e:
+        flag = 2  # user error
+        message = str(e)
+
+    if flag == 1:
+        job = db.get_import_job(job_id)
+        if job == None:
+            flag = 2
+            message = "No import job found."
+
+    return jsonify({"flag": flag, "message": message, "job": import_job_to_dict(job)})
+
+
+@app.route("/import/cancel", methods=["POST"])
+@jwt_required()
+def import_cancel() -> json:
+    """Cancels an active import job. A running job stops after the report it is importing.
+
+    Args:
+        json (json): A JSON object containing the job_id of the job (optional, defaults to the active job).
+
+    Returns:
+        flag: 1 if successful, 2 if the job ID is invalid or there is no such active job.
+        job: the cancelled job, see /import/status.
+    """
+    flag = 1
+    message = ""
+    job = None
+
+    try:
+        job_id = parse_job_id((request.json or {}).get("job_id", None))
+    except ValueError as e:
+        flag = 2  # user error
+        message = str(e)
+
+    if flag == 1:
+        job = db.cancel_import_job(job_id)
+        if job == None:
+            flag = 2
+            message = "No active import job found."
+
+    return jsonify({"flag": flag, "message": message, "job": import_job_to_dict(job)})
+
+
+@app.route("/import/ledger", methods=["GET"])
+@jwt_required()
+def import_ledger() -> json:
+    """Counts the reports in the import ledger by the outcome of their most recent import.
+
+    Returns:
+        flag: 1 if successful.
+        ledger: a list of outcomes, each with its status (imported, failed or error), failure class
+            (the name of the error, or null for imported reports) and number of reports.
+            Failed reports are retried once the parser version changes, and reports with errors are
+            retried until they have been attempted the maximum number of times, by running
+            controller.importer.ledger_retry.
+    """
+    ledger = [{"status": status, "failure_class": failure_class, "count": count}
+              for status, failure_class, count in db.get_ledger_summary()]
+
+    return jsonify({"flag": 1, "message": "", "ledger": ledger})
+
+
+def import_job_to_dict(job: ImportJob) -> dict:
+    """Converts an import job to its JSON representation.
+
+    Args:
+        job (ImportJob): the job, or None.
+
+    Returns:
+        dict: the job's fields, or None if no job was given.
+    """
+    if job == None:
+        return None
+
+    def timestamp(value: datetime) -> str:
+        return value.isoformat() if value != None else None
+
+    return {
+        "job_id": job.job_id,
+        "state": job.state.value,
+        "start_atel": job.start_atel,
+        "current_atel": job.current_atel,
+        "imported": job.imported,
+        "skipped": job.skipped,
+        "failed": job.failed,
+        "rate": job.rate,
+        "request_rate": job.request_rate,
+        "last_error": job.last_error,
+        "delay_seconds": job.delay_seconds,
+        "range_size": job.range_size,
+        "newest_atel": job.newest_atel,
+        "pending": job.pending,
+        "created_at": timestamp(job.created_at),
+        "started_at": timestamp(job.started_at),
+        "heartbeat_at": timestamp(job.heartbeat_at),
+        "finished_at": timestamp(job.finished_at),
+    }
 
 
 @app.route("/search", methods=["POST"])
@@ -206,6 +371,25 @@ def search() -> json:
     Returns:
         bool: determines whether the search was successful.
         reports_list: a list of ATel reports returned by search queries.
+        next_cursor: the cursor of the next page of reports, when a limit or cursor is given (None on the last page).
+        total: the total number of matching reports, when count is requested.
+        degraded: whether SIMBAD was unavailable or too slow, so only reports already
+            linked to objects in the local database were searched.
+
+        If observed_start_date or observed_end_date is given, only reports mentioning an
+        observation in that date range are returned.
+
+        If fields is given, each report only includes the ATel number and the given fields.
+        The "snippet" field is a short part of the body around the search term, with the
+        positions of each match of the term. The "citations" field is the number of reports
+        referencing the report and its PageRank score relative to the average report.
+
+        If collapse_threads is true, only the first report of each thread of related reports
+        is returned, with its "thread_id" and the "thread_size" of the whole thread. The
+        thread can then be expanded with /thread.
+
+        If stream is true, the reports are instead streamed as newline-delimited JSON
+        (see stream_report_lines()), without the visualisation graph.
         nodes_list: a list of report nodes for the visualisation graph.
         edges_list: a list of edges for the visualisation graph.
 
@@ -223,6 +407,8 @@ def search() -> json:
 
     start_date_obj = None
     end_date_obj = None
+    observed_start_obj = None
+    observed_end_obj = None
     ra = 0.0
     dec = 0.0
     radius = 10.0
@@ -237,6 +423,22 @@ def search() -> json:
     start_date_in = request.json.get("start_date", None)
     end_date_in = request.json.get("end_date", None)
 
+    # optional observation date fields
+    observed_start_in = request.json.get("observed_start_date", "")
+    observed_end_in = request.json.get("observed_end_date", "")
+
+    # optional paging, streaming and projection fields
+    limit_in = request.json.get("limit", None)
+    cursor_in = request.json.get("cursor", None)
+    count_in = request.json.get("count", False)
+    stream = parse_flag(request.json.get("stream", False))
+    collapse_threads = parse_flag(request.json.get("collapse_threads", False))
+    fields_in = request.json.get("fields", None)
+    fields = None
+    search_args = {}
+    reports_page = None
+    paged = False
+
     # if any fields are missing from the JSON request, flag 0
     try:
         none_check(
@@ -271,6 +473,7 @@ def search() -> json:
         )
         keywords_in, keyword_mode_in = parse_keywords(keywords_in, keyword_mode_in)
         start_date_in, end_date_in = parse_dates(start_date_in, end_date_in)
+        observed_start_in, observed_end_in = parse_dates(observed_start_in, observed_end_in)
         term_in = parse_term(term_in)
 
     # turning dates into date objects
@@ -290,6 +493,16 @@ def search() -> json:
                 flag = 2
                 message = str(e)
 
+    if flag == 1:
+        try:
+            if observed_start_in != None:
+                observed_start_obj = parse_date_input(observed_start_in)
+            if observed_end_in != None:
+                observed_end_obj = parse_date_input(observed_end_in)
+        except ValueError as e:
+            flag = 2
+            message = str(e)
+
     # set keywords_in to None if empty
     if flag == 1:
         if keywords_in == []:
@@ -299,6 +512,27 @@ def search() -> json:
     CHECKS
     """
 
+    # parsing the page size, cursor and result fields, if given - PAGING CHECK
+    if flag == 1:
+        try:
+            limit = parse_limit(limit_in)
+            after = parse_cursor(cursor_in)
+            count = parse_flag(count_in)
+            if limit != None or after != None or count:
+                search_args = {"limit": limit, "after": after, "count": count}
+            if stream and search_args:
+                raise ValueError("Streamed results cannot be paged or counted.")
+            if stream and collapse_threads:
+                raise ValueError("Streamed results cannot be collapsed by thread.")
+            fields = parse_fields(fields_in)
+            if fields != None:
+                search_args["fields"] = fields
+            paged = "count" in search_args
+            search_args["deadline"] = Deadline(SEARCH_DEADLINE_SECONDS)
+        except ValueError as e:
+            flag = 2  # user error
+            message = str(e)
+
     # checking if search_mode_in has a valid value - SEARCH MODE CHECK
     if flag == 1:
         try:
@@ -316,6 +550,13 @@ def search() -> json:
             except ValueError as e:
                 flag = 2  # user error
                 message = str(e)
+    if flag == 1:
+        if observed_start_obj != None and observed_end_obj != None:
+            try:
+                valid_date_check(observed_start_obj, observed_end_obj)
+            except ValueError as e:
+                flag = 2  # user error
+                message = str(e)
 
     # checking if keywords are within the FIXED_KEYWORDS list - KEYWORDS CHECK
     if flag == 1:
@@ -392,11 +633,16 @@ def search() -> json:
     # CREATING DATE FILTERS OBJECT
     if flag == 1:
         if (
-            start_date_in == None and end_date_in == None
+            start_date_in == None
+            and end_date_in == None
+            and observed_start_in == None
+            and observed_end_in == None
         ):  # set the date filters to None if no dates have been provided
             date_filter = None
         else:
-            date_filter = DateFilter(start_date_obj, end_date_obj)
+            date_filter = DateFilter(
+                start_date_obj, end_date_obj, observed_start_obj, observed_end_obj
+            )
 
     # CALLING SEARCH REPORTS BY NAME AND SEARCH REPORTS BY COORDS TO GET reports OUTPUT
     if flag == 1:
@@ -404,9 +650,14 @@ def search() -> json:
             search_mode_in = "name"
         if search_mode_in == "name":
             try:
-                reports = search_reports_by_name(
-                    search_filters, date_filter, search_data_in
-                )
+                if stream:
+                    reports = stream_reports_by_name(
+                        search_filters, date_filter, search_data_in, **search_args
+                    )
+                else:
+                    reports = search_cache.search_by_name(
+                        search_filters, date_filter, search_data_in, **search_args
+                    )
             except ValueError as e:
                 if hasattr(e, "message"):
                     msg = e.message
@@ -417,35 +668,446 @@ def search() -> json:
         elif search_mode_in == "coords":
             try:
                 radius_float = parse_radius(radius)
-                reports = search_reports_by_coords(
-                    search_filters, date_filter, sky_coord, radius_float
-                )
+                if stream:
+                    reports = stream_reports_by_coords(
+                        search_filters, date_filter, sky_coord, radius_float, **search_args
+                    )
+                else:
+                    reports = search_cache.search_by_coords(
+                        search_filters, date_filter, sky_coord, radius_float, **search_args
+                    )
             except ValueError as e:
                 flag = 2  # user error
                 message = str(e)
 
+    # STREAMING THE REPORTS AS THEY ARE READ, WITHOUT THE VISUALISATION
+    if flag == 1 and stream:
+        return Response(
+            stream_with_context(stream_report_lines(reports, fields, term_in)),
+            mimetype="application/x-ndjson",
+        )
+
     # CALLING VISUALISATION FUNCTION TO GET NODES/EDGES LIST RESULT
     if flag == 1:
+        if isinstance(reports, ReportPage):
+            reports_page = reports
+        threads = None
+        if collapse_threads:
+            threads = collapse_report_threads(reports)
+            reports = [report for report, _ in threads]
         list_result = create_nodes_list(reports)
         for report in reports:
-            report_dicts.append(
-                {
-                    "atel_num": report.atel_num,
-                    "title": report.title,
-                    "authors": report.authors,
-                    "body": report.body,
-                    "submission_date": str(report.submission_date),
-                    "referenced_reports": report.referenced_reports,
-                }
-            )
+            report_dicts.append(report_to_dict(report, fields, term_in))
+        if threads != None:
+            for (_, thread), report_dict in zip(threads, report_dicts):
+                report_dict["thread_id"], report_dict["thread_size"] = thread
 
     # SEARCH FUNCTION RETURN
+    response = {
+        "flag": flag,
+        "report_list": report_dicts,
+        "node_list": list_result[0],
+        "edge_list": list_result[1],
+        "message": message,
+        "degraded": reports_page != None and reports_page.degraded,
+    }
+    if reports_page != None and paged:
+        next_cursor = reports_page.next_cursor
+        response["next_cursor"] = next_cursor.encode() if next_cursor != None else None
+        response["total"] = reports_page.total
+    return jsonify(response)
+
+
+def collapse_report_threads(reports: list) -> list:
+    """Keeps only the first report of each thread of related reports in the search results,
+    in the order they were returned.
+
+    Args:
+        reports (list[ReportResult]): the reports returned by a search.
+
+    Returns:
+        list[tuple[ReportResult, tuple[int, int]]]: the first report of each thread, with
+            the thread ID and the number of reports in the thread.
+    """
+    threads = db.get_report_threads([report.atel_num for report in reports])
+
+    collapsed = []
+    seen = set()
+    for report in reports:
+        thread = threads.get(report.atel_num, (report.atel_num, 1))
+        if thread[0] not in seen:
+            seen.add(thread[0])
+            collapsed.append((report, thread))
+    return collapsed
+
+
+def report_to_dict(report: ReportResult, fields: list = None, term: str = None) -> dict:
+    """Converts a report returned by a search into its JSON representation.
+
+    Args:
+        report (ReportResult): the report to convert.
+        fields (list[str]): the fields to include, or None for all fields except the snippet
+            and citations. The ATel number is always included.
+        term (str): the free-text search term, used to create the snippet.
+
+    Returns:
+        dict: the report fields.
+    """
+    report_dict = {
+        "atel_num": report.atel_num,
+        "title": report.title,
+        "authors": report.authors,
+        "body": report.body,
+        "submission_date": str(report.submission_date),
+        "referenced_reports": report.referenced_reports,
+    }
+    if fields == None:
+        return report_dict
+
+    if "snippet" in fields:
+        report_dict["snippet"] = make_snippet(report.body, term)
+    if "citations" in fields:
+        cited_by, score = db.get_citation_scores([report.atel_num])[report.atel_num]
+        report_dict["citations"] = {"cited_by": cited_by, "score": score}
+    return {
+        field: value
+        for field, value in report_dict.items()
+        if field == "atel_num" or field in fields
+    }
+
+
+def stream_report_lines(reports, fields: list = None, term: str = None):
+    """Writes the reports returned by a streaming search as newline-delimited JSON,
+    one report per line as each is read from the database. A final line containing
+    the flag, the number of reports and whether the search was degraded marks the end
+    of the results, so clients can detect a truncated stream.
+
+    Args:
+        reports (ReportStream): the reports to write.
+        fields (list[str]): the fields of each report to write, or None for all fields.
+        term (str): the free-text search term, used to create snippets.
+
+    Yields:
+        str: one line of JSON.
+    """
+    count = 0
+    for report in reports:
+        count += 1
+        yield json.dumps(report_to_dict(report, fields, term)) + "\n"
+
+    yield json.dumps(
+        {"flag": 1, "count": count, "message": "", "degraded": reports.degraded}
+    ) + "\n"
+
+
+def parse_search_criteria(request_json: dict, purpose: str) -> tuple:
+    """Parses and validates the criteria of a name search given to an aggregation
+    endpoint, such as /facets or /timeline. All fields are optional.
+
+    Args:
+        request_json (dict): the request JSON, containing any of the term, keywords,
+            keyword_mode, start_date, end_date, observed_start_date, observed_end_date,
+            search_mode and search_data fields of a search.
+        purpose (str): what is calculated from the criteria, used in error messages.
+
+    Returns:
+        SearchFilters: the filters, or None if there is no term or keywords.
+        DateFilter: the date filter, or None if there are no dates.
+        str: the object name, or None if it is not a name search.
+
+    Raises:
+        ValueError: if the criteria are invalid or it is a coordinate search.
+    """
+    search_filters = None
+    date_filter = None
+    name = None
+
+    term_in = parse_term(request_json.get("term", ""))
+    search_mode_in, search_data_in = parse_search_mode(
+        request_json.get("search_mode", ""), request_json.get("search_data", "")
+    )
+    keywords_in, keyword_mode_in = parse_keywords(
+        request_json.get("keywords", ""), request_json.get("keyword_mode", "")
+    )
+    start_date_in, end_date_in = parse_dates(
+        request_json.get("start_date", ""), request_json.get("end_date", "")
+    )
+    observed_start_in, observed_end_in = parse_dates(
+        request_json.get("observed_start_date", ""),
+        request_json.get("observed_end_date", ""),
+    )
+    if keywords_in == []:
+        keywords_in = None
+
+    if search_mode_in == "coords" and search_data_in != None:
+        raise ValueError(f"{purpose} cannot be counted for coordinate searches.")
+    if search_mode_in == "name":
+        name = search_data_in
+
+    start_date_obj = None
+    end_date_obj = None
+    observed_start_obj = None
+    observed_end_obj = None
+    if start_date_in != None:
+        start_date_obj = parse_date_input(start_date_in)
+    if end_date_in != None:
+        end_date_obj = parse_date_input(end_date_in)
+    if observed_start_in != None:
+        observed_start_obj = parse_date_input(observed_start_in)
+    if observed_end_in != None:
+        observed_end_obj = parse_date_input(observed_end_in)
+    if start_date_obj != None and end_date_obj != None:
+        valid_date_check(start_date_obj, end_date_obj)
+    if observed_start_obj != None and observed_end_obj != None:
+        valid_date_check(observed_start_obj, observed_end_obj)
+
+    keyword_mode_enum = KeywordMode.ANY
+    if keywords_in != None:
+        keywords_check(keywords_in)
+        if keyword_mode_in != None:
+            keyword_mode_check(keyword_mode_in)
+            keyword_mode_enum = parse_keyword_mode(keyword_mode_in)
+
+    if term_in != None or keywords_in != None:
+        search_filters = SearchFilters(term_in, keywords_in, keyword_mode_enum)
+    if (
+        start_date_obj != None
+        or end_date_obj != None
+        or observed_start_obj != None
+        or observed_end_obj != None
+    ):
+        date_filter = DateFilter(
+            start_date_obj, end_date_obj, observed_start_obj, observed_end_obj
+        )
+
+    return search_filters, date_filter, name
+
+
+@app.route("/facets", methods=["POST"])
+def facets() -> json:
+    """Counts the reports matching the search criteria with each keyword and submitted in
+    each year, so the frontend can show how many results each filter would give. Accepts
+    the same fields as /search, all optional. Without criteria the counts are read from
+    summary tables, without scanning the reports.
+
+    Args:
+        json (json): a JSON object containing any of the term, keywords, keyword_mode,
+            start_date, end_date, observed_start_date, observed_end_date, search_mode
+            and search_data fields of a search.
+            Only name searches are supported.
+
+    Returns:
+        flag: 1 if successful, 2 if the criteria are invalid.
+        keywords: the number of matching reports with each fixed keyword.
+        years: the number of matching reports submitted in each year, in year order.
+    """
+    flag = 1
+    message = ""
+    keyword_counts = {}
+    year_counts = {}
+
+    try:
+        search_filters, date_filter, name = parse_search_criteria(request.json, "Facets")
+    except ValueError as e:
+        flag = 2  # user error
+        message = str(e)
+
+    if flag == 1:
+        keyword_counts, year_counts = db.get_facet_counts(
+            search_filters, date_filter, name
+        )
+
+    return jsonify(
+        {
+            "flag": flag,
+            "keywords": keyword_counts,
+            "years": [
+                {"year": year, "count": count} for year, count in year_counts.items()
+            ],
+            "message": message,
+        }
+    )
+
+
+@app.route("/timeline", methods=["POST"])
+def timeline() -> json:
+    """Counts the reports matching the search criteria in each day, week, month or year,
+    so the frontend can draw a timeline of a broad search without receiving every report.
+    Accepts the same fields as /search, all optional.
+
+    Args:
+        json (json): a JSON object containing any of the term, keywords, keyword_mode,
+            start_date, end_date, observed_start_date, observed_end_date, search_mode
+            and search_data fields of a search. Only name searches are supported.
+            bin: the length of each bin, one of "day", "week", "month" or "year" (optional,
+                defaults to "month"). Weeks start on Monday.
+            date_field: the date that reports are binned by, either "submission" or
+                "observation" (optional, defaults to "submission"). A report is counted
+                once in each bin containing one of its observation dates.
+
+    Returns:
+        flag: 1 if successful, 2 if the criteria, bin or date field are invalid.
+        bins: the start date and number of matching reports of each bin, in date order.
+            Bins without reports are omitted.
+    """
+    flag = 1
+    message = ""
+    bins = []
+
+    try:
+        search_filters, date_filter, name = parse_search_criteria(request.json, "Timelines")
+        bin_size = parse_timeline_bin(request.json.get("bin", ""))
+        date_field = parse_timeline_date_field(request.json.get("date_field", ""))
+    except ValueError as e:
+        flag = 2  # user error
+        message = str(e)
+
+    if flag == 1:
+        bins = db.get_timeline_counts(
+            search_filters, date_filter, name, bin_size, date_field
+        )
+
+    return jsonify(
+        {
+            "flag": flag,
+            "bins": [
+                {"start": start.strftime("%Y-%m-%d"), "count": count}
+                for start, count in bins
+            ],
+            "message": message,
+        }
+    )
+
+
+@app.route("/autocomplete", methods=["GET"])
+def autocomplete() -> json:
+    """Suggests stored objects whose ID or alias starts with the typed prefix, so users
+    can find the exact object name before searching. Letter case, whitespace and SIMBAD
+    prefixes (e.g. "NAME") are ignored. Answered from memory, without querying SIMBAD.
+
+    Args:
+        q (str): the partially typed object name, as a query parameter.
+        limit (int): the maximum number of suggestions, as a query parameter (optional).
+
+    Returns:
+        flag: 1 if successful, 2 if the prefix or limit is invalid.
+        suggestions: a list of suggested objects, each with the matching name, the object's
+            main ID and the number of linked reports, most reports first.
+    """
+    flag = 1
+    message = ""
+    suggestions = []
+
+    prefix = request.args.get("q", "").strip()
+    try:
+        if prefix == "":
+            raise ValueError("Prefix cannot be empty.")
+        limit = parse_limit(request.args.get("limit"), AUTOCOMPLETE_MAX_LIMIT)
+        if limit == None:
+            limit = AUTOCOMPLETE_DEFAULT_LIMIT
+    except ValueError as e:
+        flag = 2  # user error
+        message = str(e)
+
+    if flag == 1:
+        for name, object_id, report_count in db.find_aliases_by_prefix(prefix, limit):
+            suggestions.append(
+                {"name": name, "object_id": object_id, "report_count": report_count}
+            )
+
+    return jsonify({"flag": flag, "suggestions": suggestions, "message": message})
+
+
+@app.route("/graph", methods=["GET"])
+def report_graph() -> json:
+    """Finds the reports related to the given reports through up to the given number
+    of references, in either direction, so a thread of follow-up reports can be
+    visualised without repeated searches.
+
+    Args:
+        atel_num (int): the ATel number of a report to start from, as a query parameter.
+            May be given more than once, or as a comma separated list.
+        hops (int): the maximum number of references to follow, as a query parameter (optional).
+        limit (int): the maximum number of reports in the graph, as a query parameter (optional).
+
+    Returns:
+        flag: 1 if successful, 2 if the ATel numbers, hops or limit are invalid.
+        nodes: a list of the reports in the graph, each with its ATel number and the number
+            of references from the nearest starting report, nearest first.
+        edges: a list of references between reports in the graph, each a pair of the
+            referencing and referenced ATel numbers.
+        truncated: true if reports were left out because the graph reached the limit.
+    """
+    flag = 1
+    message = ""
+    nodes = []
+    edges = []
+    truncated = False
+
+    try:
+        atel_nums = parse_atel_nums(",".join(request.args.getlist("atel_num")))
+        hops = parse_hops(request.args.get("hops"))
+        if hops == None:
+            hops = DEFAULT_GRAPH_HOPS
+        limit = parse_limit(request.args.get("limit"), MAX_GRAPH_NODES)
+        if limit == None:
+            limit = MAX_GRAPH_NODES
+    except ValueError as e:
+        flag = 2  # user error
+        message = str(e)
+
+    if flag == 1:
+        graph = db.get_reference_subgraph(atel_nums, hops, limit)
+        nodes, edges = create_subgraph_lists(graph)
+        truncated = graph.truncated
+
     return jsonify(
         {
             "flag": flag,
-            "report_list": report_dicts,
-            "node_list": list_result[0],
-            "edge_list": list_result[1],
+            "nodes": [{"atel_num": atel_num, "hops": hops} for atel_num, hops in nodes],
+            "edges": [list(edge) for edge in edges],
+            "truncated": truncated,
+            "message": message,
+        }
+    )
+
+
+@app.route("/thread", methods=["GET"])
+def report_thread() -> json:
+    """Finds every report in the same thread as the given report, such as a discovery
+    report and all its follow-ups, connected by references or shared objects.
+
+    Args:
+        atel_num (int): the ATel number of a report in the thread, as a query parameter.
+
+    Returns:
+        flag: 1 if successful, 2 if the ATel number is invalid.
+        report_list: the reports in the thread, oldest first, empty if the report is not stored.
+        node_list: a list of report nodes for the visualisation graph.
+        edge_list: a list of edges for the visualisation graph.
+    """
+    flag = 1
+    message = ""
+    reports = []
+
+    try:
+        atel_nums = parse_atel_nums(request.args.get("atel_num", ""))
+        if len(atel_nums) > 1:
+            raise ValueError("Only one ATel number can be given.")
+    except ValueError as e:
+        flag = 2  # user error
+        message = str(e)
+
+    if flag == 1:
+        reports = db.find_reports_by_thread(atel_nums[0])
+
+    nodes, edges = create_nodes_list(reports)
+    return jsonify(
+        {
+            "flag": flag,
+            "report_list": [report_to_dict(report) for report in reports],
+            "node_list": nodes,
+            "edge_list": edges,
             "message": message,
         }
     )
@@ -473,25 +1135,6 @@ def load_metadata() -> json:
     )
 
 
-def background_import():
-    process = Process(target=background_import_task, daemon=True)
-    process.start()
-
-
-def background_import_task():
-    print("Acquiring lock", flush=True)
-    if lock.acquire(timeout=30):
-        print("Acquired lock", flush=True)
-
-        try:
-            import_all_reports()
-        finally:
-            print("Releasing lock", flush=True)
-            lock.release()
-    else:
-        print("Failed to acquire lock", flush=True)
-
-
 """
 Application Main Line  
   
@@ -499,8 +1142,8 @@ Application Main Line
 # Initialise the database
 init_db()
 
-print("Force releasing lock", flush=True)
-lock.release(forceRelease=True)
+# Load the graph of references between reports before handling requests
+db.load_citation_graph()
 
 if __name__ == "__main__":
     # Run the application
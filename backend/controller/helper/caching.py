@@ -0,0 +1,204 @@
+"""
+Contains helper data structures used for caching results in memory.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from collections import OrderedDict
+from threading import Event, Lock
+from typing import Any, Callable, Hashable
+import time
+
+
+class TTLCache:
+    """
+    A thread-safe, size-bounded cache whose entries expire after a fixed time to live. When full, the least recently used entry is evicted.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Creates an empty cache.
+
+        Args:
+            max_entries (int): The maximum number of entries to store. Must be positive.
+            ttl (float): The number of seconds an entry remains valid after it is stored.
+            clock (Callable[[], float], optional): Returns the current time in seconds. Defaults to time.monotonic.
+
+        Raises:
+            ValueError: When max_entries is not positive.
+        """
+        if max_entries < 1:
+            raise ValueError("Cache must be able to hold at least one entry.")
+
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        """
+        Returns:
+            int: The number of entries stored, including any that have expired but not yet been evicted.
+        """
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """
+        Checks whether a valid entry is stored for the given key.
+
+        Args:
+            key (Hashable): The key to lookup.
+
+        Returns:
+            bool: True if an unexpired entry exists.
+        """
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Retrieves the value stored for the given key.
+
+        Args:
+            key (Hashable): The key to lookup.
+            default (Any, optional): The value to return if there is no valid entry. Defaults to None.
+
+        Returns:
+            Any: The stored value, or the default if the key is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                return default
+
+            expires, value = entry
+            if self._clock() >= expires:
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Stores a value for the given key, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key (Hashable): The key to store the value under.
+            value (Any): The value to store.
+        """
+        with self._lock:
+            self._entries[key] = (self._clock() + self._ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def remove(self, key: Hashable):
+        """
+        Removes the entry for the given key, if one exists.
+
+        Args:
+            key (Hashable): The key to remove.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Removes all entries from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key, so that only one call is in flight at a time and every concurrent caller shares its result.
+    """
+
+    def __init__(self):
+        """
+        Creates a single flight group with no calls in flight.
+        """
+        self._calls: dict = {}
+        self._lock = Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Calls the given function, unless a call with the same key is already in flight, in which case waits for and returns that call's result instead.
+
+        Args:
+            key (Hashable): Identifies equivalent calls.
+            fn (Callable[[], Any]): The function to call.
+
+        Returns:
+            Any: The result of the function, shared by all concurrent callers.
+
+        Raises:
+            Exception: Any exception raised by the function is raised to all concurrent callers.
+        """
+        with self._lock:
+            call = self._calls.get(key, None)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def in_flight(self) -> int:
+        """
+        Returns:
+            int: The number of calls currently in flight.
+        """
+        with self._lock:
+            return len(self._calls)
+
+
+class _Call:
+    """
+    A call in flight within a SingleFlight group.
+    """
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+# Sentinel used to distinguish missing entries from stored None values.
+_MISSING = object()
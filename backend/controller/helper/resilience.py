@@ -0,0 +1,246 @@
+"""
+Contains helpers used to bound the time spent waiting on remote services.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from enum import Enum
+from threading import Lock
+from typing import Callable
+import random
+import time
+
+
+class Deadline:
+    """
+    A point in time by which an operation, such as handling a request, must complete.
+    """
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Creates a deadline the given number of seconds from now.
+
+        Args:
+            seconds (float): The time budget, in seconds.
+            clock (Callable[[], float], optional): Returns the current time in seconds. Defaults to time.monotonic.
+        """
+        self._clock = clock
+        self._expires = clock() + seconds
+
+    def remaining(self) -> float:
+        """
+        Returns:
+            float: The number of seconds until the deadline, or zero if it has passed.
+        """
+        return max(0.0, self._expires - self._clock())
+
+    def expired(self) -> bool:
+        """
+        Returns:
+            bool: True if the deadline has passed.
+        """
+        return self.remaining() <= 0.0
+
+
+class CircuitState(Enum):
+    """
+    The states of a circuit breaker.
+
+    CLOSED: Calls are allowed.
+    OPEN: Calls are rejected until the reset timeout has elapsed.
+    HALF_OPEN: A single trial call is allowed to test whether the service has recovered.
+    """
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+
+class CircuitBreaker:
+    """
+    A thread-safe circuit breaker, which stops calls to a remote service after consecutive failures or slow responses, so callers fail fast while the service is unavailable.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, slow_call_seconds: float = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Creates a closed circuit breaker.
+
+        Args:
+            failure_threshold (int): The number of consecutive failures after which the circuit opens. Must be positive.
+            reset_timeout (float): The number of seconds the circuit stays open before a trial call is allowed.
+            slow_call_seconds (float, optional): Calls taking longer than this many seconds count as failures. Defaults to None, never counting slow calls.
+            clock (Callable[[], float], optional): Returns the current time in seconds. Defaults to time.monotonic.
+
+        Raises:
+            ValueError: When failure_threshold is not positive.
+        """
+        if failure_threshold < 1:
+            raise ValueError("Failure threshold must be at least one.")
+
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._slow_call_seconds = slow_call_seconds
+        self._clock = clock
+        self._lock = Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        """
+        The current state of the circuit.
+        """
+        with self._lock:
+            if self._state == CircuitState.OPEN and self._clock() - self._opened_at >= self._reset_timeout:
+                return CircuitState.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Checks whether a call may be made. When the circuit is half open, only one trial call is allowed at a time.
+
+        Returns:
+            bool: True if the call may be made. The outcome must then be recorded with record_success() or record_failure().
+        """
+        with self._lock:
+            if self._state == CircuitState.OPEN:
+                if self._clock() - self._opened_at < self._reset_timeout:
+                    return False
+                self._state = CircuitState.HALF_OPEN
+                self._trial_in_flight = False
+
+            if self._state == CircuitState.HALF_OPEN:
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+
+            return True
+
+    def record_success(self, duration: float = 0.0):
+        """
+        Records a completed call. Calls slower than slow_call_seconds are recorded as failures.
+
+        Args:
+            duration (float, optional): The number of seconds the call took. Defaults to 0.
+        """
+        if self._slow_call_seconds is not None and duration > self._slow_call_seconds:
+            self.record_failure()
+            return
+
+        with self._lock:
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """
+        Records a failed call, opening the circuit once the failure threshold is reached or if the trial call failed.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._state == CircuitState.HALF_OPEN or self._failures >= self._failure_threshold:
+                self._state = CircuitState.OPEN
+                self._opened_at = self._clock()
+                self._trial_in_flight = False
+
+    def reset(self):
+        """
+        Closes the circuit and clears the failure count.
+        """
+        with self._lock:
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket rate limiter, which allows calls at an average rate with short bursts.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """
+        Creates a full token bucket.
+
+        Args:
+            rate (float): The number of tokens added per second. Must be positive.
+            capacity (float): The maximum number of tokens held, i.e. the largest burst of calls. Must be at least one.
+            clock (Callable[[], float], optional): Returns the current time in seconds. Defaults to time.monotonic.
+            sleep (Callable[[float], None], optional): Waits for a number of seconds. Defaults to time.sleep.
+
+        Raises:
+            ValueError: When rate is not positive or capacity is less than one.
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be positive.")
+        if capacity < 1:
+            raise ValueError("Capacity must be at least one.")
+
+        self._rate = rate
+        self._capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = Lock()
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def try_acquire(self) -> float:
+        """
+        Takes a token if one is available.
+
+        Returns:
+            float: Zero if a token was taken, otherwise the number of seconds until one is available.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self._rate
+
+    def acquire(self):
+        """
+        Takes a token, waiting until one is available.
+        """
+        wait = self.try_acquire()
+        while wait > 0:
+            self._sleep(wait)
+            wait = self.try_acquire()
+
+
+def backoff_delay(attempt: int, base: float, maximum: float, jitter: Callable[[], float] = random.random) -> float:
+    """
+    Computes the time to wait before retrying a failed call, using exponential backoff with full jitter, so callers failing together do not retry together.
+
+    Args:
+        attempt (int): The number of the failed attempt, starting from zero.
+        base (float): The maximum delay after the first failure, in seconds.
+        maximum (float): The maximum delay after any failure, in seconds.
+        jitter (Callable[[], float], optional): Returns a random number between zero and one. Defaults to random.random.
+
+    Returns:
+        float: The number of seconds to wait.
+    """
+    return jitter() * min(maximum, base * 2 ** min(attempt, 32))
@@ -0,0 +1,252 @@
+"""
+Contains the download scheduler, which paces the importer's requests to the AT website so concurrent imports do not overload it.
+
+Requests are limited by a token bucket shared by every thread of the process, and by a cap on the number of requests to each host at a time. A failed request pauses every download for an exponentially increasing, jittered delay before it is retried. Each thread reuses its own session, keeping connections to the website alive and its browser open between reports.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from collections import deque
+from threading import BoundedSemaphore, Lock, local
+from typing import Callable, TypeVar
+from urllib.parse import urlparse
+import asyncio
+import random
+import time
+
+import pyppeteer
+from pyppeteer.errors import TimeoutError
+from requests.exceptions import ConnectionError, HTTPError, Timeout
+from requests_html import HTMLSession
+
+from controller.helper.resilience import TokenBucket, backoff_delay
+
+# The average number of requests per second to the AT website, and the largest burst of requests.
+DOWNLOAD_RATE: float = 1.0
+DOWNLOAD_BURST: int = 2
+
+# The maximum number of requests to a host at a time.
+MAX_DOWNLOADS_PER_HOST: int = 2
+
+# The number of attempts at a request before its failure is raised.
+DOWNLOAD_ATTEMPTS: int = 3
+
+# The maximum pause after the first failed request, doubling after each further failure, and the maximum pause after any failure, in seconds.
+BACKOFF_BASE_SECONDS: float = 0.5
+BACKOFF_MAX_SECONDS: float = 60.0
+
+# The number of seconds over which the effective request rate is measured.
+RATE_WINDOW_SECONDS: float = 60.0
+
+# The errors after which a request is retried.
+RETRYABLE_ERRORS = (ConnectionError, HTTPError, Timeout, TimeoutError)
+
+T = TypeVar("T")
+
+class RenderSession(HTMLSession):
+    """
+    An HTMLSession that can render pages on any thread, with its own event loop and a browser that does not install signal handlers, which is only allowed on the main thread.
+    """
+
+    @property
+    def browser(self):
+        if not hasattr(self, "_browser"):
+            self.loop = asyncio.new_event_loop()
+            self._browser = self.loop.run_until_complete(pyppeteer.launch(
+                headless=True, args=["--no-sandbox"], handleSIGINT=False, handleSIGTERM=False, handleSIGHUP=False))
+        return self._browser
+
+class DownloadScheduler:
+    """
+    Paces requests to remote hosts with a shared rate limit, a per-host concurrency cap and retries with backoff.
+    """
+
+    def __init__(self,
+                 rate: float = DOWNLOAD_RATE,
+                 burst: int = DOWNLOAD_BURST,
+                 max_per_host: int = MAX_DOWNLOADS_PER_HOST,
+                 attempts: int = DOWNLOAD_ATTEMPTS,
+                 backoff_base: float = BACKOFF_BASE_SECONDS,
+                 backoff_max: float = BACKOFF_MAX_SECONDS,
+                 open_session: Callable[[], HTMLSession] = RenderSession,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 jitter: Callable[[], float] = random.random):
+        """
+        Creates a scheduler with no requests made.
+
+        Args:
+            rate (float, optional): The average number of requests per second. Defaults to DOWNLOAD_RATE.
+            burst (int, optional): The largest burst of requests. Defaults to DOWNLOAD_BURST.
+            max_per_host (int, optional): The maximum number of requests to a host at a time. Defaults to MAX_DOWNLOADS_PER_HOST.
+            attempts (int, optional): The number of attempts at a request before its failure is raised. Defaults to DOWNLOAD_ATTEMPTS.
+            backoff_base (float, optional): The maximum pause after the first failed request, in seconds. Defaults to BACKOFF_BASE_SECONDS.
+            backoff_max (float, optional): The maximum pause after any failed request, in seconds. Defaults to BACKOFF_MAX_SECONDS.
+            open_session (Callable[[], HTMLSession], optional): Opens the session a thread makes its requests with. Defaults to RenderSession.
+            clock (Callable[[], float], optional): Returns the current time in seconds. Defaults to time.monotonic.
+            sleep (Callable[[float], None], optional): Waits for a number of seconds. Defaults to time.sleep.
+            jitter (Callable[[], float], optional): Returns a random number between zero and one. Defaults to random.random.
+        """
+        self._bucket = TokenBucket(rate, burst, clock, sleep)
+        self._max_per_host = max_per_host
+        self._attempts = max(1, attempts)
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._open_session = open_session
+        self._clock = clock
+        self._sleep = sleep
+        self._jitter = jitter
+
+        self._lock = Lock()
+        self._host_slots: dict[str, BoundedSemaphore] = {}
+        self._paused_until = 0.0
+        self._failures = 0
+        self._request_times = deque()
+        self._local = local()
+
+    def fetch(self, url: str, request: Callable[[HTMLSession, str], T]) -> T:
+        """
+        Makes a request once the rate limit and the host's concurrency cap allow it, retrying it after a pause if it fails.
+
+        Args:
+            url (str): The URL requested.
+            request (Callable[[HTMLSession, str], T]): Makes the request with the thread's session and returns its result.
+
+        Returns:
+            T: The result of the request.
+
+        Raises:
+            ConnectionError, HTTPError, Timeout, TimeoutError: The error of the last attempt, once every attempt has failed.
+        """
+        host = urlparse(url).netloc
+
+        for _ in range(self._attempts):
+            self._wait_until_resumed()
+            self._bucket.acquire()
+
+            with self._host_slot(host):
+                self._record_request()
+                try:
+                    result = request(self._session(), url)
+                except RETRYABLE_ERRORS as err:
+                    error = err
+                    if isinstance(err, TimeoutError):
+                        # The browser may be stuck, so the next attempt opens a new one
+                        self.close_session()
+                else:
+                    with self._lock:
+                        self._failures = 0
+                    return result
+
+            self._pause()
+
+        raise error
+
+    def requests_per_second(self) -> float:
+        """
+        Returns:
+            float: The number of requests made per second over the last RATE_WINDOW_SECONDS.
+        """
+        with self._lock:
+            self._expire_request_times(self._clock())
+            return len(self._request_times) / RATE_WINDOW_SECONDS
+
+    def paused_for(self) -> float:
+        """
+        Returns:
+            float: The number of seconds until requests resume after a failure, or zero if they are not paused.
+        """
+        with self._lock:
+            return max(0.0, self._paused_until - self._clock())
+
+    def close_session(self):
+        """
+        Closes the calling thread's session and browser, if it has one.
+        """
+        session = getattr(self._local, "session", None)
+        self._local.session = None
+        if session is not None:
+            try:
+                session.close()
+            except Exception as err:
+                print(f"Closing download session failed: {str(err)}", flush=True)
+
+    def _session(self) -> HTMLSession:
+        """
+        Returns:
+            HTMLSession: The calling thread's session, opened on its first request.
+        """
+        if getattr(self._local, "session", None) is None:
+            self._local.session = self._open_session()
+        return self._local.session
+
+    def _host_slot(self, host: str) -> BoundedSemaphore:
+        """
+        Args:
+            host (str): The host requested.
+
+        Returns:
+            BoundedSemaphore: The semaphore limiting the number of requests to the host at a time.
+        """
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = BoundedSemaphore(self._max_per_host)
+            return self._host_slots[host]
+
+    def _wait_until_resumed(self):
+        """
+        Waits until requests resume after a failure.
+        """
+        wait = self.paused_for()
+        while wait > 0:
+            self._sleep(wait)
+            wait = self.paused_for()
+
+    def _pause(self):
+        """
+        Pauses every request after a failure, for longer after each consecutive failure.
+        """
+        with self._lock:
+            delay = backoff_delay(self._failures, self._backoff_base, self._backoff_max, self._jitter)
+            self._failures += 1
+            self._paused_until = max(self._paused_until, self._clock() + delay)
+
+    def _record_request(self):
+        """
+        Records the time of a request, for the effective request rate.
+        """
+        with self._lock:
+            now = self._clock()
+            self._request_times.append(now)
+            self._expire_request_times(now)
+
+    def _expire_request_times(self, now: float):
+        """
+        Discards the times of requests made before the rate window. The lock must be held.
+
+        Args:
+            now (float): The current time in seconds.
+        """
+        while self._request_times and self._request_times[0] <= now - RATE_WINDOW_SECONDS:
+            self._request_times.popleft()
+
+
+# Download scheduler of this process, shared by every import thread.
+download_scheduler = DownloadScheduler()
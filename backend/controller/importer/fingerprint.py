@@ -0,0 +1,78 @@
+"""
+Contains functions that fingerprint downloaded and parsed ATel reports, so unchanged reports are not parsed or stored again when they are re-imported.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from hashlib import sha256
+import json
+
+from model.ds.report_fingerprint import ReportFingerprint, ReportSection
+from model.ds.report_types import ImportedReport
+
+def hash_text(text: str) -> str:
+    """
+    Hashes text, ignoring differences in whitespace.
+
+    Args:
+        text (str): The text to hash.
+
+    Returns:
+        str: The hexadecimal SHA-256 hash of the text.
+    """
+    return sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+def hash_html(html_string: str) -> str:
+    """
+    Hashes the HTML of a report's page, ignoring differences in whitespace, such as those between renders of the page.
+
+    Args:
+        html_string (str): The HTML of the page.
+
+    Returns:
+        str: The hexadecimal SHA-256 hash of the HTML.
+    """
+    return hash_text(html_string)
+
+def fingerprint_report(report: ImportedReport, html_hash: str, parser_version: int) -> ReportFingerprint:
+    """
+    Fingerprints a parsed report, hashing each section of its data in the form it is stored in, so the order of extracted values does not matter.
+
+    Args:
+        report (ImportedReport): The parsed report.
+        html_hash (str): The hash of the page the report was parsed from, from hash_html.
+        parser_version (int): The version of the parser the report was parsed with.
+
+    Returns:
+        ReportFingerprint: The report's fingerprint.
+    """
+    sections = {
+        ReportSection.REPORT: [report.title, report.authors, report.body,
+                               report.submission_date.strftime("%Y-%m-%d %H:%M:%S"),
+                               sorted(set(str(kw).lower() for kw in report.keywords))],
+        ReportSection.OBJECTS: sorted(set(report.objects)),
+        ReportSection.OBSERVATION_DATES: sorted(set(date.strftime("%Y-%m-%d %H:%M:%S") for date in report.observation_dates)),
+        ReportSection.COORDINATES: sorted(set(f"{coord.ra.deg:.10f} {coord.dec.deg:.10f}" for coord in report.coordinates)),
+        ReportSection.REFERENCES: sorted(set(int(num) for num in report.referenced_reports)),
+        ReportSection.REFERENCED_BY: sorted(set(int(num) for num in report.referenced_by))
+    }
+
+    section_hashes = {section: sha256(json.dumps(value).encode("utf-8")).hexdigest() for section, value in sections.items()}
+    return ReportFingerprint(report.atel_num, html_hash, parser_version, section_hashes)
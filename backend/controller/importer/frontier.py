@@ -0,0 +1,100 @@
+"""
+Contains functions that find the newest ATel report on the AT website, so the number of reports waiting to be imported is known before importing them.
+
+The newest report is found by galloping search, probing ATel numbers at doubling distances from the next report to import until one is not found, then by binary search between the last report found and that number. Numbers missing for fewer than a few consecutive reports are treated as gaps rather than the end, so an isolated missing report does not hide the reports after it.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from math import ceil
+from typing import Callable
+
+from model.constants import MAX_IMPORT_RANGE_SIZE
+from controller.importer.importer import probe_report
+
+# The number of consecutive missing ATel numbers after which the newest report is assumed to have been passed.
+FRONTIER_MAX_GAP: int = 3
+
+# The number of ranges a sharded import is split into, so that every worker has ranges to lease.
+IMPORT_TARGET_RANGES: int = 32
+
+# The number of ATel numbers leased to a worker at a time when the number of waiting reports is unknown.
+DEFAULT_IMPORT_RANGE_SIZE: int = 50
+
+def find_newest_report(start_atel: int, exists: Callable[[int], bool] = probe_report, max_gap: int = FRONTIER_MAX_GAP) -> int:
+    """
+    Finds the ATel number of the newest report, probing ATel numbers from the specified number onwards.
+
+    Args:
+        start_atel (int): The ATel number of the next report to import. Reports before it are assumed to exist.
+        exists (Callable[[int], bool], optional): Checks whether the report with an ATel number exists. Defaults to probe_report.
+        max_gap (int, optional): The number of consecutive missing ATel numbers after which the newest report is assumed to have been passed. Defaults to FRONTIER_MAX_GAP.
+
+    Returns:
+        int: The ATel number of the newest report, or start_atel - 1 if there are no new reports.
+
+    Raises:
+        NetworkError: Thrown when network failure occurs while probing a report.
+    """
+    probed: dict[int, bool] = {}
+
+    def newest_near(atel_num: int) -> int:
+        # Finds the first report within max_gap ATel numbers of the given number
+        for i in range(max(1, max_gap)):
+            if atel_num + i not in probed:
+                probed[atel_num + i] = exists(atel_num + i)
+            if probed[atel_num + i]:
+                return atel_num + i
+        return None
+
+    # The newest report found, and an ATel number after it where no report was found
+    newest = start_atel - 1
+    step = 1
+    while True:
+        found = newest_near(newest + step)
+        if found is None:
+            missing = newest + step
+            break
+        newest = found
+        step *= 2
+
+    while missing - newest > 1:
+        middle = (newest + missing) // 2
+        found = newest_near(middle)
+        if found is None:
+            missing = middle
+        else:
+            newest = found
+
+    return newest
+
+def choose_range_size(pending: int) -> int:
+    """
+    Chooses the number of ATel numbers leased to a worker at a time by a sharded import, splitting the waiting reports into about IMPORT_TARGET_RANGES ranges.
+
+    Args:
+        pending (int): The number of reports waiting to be imported, or None if unknown.
+
+    Returns:
+        int: The number of ATel numbers in each range.
+    """
+    if pending is None:
+        return DEFAULT_IMPORT_RANGE_SIZE
+    return max(1, min(MAX_IMPORT_RANGE_SIZE, ceil(pending / IMPORT_TARGET_RANGES)))
@@ -0,0 +1,372 @@
+"""
+Contains the import worker, which processes the import jobs queued in the database on a background thread.
+
+Jobs are claimed through the database, so only one job runs at a time across every process and host, and a job whose worker stops recording progress is resumed by another worker from the next ATel number it had not imported. Progress is stored after every report, so it can be observed and the job cancelled while it runs.
+
+A sharded job is imported by every worker at once: each worker leases a range of ATel numbers from the database, imports it and reports its completion, so an import scales out across hosts. Run this module to start a worker process without the web server.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from threading import Condition, Thread
+from typing import Callable, Union
+import os
+import socket
+import time
+import uuid
+
+from model.constants import MAX_IMPORT_DELAY_SECONDS
+from model.db.db_interface import (
+    add_import_job,
+    claim_import_job,
+    claim_import_lease,
+    complete_import_lease,
+    finish_import_job,
+    get_import_job,
+    get_next_atel_num,
+    record_import_progress,
+    record_lease_progress,
+    set_next_atel_num,
+)
+from model.ds.import_job import ImportJob, ImportLease, JobState
+from controller.importer.importer import ImportFailError, NetworkError, ReportAlreadyExistsError, ReportNotFoundError, import_report
+from controller.importer.download_scheduler import download_scheduler
+from controller.importer.frontier import choose_range_size, find_newest_report
+from controller.importer.parser import MissingReportElementError
+
+# The number of seconds between checks for queued jobs.
+JOB_POLL_SECONDS: float = 5.0
+
+# The number of seconds without recorded progress after which a running job or leased range is resumed by another worker.
+# Must be longer than the time taken to download and import a single report.
+JOB_STALE_SECONDS: float = 120.0
+
+# The number of seconds an import job is paused after a report could not be downloaded, before the report is retried.
+FAILURE_PAUSE_SECONDS: float = 60.0
+
+# The number of times a report that could not be downloaded is attempted before it is counted as failed and skipped.
+# Its ERROR entry in the import ledger is left for ledger_retry.
+MAX_REPORT_ATTEMPTS: int = 5
+
+def queue_import_job(delay_seconds: float = 0.0, range_size: int = 0, sharded: bool = False) -> ImportJob:
+    """
+    Queues a job to import every new report, after finding the newest report on the AT website. If a job is already queued or running, that job is returned instead.
+
+    Args:
+        delay_seconds (float, optional): The number of seconds to wait between reports, to throttle the import. Defaults to 0.
+        range_size (int, optional): The number of ATel numbers to lease to a worker at a time. Defaults to 0, where a single worker imports every report in order unless sharded.
+        sharded (bool, optional): Whether workers on every host import the job in parallel, with a range size chosen from the number of waiting reports if none is given. Defaults to False.
+
+    Returns:
+        ImportJob: The queued job, or the job that was already active.
+    """
+    job = get_import_job()
+    if job is not None and job.state.active:
+        return job
+
+    next_atel = get_next_atel_num()
+    try:
+        newest_atel = find_newest_report(next_atel)
+    except NetworkError as e:
+        # The job ends at the first missing report instead
+        print(f"Finding the newest report failed: {str(e)}", flush=True)
+        newest_atel = None
+
+    if sharded and range_size == 0:
+        range_size = choose_range_size(newest_atel - next_atel + 1 if newest_atel is not None else None)
+
+    return add_import_job(next_atel, delay_seconds, range_size, newest_atel)
+
+class ImportWorker:
+    """
+    Claims queued import jobs and imports their reports on a background thread.
+    """
+
+    def __init__(self,
+                 claim_job: Callable[[str, float], ImportJob] = claim_import_job,
+                 record_progress: Callable[[ImportJob, str], JobState] = record_import_progress,
+                 finish_job: Callable[[ImportJob, str, JobState], None] = finish_import_job,
+                 import_one: Callable[[int], None] = import_report,
+                 set_next_atel: Callable[[int], None] = set_next_atel_num,
+                 claim_lease: Callable[[str, float], ImportLease] = claim_import_lease,
+                 record_lease: Callable[[ImportLease, str], JobState] = record_lease_progress,
+                 complete_lease: Callable[[ImportLease, str, int, bool], JobState] = complete_import_lease,
+                 request_rate: Callable[[], float] = download_scheduler.requests_per_second,
+                 poll_interval: float = JOB_POLL_SECONDS,
+                 stale_seconds: float = JOB_STALE_SECONDS,
+                 failure_pause: float = FAILURE_PAUSE_SECONDS,
+                 max_report_attempts: int = MAX_REPORT_ATTEMPTS,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Creates an idle worker. Call start() to begin processing jobs.
+
+        Args:
+            claim_job (Callable[[str, float], ImportJob], optional): Claims the next job for a worker ID, given the stale job timeout. Defaults to claim_import_job.
+            record_progress (Callable[[ImportJob, str], JobState], optional): Stores a job's progress and returns its state. Defaults to record_import_progress.
+            finish_job (Callable[[ImportJob, str, JobState], None], optional): Stores a job's final progress and state. Defaults to finish_import_job.
+            import_one (Callable[[int], None], optional): Imports a single report, given its ATel number. Defaults to import_report.
+            set_next_atel (Callable[[int], None], optional): Stores the ATel number of the next report to import. Defaults to set_next_atel_num.
+            claim_lease (Callable[[str, float], ImportLease], optional): Leases the next range of a sharded job to a worker ID, given the stale range timeout. Defaults to claim_import_lease.
+            record_lease (Callable[[ImportLease, str], JobState], optional): Stores a leased range's progress and returns its job's state. Defaults to record_lease_progress.
+            complete_lease (Callable[[ImportLease, str, int, bool], JobState], optional): Completes a leased range, given the ATel number the worker stopped at and whether the job failed, and returns its job's state. Defaults to complete_import_lease.
+            request_rate (Callable[[], float], optional): Returns the number of requests per second made to the AT website. Defaults to download_scheduler.requests_per_second.
+            poll_interval (float, optional): The number of seconds between checks for queued jobs. Defaults to JOB_POLL_SECONDS.
+            stale_seconds (float, optional): The number of seconds without progress after which a running job is resumed. Defaults to JOB_STALE_SECONDS.
+            failure_pause (float, optional): The number of seconds a job is paused after a report could not be downloaded. Defaults to FAILURE_PAUSE_SECONDS.
+            max_report_attempts (int, optional): The number of times a report that could not be downloaded is attempted before it is skipped. Defaults to MAX_REPORT_ATTEMPTS.
+            clock (Callable[[], float], optional): Returns the current time in seconds. Defaults to time.monotonic.
+            sleep (Callable[[float], None], optional): Waits for a number of seconds. Defaults to time.sleep.
+        """
+        self._claim_job = claim_job
+        self._record_progress = record_progress
+        self._finish_job = finish_job
+        self._import_one = import_one
+        self._set_next_atel = set_next_atel
+        self._claim_lease = claim_lease
+        self._record_lease = record_lease
+        self._complete_lease = complete_lease
+        self._request_rate = request_rate
+        self._poll_interval = poll_interval
+        self._stale_seconds = stale_seconds
+        self._failure_pause = failure_pause
+        self._max_report_attempts = max_report_attempts
+        self._clock = clock
+        self._sleep = sleep
+
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._condition = Condition()
+        self._thread: Thread = None
+        self._stopped = False
+        self._woken = False
+
+    def start(self):
+        """
+        Starts the background thread if it is not already running.
+        """
+        with self._condition:
+            if self.is_running():
+                return
+            self._stopped = False
+            self._thread = Thread(target=self.run, name="import-worker", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Signals the background thread to stop after the current report. A running job is left to be resumed later.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def is_running(self) -> bool:
+        """
+        Returns:
+            bool: True if the background thread is alive in this process.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def wake(self):
+        """
+        Checks for queued jobs now, rather than waiting for the next poll.
+        """
+        with self._condition:
+            self._woken = True
+            self._condition.notify_all()
+
+    def run_job(self, job: ImportJob) -> JobState:
+        """
+        Imports every new report of a claimed job, from its current ATel number until a report after the newest report found when the job was queued is not found, storing its progress after each report.
+
+        Args:
+            job (ImportJob): The claimed job.
+
+        Returns:
+            JobState: The final state of the job, or RUNNING if the worker was stopped or the job was claimed by another worker, leaving it to be resumed.
+        """
+        if job.state == JobState.CANCELLING:
+            self._finish_job(job, self.worker_id, JobState.CANCELLED)
+            return JobState.CANCELLED
+
+        started = self._clock()
+        processed = 0
+
+        while True:
+            stopped = self._import_current(job)
+            if stopped in (JobState.COMPLETED, JobState.FAILED):
+                self._finish_job(job, self.worker_id, stopped)
+                return stopped
+
+            if stopped is None:
+                job.current_atel += 1
+                self._set_next_atel(job.current_atel)
+                processed += 1
+
+            elapsed = self._clock() - started
+            job.rate = processed / elapsed if elapsed > 0 else 0.0
+            job.request_rate = self._request_rate()
+
+            state = self._record_progress(job, self.worker_id)
+            if state == JobState.CANCELLING:
+                self._finish_job(job, self.worker_id, JobState.CANCELLED)
+                return JobState.CANCELLED
+            if state is None or self._stopped:
+                return JobState.RUNNING
+
+            self._wait(job, stopped)
+
+    def run_lease(self, lease: ImportLease) -> JobState:
+        """
+        Imports every new report of a leased range of a sharded job, storing its progress after each report, then completes the range.
+
+        Args:
+            lease (ImportLease): The leased range.
+
+        Returns:
+            JobState: The state of the range's job once the range is completed, or RUNNING if the worker was stopped or the range was leased to another worker, leaving it to be resumed.
+        """
+        while lease.current_atel < lease.end_atel:
+            stopped = self._import_current(lease)
+            if stopped in (JobState.COMPLETED, JobState.FAILED):
+                # The first report found not to exist ends the range, and the ranges after it
+                return self._stop_lease(lease, lease.current_atel, stopped == JobState.FAILED)
+
+            if stopped is None:
+                lease.current_atel += 1
+                if lease.current_atel == lease.end_atel:
+                    break
+
+            state = self._record_lease(lease, self.worker_id)
+            if state == JobState.CANCELLING:
+                return self._stop_lease(lease, lease.current_atel, False)
+            if state is None or self._stopped:
+                return JobState.RUNNING
+
+            self._wait(lease, stopped)
+
+        return self._stop_lease(lease, lease.end_atel, False)
+
+    def run(self):
+        """
+        Claims and runs import jobs and leased ranges until the worker is stopped. Called on the background thread by start(), or directly to run a worker in the foreground.
+        """
+        while not self._stopped:
+            try:
+                lease = self._claim_lease(self.worker_id, self._stale_seconds)
+                if lease is not None:
+                    print(f"Importing {lease}", flush=True)
+                    self.run_lease(lease)
+                    continue
+
+                job = self._claim_job(self.worker_id, self._stale_seconds)
+                if job is not None:
+                    print(f"Running import job {job.job_id} from ATel #{job.current_atel}", flush=True)
+                    state = self.run_job(job)
+                    print(f"Import job {job.job_id} {state.value}", flush=True)
+                    continue
+            except Exception as e:
+                print(f"Import worker failed: {str(e)}", flush=True)
+
+            with self._condition:
+                if not self._woken and not self._stopped:
+                    self._condition.wait(self._poll_interval)
+                self._woken = False
+
+    def _stop_lease(self, lease: ImportLease, stop_atel: int, failed: bool) -> JobState:
+        """
+        Completes a leased range.
+
+        Args:
+            lease (ImportLease): The leased range.
+            stop_atel (int): The ATel number the worker stopped at.
+            failed (bool): Whether a report could not be imported, failing the job.
+
+        Returns:
+            JobState: The state of the range's job, or RUNNING if the range was leased to another worker.
+        """
+        lease.request_rate = self._request_rate()
+        state = self._complete_lease(lease, self.worker_id, stop_atel, failed)
+        return state if state is not None else JobState.RUNNING
+
+    def _wait(self, progress: Union[ImportJob, ImportLease], stopped: JobState):
+        """
+        Waits before importing the next report of a job or leased range: for the failure pause if the current report could not be downloaded, otherwise for the throttling delay.
+
+        Args:
+            progress (ImportJob | ImportLease): The job or leased range.
+            stopped (JobState): The outcome of importing the current report, from _import_current().
+        """
+        if stopped == JobState.RUNNING:
+            self._sleep(self._failure_pause)
+        elif progress.delay_seconds > 0:
+            self._sleep(min(progress.delay_seconds, MAX_IMPORT_DELAY_SECONDS))
+
+    def _import_current(self, progress: Union[ImportJob, ImportLease]) -> JobState:
+        """
+        Imports the report at the current ATel number of a job or leased range, counting the outcome.
+
+        Args:
+            progress (ImportJob | ImportLease): The job or leased range.
+
+        Returns:
+            JobState: None if the worker can continue with the next report, RUNNING if the report could not be downloaded and must be retried after a pause, until it has been attempted max_report_attempts times, COMPLETED if the report does not exist and is not before the newest report, or FAILED if the job cannot continue.
+        """
+        try:
+            self._import_one(progress.current_atel)
+            progress.imported += 1
+        except ReportAlreadyExistsError:
+            progress.skipped += 1
+        except MissingReportElementError as e:
+            progress.failed += 1
+            progress.last_error = f"ATel #{progress.current_atel}: {str(e)}"
+        except ReportNotFoundError:
+            if progress.newest_atel is None or progress.current_atel >= progress.newest_atel:
+                return JobState.COMPLETED
+            # A report missing before the newest report is a gap in the ATel numbers
+            progress.skipped += 1
+            progress.last_error = f"ATel #{progress.current_atel} does not exist"
+        except ImportFailError as e:
+            # The download scheduler has already retried the report, so the website is unavailable
+            # and the job is paused rather than ended
+            progress.last_error = f"ATel #{progress.current_atel}: {str(e)}"
+            progress.report_attempts += 1
+            if progress.report_attempts < self._max_report_attempts:
+                return JobState.RUNNING
+            # The report keeps failing, e.g. as its page cannot be rendered, so it is skipped and left in the
+            # import ledger for ledger_retry
+            progress.failed += 1
+        except Exception as e:
+            # Database errors stop the job, so it can be queued again once the failure is resolved
+            progress.last_error = f"ATel #{progress.current_atel}: {str(e)}"
+            return JobState.FAILED
+        progress.report_attempts = 0
+        return None
+
+
+# Import worker of this process.
+import_worker = ImportWorker()
+
+if __name__ == "__main__":
+    # Import reports in the foreground, e.g. on another host, until interrupted
+    print(f"Starting import worker {import_worker.worker_id}", flush=True)
+    try:
+        import_worker.run()
+    except KeyboardInterrupt:
+        import_worker.stop()
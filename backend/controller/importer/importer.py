@@ -21,14 +21,29 @@ License Terms and Copyright:
     along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
-from model.db.db_interface import ExistingReportError, report_exists, add_report, get_next_atel_num, set_next_atel_num
-from controller.importer.parser import MissingReportElementError, parse_report
+from model.db.db_interface import ExistingReportError, report_exists, add_report, update_report, get_report_fingerprint, get_next_atel_num, set_next_atel_num, record_ledger_entry
+from model.ds.import_ledger import LedgerEntry, LedgerStatus
+from model.ds.report_fingerprint import ReportSection
+from controller.importer.parser import MissingReportElementError, parse_report, PARSER_VERSION
+from controller.importer.fingerprint import fingerprint_report, hash_html
+from controller.importer.download_scheduler import download_scheduler
 
 from requests_html import HTMLSession
+import os
+import time
 from bs4 import BeautifulSoup
-from requests.exceptions import ConnectionError, HTTPError
+from requests.exceptions import ConnectionError, HTTPError, Timeout
 from pyppeteer.errors import TimeoutError
 
+# The URL of the AT website, which the ATEL_BASE_URL environment variable overrides, e.g. to import from a local mock website.
+ATEL_BASE_URL: str = 'https://www.astronomerstelegram.org/'
+
+# The number of seconds to wait for the AT website to respond to a probe for a report.
+PROBE_TIMEOUT_SECONDS: float = 10.0
+
+# The number of seconds to wait for a report's page to be downloaded, and then rendered.
+RENDER_TIMEOUT_SECONDS: float = 20.0
+
 # Custom exceptions
 class ReportAlreadyExistsError(Exception):
     pass
@@ -48,7 +63,7 @@ class DownloadFailError(Exception):
 # Importer functions
 def import_report(atel_num: int):
     """
-    Adds new ATel report into the database if it is valid.
+    Adds new ATel report into the database if it is valid, recording the outcome in the import ledger unless the report already exists or is not found.
 
     Args:
         atel_num (int): The ATel number of the new report to be added.
@@ -63,25 +78,25 @@ def import_report(atel_num: int):
     # Raises error when ATel report is already imported into the database
     if(report_exists(atel_num) == True):
         raise ReportAlreadyExistsError(f'ATel #{str(atel_num)} already exists in the database')
-    
-    try:
-        # Downloads the HTML of ATel report
-        html_string = download_report(atel_num)
 
-        # Raises error when ATel report is not found
-        if(html_string is None):
-            raise ReportNotFoundError(f'ATel #{str(atel_num)} does not exist')
+    _import_report(atel_num, False)
 
-        # Parses HTML and imports ATel report into the database
-        add_report(parse_report(atel_num, html_string))
-    # Raises error when ATel report import fails due to download issues
-    except NetworkError as err:
-        raise ImportFailError(f'Importing ATel #{str(atel_num)} failed: {str(err)}')
-    except DownloadFailError as err:
-        raise ImportFailError(f'Importing ATel #{str(atel_num)} failed: {str(err)}')
-    # Raises error when ATel report is already imported into the database
-    except ExistingReportError:
-        raise ReportAlreadyExistsError(f'ATel #{str(atel_num)} already exists in the database')
+def reimport_report(atel_num: int) -> list[ReportSection]:
+    """
+    Downloads an ATel report again and updates the stored report with any changes, recording the outcome in the import ledger. The report is not parsed if its page and the parser are unchanged since it was stored, and only the sections of its data that changed are written. A report that is not stored is imported.
+
+    Args:
+        atel_num (int): The ATel number of the report to be re-imported.
+
+    Returns:
+        list[ReportSection]: The sections of the report's data that were written.
+
+    Raises:
+        ReportNotFoundError: Thrown when report with the ATel number is not found on the AT website.
+        ImportFailError: Thrown when report with the ATel number failed to be downloaded.
+        MissingReportElementError: Thrown when important data could not be extracted or are missing from the ATel report.
+    """
+    return _import_report(atel_num, report_exists(atel_num))
 
 def import_all_reports():
     """
@@ -110,6 +125,54 @@ def import_all_reports():
     except ImportFailError:
         print('Importing stopped due to a network issue', flush=True)
 
+def report_url(atel_num: int) -> str:
+    """
+    Generates the URL of an ATel report's page, on the website set by the ATEL_BASE_URL environment variable, or the AT website if it is not set.
+
+    Args:
+        atel_num (int): The ATel number of the report.
+
+    Returns:
+        str: The URL of the report's page.
+    """
+    base_url = os.getenv('ATEL_BASE_URL') or ATEL_BASE_URL
+    return f'{base_url.rstrip("/")}/?read={atel_num}'
+
+def is_missing_report(html: str) -> bool:
+    """
+    Determines whether the HTML of an ATel report's page states that the report does not exist.
+
+    Args:
+        html (str): The HTML of the page.
+
+    Returns:
+        bool: True if the report does not exist.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    texts = soup.find_all('p', {'class': None, 'align': None})
+
+    return len(texts) > 1 and texts[1].get_text(strip=True) == 'This ATel does not appear to exist.'
+
+def probe_report(atel_num: int) -> bool:
+    """
+    Checks whether an ATel report exists on the AT website, with a single request that does not render the page.
+
+    Args:
+        atel_num (int): The ATel number of the report.
+
+    Returns:
+        bool: True if the report exists.
+
+    Raises:
+        NetworkError: Thrown when network failure occurs during the request.
+    """
+    try:
+        html = download_scheduler.fetch(report_url(atel_num), lambda session, url: _get_page(session, url, PROBE_TIMEOUT_SECONDS).text)
+    except (ConnectionError, HTTPError, Timeout) as err:
+        raise NetworkError(f'Network failure encountered: {str(err)}')
+
+    return not is_missing_report(html)
+
 def download_report(atel_num: int) -> str:
     """
     Downloads the HTML of ATel report.
@@ -125,25 +188,12 @@ def download_report(atel_num: int) -> str:
         DownloadFailError: Thrown when the HTML could not be downloaded.
     """
 
-    session = None
-
     try:
-        # Generates the URL of ATel page
-        url = f'https://www.astronomerstelegram.org/?read={atel_num}'
-
-        # Makes a GET request to ATel page
-        session = HTMLSession()
-        request = session.get(url)
-
-        # Fully loads the HTML of ATel page
-        request.html.render(timeout=20)
-        html = request.html.raw_html
+        # Makes a GET request to ATel page and fully loads its HTML, when the download scheduler allows it
+        html = download_scheduler.fetch(report_url(atel_num), _render_page)
 
         # Determines whether ATel report exists
-        soup = BeautifulSoup(html, 'html.parser')
-        texts = soup.find_all('p', {'class': None, 'align': None})
-
-        if(texts[1].get_text(strip=True) == 'This ATel does not appear to exist.'):
+        if(is_missing_report(html)):
             html = None
 
         return html
@@ -157,6 +207,159 @@ def download_report(atel_num: int) -> str:
         raise DownloadFailError(f'Couldn\'t download HTML: {str(err)}')
     except Exception as err:
         raise DownloadFailError(f'Couldn\'t download HTML: {str(err)}')
-    finally:
-        # Closes connection
-        session.close()
\ No newline at end of file
+
+def download_if_modified(atel_num: int, etag: str = None, last_modified: str = None) -> tuple[str, str, str]:
+    """
+    Downloads the HTML of an ATel report's page without rendering it, unless the AT website responds that it has not been modified since it was last downloaded.
+
+    Args:
+        atel_num (int): The ATel number of the report.
+        etag (str, optional): The ETag header of the page when it was last downloaded. Defaults to None.
+        last_modified (str, optional): The Last-Modified header of the page when it was last downloaded. Defaults to None.
+
+    Returns:
+        tuple[str, str, str]: The HTML of the page, or None if it has not been modified, and the page's current ETag and Last-Modified headers, or the given headers if it has not been modified.
+
+    Raises:
+        NetworkError: Thrown when network failure occurs during the request.
+    """
+    headers = {}
+    if etag is not None:
+        headers['If-None-Match'] = etag
+    if last_modified is not None:
+        headers['If-Modified-Since'] = last_modified
+
+    try:
+        response = download_scheduler.fetch(report_url(atel_num), lambda session, url: _get_page(session, url, PROBE_TIMEOUT_SECONDS, headers))
+        response.raise_for_status()
+    except (ConnectionError, HTTPError, Timeout) as err:
+        raise NetworkError(f'Network failure encountered: {str(err)}')
+
+    if response.status_code == 304:
+        return None, etag, last_modified
+    return response.text, response.headers.get('ETag'), response.headers.get('Last-Modified')
+
+def _render_page(session: HTMLSession, url: str) -> str:
+    """
+    Downloads a page and renders it.
+
+    Args:
+        session (HTMLSession): The session to make the request with.
+        url (str): The URL of the page.
+
+    Returns:
+        str: String representation of the rendered HTML.
+    """
+    response = _get_page(session, url, RENDER_TIMEOUT_SECONDS)
+    response.html.render(timeout=RENDER_TIMEOUT_SECONDS)
+    return response.html.raw_html
+
+def _get_page(session: HTMLSession, url: str, timeout: float, headers: dict[str, str] = None):
+    """
+    Makes a GET request for a page, raising HTTPError if the website is unavailable or limiting requests, so the request is retried.
+
+    Args:
+        session (HTMLSession): The session to make the request with.
+        url (str): The URL of the page.
+        timeout (float): The number of seconds to wait for a response.
+        headers (dict[str, str], optional): Extra headers of the request. Defaults to None.
+
+    Returns:
+        HTMLResponse: The response.
+    """
+    response = session.get(url, timeout=timeout, headers=headers)
+    if response.status_code == 429 or response.status_code >= 500:
+        response.raise_for_status()
+    return response
+
+def _import_report(atel_num: int, existing: bool) -> list[ReportSection]:
+    """
+    Downloads, parses and stores an ATel report, recording the outcome in the import ledger.
+
+    Args:
+        atel_num (int): The ATel number of the report.
+        existing (bool): Whether the report is already stored, in which case only the sections of its data that changed are written.
+
+    Returns:
+        list[ReportSection]: The sections of the report's data that were written.
+    """
+    entry = LedgerEntry(atel_num, LedgerStatus.IMPORTED, PARSER_VERSION)
+    stage_start = time.monotonic()
+    
+    try:
+        # Downloads the HTML of ATel report
+        html_string = download_report(atel_num)
+        entry.download_seconds = time.monotonic() - stage_start
+
+        # Raises error when ATel report is not found
+        if(html_string is None):
+            raise ReportNotFoundError(f'ATel #{str(atel_num)} does not exist')
+
+        # Skips parsing a stored report whose page and parser are unchanged
+        html_hash = hash_html(html_string)
+        previous = get_report_fingerprint(atel_num) if existing else None
+        if(previous is not None and previous.is_unchanged(html_hash, PARSER_VERSION)):
+            _record_ledger(entry)
+            return []
+
+        # Parses HTML and imports ATel report into the database
+        stage_start = time.monotonic()
+        report = parse_report(atel_num, html_string)
+        fingerprint = fingerprint_report(report, html_hash, PARSER_VERSION)
+        entry.parse_seconds = time.monotonic() - stage_start
+
+        stage_start = time.monotonic()
+        if(existing):
+            sections = fingerprint.changed_sections(previous)
+            update_report(report, fingerprint, sections)
+        else:
+            sections = list(ReportSection)
+            add_report(report, fingerprint)
+        entry.insert_seconds = time.monotonic() - stage_start
+    # Raises error when ATel report import fails due to download issues
+    except NetworkError as err:
+        _record_failure(entry, LedgerStatus.ERROR, err)
+        raise ImportFailError(f'Importing ATel #{str(atel_num)} failed: {str(err)}')
+    except DownloadFailError as err:
+        _record_failure(entry, LedgerStatus.ERROR, err)
+        raise ImportFailError(f'Importing ATel #{str(atel_num)} failed: {str(err)}')
+    # Raises error when ATel report is already imported into the database
+    except ExistingReportError:
+        raise ReportAlreadyExistsError(f'ATel #{str(atel_num)} already exists in the database')
+    except ReportNotFoundError:
+        raise
+    except MissingReportElementError as err:
+        _record_failure(entry, LedgerStatus.FAILED, err)
+        raise
+    except Exception as err:
+        _record_failure(entry, LedgerStatus.ERROR, err)
+        raise
+
+    _record_ledger(entry)
+    return sections
+
+def _record_failure(entry: LedgerEntry, status: LedgerStatus, err: Exception):
+    """
+    Records a failed attempt at importing a report in the import ledger.
+
+    Args:
+        entry (LedgerEntry): The attempt, with the durations of the stages completed before the failure.
+        status (LedgerStatus): FAILED if the report could not be parsed, or ERROR if it could not be downloaded or stored.
+        err (Exception): The error that stopped the attempt.
+    """
+    entry.status = status
+    entry.failure_class = type(err).__name__
+    entry.last_error = str(err)
+    _record_ledger(entry)
+
+def _record_ledger(entry: LedgerEntry):
+    """
+    Stores an attempt at importing a report in the import ledger. A failure to store it is printed rather than raised, so it does not hide the outcome of the import.
+
+    Args:
+        entry (LedgerEntry): The attempt.
+    """
+    try:
+        record_ledger_entry(entry)
+    except Exception as err:
+        print(f'Recording ATel #{entry.atel_num} in the import ledger failed: {str(err)}', flush=True)
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""
+Contains the ledger retrier, which re-imports only the reports the import ledger records as not imported: reports an older version of the parser could not parse, and reports that could not be downloaded or stored. After a parser or network fix, the affected reports are imported without rescanning every ATel number.
+
+Run this module to retry the reports in the foreground, optionally only those that failed with one error.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from typing import Callable
+import argparse
+import time
+
+from model.constants import MAX_IMPORT_DELAY_SECONDS
+from model.db.db_interface import get_retry_candidates, record_ledger_entry
+from model.ds.import_ledger import LedgerEntry, LedgerStatus
+from controller.importer.importer import ImportFailError, ReportAlreadyExistsError, ReportNotFoundError, import_report
+from controller.importer.parser import MissingReportElementError, PARSER_VERSION
+
+# The number of ledger entries retrieved from the database at a time.
+RETRY_BATCH_SIZE: int = 100
+
+class LedgerRetrier:
+    """
+    Re-imports the reports the import ledger records as not imported.
+    """
+
+    def __init__(self,
+                 get_candidates: Callable[..., list[LedgerEntry]] = get_retry_candidates,
+                 import_one: Callable[[int], None] = import_report,
+                 record_entry: Callable[[LedgerEntry], None] = record_ledger_entry,
+                 parser_version: int = PARSER_VERSION,
+                 batch_size: int = RETRY_BATCH_SIZE,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Creates a retrier.
+
+        Args:
+            get_candidates (Callable[..., list[LedgerEntry]], optional): Retrieves the next page of reports to retry, like get_retry_candidates. Defaults to get_retry_candidates.
+            import_one (Callable[[int], None], optional): Imports a single report, given its ATel number, and records the outcome in the ledger. Defaults to import_report.
+            record_entry (Callable[[LedgerEntry], None], optional): Stores an outcome the import does not record. Defaults to record_ledger_entry.
+            parser_version (int, optional): The version of the current parser. Defaults to PARSER_VERSION.
+            batch_size (int, optional): The number of ledger entries retrieved at a time. Defaults to RETRY_BATCH_SIZE.
+            sleep (Callable[[float], None], optional): Waits for a number of seconds. Defaults to time.sleep.
+        """
+        self._get_candidates = get_candidates
+        self._import_one = import_one
+        self._record_entry = record_entry
+        self._parser_version = parser_version
+        self._batch_size = batch_size
+        self._sleep = sleep
+
+    def run(self, failure_class: str = None, limit: int = None, delay_seconds: float = 0.0) -> dict[LedgerStatus, int]:
+        """
+        Retries each report to retry once, in order of ATel number. Stops early if a report cannot be downloaded, as the AT website is unavailable.
+
+        Args:
+            failure_class (str, optional): Only retries reports that failed with the error of this name, e.g. MissingReportElementError. Defaults to None, retrying reports that failed with any error.
+            limit (int, optional): The maximum number of reports retried. Defaults to None, retrying every report.
+            delay_seconds (float, optional): The number of seconds to wait between reports, to throttle the retry. Defaults to 0.
+
+        Returns:
+            dict[LedgerStatus, int]: The number of reports retried with each outcome.
+        """
+        outcomes = {status: 0 for status in LedgerStatus}
+        after_atel = 0
+        retried = 0
+
+        while limit is None or retried < limit:
+            batch_size = self._batch_size if limit is None else min(self._batch_size, limit - retried)
+            candidates = self._get_candidates(self._parser_version, failure_class, after_atel, batch_size)
+            if len(candidates) == 0:
+                break
+
+            for entry in candidates:
+                try:
+                    status = self._retry(entry.atel_num)
+                except ImportFailError as e:
+                    # The import has recorded the failure, and later reports would fail the same way
+                    print(f"Retrying stopped due to a network issue: {str(e)}", flush=True)
+                    outcomes[LedgerStatus.ERROR] += 1
+                    return outcomes
+
+                outcomes[status] += 1
+                retried += 1
+                after_atel = entry.atel_num
+
+                if delay_seconds > 0:
+                    self._sleep(min(delay_seconds, MAX_IMPORT_DELAY_SECONDS))
+
+        return outcomes
+
+    def _retry(self, atel_num: int) -> LedgerStatus:
+        """
+        Retries importing a report.
+
+        Args:
+            atel_num (int): The ATel number of the report.
+
+        Returns:
+            LedgerStatus: The outcome.
+
+        Raises:
+            ImportFailError: Thrown when the report could not be downloaded.
+        """
+        try:
+            self._import_one(atel_num)
+            print(f"ATel #{atel_num} successfully imported", flush=True)
+            return LedgerStatus.IMPORTED
+        except ReportAlreadyExistsError:
+            # Imported since the failure, e.g. manually, which the import does not record
+            self._record_entry(LedgerEntry(atel_num, LedgerStatus.IMPORTED, self._parser_version))
+            return LedgerStatus.IMPORTED
+        except ReportNotFoundError as e:
+            # Removed from the AT website, which the import does not record
+            self._record_entry(LedgerEntry(atel_num, LedgerStatus.ERROR, self._parser_version, type(e).__name__, str(e)))
+            return LedgerStatus.ERROR
+        except MissingReportElementError as e:
+            print(f"ATel #{atel_num} could not be imported due to it missing important data: {str(e)}", flush=True)
+            return LedgerStatus.FAILED
+        except ImportFailError:
+            raise
+        except Exception as e:
+            print(f"ATel #{atel_num} could not be imported: {str(e)}", flush=True)
+            return LedgerStatus.ERROR
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-imports the reports the import ledger records as not imported.")
+    parser.add_argument("--failure-class", help="only retry reports that failed with the error of this name, e.g. MissingReportElementError")
+    parser.add_argument("--limit", type=int, help="the maximum number of reports retried")
+    parser.add_argument("--delay", type=float, default=0.0, help="the number of seconds to wait between reports")
+    args = parser.parse_args()
+
+    outcomes = LedgerRetrier().run(args.failure_class, args.limit, args.delay)
+    print(", ".join(f"{count} {status.value}" for status, count in outcomes.items()), flush=True)
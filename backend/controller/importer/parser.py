@@ -28,11 +28,24 @@ from model.ds.report_types import ImportedReport
 from model.db.db_interface import object_exists, add_object, get_all_aliases
 from controller.search.query_simbad import query_simbad_by_coords, query_simbad_by_name
 from controller.search.search import check_object_updates
+from controller.importer.regex_backend import compile_pattern
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from datetime import datetime
 from astropy.coordinates import SkyCoord
 from astropy.time import Time
+import time
+
+# The version of the parser, stored with the outcome of each import in the import ledger.
+# Increase it whenever a change to the parser changes the data extracted from reports, so reports it previously failed to parse are retried, and stored reports are re-imported by the reparser.
+PARSER_VERSION: int = 1
+
+# The number of seconds after which extracting coordinates and dates from a report is abandoned, so a report with unusual text does not stall the importer.
+# The budget is best-effort: it is only checked between regexes, so a single slow search can overrun it. Shortening whitespace runs bounds the slowest known searches.
+PARSE_BUDGET_SECONDS: float = 10.0
+
+# The maximum length of a run of whitespace searched for coordinates. Longer runs are shortened, as the coordinate regexes take super-linear time on them with a backtracking regex engine.
+MAX_WHITESPACE_RUN: int = 10
 
 # Used for extracting the body of ATel reports
 BODY_TAGS = [['p', {'class': None, 'align': None}],
@@ -154,6 +167,9 @@ KEYWORD_REGEXES = ['radios?',
 class MissingReportElementError(Exception):
     pass
 
+class ParseBudgetExceededError(MissingReportElementError):
+    pass
+
 # Parser functions
 def parse_report(atel_num: int, html_string: str) -> ImportedReport:
     """
@@ -168,8 +184,11 @@ def parse_report(atel_num: int, html_string: str) -> ImportedReport:
 
     Raises:
         MissingReportElementError: Thrown when important data could not be extracted or are missing from the ATel report.
+        ParseBudgetExceededError: Thrown when extracting data from the ATel report is found to have taken longer than PARSE_BUDGET_SECONDS, checked between regexes.
     """
 
+    deadline = time.monotonic() + PARSE_BUDGET_SECONDS
+
     # Parses HTML into a tree
     soup = BeautifulSoup(html_string, 'html.parser')
 
@@ -267,8 +286,7 @@ def parse_report(atel_num: int, html_string: str) -> ImportedReport:
         body = body.strip()[:5120]
 
     # Extracts the number of any ATel reports that referenced the ATel report
-    referenced_by = re.findall('\d+', referenced_by_text)
-    referenced_by = list(dict.fromkeys([int(referenced_by_num) for referenced_by_num in referenced_by]))
+    referenced_by = parse_referenced_by(referenced_by_text)
 
     # Extracts any links that are in the ATel report
     referenced_reports = []
@@ -291,33 +309,73 @@ def parse_report(atel_num: int, html_string: str) -> ImportedReport:
 
     text = f'{title} {body.strip()}'
 
-    return ImportedReport(atel_num, title, authors, body.strip(), formatted_submission_date, referenced_reports, parse_dates(extract_dates(text)), extract_keywords(f'{title} {subjects} {body.strip()}'), extract_known_aliases(text), parse_coords(extract_coords(text)), referenced_by)
+    try:
+        return ImportedReport(atel_num, title, authors, body.strip(), formatted_submission_date, referenced_reports, parse_dates(extract_dates(text, deadline)), extract_keywords(f'{title} {subjects} {body.strip()}'), extract_known_aliases(text), parse_coords(extract_coords(text, deadline)), referenced_by)
+    except ParseBudgetExceededError as err:
+        raise ParseBudgetExceededError(f'Parsing ATel #{str(atel_num)} took too long: {str(err)}')
+
+def extract_references(html_string: str) -> str:
+    """
+    Finds the "Referred to by" block of an ATel report, parsing only that block of the HTML.
+
+    Args:
+        html_string (str): String representation of the downloaded HTML of the ATel report.
+
+    Returns:
+        str: The text of the block, or an empty string if the report has not been referred to.
+    """
+    soup = BeautifulSoup(html_string, 'html.parser', parse_only=SoupStrainer('div', {'id': 'references'}))
+    references = soup.find('div', {'id': 'references'})
+
+    return references.get_text() if references is not None else ''
+
+def parse_referenced_by(references_text: str) -> list[int]:
+    """
+    Extracts the ATel numbers of the reports referring to an ATel report from its "Referred to by" block.
+
+    Args:
+        references_text (str): The text of the block.
 
-def extract_coords(text: str) -> list[str]:
+    Returns:
+        list[int]: The ATel numbers, without duplicates.
+    """
+    referenced_by = re.findall('\d+', references_text)
+    return list(dict.fromkeys([int(referenced_by_num) for referenced_by_num in referenced_by]))
+
+def extract_coords(text: str, deadline: float = None) -> list[str]:
     """
     Finds all coordinates in the text of ATel report.
 
     Args:
         text (str): Text of ATel report.
+        deadline (float, optional): The time.monotonic() time by which extraction must finish. Defaults to None, for no deadline.
 
     Returns:
         list[str]: List of coordinates found.
+
+    Raises:
+        ParseBudgetExceededError: Thrown when the deadline has passed before a regex is searched. A search in progress is not interrupted.
     """
 
     coords = []
 
+    # Shortens long runs of whitespace, which the coordinate formats allow any number of
+    text = re.sub(rf'(\s{{{MAX_WHITESPACE_RUN}}})\s+', r'\1', text)
+
     # Finds all coordinates that are in the above coordinate formats in the text of ATel report
     for regex in COORD_REGEXES:
         # Attempts to find all coordinates that are in a certain coordinate format in the text using regex
-        coord_regex = re.compile(f'[^a-z]{regex}[^\d|^a-z]')
+        coord_regex = compile_pattern(f'[^a-z]{regex}[^\d|^a-z]')
         coords_found = coord_regex.findall(f' {text.lower()} ')
 
         # Removes any leading and/or trailing characters that are not part of the coordinate format
         for coord in coords_found:
-            coord_regex = re.compile(regex)
+            coord_regex = compile_pattern(regex)
             extracted_coord = coord_regex.search(coord)
             coords.append(extracted_coord.group())
 
+        _check_deadline(deadline, 'coordinates')
+
     return list(dict.fromkeys(coords))
 
 def parse_coords(coords: list[str]) -> list[SkyCoord]:
@@ -339,16 +397,16 @@ def parse_coords(coords: list[str]) -> list[SkyCoord]:
             coord_format = COORD_FORMATS[i]
 
             # Attempts to extract RA and DEC in a certain coordinate format
-            ra_regex = re.compile(f'[r]\.?\s*[a]\.?\s*(?:\([j]?2000\))?\s*[,:=]?\s*\(?{coord_format[0]}')
-            dec_regex = re.compile(f'[d][e][c][l]?\.?\s*(?:\([j]?2000\))?\s*[,:=]?\s*\(?{coord_format[1]}')
+            ra_regex = compile_pattern(f'[r]\.?\s*[a]\.?\s*(?:\([j]?2000\))?\s*[,:=]?\s*\(?{coord_format[0]}')
+            dec_regex = compile_pattern(f'[d][e][c][l]?\.?\s*(?:\([j]?2000\))?\s*[,:=]?\s*\(?{coord_format[1]}')
 
             ra_found = ra_regex.search(coord)
             dec_found = dec_regex.search(coord)
 
             # Extracts coordinates if they are in the coordinate format
             if((ra_found is not None) and (dec_found is not None)):
-                ra_regex = re.compile(coord_format[0])
-                dec_regex = re.compile(coord_format[1])
+                ra_regex = compile_pattern(coord_format[0])
+                dec_regex = compile_pattern(coord_format[1])
 
                 try:
                     skycoord_obj = None
@@ -445,15 +503,19 @@ def parse_coords(coords: list[str]) -> list[SkyCoord]:
 
     return formatted_coords
 
-def extract_dates(text: str) -> list[str]:
+def extract_dates(text: str, deadline: float = None) -> list[str]:
     """
     Finds all dates in the text of ATel report.
 
     Args:
         text (str): Text of ATel report.
+        deadline (float, optional): The time.monotonic() time by which extraction must finish. Defaults to None, for no deadline.
 
     Returns:
         list[str]: List of dates found.
+
+    Raises:
+        ParseBudgetExceededError: Thrown when the deadline has passed before a regex is searched. A search in progress is not interrupted.
     """
 
     dates = []
@@ -470,6 +532,8 @@ def extract_dates(text: str) -> list[str]:
             extracted_date = date_regex.search(date)
             dates.append(extracted_date.group())
 
+        _check_deadline(deadline, 'dates')
+
     return list(dict.fromkeys(dates))
 
 def parse_dates(dates: list[str]) -> list[datetime]:
@@ -586,4 +650,18 @@ def extract_keywords(text: str) -> list[str]:
 
         i = i + 1
 
-    return keywords
\ No newline at end of file
+    return keywords
+
+def _check_deadline(deadline: float, stage: str):
+    """
+    Stops parsing a report if its parse budget has been spent. Called between regexes, as a search in progress cannot be interrupted.
+
+    Args:
+        deadline (float): The time.monotonic() time by which parsing must finish, or None for no deadline.
+        stage (str): What was being extracted, for the error message.
+
+    Raises:
+        ParseBudgetExceededError: Thrown when the deadline has passed.
+    """
+    if(deadline is not None and time.monotonic() > deadline):
+        raise ParseBudgetExceededError(f'Extracting {stage} exceeded the parse budget of {PARSE_BUDGET_SECONDS} seconds')
@@ -0,0 +1,166 @@
+"""
+Contains the reference refresher, which keeps the "Referred to by" links of recently published reports up to date, as later telegrams cite them after they were imported.
+
+Each report published within the last REFERENCE_REFRESH_DAYS is checked on a decaying schedule: the interval between checks doubles each time its references are found unchanged, up to REFERENCE_CHECK_MAX_DAYS. A check downloads the report's page without rendering it, sending back the page's ETag and Last-Modified headers so an unmodified page is not downloaded again, and parses only the references block. If the block's hash is unchanged, nothing is written; otherwise only the references not already stored are added.
+
+Run this module to check the reports that are due, e.g. periodically from cron.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from datetime import datetime, timedelta
+from typing import Callable
+import argparse
+
+from model.db.db_interface import add_referenced_by, get_due_reference_checks, record_reference_check
+from model.ds.reference_check import ReferenceCheck
+from controller.importer.fingerprint import hash_text
+from controller.importer.importer import NetworkError, download_if_modified
+from controller.importer.parser import extract_references, parse_referenced_by
+
+# The number of days after a report is published during which its references are checked.
+REFERENCE_REFRESH_DAYS: int = 365
+
+# The number of hours between checks of a report whose references have just changed, doubling after each check that finds them unchanged.
+REFERENCE_CHECK_BASE_HOURS: float = 24.0
+
+# The maximum number of days between checks of a report.
+REFERENCE_CHECK_MAX_DAYS: float = 30.0
+
+# The maximum number of reports checked by one run.
+REFERENCE_REFRESH_BATCH_SIZE: int = 100
+
+def check_interval(unchanged_count: int) -> timedelta:
+    """
+    Computes the time until a report's references are checked again.
+
+    Args:
+        unchanged_count (int): The number of consecutive checks that found the references unchanged.
+
+    Returns:
+        timedelta: The time until the next check.
+    """
+    hours = REFERENCE_CHECK_BASE_HOURS * 2 ** min(unchanged_count, 32)
+    return timedelta(hours=min(hours, REFERENCE_CHECK_MAX_DAYS * 24))
+
+def hash_references(references_text: str) -> str:
+    """
+    Hashes the text of a report's references block, ignoring differences in whitespace.
+
+    Args:
+        references_text (str): The text of the block.
+
+    Returns:
+        str: The hexadecimal SHA-256 hash of the text.
+    """
+    return hash_text(references_text)
+
+class ReferenceRefresher:
+    """
+    Checks the "Referred to by" links of recently published reports that are due, storing any new references.
+    """
+
+    def __init__(self,
+                 get_due: Callable[[datetime, int], list[ReferenceCheck]] = get_due_reference_checks,
+                 record_check: Callable[[ReferenceCheck], None] = record_reference_check,
+                 add_refs: Callable[[int, list[int]], list[int]] = add_referenced_by,
+                 download: Callable[[int, str, str], tuple[str, str, str]] = download_if_modified,
+                 now: Callable[[], datetime] = datetime.now):
+        """
+        Creates a refresher.
+
+        Args:
+            get_due (Callable[[datetime, int], list[ReferenceCheck]], optional): Retrieves the reports published after a date that are due to be checked, up to a limit. Defaults to get_due_reference_checks.
+            record_check (Callable[[ReferenceCheck], None], optional): Stores the outcome of a check. Defaults to record_reference_check.
+            add_refs (Callable[[int, list[int]], list[int]], optional): Stores the references to a report not already stored, and returns them. Defaults to add_referenced_by.
+            download (Callable[[int, str, str], tuple[str, str, str]], optional): Downloads a report's page unless it is unmodified, like download_if_modified. Defaults to download_if_modified.
+            now (Callable[[], datetime], optional): Returns the current date and time. Defaults to datetime.now.
+        """
+        self._get_due = get_due
+        self._record_check = record_check
+        self._add_refs = add_refs
+        self._download = download
+        self._now = now
+
+    def run(self, limit: int = REFERENCE_REFRESH_BATCH_SIZE) -> tuple[int, int]:
+        """
+        Checks the references of the reports that are due, most recently published first. Stops early if a report cannot be downloaded, as the AT website is unavailable.
+
+        Args:
+            limit (int, optional): The maximum number of reports checked. Defaults to REFERENCE_REFRESH_BATCH_SIZE.
+
+        Returns:
+            tuple[int, int]: The number of reports checked, and the number of new references stored.
+        """
+        checked = 0
+        added = 0
+
+        for check in self._get_due(self._now() - timedelta(days=REFERENCE_REFRESH_DAYS), limit):
+            try:
+                added += len(self.refresh(check))
+            except NetworkError as e:
+                print(f"Checking references stopped due to a network issue: {str(e)}", flush=True)
+                break
+            checked += 1
+
+        return checked, added
+
+    def refresh(self, check: ReferenceCheck) -> list[int]:
+        """
+        Checks the references of a report, storing any new references and scheduling the next check.
+
+        Args:
+            check (ReferenceCheck): The state of the report's check, updated with its outcome.
+
+        Returns:
+            list[int]: The ATel numbers of the reports found referring to the report since it was last checked.
+
+        Raises:
+            NetworkError: Thrown when the report's page could not be downloaded.
+        """
+        html, check.etag, check.last_modified = self._download(check.atel_num, check.etag, check.last_modified)
+
+        new_refs = []
+        changed = False
+        if html is not None:
+            references_text = extract_references(html)
+            content_hash = hash_references(references_text)
+            if content_hash != check.content_hash:
+                new_refs = self._add_refs(check.atel_num, parse_referenced_by(references_text))
+                check.content_hash = content_hash
+                changed = True
+
+        check.unchanged_count = 0 if changed else check.unchanged_count + 1
+        check.checked_at = self._now()
+        check.next_check_at = check.checked_at + check_interval(check.unchanged_count)
+        self._record_check(check)
+
+        if len(new_refs) > 0:
+            print(f"ATel #{check.atel_num} referred to by {', '.join(f'ATel #{num}' for num in new_refs)}", flush=True)
+        return new_refs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Checks the \"Referred to by\" links of recently published reports that are due.")
+    parser.add_argument("--limit", type=int, default=REFERENCE_REFRESH_BATCH_SIZE, help="the maximum number of reports checked")
+    args = parser.parse_args()
+
+    checked, added = ReferenceRefresher().run(args.limit)
+    print(f"Checked {checked} reports, storing {added} new references", flush=True)
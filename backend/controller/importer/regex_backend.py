@@ -0,0 +1,92 @@
+"""
+Contains the regex backend used by the parser to extract coordinates from reports. Python's re module backtracks, so some patterns take super-linear time on unusual text, such as long tables of numbers. If an RE2 module (e.g. google-re2) is installed, it is used instead, as it matches in linear time.
+
+The REGEX_BACKEND environment variable selects the backend: "re2", "re", or "auto" to use RE2 if it is installed. RE2 is an optional dependency, listed in requirements-re2.txt and installed in the Docker image when it is built with --build-arg INSTALL_RE2=true.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from functools import lru_cache
+from types import ModuleType
+import os
+import re
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# The backend used if the REGEX_BACKEND environment variable is not set.
+DEFAULT_REGEX_BACKEND: str = 'auto'
+
+def regex_backend() -> ModuleType:
+    """
+    Chooses the regex module to compile patterns with, as set by the REGEX_BACKEND environment variable.
+
+    Returns:
+        ModuleType: The re2 module if it is selected, or selected automatically and installed, otherwise the re module.
+
+    Raises:
+        ValueError: Thrown when the environment variable names an unknown backend, or re2 is selected but not installed.
+    """
+    name = (os.getenv('REGEX_BACKEND') or DEFAULT_REGEX_BACKEND).lower()
+
+    if(name == 're'):
+        return re
+    if(name == 're2'):
+        if(re2 is None):
+            raise ValueError('The re2 regex backend is selected but not installed')
+        return re2
+    if(name == 'auto'):
+        return re if re2 is None else re2
+
+    raise ValueError(f'Unknown regex backend: {name}')
+
+def compile_pattern(pattern: str):
+    """
+    Compiles a pattern with the selected regex backend, reusing the compiled pattern of earlier calls. Patterns that the backend does not support are compiled with the re module.
+
+    Args:
+        pattern (str): The pattern.
+
+    Returns:
+        Pattern: The compiled pattern, supporting search and findall like a pattern of the re module.
+    """
+    return _compile(pattern, regex_backend())
+
+@lru_cache(maxsize=256)
+def _compile(pattern: str, backend: ModuleType):
+    """
+    Compiles a pattern with a regex module, falling back to the re module if the pattern is not supported.
+
+    Args:
+        pattern (str): The pattern.
+        backend (ModuleType): The regex module.
+
+    Returns:
+        Pattern: The compiled pattern.
+    """
+    if(backend is not re):
+        try:
+            return backend.compile(pattern)
+        except Exception:
+            pass
+
+    return re.compile(pattern)
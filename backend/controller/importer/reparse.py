@@ -0,0 +1,122 @@
+"""
+Contains the reparser, which re-imports stored reports, such as after a change to the parser. Each report's fingerprint is compared with its stored fingerprint, so a report whose page and parser are unchanged is not parsed again, and only the sections of a report's data that changed are written.
+
+Run this module to re-import the reports parsed by an older version of the parser, or every stored report, in the foreground.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from typing import Callable
+import argparse
+import time
+
+from model.constants import MAX_IMPORT_DELAY_SECONDS
+from model.db.db_interface import get_reparse_candidates
+from model.ds.report_fingerprint import ReportSection
+from controller.importer.importer import ImportFailError, reimport_report
+from controller.importer.parser import PARSER_VERSION
+
+# The number of reports retrieved from the database at a time.
+REPARSE_BATCH_SIZE: int = 100
+
+class Reparser:
+    """
+    Re-imports stored reports, writing only the data that changed.
+    """
+
+    def __init__(self,
+                 get_candidates: Callable[[int, int, int], list[int]] = get_reparse_candidates,
+                 reimport_one: Callable[[int], list[ReportSection]] = reimport_report,
+                 parser_version: int = PARSER_VERSION,
+                 batch_size: int = REPARSE_BATCH_SIZE,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Creates a reparser.
+
+        Args:
+            get_candidates (Callable[[int, int, int], list[int]], optional): Retrieves the next page of reports to re-import, like get_reparse_candidates. Defaults to get_reparse_candidates.
+            reimport_one (Callable[[int], list[ReportSection]], optional): Re-imports a single report, given its ATel number, and returns the sections written. Defaults to reimport_report.
+            parser_version (int, optional): The version of the current parser. Defaults to PARSER_VERSION.
+            batch_size (int, optional): The number of reports retrieved at a time. Defaults to REPARSE_BATCH_SIZE.
+            sleep (Callable[[float], None], optional): Waits for a number of seconds. Defaults to time.sleep.
+        """
+        self._get_candidates = get_candidates
+        self._reimport_one = reimport_one
+        self._parser_version = parser_version
+        self._batch_size = batch_size
+        self._sleep = sleep
+
+    def run(self, all_reports: bool = False, limit: int = None, delay_seconds: float = 0.0) -> tuple[int, int, int]:
+        """
+        Re-imports each report once, in order of ATel number. Stops early if a report cannot be downloaded, as the AT website is unavailable.
+
+        Args:
+            all_reports (bool, optional): Whether every stored report is re-imported, rather than only those parsed by an older version of the parser. Defaults to False.
+            limit (int, optional): The maximum number of reports re-imported. Defaults to None, re-importing every report.
+            delay_seconds (float, optional): The number of seconds to wait between reports, to throttle the re-import. Defaults to 0.
+
+        Returns:
+            tuple[int, int, int]: The number of reports unchanged, updated, and that could not be re-imported.
+        """
+        parser_version = None if all_reports else self._parser_version
+        unchanged = 0
+        updated = 0
+        failed = 0
+        after_atel = 0
+
+        while limit is None or unchanged + updated + failed < limit:
+            batch_size = self._batch_size if limit is None else min(self._batch_size, limit - unchanged - updated - failed)
+            candidates = self._get_candidates(parser_version, after_atel, batch_size)
+            if len(candidates) == 0:
+                break
+
+            for atel_num in candidates:
+                try:
+                    sections = self._reimport_one(atel_num)
+                except ImportFailError as e:
+                    print(f"Re-importing stopped due to a network issue: {str(e)}", flush=True)
+                    return unchanged, updated, failed + 1
+                except Exception as e:
+                    # Recorded in the import ledger, so it can be retried
+                    print(f"ATel #{atel_num} could not be re-imported: {str(e)}", flush=True)
+                    failed += 1
+                else:
+                    if len(sections) == 0:
+                        unchanged += 1
+                    else:
+                        print(f"ATel #{atel_num} updated: {', '.join(section.value for section in sections)}", flush=True)
+                        updated += 1
+                after_atel = atel_num
+
+                if delay_seconds > 0:
+                    self._sleep(min(delay_seconds, MAX_IMPORT_DELAY_SECONDS))
+
+        return unchanged, updated, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-imports stored reports, writing only the data that changed.")
+    parser.add_argument("--all", action="store_true", help="re-import every stored report, rather than only those parsed by an older version of the parser")
+    parser.add_argument("--limit", type=int, help="the maximum number of reports re-imported")
+    parser.add_argument("--delay", type=float, default=0.0, help="the number of seconds to wait between reports")
+    args = parser.parse_args()
+
+    unchanged, updated, failed = Reparser().run(args.all, args.limit, args.delay)
+    print(f"{unchanged} unchanged, {updated} updated, {failed} failed", flush=True)
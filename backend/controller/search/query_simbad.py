@@ -24,11 +24,16 @@ License Terms and Copyright:
 """
 
 
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable
+import time
+
 from astropy.coordinates import SkyCoord
 from astropy.coordinates.angles import Angle
 from astropy.table import Table
 from astroquery.simbad import Simbad
 
+from controller.helper.resilience import CircuitBreaker, Deadline
 from model.constants import DEFAULT_RADIUS, RADIUS_UNIT
 
 from requests.exceptions import ConnectionError, HTTPError, ReadTimeout
@@ -51,6 +56,18 @@ RA_COLUMN = "RA"
 DEC_COLUMN = "DEC"
 
 
+# The number of consecutive failed or slow SIMBAD queries after which
+# queries are stopped for SIMBAD_RESET_SECONDS.
+SIMBAD_FAILURE_THRESHOLD: int = 5
+SIMBAD_RESET_SECONDS: float = 30.0
+
+# SIMBAD queries taking longer than this many seconds count as failures.
+SIMBAD_SLOW_CALL_SECONDS: float = 10.0
+
+# The maximum number of SIMBAD queries with a deadline running at once.
+SIMBAD_MAX_WORKERS: int = 8
+
+
 """
 Error class for a failed connection to the SIMBAD database.
 """
@@ -58,6 +75,22 @@ class QuerySimbadError(Exception):
     pass
 
 
+"""
+Error class for a SIMBAD query that was not attempted or not waited for,
+because SIMBAD has recently been failing (the circuit breaker is open) or
+the deadline has passed. Searches may fall back to the local database.
+"""
+class SimbadUnavailableError(QuerySimbadError):
+    pass
+
+
+# Stops queries to SIMBAD while it is failing or slow. 
+simbad_breaker = CircuitBreaker(SIMBAD_FAILURE_THRESHOLD, SIMBAD_RESET_SECONDS, SIMBAD_SLOW_CALL_SECONDS)
+
+# Runs queries with a deadline, so the caller can stop waiting on them. 
+_executor = ThreadPoolExecutor(max_workers=SIMBAD_MAX_WORKERS, thread_name_prefix="simbad")
+
+
 ##############################
 # Helper functions (private) #
 ##############################
@@ -132,6 +165,49 @@ def _get_names_from_table(table: Table) -> list[str]:
     return lst
 
 
+def _call_simbad(query: Callable[[], Any], deadline: Deadline=None) -> Any:
+    """ Performs a SIMBAD query through the circuit breaker, waiting no longer
+        than the deadline for a response. 
+
+    Args:
+        query (Callable[[], Any]): Performs the Astroquery request. 
+        deadline (Deadline, optional): The deadline for the response. If None, 
+            waits until Astroquery times out. 
+
+    Returns:
+        Any: The result of the query. 
+
+    Raises:
+        SimbadUnavailableError: if the circuit breaker is open or the deadline
+            passes before SIMBAD responds. 
+        Any exception raised by the query. 
+    """
+    if deadline is not None and deadline.expired():
+        raise SimbadUnavailableError("Deadline passed before SIMBAD could be queried.")
+    if not simbad_breaker.allow():
+        raise SimbadUnavailableError("SIMBAD is currently unavailable.")
+
+    start = time.monotonic()
+    try:
+        if deadline is None:
+            result = query()
+        else:
+            result = _executor.submit(query).result(timeout=deadline.remaining())
+    except FutureTimeoutError:
+        simbad_breaker.record_failure()
+        raise SimbadUnavailableError("SIMBAD did not respond before the deadline.")
+    except (ConnectionError, HTTPError, ReadTimeout):
+        simbad_breaker.record_failure()
+        raise
+    except Exception:
+        # SIMBAD responded, e.g. the object was not found. 
+        simbad_breaker.record_success(time.monotonic() - start)
+        raise
+
+    simbad_breaker.record_success(time.monotonic() - start)
+    return result
+
+
 def _set_mirror(): 
     """ Sets the mirror for SIMBAD to the one defined by the
         SIMBAD_MIRROR constant.
@@ -144,12 +220,13 @@ def _set_mirror():
 #####################
 
 
-def get_aliases(id: str) -> list[str]:
+def get_aliases(id: str, deadline: Deadline=None) -> list[str]:
     """ Queries the SIMBAD database by an object name/identifier and returns the 
         list of alternative names (aliases). 
 
     Args:
         id (str): The object identifier. 
+        deadline (Deadline, optional): The deadline for SIMBAD to respond. 
 
     Returns:
         list[str]: A list of aliases. List is empty if no aliases exist. 
@@ -157,9 +234,10 @@ def get_aliases(id: str) -> list[str]:
     Raises:
         QuerySimbadError: if a network error occurs while contacting the 
             SIMBAD server using the Astroquery package.  
+        SimbadUnavailableError: if SIMBAD is unavailable or the deadline passes. 
     """
     try:
-        aliases_table = Simbad.query_objectids(id)
+        aliases_table = _call_simbad(lambda: Simbad.query_objectids(id), deadline)
         aliases_list = _get_names_from_table(aliases_table)
     except ConnectionError as e:
         raise QuerySimbadError(f"Failed to establish a network connection: {str(e)}")
@@ -173,7 +251,8 @@ def get_aliases(id: str) -> list[str]:
 
 
 def query_simbad_by_coords(coords: SkyCoord, 
-                           radius: float=DEFAULT_RADIUS
+                           radius: float=DEFAULT_RADIUS,
+                           deadline: Deadline=None
 ) -> dict[str, list[str]]:
     """ Queries the SIMBAD database by an exact coordinate if the radius is zero, 
         or a regional area if the radius is non-zero. 
@@ -184,6 +263,8 @@ def query_simbad_by_coords(coords: SkyCoord,
         radius (float): A value, in arcseconds, for the radius of the 
             region. By default, the radius is set to 10.0 arcsecs, however it
             can be between 0.0 (exact coordinates) and 20.0 (maximum allowed). 
+        deadline (Deadline, optional): The deadline for SIMBAD to respond to
+            all queries. 
     Returns:
         dict[str, list[str]]: A dictionary where the key is the MAIN_ID of an 
             object found in the coordinate range, and the value is a list of 
@@ -192,6 +273,7 @@ def query_simbad_by_coords(coords: SkyCoord,
         ValueError: If the radius is invalid. 
         QuerySimbadError: if a network error occurs while contacting the 
             SIMBAD server using the Astroquery package.     
+        SimbadUnavailableError: if SIMBAD is unavailable or the deadline passes. 
     """
     # Radius should be validated prior to calling this function. 
     if  radius < 0.0 or radius > 20.0:
@@ -205,7 +287,7 @@ def query_simbad_by_coords(coords: SkyCoord,
     _set_mirror()
 
     try:        
-        table = Simbad.query_region(coords, radius_angle)
+        table = _call_simbad(lambda: Simbad.query_region(coords, radius_angle), deadline)
 
         if table is None:
             return dict()
@@ -220,7 +302,7 @@ def query_simbad_by_coords(coords: SkyCoord,
         # Get the aliases for each ID. Assign the alias list to 
         # the value of the main ID.
         for id in main_ids:
-            results[id] = get_aliases(id)
+            results[id] = get_aliases(id, deadline)
 
         return results
     except ConnectionError as e:
@@ -235,7 +317,8 @@ def query_simbad_by_coords(coords: SkyCoord,
 
 
 def query_simbad_by_name(object_name: str, 
-                         retrieve_aliases: bool=True
+                         retrieve_aliases: bool=True,
+                         deadline: Deadline=None
 ) -> tuple[str, SkyCoord, list[str]]:
     """ Queries the SIMBAD database by an object identifier string. 
 
@@ -245,6 +328,8 @@ def query_simbad_by_name(object_name: str,
             be retrieved. Defaults to True. If True, an alias list will
             be returned by this function, otherwise only the coordinates
             will be returned. 
+        deadline (Deadline, optional): The deadline for SIMBAD to respond to
+            all queries. 
     Returns:
         str: The object's MAIN_ID as listed in the SIMBAD database. 
         SkyCoord: The object's coordinates, retrieved from SIMBAD. 
@@ -253,11 +338,12 @@ def query_simbad_by_name(object_name: str,
     Raises:
         QuerySimbadError: if a network error occurs while contacting the 
             SIMBAD server using the Astroquery package. 
+        SimbadUnavailableError: if SIMBAD is unavailable or the deadline passes. 
     """
     _set_mirror()
 
     try:
-        table = Simbad.query_object(object_name)
+        table = _call_simbad(lambda: Simbad.query_object(object_name), deadline)
 
         if table is None:
             # The object does not exist.
@@ -270,7 +356,7 @@ def query_simbad_by_name(object_name: str,
         coords = _get_coords_from_table(table)
 
         if retrieve_aliases:
-            return main_id, coords, get_aliases(object_name)
+            return main_id, coords, get_aliases(object_name, deadline)
 
         return main_id, coords, []
     except ConnectionError as e:
@@ -0,0 +1,221 @@
+"""Background refresher for stale celestial objects.
+
+Objects stored in the local database are periodically re-checked against
+SIMBAD for new aliases. Rather than performing these slow remote calls while
+a user waits for a search, searches enqueue stale objects here and a single
+background thread drains the queue, rate limiting and batching its calls to
+SIMBAD. When the queue is empty, the refresher also proactively refreshes the
+least recently updated objects in the local database. Every worker process
+runs its own refresher for the objects its searches queue, but only the worker
+holding the scan lease makes proactive scans, so workers do not refresh the
+same objects at once.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+from collections import deque
+from threading import Condition, Thread
+from typing import Callable
+import time
+
+
+##############################
+# Refresher module constants #
+##############################
+
+
+# The maximum number of objects refreshed in a single batch.
+REFRESH_BATCH_SIZE: int = 10
+
+# The minimum number of seconds between two consecutive SIMBAD refreshes.
+REFRESH_INTERVAL_SECONDS: float = 1.0
+
+# The number of seconds between proactive scans for stale objects. Scans are
+# made as soon as the queue is empty while they keep finding a full batch.
+PROACTIVE_SCAN_SECONDS: float = 3600.0
+
+# The number of seconds a worker holds the scan lease for, unless it renews it
+# at its next scan. Another worker takes over scanning once it expires.
+SCAN_LEASE_SECONDS: float = 2 * PROACTIVE_SCAN_SECONDS
+
+
+class ObjectRefresher:
+    """
+    Drains a queue of stale object identifiers on a background thread.
+    """
+
+    def __init__(self,
+                 refresh: Callable[[str], None],
+                 find_stale: Callable[[int], list[str]],
+                 batch_size: int=REFRESH_BATCH_SIZE,
+                 interval: float=REFRESH_INTERVAL_SECONDS,
+                 scan_period: float=PROACTIVE_SCAN_SECONDS,
+                 acquire_scan: Callable[[], bool]=lambda: True
+    ):
+        """ Creates an idle refresher. Call start() to begin refreshing.
+
+        Args:
+            refresh (Callable[[str], None]): Refreshes a single object, given
+                its identifier.
+            find_stale (Callable[[int], list[str]]): Returns up to the given
+                number of stale object identifiers, least recently updated first.
+            batch_size (int): The maximum number of objects refreshed per batch.
+            interval (float): The minimum number of seconds between refreshes.
+            scan_period (float): The number of seconds between proactive scans.
+            acquire_scan (Callable[[], bool]): Returns whether this process may
+                make a proactive scan, e.g. by acquiring a lease shared by all
+                workers. Defaults to always scanning.
+        """
+        self._refresh = refresh
+        self._find_stale = find_stale
+        self._batch_size = batch_size
+        self._interval = interval
+        self._scan_period = scan_period
+        self._acquire_scan = acquire_scan
+
+        self._queue: deque[str] = deque()
+        self._pending: set[str] = set()
+        self._condition = Condition()
+        self._thread: Thread = None
+        self._stopped = False
+        self._last_refresh = 0.0
+        self._last_scan = 0.0
+        self._backlog = False
+        self._scanned: set[str] = set()
+
+    def start(self):
+        """ Starts the background thread if it is not already running.
+        """
+        with self._condition:
+            if self.is_running():
+                return
+            self._stopped = False
+            self._thread = Thread(target=self._run, name="object-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """ Signals the background thread to stop after the current refresh.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def is_running(self) -> bool:
+        """
+        Returns:
+            bool: True if the background thread is alive in this process.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def enqueue(self, name: str) -> bool:
+        """ Queues an object to be refreshed in the background.
+
+        Args:
+            name (str): The object's identifier.
+
+        Returns:
+            bool: True if the object was queued, False if it was already pending.
+        """
+        with self._condition:
+            if name in self._pending:
+                return False
+            self._pending.add(name)
+            self._queue.append(name)
+            self._condition.notify()
+            return True
+
+    def pending(self) -> int:
+        """
+        Returns:
+            int: The number of objects waiting to be refreshed.
+        """
+        with self._condition:
+            return len(self._queue)
+
+    def _next_batch(self) -> list[str]:
+        """ Blocks until there are objects to refresh, or a proactive scan is due.
+            A scan is due once the queue is empty if the last scan found more
+            stale objects than fit in a batch, otherwise once every scan period.
+
+        Returns:
+            list[str]: Up to batch_size object identifiers. Empty if stopped.
+        """
+        with self._condition:
+            while not self._queue and not self._stopped:
+                due = self._last_scan if self._backlog else self._last_scan + self._scan_period
+                wait = due - time.monotonic()
+                if wait <= 0:
+                    break
+                self._condition.wait(wait)
+
+            batch = []
+            while self._queue and len(batch) < self._batch_size:
+                batch.append(self._queue.popleft())
+            return batch
+
+    def _scan(self):
+        """ Queues the least recently updated objects from the local database,
+            if this process holds the scan lease.
+
+            A full batch means more stale objects may be waiting, so the next
+            scan is made as soon as the batch is refreshed, until the backlog is
+            cleared. If a scan finds the same objects as the last one, e.g.
+            because SIMBAD is unavailable, the next scan waits for the scan period.
+        """
+        self._last_scan = time.monotonic()
+        self._backlog = False
+        try:
+            if not self._acquire_scan():
+                return
+            names = self._find_stale(self._batch_size)
+            self._backlog = len(names) >= self._batch_size and set(names) != self._scanned
+            self._scanned = set(names)
+            for name in names:
+                self.enqueue(name)
+        except Exception as e:
+            print(f"Stale object scan failed: {str(e)}", flush=True)
+
+    def _run(self):
+        """ The background thread's main loop.
+        """
+        while not self._stopped:
+            batch = self._next_batch()
+            if self._stopped:
+                break
+            if not batch:
+                self._scan()
+                continue
+
+            for name in batch:
+                # Rate limit calls to SIMBAD.
+                wait = self._last_refresh + self._interval - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                self._last_refresh = time.monotonic()
+
+                try:
+                    self._refresh(name)
+                except Exception as e:
+                    # The object remains stale and will be picked up again by a later scan.
+                    print(f"Refreshing object {name} failed: {str(e)}", flush=True)
+                finally:
+                    with self._condition:
+                        self._pending.discard(name)
@@ -0,0 +1,290 @@
+"""Cache of search results, shared between identical searches.
+
+Searches are keyed by a canonical form of their criteria, so equivalent
+searches (e.g. differing only in letter case, keyword order or whitespace)
+share a single entry. Entries expire after a fixed time and are discarded
+whenever the local database's data generation number changes, i.e. after
+reports, objects or aliases are added. A cache hit returns without querying
+the local database or SIMBAD.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+from threading import Lock
+from typing import Callable
+import copy
+import time
+
+from astropy.coordinates import SkyCoord
+
+from controller.helper.caching import TTLCache
+from controller.helper.resilience import Deadline
+from controller.search import search
+from model.constants import DEFAULT_RADIUS
+from model.ds.pagination import PageCursor, ReportPage
+from model.ds.report_types import ReportResult
+from model.ds.search_filters import SearchFilters, DateFilter
+import model.db.db_interface as db
+
+
+#################################
+# Result cache module constants #
+#################################
+
+
+# The maximum number of searches stored in the cache.
+CACHE_MAX_ENTRIES: int = 256
+
+# The number of seconds a cached search remains valid.
+CACHE_TTL_SECONDS: float = 300.0
+
+# The minimum number of seconds between checks of the data generation number.
+GENERATION_CHECK_SECONDS: float = 5.0
+
+# The number of decimal places of degrees that coordinates are rounded to in keys.
+COORD_KEY_PRECISION: int = 6
+
+
+#####################
+# Private functions #
+#####################
+
+
+def _filters_key(search_filters: SearchFilters, date_filter: DateFilter) -> tuple:
+    ''' Builds the canonical form of the given filters. Free-text terms are
+        matched case-insensitively by the local database, so they are case folded.
+
+    Args:
+        search_filters (SearchFilters): Filters for the frontend search.
+        date_filter (DateFilter): Date filter for the frontend search.
+
+    Returns:
+        tuple: A hashable representation of the filters.
+    '''
+    filters_key = None
+    if search_filters is not None:
+        term = search_filters.term
+        if term is not None:
+            term = term.casefold()
+        keywords = search_filters.keywords
+        if keywords is not None:
+            keywords = tuple(sorted(set(kw.lower() for kw in keywords)))
+        filters_key = (term, keywords, search_filters.keyword_mode.name)
+
+    dates_key = None
+    if date_filter is not None:
+        dates_key = (date_filter.start_date, date_filter.end_date,
+                     date_filter.observed_start_date, date_filter.observed_end_date)
+
+    return filters_key, dates_key
+
+
+def _name_key(name: str) -> str:
+    ''' Builds the canonical form of an object name.
+
+    Args:
+        name (str): The object identifier.
+
+    Returns:
+        str: The name with whitespace collapsed and case folded.
+    '''
+    if name is None:
+        return None
+    return " ".join(name.split()).casefold()
+
+
+def _coords_key(coords: SkyCoord, radius: float) -> tuple:
+    ''' Builds the canonical form of a coordinate search region.
+
+    Args:
+        coords (SkyCoord): The centre of the region.
+        radius (float): The radius of the region, in arcseconds.
+
+    Returns:
+        tuple: The rounded coordinates in degrees and the radius.
+    '''
+    if coords is None:
+        return None, float(radius)
+    return (round(float(coords.ra.deg), COORD_KEY_PRECISION),
+            round(float(coords.dec.deg), COORD_KEY_PRECISION),
+            float(radius))
+
+
+def _options_key(limit: int=None, after: PageCursor=None, count: bool=False, fields: list[str]=None, deadline: Deadline=None) -> tuple:
+    ''' Builds the canonical form of the page and fields requested from a search.
+
+    Args:
+        limit (int): The maximum number of reports on the page, or None.
+        after (PageCursor): The cursor the page follows, or None.
+        count (bool): Whether the total number of reports is counted.
+        fields (list[str]): The fields of each result, or None for all fields.
+        deadline (Deadline): The deadline for SIMBAD to respond. Ignored, as
+            it does not change the results.
+
+    Returns:
+        tuple: A hashable representation of the options.
+    '''
+    if fields is not None:
+        fields = tuple(sorted(set(fields)))
+    return limit, after, bool(count), fields
+
+
+##################
+# Public classes #
+##################
+
+
+class SearchResultCache:
+    """
+    Caches the results of name and coordinate searches.
+    """
+
+    def __init__(self,
+                 get_generation: Callable[[], int],
+                 max_entries: int=CACHE_MAX_ENTRIES,
+                 ttl: float=CACHE_TTL_SECONDS,
+                 check_interval: float=GENERATION_CHECK_SECONDS,
+                 clock: Callable[[], float]=time.monotonic
+    ):
+        """ Creates an empty cache.
+
+        Args:
+            get_generation (Callable[[], int]): Returns the current data generation number.
+            max_entries (int): The maximum number of searches to store.
+            ttl (float): The number of seconds a cached search remains valid.
+            check_interval (float): The minimum number of seconds between
+                generation number checks.
+            clock (Callable[[], float]): Returns the current time in seconds.
+        """
+        self._get_generation = get_generation
+        self._check_interval = check_interval
+        self._clock = clock
+        self._entries = TTLCache(max_entries, ttl, clock)
+        self._lock = Lock()
+        self._generation = None
+        self._checked_at = None
+        # Counts the times the cache was cleared, so results of searches started before are not stored
+        self._clears = 0
+
+    def search_by_name(self,
+                       search_filters: SearchFilters=None,
+                       date_filter: DateFilter=None,
+                       name: str=None,
+                       **options
+    ) -> list[ReportResult]:
+        """ Returns the cached result of search.search_reports_by_name(), performing
+            the search if there is no valid cached result.
+
+        Args:
+            search_filters (SearchFilters): Filters for the front-end search.
+            date_filter (DateFilter, optional): Date filter for the front-end search.
+            name (str): The object identifier.
+            **options: The limit, after, count, fields and deadline arguments of the search, if given.
+
+        Returns:
+            list[ReportResult]: The reports matching the name.
+
+        Raises:
+            See search.search_reports_by_name(). Failed and degraded searches are not cached.
+        """
+        key = ("name", _filters_key(search_filters, date_filter), _name_key(name), _options_key(**options))
+        return self._get_or_search(key, lambda: search.search_reports_by_name(search_filters, date_filter, name, **options))
+
+    def search_by_coords(self,
+                         search_filters: SearchFilters,
+                         date_filter: DateFilter,
+                         coords: SkyCoord,
+                         radius: float=DEFAULT_RADIUS,
+                         **options
+    ) -> list[ReportResult]:
+        """ Returns the cached result of search.search_reports_by_coords(), performing
+            the search if there is no valid cached result.
+
+        Args:
+            search_filters (SearchFilters): Filters for the frontend search.
+            date_filter (DateFilter): Date filter for the frontend search.
+            coords (SkyCoord): The coordinates that define the region search criteria.
+            radius (float): The radius, in arcseconds, that defines the size of the region.
+            **options: The limit, after, count, fields and deadline arguments of the search, if given.
+
+        Returns:
+            list[ReportResult]: The reports matching the coordinate/region criteria.
+
+        Raises:
+            See search.search_reports_by_coords(). Failed and degraded searches are not cached.
+        """
+        key = ("coords", _filters_key(search_filters, date_filter), _coords_key(coords, radius), _options_key(**options))
+        return self._get_or_search(key, lambda: search.search_reports_by_coords(search_filters, date_filter, coords, radius, **options))
+
+    def clear(self):
+        """ Discards all cached searches.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._clears += 1
+
+    def _get_or_search(self, key: tuple, perform_search: Callable[[], list[ReportResult]]) -> list[ReportResult]:
+        """ Returns the cached reports for the given key, performing and caching
+            the search if there is no valid cached result. Degraded results,
+            which only contain reports from the local database, are not cached.
+
+        Args:
+            key (tuple): The canonical search key.
+            perform_search (Callable[[], list[ReportResult]]): Performs the search.
+
+        Returns:
+            list[ReportResult]: A shallow copy of the list (or page) of reports.
+        """
+        clears = self._check_generation()
+
+        reports = self._entries.get(key)
+        if reports is None:
+            reports = perform_search()
+            if not (isinstance(reports, ReportPage) and reports.degraded):
+                # A search that started before the cache was cleared may have read outdated data
+                with self._lock:
+                    if self._clears == clears:
+                        self._entries.put(key, copy.copy(reports))
+        return copy.copy(reports)
+
+    def _check_generation(self) -> int:
+        """ Discards all cached searches if the data generation number has changed.
+            The number is checked at most once every check_interval seconds.
+
+        Returns:
+            int: The number of times the cache has been cleared, including by this check.
+        """
+        with self._lock:
+            now = self._clock()
+            if self._checked_at is not None and now - self._checked_at < self._check_interval:
+                return self._clears
+            self._checked_at = now
+
+            generation = self._get_generation()
+            if generation != self._generation:
+                self._entries.clear()
+                self._clears += 1
+                self._generation = generation
+            return self._clears
+
+
+# Search result cache shared by all requests handled by this worker.
+search_cache = SearchResultCache(db.get_data_generation)
@@ -28,13 +28,23 @@ License Terms and Copyright:
 
 from astropy.coordinates import SkyCoord
 
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Iterator
+import heapq
+import os
+import socket
+import uuid
 
 from model.constants import DEFAULT_RADIUS
 from model.ds.report_types import ReportResult
 from model.ds.search_filters import SearchFilters, DateFilter
+from model.ds.pagination import PageCursor, ReportPage, ReportStream, sort_key
 import model.db.db_interface as db
 from controller.search import query_simbad as qs
+from controller.search.refresher import ObjectRefresher, SCAN_LEASE_SECONDS
+from controller.search.snippets import SNIPPET_WINDOW_CHARS
+from controller.helper.caching import SingleFlight, TTLCache
+from controller.helper.resilience import Deadline
 
 
 ###########################
@@ -45,6 +55,15 @@ from controller.search import query_simbad as qs
 # The amount of days elapsed before updating an object. 
 UPDATE_OBJECT_DAYS: int = 60 
 
+# The number of seconds a name unknown to SIMBAD is remembered for. 
+UNKNOWN_NAME_TTL_SECONDS: float = 600.0
+
+# The maximum number of names unknown to SIMBAD that are remembered. 
+UNKNOWN_NAME_CACHE_SIZE: int = 1024
+
+# The name of the lease held by the worker that scans for stale objects.
+SCAN_LEASE_NAME: str = "object-refresher"
+
 
 #####################
 # Private functions #
@@ -58,7 +77,305 @@ def _sort_reports(reports: list[ReportResult]):
     Args:
         reports (list[ReportResult]): the reports
     '''
-    reports.sort(key=lambda x: x.submission_date, reverse=True)
+    reports.sort(key=sort_key, reverse=True)
+
+
+def _page_args(limit: int, after: PageCursor) -> dict:
+    ''' Builds the keyword arguments used to retrieve a page of reports from the
+        local database. 
+
+    Args:
+        limit (int): The maximum number of reports on the page, or None. 
+        after (PageCursor): The cursor the page follows, or None. 
+
+    Returns:
+        dict: The keyword arguments, empty if not retrieving a page. 
+    '''
+    if limit is None and after is None:
+        return dict()
+    return {"limit": limit, "after": after}
+
+
+def _projection_args(search_filters: SearchFilters, fields: list[str]) -> dict:
+    ''' Builds the keyword arguments used to select only the report fields
+        required by the search results from the local database. 
+
+    Args:
+        search_filters (SearchFilters): Filters for the search, providing the term to build snippets around. 
+        fields (list[str]): The fields of each search result, or None for all fields. 
+
+    Returns:
+        dict: The keyword arguments, empty if selecting all fields. 
+    '''
+    if fields is None:
+        return dict()
+
+    args = {"fields": [field for field in db.REPORT_TEXT_FIELDS if field in fields]}
+    if "snippet" in fields and "body" not in fields:
+        # Only the part of the body around the term is needed for the snippet. 
+        term = ""
+        if search_filters is not None and search_filters.term is not None:
+            term = search_filters.term
+        args["body_window"] = (term, SNIPPET_WINDOW_CHARS)
+    return args
+
+
+def _make_page(reports: list[ReportResult],
+               limit: int,
+               source_lengths: list[int],
+               total: int,
+               degraded: bool=False
+) -> ReportPage:
+    ''' Truncates a sorted list of reports merged from several pages to a single page. 
+
+    Args:
+        reports (list[ReportResult]): The merged reports, in result order, without duplicates. 
+        limit (int): The maximum number of reports on the page, or None. 
+        source_lengths (list[int]): The number of reports returned by each merged page. 
+        total (int): The total number of matching reports, or None if not counted. 
+        degraded (bool, optional): Whether SIMBAD was unavailable, so only the local database was searched. 
+
+    Returns:
+        ReportPage: The page of reports and the cursor for the next page. 
+    '''
+    if limit is None:
+        return ReportPage(reports, None, total, degraded)
+
+    # There may be more reports if any source page was full.
+    has_more = len(reports) > limit or any(length >= limit for length in source_lengths)
+    page = reports[:limit]
+
+    next_cursor = None
+    if has_more and page:
+        next_cursor = PageCursor.after(page[-1])
+
+    return ReportPage(page, next_cursor, total, degraded)
+
+
+def _prepare_coords_search(search_filters: SearchFilters,
+                           coords: SkyCoord,
+                           radius: float,
+                           deadline: Deadline=None
+) -> tuple[dict, bool]:
+    ''' Queries SIMBAD for the objects in the coordinate range, adding any
+        new objects to the local database and checking existing objects for updates. 
+        If SIMBAD is unavailable, only the local database will be searched. 
+
+    Args:
+        search_filters (SearchFilters): Filters for the frontend search. 
+        coords (SkyCoord): The coordinates that define the region search criteria. 
+        radius (float): The radius, in arcseconds, that defines the size of the region. 
+        deadline (Deadline, optional): The deadline for SIMBAD to respond. 
+
+    Returns:
+        dict: The SIMBAD query result, mapping each object's main ID to its aliases. 
+        bool: Whether SIMBAD was unavailable (degraded). 
+
+    Raises:
+        See search_reports_by_coords(). 
+    '''
+    if search_filters is None and coords is None:
+        raise ValueError("SearchFilters and coordinates cannot both be None.")
+
+    # Always query SIMBAD first. 
+    query_result = dict() 
+    degraded = False
+    if coords is not None:
+        try:
+            query_result = qs.query_simbad_by_coords(coords, radius, deadline=deadline) 
+        except qs.SimbadUnavailableError:
+            return dict(), True
+
+    # The 'key' is the MAIN_ID
+    for key, value in query_result.items():
+        exists, last_updated = db.object_exists(key) 
+        try:
+            if exists:
+                check_object_updates(key, last_updated)
+            else:
+                # Query by name without aliases. 
+                name_query_result = qs.query_simbad_by_name(key, False, deadline=deadline)
+                if name_query_result is not None:
+                    # Add the newly discovered object to the 
+                    # local database. 
+                    name, object_coords, _ = name_query_result
+                    db.add_object(name, object_coords, value)
+        except qs.SimbadUnavailableError:
+            # Reports already linked to the object can still be found. 
+            degraded = True
+
+    return query_result, degraded
+
+
+def _prepare_name_search(search_filters: SearchFilters,
+                         name: str,
+                         deadline: Deadline=None
+) -> tuple[SkyCoord, bool]:
+    ''' Checks the named object for updates if it exists in the local database,
+        otherwise queries SIMBAD and adds the object to the local database. 
+        If SIMBAD is unavailable, only the local database will be searched. 
+
+    Args:
+        search_filters (SearchFilters): Filters for the front-end search. 
+        name (str): The object identifier. 
+        deadline (Deadline, optional): The deadline for SIMBAD to respond. 
+
+    Returns:
+        SkyCoord: The coordinates of the object, or None if unknown. 
+        bool: Whether SIMBAD was unavailable (degraded). 
+
+    Raises:
+        See search_reports_by_name(). 
+    '''
+    if search_filters is None and name is None:
+        raise ValueError("SearchFilters and name cannot both be None.")
+
+    coordinates = None
+    degraded = False
+
+    if name is not None:
+        # Check if the object already exists in the local database. 
+        exists, last_updated = db.object_exists(name)
+
+        # Check if the object exists in the database. 
+        if exists:
+            # The object exists in the local database, check to see if it needs to be updated. 
+            try:
+                check_object_updates(name, last_updated)
+            except qs.SimbadUnavailableError:
+                degraded = True
+            coordinates = db.get_object_coords(name)
+        else:
+            # The object does not exist, invoke an external (SIMBAD) search. 
+            try:
+                query_result = _lookup_unknown_object(name, deadline)
+            except qs.SimbadUnavailableError:
+                query_result = None
+                degraded = True
+
+            if query_result is not None:
+                # There is a result from the SIMBAD search. 
+                # Add the object to the local database.
+                main_id, coordinates, aliases = query_result
+                aliases = aliases + [name]
+                try:
+                    db.add_object(main_id, coordinates, aliases)
+                except db.ExistingObjectError:
+                    db.add_aliases(main_id, [name]) 
+
+    return coordinates, degraded
+
+
+def _lookup_unknown_object(name: str, deadline: Deadline=None) -> tuple:
+    ''' Queries SIMBAD for an object that is not in the local database. 
+        Names that SIMBAD does not know are remembered for a short time, so
+        repeated searches do not query SIMBAD again, and concurrent lookups
+        of the same name share a single query. 
+
+    Args:
+        name (str): The object identifier. 
+        deadline (Deadline, optional): The deadline for SIMBAD to respond. 
+
+    Returns:
+        tuple: The result of query_simbad.query_simbad_by_name(), or None if
+            the object is unknown. The aliases list is shared, so must not be modified. 
+
+    Raises:
+        QuerySimbadError: If there is an issue connecting to the SIMBAD server.
+            Failed lookups are not remembered. 
+    '''
+    key = " ".join(name.split()).casefold()
+    if key in unknown_names:
+        return None
+
+    def lookup():
+        query_result = qs.query_simbad_by_name(name, True, deadline=deadline)
+        if query_result is None:
+            unknown_names.put(key, True)
+        return query_result
+
+    return simbad_lookups.do(key, lookup)
+
+
+def _merge_reports(sources: list[Iterator[ReportResult]]) -> Iterator[ReportResult]:
+    ''' Lazily merges several streams of reports, each in result order, into a
+        single stream in result order without duplicates. 
+
+    Args:
+        sources (list[Iterator[ReportResult]]): The streams of reports, each newest first. 
+
+    Yields:
+        ReportResult: The merged reports, newest first. 
+    '''
+    last_atel_num = None
+    for report in heapq.merge(*sources, key=sort_key, reverse=True):
+        # Duplicates share the same sort key, so are adjacent. 
+        if report.atel_num != last_atel_num:
+            last_atel_num = report.atel_num
+            yield report
+
+
+def _refresh_if_stale(name: str):
+    ''' Re-checks an object's last updated date and updates it if it is
+        still stale. Used by the background refresher, as the object may have
+        been updated since it was queued.
+
+    Args:
+        name (str): The object's identifier.
+    '''
+    exists, last_updated = db.object_exists(name)
+    if exists and _is_stale(last_updated):
+        update_object(name)
+
+
+def _find_stale_objects(limit: int) -> list[str]:
+    ''' Finds the least recently updated objects that require updating.
+
+    Args:
+        limit (int): The maximum number of objects to return.
+
+    Returns:
+        list[str]: The identifiers of the stale objects.
+    '''
+    before = datetime.today() - timedelta(days=UPDATE_OBJECT_DAYS)
+    return db.get_stale_objects(before, limit)
+
+
+def _acquire_scan_lease() -> bool:
+    ''' Acquires or renews the lease to scan for stale objects, so only one
+        worker process makes proactive scans at a time.
+
+    Returns:
+        bool: True if this worker holds the lease.
+    '''
+    return db.acquire_worker_lease(SCAN_LEASE_NAME, worker_id, SCAN_LEASE_SECONDS)
+
+
+def _is_stale(last_updated: datetime) -> bool:
+    ''' Checks whether an object last updated on the given date requires updating.
+
+    Args:
+        last_updated (datetime): The last updated date.
+
+    Returns:
+        bool: True if UPDATE_OBJECT_DAYS or more have elapsed.
+    '''
+    diff = datetime.today() - last_updated
+    return diff.days >= UPDATE_OBJECT_DAYS
+
+
+# Names recently found to be unknown to SIMBAD. 
+unknown_names = TTLCache(UNKNOWN_NAME_CACHE_SIZE, UNKNOWN_NAME_TTL_SECONDS)
+
+# Coalesces concurrent SIMBAD lookups of the same unknown name. 
+simbad_lookups = SingleFlight()
+
+# Identifies this worker process when acquiring the scan lease.
+worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Refreshes stale objects in the background once started.
+# Until start() is called, stale objects are updated synchronously.
+refresher = ObjectRefresher(_refresh_if_stale, _find_stale_objects, acquire_scan=_acquire_scan_lease)
 
 
 ####################
@@ -69,7 +386,12 @@ def _sort_reports(reports: list[ReportResult]):
 def search_reports_by_coords(search_filters: SearchFilters,
                              date_filter: DateFilter,
                              coords: SkyCoord, 
-                             radius: float=DEFAULT_RADIUS
+                             radius: float=DEFAULT_RADIUS,
+                             limit: int=None,
+                             after: PageCursor=None,
+                             count: bool=False,
+                             fields: list[str]=None,
+                             deadline: Deadline=None
 ) -> list[ReportResult]:
     """ Performs an immediate query of the SIMBAD database by the coordinate
         range and retrieves matching reports from the local database. 
@@ -80,59 +402,73 @@ def search_reports_by_coords(search_filters: SearchFilters,
         coords (SkyCoord): The coordinates that define the region search criteria. 
         radius (float): The radius, in arcseconds, that defines the size of the
             region. 10.0 arcsecs by default. Should be validated beforehand. 
+        limit (int, optional): The maximum number of reports to return. 
+        after (PageCursor, optional): Only return reports following this cursor. 
+        count (bool, optional): Whether to count the total number of matching reports. 
+        fields (list[str], optional): The fields required in each result. Text
+            fields that are not required are left empty. 
+        deadline (Deadline, optional): The deadline for SIMBAD to respond. 
 
     Returns:
         list[ReportResult]: The reports found in the local database that match
-            the coordinate/region criteria. 
+            the coordinate/region criteria. If limit, after or count is given, 
+            this is a ReportPage with the cursor for the next page and the total. 
+            If SIMBAD was unavailable, this is a degraded ReportPage containing
+            only the results of the local database. 
 
     Raises:
-        QuerySimbadError: When the SIMBAD server is unavailable. The error is
+        QuerySimbadError: When the SIMBAD server cannot be connected to. The error is
             raised as a connection to the server is required to perform a coordinate
-            search. 
+            search, unless the circuit breaker is open or the deadline passes. 
         ValueError: (from query_simbad.py) if the radius is invalid, or the
             SearchFilters and coordinates are both None. 
     """
-    if search_filters is None and coords is None:
-        raise ValueError("SearchFilters and coordinates cannot both be None.")
-
-    # Always query SIMBAD first. 
-    query_result = dict() 
-    if coords is not None:
-        query_result = qs.query_simbad_by_coords(coords, radius) 
+    query_result, degraded = _prepare_coords_search(search_filters, coords, radius, deadline)
 
     reports: list[ReportResult] = [] 
+    page_args = _page_args(limit, after)
+    query_args = {**page_args, **_projection_args(search_filters, fields)}
+    source_lengths = []
 
     # The 'key' is the MAIN_ID
-    for key, value in query_result.items():
-        exists, last_updated = db.object_exists(key) 
-        if exists:
-            check_object_updates(key, last_updated)
-        else:
-            # Query by name without aliases. 
-            name_query_result = qs.query_simbad_by_name(key, False)
-            if name_query_result is not None:
-                # Add the newly discovered object to the 
-                # local database. 
-                name, coords, _ = name_query_result
-                db.add_object(name, coords, value)
-        db_name_query = db.find_reports_by_object(search_filters, date_filter, key)
+    for key in query_result.keys():
+        db_name_query = db.find_reports_by_object(search_filters, date_filter, key, **query_args)
+        source_lengths.append(len(db_name_query))
 
         for r in db_name_query:
             if r not in reports: reports.append(r) 
 
-    db_coord_query = db.find_reports_in_coord_range(search_filters, date_filter, coords, radius)
+    db_coord_query = db.find_reports_in_coord_range(search_filters, date_filter, coords, radius, **query_args)
+    source_lengths.append(len(db_coord_query))
     for report in db_coord_query:
         if report not in reports: 
             reports.append(report)
 
     _sort_reports(reports)
-    return reports
+
+    if not page_args and not count and not degraded:
+        return reports
+
+    total = None
+    if count:
+        # Count the distinct reports matching any of the objects or the region.
+        atel_nums = db.find_report_nums_in_coord_range(search_filters, date_filter, coords, radius)
+        for key in query_result.keys():
+            atel_nums |= db.find_report_nums_by_object(search_filters, date_filter, key)
+        total = len(atel_nums)
+
+    return _make_page(reports, limit, source_lengths, total, degraded)
 
 
 def search_reports_by_name(
     search_filters: SearchFilters = None,
     date_filter: DateFilter = None,
-    name: str = None
+    name: str = None,
+    limit: int = None,
+    after: PageCursor = None,
+    count: bool = False,
+    fields: list[str] = None,
+    deadline: Deadline = None
 ) -> list[ReportResult]:
     """ Query the local database and the SIMBAD database by an object identifier
         and return the reports that match. 
@@ -141,10 +477,19 @@ def search_reports_by_name(
         search_filters (SearchFilters): Filters for the front-end search. 
         date_filter (DateFilter, optional): Date filter for the front-end search. 
         name (str): The object identifier. 
+        limit (int, optional): The maximum number of reports to return. 
+        after (PageCursor, optional): Only return reports following this cursor. 
+        count (bool, optional): Whether to count the total number of matching reports. 
+        fields (list[str], optional): The fields required in each result. Text
+            fields that are not required are left empty. 
+        deadline (Deadline, optional): The deadline for SIMBAD to respond. 
 
     Returns:
         list[ReportResult]: The reports found in the local database that match
-            the name.
+            the name. If limit, after or count is given, this is a ReportPage
+            with the cursor for the next page and the total. If SIMBAD was
+            unavailable, this is a degraded ReportPage containing only the
+            results of the local database. 
 
     Raises:
         QuerySimbadError: If there is an issue connecting to the SIMBAD server. 
@@ -152,57 +497,119 @@ def search_reports_by_name(
             message should be displayed to the user. 
         ValueError: If SearchFilters and name is None. 
     """
-    if search_filters is None and name is None:
-        raise ValueError("SearchFilters and name cannot both be None.")
-
-    coordinates = None
+    coordinates, degraded = _prepare_name_search(search_filters, name, deadline)
     by_coord_range = None
 
-    if name is not None:
-        # Check if the object already exists in the local database. 
-        exists, last_updated = db.object_exists(name)
-
-        # Check if the object exists in the database. 
-        if exists:
-            # The object exists in the local database, check to see if it needs to be updated. 
-            check_object_updates(name, last_updated)
-            coordinates = db.get_object_coords(name)
-        else:
-            # The object does not exist, invoke an external (SIMBAD) search. 
-            query_result = qs.query_simbad_by_name(name, True)
-
-            if query_result is not None:
-                # There is a result from the SIMBAD search. 
-                # Add the object to the local database.
-                main_id, coordinates, aliases = query_result
-                aliases.append(name)
-                try:
-                    db.add_object(main_id, coordinates, aliases)
-                except db.ExistingObjectError:
-                    db.add_aliases(main_id, [name]) 
-
     # After update checking and external search, query the local database 
     # for all reports. 
 
+    page_args = _page_args(limit, after)
+    query_args = {**page_args, **_projection_args(search_filters, fields)}
+
     # Get the base reports from the database. 
-    reports = db.find_reports_by_object(search_filters, date_filter, name)
+    reports = db.find_reports_by_object(search_filters, date_filter, name, **query_args)
+    source_lengths = [len(reports)]
 
     if coordinates is not None:
-        by_coord_range = db.find_reports_in_coord_range(search_filters, date_filter, coordinates, DEFAULT_RADIUS)
+        by_coord_range = db.find_reports_in_coord_range(search_filters, date_filter, coordinates, DEFAULT_RADIUS, **query_args)
         if by_coord_range is not None:
+            source_lengths.append(len(by_coord_range))
             # Append the list with reports with the same coordinates. 
             for additional_report in by_coord_range:
                 if not additional_report in reports:
                     reports.append(additional_report)
 
     _sort_reports(reports)
-    return reports
+
+    if not page_args and not count and not degraded:
+        return reports
+
+    total = None
+    if count:
+        # Count the distinct reports matching the name or the object's coordinates.
+        atel_nums = db.find_report_nums_by_object(search_filters, date_filter, name)
+        if coordinates is not None:
+            atel_nums |= db.find_report_nums_in_coord_range(search_filters, date_filter, coordinates, DEFAULT_RADIUS)
+        total = len(atel_nums)
+
+    return _make_page(reports, limit, source_lengths, total, degraded)
+
+
+def stream_reports_by_coords(search_filters: SearchFilters,
+                             date_filter: DateFilter,
+                             coords: SkyCoord, 
+                             radius: float=DEFAULT_RADIUS,
+                             fields: list[str]=None,
+                             deadline: Deadline=None
+) -> ReportStream:
+    """ Performs the same search as search_reports_by_coords(), but returns the
+        reports lazily. SIMBAD is queried immediately, while the local database
+        is read in batches as the reports are consumed. 
+
+    Args: 
+        search_filters (SearchFilters): Filters for the frontend search. 
+        date_filter (DateFilter): Date filter for the frontend search.
+        coords (SkyCoord): The coordinates that define the region search criteria. 
+        radius (float): The radius, in arcseconds, that defines the size of the
+            region. 10.0 arcsecs by default. Should be validated beforehand. 
+        fields (list[str], optional): The fields required in each result. 
+        deadline (Deadline, optional): The deadline for SIMBAD to respond. 
+
+    Returns:
+        ReportStream: The matching reports, newest first. 
+
+    Raises:
+        See search_reports_by_coords(). 
+    """
+    query_result, degraded = _prepare_coords_search(search_filters, coords, radius, deadline)
+    query_args = _projection_args(search_filters, fields)
+
+    sources = [db.iter_reports_by_object(search_filters, date_filter, key, **query_args) for key in query_result.keys()]
+    sources.append(db.iter_reports_in_coord_range(search_filters, date_filter, coords, radius, **query_args))
+    return ReportStream(_merge_reports(sources), degraded)
+
+
+def stream_reports_by_name(
+    search_filters: SearchFilters = None,
+    date_filter: DateFilter = None,
+    name: str = None,
+    fields: list[str] = None,
+    deadline: Deadline = None
+) -> ReportStream:
+    """ Performs the same search as search_reports_by_name(), but returns the
+        reports lazily. SIMBAD is queried immediately, while the local database
+        is read in batches as the reports are consumed. 
+
+    Args:
+        search_filters (SearchFilters): Filters for the front-end search. 
+        date_filter (DateFilter, optional): Date filter for the front-end search. 
+        name (str): The object identifier. 
+        fields (list[str], optional): The fields required in each result. 
+        deadline (Deadline, optional): The deadline for SIMBAD to respond. 
+
+    Returns:
+        ReportStream: The matching reports, newest first. 
+
+    Raises:
+        See search_reports_by_name(). 
+    """
+    coordinates, degraded = _prepare_name_search(search_filters, name, deadline)
+    query_args = _projection_args(search_filters, fields)
+
+    sources = [db.iter_reports_by_object(search_filters, date_filter, name, **query_args)]
+    if coordinates is not None:
+        sources.append(db.iter_reports_in_coord_range(search_filters, date_filter, coordinates, DEFAULT_RADIUS, **query_args))
+    return ReportStream(_merge_reports(sources), degraded)
 
 
 def check_object_updates(name: str, last_updated: datetime):
     """ Check if an object, specified by its identifier, requires an update. 
         (i.e., more than 60 days have elapsed since its last update). If so, 
         update the object. 
+
+        If the background refresher is running, the object is queued for
+        refreshing and this function returns immediately, so searches serve
+        the currently stored data instead of waiting on SIMBAD.
     
     Args: 
         name (str): The object's identifier. 
@@ -212,8 +619,23 @@ def check_object_updates(name: str, last_updated: datetime):
         QuerySimbadError (from query_simbad.get_aliases()). 
         ObjectNotFoundError (from db_interface.add_aliases())
     """
-    diff = datetime.today() - last_updated
-    if diff.days >= UPDATE_OBJECT_DAYS:
-        # The object requires updating, check for its aliases. 
-        aliases = qs.get_aliases(name)
-        db.add_aliases(name, aliases)
\ No newline at end of file
+    if _is_stale(last_updated):
+        if refresher.is_running():
+            refresher.enqueue(name)
+        else:
+            update_object(name)
+
+
+def update_object(name: str):
+    """ Updates an object's aliases from SIMBAD. 
+
+    Args: 
+        name (str): The object's identifier. 
+
+    Raises:
+        QuerySimbadError (from query_simbad.get_aliases()). 
+        ObjectNotFoundError (from db_interface.add_aliases())
+    """
+    # The object requires updating, check for its aliases. 
+    aliases = qs.get_aliases(name)
+    db.add_aliases(name, aliases)
@@ -0,0 +1,117 @@
+"""Generates short snippets of report bodies for search results.
+
+A snippet is a window of text around the first match of the search term,
+trimmed to whole words, with the positions of each match in the snippet so
+the front-end can highlight them. If there is no term, or it only matches
+the title, the snippet is the start of the body.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import re
+
+
+############################
+# Snippet module constants #
+############################
+
+
+# The number of characters of context shown either side of the matched term.
+SNIPPET_CONTEXT_CHARS: int = 80
+
+# The number of characters either side of the matched term that the local
+# database returns when only a snippet is requested. Must be larger than
+# SNIPPET_CONTEXT_CHARS, so the snippet can tell whether the body was cut.
+SNIPPET_WINDOW_CHARS: int = 2 * SNIPPET_CONTEXT_CHARS
+
+# Marks text omitted from the start or end of a snippet.
+ELLIPSIS: str = "..."
+
+
+#####################
+# Private functions #
+#####################
+
+
+def _term_pattern(term: str) -> re.Pattern:
+    ''' Compiles a case-insensitive pattern matching the literal search term.
+
+    Args:
+        term (str): The free-text search term.
+
+    Returns:
+        re.Pattern: The pattern, or None if there is no term.
+    '''
+    if term is None or term.strip() == "":
+        return None
+    return re.compile(re.escape(term.strip()), re.IGNORECASE)
+
+
+####################
+# Public functions #
+####################
+
+
+def make_snippet(text: str, term: str=None, context: int=SNIPPET_CONTEXT_CHARS) -> dict:
+    """ Creates a snippet of the given text around the first match of the term.
+
+    Args:
+        text (str): The report body, or a window of it returned by the local database.
+        term (str, optional): The free-text search term.
+        context (int, optional): The number of characters shown either side of the match.
+
+    Returns:
+        dict: The snippet "text" and a list of "highlights", each a [start, end)
+            pair of character offsets of a match within the snippet text.
+    """
+    if text is None:
+        text = ""
+    pattern = _term_pattern(term)
+
+    match = pattern.search(text) if pattern is not None else None
+    if match is None:
+        start, end = 0, min(len(text), 2 * context)
+    else:
+        start = max(0, match.start() - context)
+        end = min(len(text), match.end() + context)
+
+    # Trim partial words from each cut edge, without cutting into the match.
+    if start > 0:
+        limit = match.start() if match is not None else end
+        space = text.find(" ", start, limit)
+        if space != -1:
+            start = space + 1
+    if end < len(text):
+        limit = match.end() if match is not None else start
+        space = text.rfind(" ", limit, end)
+        if space != -1:
+            end = space
+
+    prefix = ELLIPSIS if start > 0 else ""
+    suffix = ELLIPSIS if end < len(text) else ""
+    window = text[start:end]
+
+    highlights = []
+    if pattern is not None:
+        for m in pattern.finditer(window):
+            highlights.append([len(prefix) + m.start(), len(prefix) + m.end()])
+
+    return {"text": prefix + window + suffix, "highlights": highlights}
@@ -104,3 +104,58 @@ DEFAULT_RADIUS: float = 10.0
 
 # The unit used for the radius of a coordinate search.
 RADIUS_UNIT: str = "arcsecond"
+
+
+# The maximum number of reports that can be requested in a single page of search results.
+MAX_PAGE_SIZE: int = 500
+
+
+# The default and maximum number of objects suggested when completing an object name.
+AUTOCOMPLETE_DEFAULT_LIMIT: int = 10
+AUTOCOMPLETE_MAX_LIMIT: int = 50
+
+
+# The default and maximum number of references followed from the starting reports
+# when expanding a graph of related reports.
+DEFAULT_GRAPH_HOPS: int = 2
+MAX_GRAPH_HOPS: int = 5
+
+
+# The maximum number of reports in a graph of related reports.
+MAX_GRAPH_NODES: int = 500
+
+
+# The lengths of the bins a timeline of reports can be counted in, and the
+# dates that reports can be binned by.
+TIMELINE_BINS: list[str] = ["day", "week", "month", "year"]
+TIMELINE_DATE_FIELDS: list[str] = ["submission", "observation"]
+
+
+# The maximum number of seconds a search waits on SIMBAD before falling back
+# to only searching the local database.
+SEARCH_DEADLINE_SECONDS: float = 10.0
+
+
+# The fields of a search result that can be requested.
+SEARCH_RESULT_FIELDS = [
+    "atel_num",
+    "title",
+    "authors",
+    "body",
+    "submission_date",
+    "referenced_reports",
+    "snippet",
+    "citations",
+]
+
+
+# The maximum number of seconds an import job can be throttled to wait between reports.
+MAX_IMPORT_DELAY_SECONDS: float = 60.0
+
+
+# The maximum number of ATel numbers leased to one worker at a time by a sharded import job.
+MAX_IMPORT_RANGE_SIZE: int = 1000
+
+
+# The number of attempts at importing a report that could not be downloaded or stored, after which it is no longer retried.
+MAX_IMPORT_ATTEMPTS: int = 5
\ No newline at end of file
@@ -0,0 +1,292 @@
+"""
+Contains the AliasResolver, an in-memory map from object aliases to the object IDs they refer to, and the PrefixIndex used to complete partially typed aliases.
+
+Aliases are matched by a normalized form, ignoring letter case, whitespace and SIMBAD's catalogue prefixes (e.g. "NAME Crab Nebula" or "V* V1500 Cyg"), so lookups can be made without querying the database. The database stores the same normalized form in the indexed Aliases.normalizedAlias column. Each worker keeps its own resolver, which is reloaded when the alias version number stored in the database changes. The number of reports linked to each object only ranks completions, so it is updated in place for reports stored by the worker and reloaded on a slower interval for reports stored by other workers.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable, Iterable, Iterator, Union
+import heapq
+import time
+
+# SIMBAD identifier prefixes that do not distinguish an object, in normalized form.
+# Longer prefixes must be listed first.
+SIMBAD_PREFIXES: tuple[str] = ("name", "v*", "**", "*")
+
+# The minimum number of seconds between checks of the alias version number.
+ALIAS_CHECK_SECONDS: float = 5.0
+
+# The number of seconds between reloads of the number of reports linked to each object.
+REPORT_COUNT_SECONDS: float = 300.0
+
+# The maximum number of aliases matching a prefix that are ranked when completing it.
+# Bounds the time taken to complete very short prefixes.
+COMPLETION_SCAN_LIMIT: int = 2000
+
+
+def normalize_alias(alias: str) -> str:
+    """
+    Converts an alias to the form used to match it, ignoring letter case, whitespace and SIMBAD prefixes.
+
+    Args:
+        alias (str): The object ID or alias.
+
+    Returns:
+        str: The normalized alias.
+    """
+    words = str(alias).casefold().split()
+    if len(words) > 1 and words[0] in SIMBAD_PREFIXES:
+        words = words[1:]
+    normalized = "".join(words)
+
+    # Prefixes may also be written without a space, e.g. "V*V1500Cyg".
+    for prefix in SIMBAD_PREFIXES:
+        if prefix != "name" and normalized.startswith(prefix) and len(normalized) > len(prefix):
+            return normalized[len(prefix):]
+    return normalized
+
+
+class PrefixIndex:
+    """
+    A sorted array of normalized aliases, used to find the aliases starting with a prefix. Not thread-safe.
+    """
+
+    def __init__(self, pairs: Iterable[tuple[str, str]] = ()):
+        """
+        Creates an index of the given aliases.
+
+        Args:
+            pairs (Iterable[tuple[str, str]], optional): The (alias, object ID) pairs to index. Defaults to none.
+        """
+        entries = sorted({(normalize_alias(alias), alias, object_id) for alias, object_id in pairs})
+        self._keys = [entry[0] for entry in entries]
+        self._entries = [(entry[1], entry[2]) for entry in entries]
+
+    def add(self, alias: str, object_id: str):
+        """
+        Adds an alias to the index, keeping it sorted. Aliases already indexed are ignored.
+
+        Args:
+            alias (str): The object ID or alias.
+            object_id (str): The object's main ID.
+        """
+        key = normalize_alias(alias)
+        i = bisect_left(self._keys, key)
+        j = i
+        while j < len(self._keys) and self._keys[j] == key:
+            if self._entries[j][0] == alias:
+                return
+            j += 1
+        self._keys.insert(i, key)
+        self._entries.insert(i, (alias, object_id))
+
+    def matches(self, prefix: str, limit: int = None) -> Iterator[tuple[str, str]]:
+        """
+        Finds the aliases whose normalized form starts with the normalized prefix, in normalized order.
+
+        Args:
+            prefix (str): The partially typed alias.
+            limit (int, optional): The maximum number of aliases to return. Defaults to None, for no limit.
+
+        Yields:
+            tuple[str, str]: The alias and the object ID it refers to.
+        """
+        key = normalize_alias(prefix)
+        start = bisect_left(self._keys, key)
+        end = len(self._keys) if limit is None else min(len(self._keys), start + limit)
+        for i in range(start, end):
+            if not self._keys[i].startswith(key):
+                return
+            yield self._entries[i]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class AliasResolver:
+    """
+    A thread-safe map from normalized aliases to object IDs, loaded from the database, along with a prefix index of the aliases and the number of reports linked to each object.
+    """
+
+    def __init__(self,
+                 load_aliases: Callable[[], Iterable[tuple[str, str]]],
+                 get_version: Callable[[], int],
+                 load_report_counts: Callable[[], dict[str, int]] = dict,
+                 check_interval: float = ALIAS_CHECK_SECONDS,
+                 count_interval: float = REPORT_COUNT_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Creates an empty resolver. The aliases are loaded on the first lookup.
+
+        Args:
+            load_aliases (Callable[[], Iterable[tuple[str, str]]]): Returns every stored (alias, object ID) pair. Earlier pairs take precedence when aliases normalize to the same form.
+            get_version (Callable[[], int]): Returns the current alias version number.
+            load_report_counts (Callable[[], dict[str, int]], optional): Returns the number of reports linked to each object ID. Defaults to no counts.
+            check_interval (float, optional): The minimum number of seconds between version number checks. Defaults to ALIAS_CHECK_SECONDS.
+            count_interval (float, optional): The number of seconds between reloads of the report counts, if the aliases are not reloaded sooner. Defaults to REPORT_COUNT_SECONDS.
+            clock (Callable[[], float], optional): Returns the current time in seconds. Defaults to time.monotonic.
+        """
+        self._load_aliases = load_aliases
+        self._get_version = get_version
+        self._load_report_counts = load_report_counts
+        self._check_interval = check_interval
+        self._count_interval = count_interval
+        self._clock = clock
+        self._lock = Lock()
+        self._refresh_lock = Lock()
+        self._ids: dict[str, str] = {}
+        self._index = PrefixIndex()
+        self._report_counts: dict[str, int] = {}
+        self._version = None
+        self._checked_at = None
+        self._counted_at = None
+
+    def resolve(self, alias: str) -> Union[str, None]:
+        """
+        Finds the object ID that the given alias refers to.
+
+        Args:
+            alias (str): The object ID or alias to lookup.
+
+        Returns:
+            str: The object's main ID, or None if the alias is not known.
+        """
+        self._check_version()
+        with self._lock:
+            return self._ids.get(normalize_alias(alias))
+
+    def complete(self, prefix: str, limit: int) -> list[tuple[str, str, int]]:
+        """
+        Finds the objects with an alias starting with the given prefix, ranked by the number of linked reports. Only the first COMPLETION_SCAN_LIMIT matching aliases are ranked.
+
+        Args:
+            prefix (str): The partially typed alias. Compared in normalized form.
+            limit (int): The maximum number of objects to return.
+
+        Returns:
+            list[tuple[str, str, int]]: The first matching alias of each object, the object's main ID and its number of linked reports, most reports first.
+        """
+        self._check_version()
+        with self._lock:
+            best: dict[str, str] = {}
+            for alias, object_id in self._index.matches(prefix, COMPLETION_SCAN_LIMIT):
+                best.setdefault(object_id, alias)
+
+            ranked = heapq.nsmallest(limit, best.items(), key=lambda item: (-self._report_counts.get(item[0], 0), normalize_alias(item[1])))
+            return [(alias, object_id, self._report_counts.get(object_id, 0)) for object_id, alias in ranked]
+
+    def add(self, object_id: str, aliases: list[str]):
+        """
+        Adds aliases for an object to this resolver, without waiting for it to be reloaded.
+
+        Args:
+            object_id (str): The object's main ID.
+            aliases (list[str]): The aliases of the object.
+        """
+        with self._lock:
+            for alias in [object_id] + list(aliases):
+                self._ids.setdefault(normalize_alias(alias), object_id)
+                self._index.add(alias, object_id)
+
+    def cache(self, alias: str, object_id: str):
+        """
+        Remembers the object an alias refers to, such as one found in the database, without adding the alias to the prefix index, so the text it was typed as is not suggested as a completion.
+
+        Args:
+            alias (str): The object ID or alias, as it was looked up.
+            object_id (str): The object's main ID.
+        """
+        with self._lock:
+            self._ids.setdefault(normalize_alias(alias), object_id)
+
+    def count_reports(self, object_ids: Iterable[str], change: int = 1):
+        """
+        Updates the number of reports linked to objects, such as after a report is stored, without waiting for the counts to be reloaded.
+
+        Args:
+            object_ids (Iterable[str]): The main IDs of the objects, once for each linked or unlinked report.
+            change (int, optional): The change to each object's count, e.g. -1 when a report is unlinked. Defaults to 1.
+        """
+        with self._lock:
+            for object_id in object_ids:
+                self._report_counts[object_id] = max(0, self._report_counts.get(object_id, 0) + change)
+
+    def invalidate(self):
+        """
+        Discards the loaded aliases, so they are reloaded on the next lookup.
+        """
+        with self._lock:
+            self._ids = {}
+            self._index = PrefixIndex()
+            self._report_counts = {}
+            self._version = None
+            self._checked_at = None
+            self._counted_at = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ids)
+
+    def _check_version(self):
+        """
+        Reloads the aliases and report counts if the alias version number has changed, or only the report counts if they were loaded count_interval seconds ago. The number is checked at most once every check_interval seconds.
+
+        The database is read and the new map and index are built without holding the lock, so lookups continue on the current aliases meanwhile. Only a resolver that has not been loaded makes lookups wait.
+        """
+        with self._lock:
+            if self._checked_at is not None and self._clock() - self._checked_at < self._check_interval:
+                return
+            loaded = self._version is not None
+
+        # Only one thread checks at a time. Others use the current aliases, unless they have not been loaded.
+        if not self._refresh_lock.acquire(blocking=not loaded):
+            return
+        try:
+            with self._lock:
+                now = self._clock()
+                if self._checked_at is not None and now - self._checked_at < self._check_interval:
+                    return
+                self._checked_at = now
+                version, counted_at = self._version, self._counted_at
+
+            current_version = self._get_version()
+            if current_version != version:
+                pairs = list(self._load_aliases())
+                ids = {}
+                for alias, object_id in pairs:
+                    ids.setdefault(normalize_alias(alias), object_id)
+                index = PrefixIndex(pairs)
+                report_counts = dict(self._load_report_counts())
+                with self._lock:
+                    self._ids = ids
+                    self._index = index
+                    self._report_counts = report_counts
+                    self._version = current_version
+                    self._counted_at = now
+            elif counted_at is None or now - counted_at >= self._count_interval:
+                report_counts = dict(self._load_report_counts())
+                with self._lock:
+                    self._report_counts = report_counts
+                    self._counted_at = now
+        finally:
+            self._refresh_lock.release()
@@ -0,0 +1,404 @@
+"""
+Contains the CitationGraph, an in-memory copy of the references between ATel reports, along with how often each report is referenced and a PageRank score of its centrality.
+
+References are stored in compressed sparse row (CSR) form, as NumPy arrays indexed by ATel number, so the reports referenced by or referencing a report are found in time proportional to their number. References added since the arrays were built are kept in a small overlay until the next rebuild. Each worker keeps its own graph, loading only the references stored since it last checked, and is only reloaded in full when references are removed.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from threading import Lock
+from typing import Callable, Iterable
+import time
+
+import numpy as np
+
+# The minimum number of seconds between checks for references stored or removed by other workers.
+GRAPH_CHECK_SECONDS: float = 5.0
+
+# The number of reference IDs before the last one loaded that are loaded again on each check, so references committed out of ID order by concurrent imports are not missed.
+REFERENCE_ID_OVERLAP: int = 256
+
+# The number of references that may be held in the overlay before the arrays are rebuilt.
+OVERLAY_MAX_REFERENCES: int = 1024
+
+# The minimum number of seconds between rebuilds of the arrays and scores to include a non-empty overlay.
+SCORE_REFRESH_SECONDS: float = 60.0
+
+# The probability that a random reader follows a reference rather than jumping to any report.
+PAGERANK_DAMPING: float = 0.85
+
+# PageRank iteration stops once the total change in scores is below this tolerance, or after the maximum number of iterations.
+PAGERANK_TOLERANCE: float = 1e-8
+PAGERANK_MAX_ITERATIONS: int = 100
+
+
+def _build_csr(rows: np.ndarray, cols: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Builds the compressed sparse row form of a set of edges.
+
+    Args:
+        rows (np.ndarray): The row (source) of each edge.
+        cols (np.ndarray): The column (target) of each edge.
+        size (int): The number of rows.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The row offsets, of length size + 1, and the columns of each row's edges, sorted.
+    """
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros(size + 1, dtype=np.int32)
+    np.cumsum(np.bincount(rows, minlength=size), out=indptr[1:])
+    return indptr, cols[order].astype(np.int32)
+
+
+def _build_graph(sources: np.ndarray, targets: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Builds the arrays of a graph in both directions, ignoring duplicate references.
+
+    Args:
+        sources (np.ndarray): The referencing ATel number of each reference.
+        targets (np.ndarray): The referenced ATel number of each reference.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The outgoing row offsets and columns, and the incoming row offsets and columns.
+    """
+    if len(sources) > 0:
+        # Remove duplicate references.
+        pairs = np.unique(np.stack((sources, targets), axis=1), axis=0)
+        sources, targets = pairs[:, 0], pairs[:, 1]
+    size = int(max(sources.max(), targets.max())) + 1 if len(sources) > 0 else 0
+
+    return _build_csr(sources, targets, size) + _build_csr(targets, sources, size)
+
+
+def pagerank(indptr: np.ndarray, indices: np.ndarray,
+             damping: float = PAGERANK_DAMPING,
+             tolerance: float = PAGERANK_TOLERANCE,
+             max_iterations: int = PAGERANK_MAX_ITERATIONS) -> np.ndarray:
+    """
+    Computes the PageRank score of each node of a directed graph by power iteration. Nodes without outgoing edges spread their score evenly over all nodes.
+
+    Args:
+        indptr (np.ndarray): The row offsets of the graph's outgoing edges, in CSR form.
+        indices (np.ndarray): The target of each outgoing edge, in CSR form.
+        damping (float, optional): The probability of following an edge. Defaults to PAGERANK_DAMPING.
+        tolerance (float, optional): The total change in scores below which iteration stops. Defaults to PAGERANK_TOLERANCE.
+        max_iterations (int, optional): The maximum number of iterations. Defaults to PAGERANK_MAX_ITERATIONS.
+
+    Returns:
+        np.ndarray: The score of each node, summing to one.
+    """
+    size = len(indptr) - 1
+    if size == 0:
+        return np.zeros(0)
+
+    out_degree = np.diff(indptr)
+    sources = np.repeat(np.arange(size), out_degree)
+    dangling = out_degree == 0
+    scale = np.divide(1.0, out_degree, out=np.zeros(size), where=~dangling)
+
+    scores = np.full(size, 1.0 / size)
+    for _ in range(max_iterations):
+        spread = damping * scores[dangling].sum() / size
+        updated = damping * np.bincount(indices, weights=(scores * scale)[sources], minlength=size)
+        updated += (1.0 - damping) / size + spread
+        change = np.abs(updated - scores).sum()
+        scores = updated
+        if change < tolerance:
+            break
+    return scores
+
+
+def _relative_scores(arrays: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]) -> np.ndarray:
+    """
+    Computes the PageRank score of each report of a graph, relative to the average report.
+
+    Args:
+        arrays (tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]): The outgoing row offsets and columns, and the incoming row offsets and columns, built by _build_graph.
+
+    Returns:
+        np.ndarray: The relative score of each report, or zero for reports not part of any reference.
+    """
+    out_indptr, out_indices, in_indptr, _ = arrays
+    scores = pagerank(out_indptr, out_indices) * max(1, len(out_indptr) - 1)
+    connected = (np.diff(out_indptr) > 0) | (np.diff(in_indptr) > 0)
+    return np.where(connected, scores, 0.0)
+
+
+class CitationGraph:
+    """
+    A thread-safe in-memory graph of the references between reports, loaded from the database.
+    """
+
+    def __init__(self,
+                 load_references: Callable[[int], Iterable[tuple[int, int, int]]],
+                 get_version: Callable[[], tuple[int, int]],
+                 check_interval: float = GRAPH_CHECK_SECONDS,
+                 score_interval: float = SCORE_REFRESH_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Creates an empty graph. The references are loaded on the first lookup.
+
+        Args:
+            load_references (Callable[[int], Iterable[tuple[int, int, int]]]): Returns the (reference ID, referencing ATel number, referenced ATel number) of every stored reference with an ID greater than the given ID.
+            get_version (Callable[[], tuple[int, int]]): Returns the current reference version number, which changes only when references are removed, and the ID of the last stored reference.
+            check_interval (float, optional): The minimum number of seconds between checks of the version number. Defaults to GRAPH_CHECK_SECONDS.
+            score_interval (float, optional): The minimum number of seconds between rebuilds to include added references in the scores. Defaults to SCORE_REFRESH_SECONDS.
+            clock (Callable[[], float], optional): Returns the current time in seconds. Defaults to time.monotonic.
+        """
+        self._load_references = load_references
+        self._get_version = get_version
+        self._check_interval = check_interval
+        self._score_interval = score_interval
+        self._clock = clock
+        self._lock = Lock()
+        self._refresh_lock = Lock()
+        self._version = None
+        self._last_id = 0
+        self._checked_at = None
+        self._reset(np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32))
+
+    def load(self):
+        """
+        Loads the references now if they have not been loaded, or are out of date, rather than on the next lookup.
+        """
+        self._check_version()
+
+    def references(self, atel_num: int) -> list[int]:
+        """
+        Finds the reports referenced by a report.
+
+        Args:
+            atel_num (int): The ATel number of the report.
+
+        Returns:
+            list[int]: The ATel numbers of the referenced reports.
+        """
+        self._check_version()
+        with self._lock:
+            return self._neighbours(self._out_indptr, self._out_indices, self._out_overlay, atel_num)
+
+    def referenced_by(self, atel_num: int) -> list[int]:
+        """
+        Finds the reports that reference a report.
+
+        Args:
+            atel_num (int): The ATel number of the report.
+
+        Returns:
+            list[int]: The ATel numbers of the referencing reports.
+        """
+        self._check_version()
+        with self._lock:
+            return self._neighbours(self._in_indptr, self._in_indices, self._in_overlay, atel_num)
+
+    def in_degree(self, atel_num: int) -> int:
+        """
+        Counts the reports that reference a report.
+
+        Args:
+            atel_num (int): The ATel number of the report.
+
+        Returns:
+            int: The number of referencing reports.
+        """
+        return len(self.referenced_by(atel_num))
+
+    def score(self, atel_num: int) -> float:
+        """
+        Finds the PageRank score of a report, relative to the average report, so a score above one means the report is more central than average.
+
+        Args:
+            atel_num (int): The ATel number of the report.
+
+        Returns:
+            float: The relative score, or zero if the report is not part of any reference.
+
+        The scores are computed when the arrays are built, so references in the overlay are not scored until it is merged.
+        """
+        self._check_version()
+        with self._lock:
+            scores = self._scores
+        if atel_num < 0 or atel_num >= len(scores):
+            return 0.0
+        return float(scores[atel_num])
+
+    def add_references(self, references: Iterable[tuple[int, int]]):
+        """
+        Adds references to this graph, such as references this worker has just stored, without waiting for the next check.
+
+        Args:
+            references (Iterable[tuple[int, int]]): The (referencing ATel number, referenced ATel number) pairs to add. References already in the graph are ignored.
+        """
+        with self._lock:
+            self._add_to_overlay(references)
+            full = len(self._overlay) > OVERLAY_MAX_REFERENCES
+
+        # A full overlay is left for the next check to merge if another thread is refreshing the graph.
+        if full and self._refresh_lock.acquire(blocking=False):
+            try:
+                self._merge_overlay()
+            finally:
+                self._refresh_lock.release()
+
+    def invalidate(self):
+        """
+        Discards the loaded references, so they are reloaded on the next lookup.
+        """
+        with self._lock:
+            self._reset(np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32))
+            self._version = None
+            self._last_id = 0
+            self._checked_at = None
+
+    def __len__(self) -> int:
+        """
+        Returns:
+            int: The number of references in the graph.
+        """
+        with self._lock:
+            return len(self._out_indices) + len(self._overlay)
+
+    def _reset(self, sources: np.ndarray, targets: np.ndarray):
+        """
+        Rebuilds the arrays and scores from the given references and empties the overlay.
+
+        Args:
+            sources (np.ndarray): The referencing ATel number of each reference.
+            targets (np.ndarray): The referenced ATel number of each reference.
+        """
+        arrays = _build_graph(sources, targets)
+        self._install(arrays, _relative_scores(arrays))
+
+    def _install(self, arrays: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray], scores: np.ndarray):
+        """
+        Replaces the arrays and scores with arrays built by _build_graph and their scores, and empties the overlay. The lock must be held.
+
+        Args:
+            arrays (tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]): The outgoing row offsets and columns, and the incoming row offsets and columns.
+            scores (np.ndarray): The relative score of each report, computed by _relative_scores.
+        """
+        self._out_indptr, self._out_indices, self._in_indptr, self._in_indices = arrays
+        self._scores = scores
+        self._scored_at = self._clock()
+        self._out_overlay: dict[int, list[int]] = {}
+        self._in_overlay: dict[int, list[int]] = {}
+        self._overlay: list[tuple[int, int]] = []
+
+    def _add_to_overlay(self, references: Iterable[tuple[int, int]]):
+        """
+        Adds references that are not already in the graph to the overlay. The lock must be held.
+
+        Args:
+            references (Iterable[tuple[int, int]]): The (referencing ATel number, referenced ATel number) pairs to add.
+        """
+        for source, target in references:
+            source, target = int(source), int(target)
+            if target in self._neighbours(self._out_indptr, self._out_indices, self._out_overlay, source):
+                continue
+            self._out_overlay.setdefault(source, []).append(target)
+            self._in_overlay.setdefault(target, []).append(source)
+            self._overlay.append((source, target))
+
+    def _merge_overlay(self):
+        """
+        Rebuilds the arrays and scores to include the references in the overlay. They are built without holding the lock, so lookups use the current arrays and scores meanwhile, and references added during the rebuild are kept in the overlay. The refresh lock must be held.
+        """
+        with self._lock:
+            out_indptr, out_indices = self._out_indptr, self._out_indices
+            added = np.array(self._overlay, dtype=np.int32).reshape(-1, 2)
+        if len(added) == 0:
+            return
+
+        sources = np.repeat(np.arange(len(out_indptr) - 1), np.diff(out_indptr))
+        arrays = _build_graph(np.concatenate((sources, added[:, 0])).astype(np.int32),
+                              np.concatenate((out_indices, added[:, 1])).astype(np.int32))
+        scores = _relative_scores(arrays)
+
+        with self._lock:
+            # The graph was invalidated during the rebuild
+            if self._out_indices is not out_indices:
+                return
+            remaining = self._overlay[len(added):]
+            self._install(arrays, scores)
+            self._add_to_overlay(remaining)
+
+    def _neighbours(self, indptr: np.ndarray, indices: np.ndarray, overlay: dict[int, list[int]], atel_num: int) -> list[int]:
+        """
+        Finds the neighbours of a report in one direction. The lock must be held.
+
+        Args:
+            indptr (np.ndarray): The row offsets of the direction's arrays.
+            indices (np.ndarray): The neighbours of each row of the direction's arrays.
+            overlay (dict[int, list[int]]): The direction's neighbours added since the arrays were built.
+            atel_num (int): The ATel number of the report.
+
+        Returns:
+            list[int]: The ATel numbers of the neighbouring reports.
+        """
+        neighbours = []
+        if 0 <= atel_num < len(indptr) - 1:
+            neighbours = indices[indptr[atel_num]:indptr[atel_num + 1]].tolist()
+        return neighbours + overlay.get(atel_num, [])
+
+    def _check_version(self):
+        """
+        Loads the references stored since the last check, or reloads every reference if references have been removed. Checks are made at most once every check_interval seconds. The overlay is merged, and the scores recomputed, once it is full or at most once every score_interval seconds.
+
+        The database is read and a reload's arrays and scores are built without holding the lock, so lookups continue on the current graph meanwhile. Only a graph that has not been loaded makes lookups wait.
+        """
+        with self._lock:
+            if self._checked_at is not None and self._clock() - self._checked_at < self._check_interval:
+                return
+            loaded = self._version is not None
+
+        # Only one thread checks at a time. Others use the current graph, unless it has not been loaded.
+        if not self._refresh_lock.acquire(blocking=not loaded):
+            return
+        try:
+            with self._lock:
+                now = self._clock()
+                if self._checked_at is not None and now - self._checked_at < self._check_interval:
+                    return
+                self._checked_at = now
+                version, last_id = self._version, self._last_id
+
+            current_version, current_last_id = self._get_version()
+            # A lower last ID means the references were deleted and stored again, such as after a reset
+            if current_version != version or current_last_id < last_id:
+                rows = np.array(list(self._load_references(0)), dtype=np.int64).reshape(-1, 3)
+                arrays = _build_graph(rows[:, 1].astype(np.int32), rows[:, 2].astype(np.int32))
+                scores = _relative_scores(arrays)
+                with self._lock:
+                    self._install(arrays, scores)
+                    self._version = current_version
+                    self._last_id = max(current_last_id, int(rows[:, 0].max()) if len(rows) > 0 else 0)
+            elif current_last_id > last_id:
+                rows = list(self._load_references(max(0, last_id - REFERENCE_ID_OVERLAP)))
+                with self._lock:
+                    self._add_to_overlay((source, target) for _, source, target in rows)
+                    self._last_id = max([current_last_id] + [int(ref_id) for ref_id, _, _ in rows])
+
+            with self._lock:
+                merge = (len(self._overlay) > OVERLAY_MAX_REFERENCES
+                         or (len(self._overlay) > 0 and now - self._scored_at >= self._score_interval))
+            if merge:
+                self._merge_overlay()
+        finally:
+            self._refresh_lock.release()
@@ -25,17 +25,45 @@ import os
 import warnings
 
 import mysql.connector
+from mysql.connector import errorcode
 from mysql.connector.cursor import MySQLCursor
 
 from model.constants import FIXED_KEYWORDS
 from model.db.db_interface import _connect
+from model.db.alias_resolver import normalize_alias
+from model.ds.disjoint_set import DisjointSet
 
 # Constants
 
-_LATEST_SCHEMA_VERSION: int = 8
+_LATEST_SCHEMA_VERSION: int = 12
 """ 
 Version number of the latest database schema.
 This must be increased every time the schema is upgraded.
+
+v10 adds the ImportLedger, ReferenceChecks and ReportFingerprints tables, and the columns of the ImportJobs table added after it was created.
+It also reapplies every v9 change, as databases were deployed at v9 before all of them were made.
+
+v11 numbers each reference between reports and adds the reference version number, so the citation graph loads only new references.
+
+v12 adds the WorkerLeases table, so background tasks shared by every worker run in one worker at a time.
+"""
+
+_OLDEST_UPGRADABLE_SCHEMA_VERSION: int = 8
+"""
+Version number of the oldest database schema that can be upgraded to the latest version without a reset.
+"""
+
+_BACKFILLED_SCHEMA_VERSION: int = 10
+"""
+Version number of the schema that completed the normalized aliases, facet count tables and report thread IDs.
+Their backfills only run when upgrading from an older version, as later versions keep them up to date.
+"""
+
+_UPGRADED_TABLES: list[str] = ["AdminUsers", "Reports", "Metadata", "Objects", "ObjectRefs", "Aliases", "ReportRefs",
+                               "ReportCoords", "ObservationDates", "ImportJobs"]
+"""
+Tables with an upgrade schema, altered in this order.
+Each statement of an upgrade schema is skipped if the database already has the column or index it adds, so upgrading from any older version applies every change exactly once.
 """
 
 _LATEST_SCHEMA_VERSION_REQUIRES_RESET: bool = False
@@ -55,8 +83,8 @@ def init_db():
     if (schema_version is None):  # Database does not yet exist.
         # Create db from schema
         _create_db()
-    # Database schema is previous version.
-    elif (schema_version == _LATEST_SCHEMA_VERSION-1):
+    # Database schema is an older version that can be upgraded.
+    elif (_OLDEST_UPGRADABLE_SCHEMA_VERSION <= schema_version < _LATEST_SCHEMA_VERSION):
         if _LATEST_SCHEMA_VERSION_REQUIRES_RESET:
             _warn_schema_incompatible(schema_version)
         else:
@@ -144,6 +172,14 @@ def _create_db():
     report_refs_table = _read_table("ReportRefs")
     report_coords_table = _read_table("ReportCoords")
     ob_dates_table = _read_table("ObservationDates")
+    keyword_counts_table = _read_table("KeywordCounts")
+    year_counts_table = _read_table("YearCounts")
+    import_jobs_table = _read_table("ImportJobs")
+    import_leases_table = _read_table("ImportLeases")
+    import_ledger_table = _read_table("ImportLedger")
+    reference_checks_table = _read_table("ReferenceChecks")
+    report_fingerprints_table = _read_table("ReportFingerprints")
+    worker_leases_table = _read_table("WorkerLeases")
 
     # Add keywords to reports schema
     sep = "', '"
@@ -161,6 +197,14 @@ def _create_db():
         cur.execute(report_refs_table)
         cur.execute(report_coords_table)
         cur.execute(ob_dates_table)
+        cur.execute(keyword_counts_table)
+        cur.execute(year_counts_table)
+        cur.execute(import_jobs_table)
+        cur.execute(import_leases_table)
+        cur.execute(import_ledger_table)
+        cur.execute(reference_checks_table)
+        cur.execute(report_fingerprints_table)
+        cur.execute(worker_leases_table)
 
         #Add single metadata entry
         cur.execute(
@@ -176,8 +220,8 @@ def _create_db():
 
 def _upgrade_db(old_schema_version: int):
     """
-    Upgrades the database to the next version using the upgrade schema.
-    Should only be called if the schema was the previous version.
+    Upgrades the database to the latest version using the upgrade schema.
+    Should only be called if the schema is an older version that can be upgraded, after any new tables are created.
 
     Args:
         old_schema_version (int): The schema version to upgrade from.
@@ -187,31 +231,23 @@ def _upgrade_db(old_schema_version: int):
     cn = _connect()
     cur: MySQLCursor = cn.cursor()
 
-    # Load table upgrade schema from file
-    user_table = _read_table_upgrade("AdminUsers")
-    reports_table = _read_table_upgrade("Reports")
-    metadata_table = _read_table_upgrade("Metadata")
-    objects_table = _read_table_upgrade("Objects")
-    object_refs_table = _read_table_upgrade("ObjectRefs")
-    aliases_table = _read_table_upgrade("Aliases")
-    report_refs_table = _read_table_upgrade("ReportRefs")
-    report_coords_table = _read_table_upgrade("ReportCoords")
-    ob_dates_table = _read_table_upgrade("ObservationDates")
-
     metadata_query = ("update Metadata "
                       "set schemaVersion = %s;")
 
     try:
         # Alter tables
-        cur.execute(user_table)
-        cur.execute(reports_table)
-        cur.execute(metadata_table)
-        cur.execute(objects_table)
-        cur.execute(object_refs_table)
-        cur.execute(aliases_table)
-        cur.execute(report_refs_table)
-        cur.execute(report_coords_table)
-        cur.execute(ob_dates_table)
+        for table_name in _UPGRADED_TABLES:
+            _apply_upgrade(cur, _read_table_upgrade(table_name))
+
+        if old_schema_version < _BACKFILLED_SCHEMA_VERSION:
+            # Fill normalized form of existing aliases
+            _backfill_normalized_aliases(cur)
+
+            # Fill report count summary tables
+            _backfill_facet_counts(cur)
+
+            # Group existing reports into threads
+            _backfill_report_threads(cur)
 
         #Update version
         cur.execute(metadata_query, (_LATEST_SCHEMA_VERSION,))
@@ -226,6 +262,99 @@ def _upgrade_db(old_schema_version: int):
         cn.close()
 
 
+def _apply_upgrade(cur: MySQLCursor, upgrade_schema: str):
+    """
+    Executes each statement of a table's upgrade schema, skipping statements that add a column or index the table already has.
+
+    Args:
+        cur (MySQLCursor): An open cursor to execute the statements with. The calling method must commit the changes.
+        upgrade_schema (str): The upgrade schema, with statements separated by semicolons.
+    """
+    for statement in upgrade_schema.split(";"):
+        if statement.strip() == "":
+            continue
+        try:
+            cur.execute(statement)
+        except mysql.connector.Error as err:
+            if err.errno not in (errorcode.ER_DUP_FIELDNAME, errorcode.ER_DUP_KEYNAME):
+                raise err
+
+
+def _backfill_normalized_aliases(cur: MySQLCursor):
+    """
+    Stores the normalized form of each alias that does not yet have one.
+
+    Args:
+        cur (MySQLCursor): An open cursor to execute the updates with. The calling method must commit the changes.
+    """
+    cur.execute("select alias from Aliases where normalizedAlias = ''")
+    aliases = [row[0] for row in cur.fetchall()]
+
+    update_query = ("update Aliases "
+                    "set normalizedAlias = %s "
+                    "where alias = %s;")
+    for alias in aliases:
+        cur.execute(update_query, (normalize_alias(alias), alias))
+
+
+def _backfill_facet_counts(cur: MySQLCursor):
+    """
+    Counts the existing reports with each keyword and in each year, replacing the counts in the summary tables.
+
+    Args:
+        cur (MySQLCursor): An open cursor to execute the updates with. The calling method must commit the changes.
+    """
+    cur.execute("select keywords + 0, year(submissionDate), count(*) from Reports "
+                "group by keywords, year(submissionDate)")
+    rows = cur.fetchall()
+
+    keyword_counts = {kw: 0 for kw in FIXED_KEYWORDS}
+    year_counts = {}
+    for mask, year, count in rows:
+        for i, kw in enumerate(FIXED_KEYWORDS):
+            if int(mask) & (1 << i):
+                keyword_counts[kw] += count
+        year_counts[year] = year_counts.get(year, 0) + count
+
+    keyword_query = ("insert into KeywordCounts (keyword, reportCount) "
+                     "values (%s, %s) "
+                     "on duplicate key update reportCount = values(reportCount);")
+    for kw, count in keyword_counts.items():
+        cur.execute(keyword_query, (kw, count))
+
+    year_query = ("insert into YearCounts (year, reportCount) "
+                  "values (%s, %s) "
+                  "on duplicate key update reportCount = values(reportCount);")
+    for year, count in year_counts.items():
+        cur.execute(year_query, (year, count))
+
+
+def _backfill_report_threads(cur: MySQLCursor):
+    """
+    Groups the existing reports into threads of reports connected by references between stored reports or by shared objects, storing the thread ID of each report.
+
+    Args:
+        cur (MySQLCursor): An open cursor to execute the updates with. The calling method must commit the changes.
+    """
+    cur.execute("select atelNum from Reports")
+    threads = DisjointSet(row[0] for row in cur.fetchall())
+
+    cur.execute("select atelNum, refReport from ReportRefs")
+    for atel_num, ref_report in cur.fetchall():
+        if atel_num in threads and ref_report in threads:
+            threads.union(atel_num, ref_report)
+
+    cur.execute("select objectIDFK, atelNumFK from ObjectRefs order by objectIDFK")
+    first_reports = {}
+    for object_id, atel_num in cur.fetchall():
+        threads.union(first_reports.setdefault(object_id, atel_num), atel_num)
+
+    update_query = ("update Reports "
+                    "set threadId = %s "
+                    "where atelNum = %s;")
+    cur.executemany(update_query, [(threads.find(atel_num), atel_num) for atel_num in list(threads)])
+
+
 def _get_schema_version() -> int:
     """
     Retrieves the version number of the current database schema.
@@ -276,12 +405,20 @@ def _reset_db():
         cur.execute("drop table AdminUsers;")
         cur.execute("drop table Metadata;")
         cur.execute("drop table ObjectRefs;")
+        cur.execute("drop table ReferenceChecks;")
+        cur.execute("drop table ReportFingerprints;")
         cur.execute("drop table Aliases;")
         cur.execute("drop table ObservationDates;")
         cur.execute("drop table ReportCoords;")
         cur.execute("drop table ReportRefs;")
         cur.execute("drop table Reports;")
         cur.execute("drop table Objects;")
+        cur.execute("drop table KeywordCounts;")
+        cur.execute("drop table YearCounts;")
+        cur.execute("drop table ImportLeases;")
+        cur.execute("drop table ImportJobs;")
+        cur.execute("drop table ImportLedger;")
+        cur.execute("drop table WorkerLeases;")
     except mysql.connector.Error as err:
         print(err.msg)
     finally:
@@ -23,7 +23,8 @@ License Terms and Copyright:
     You should have received a copy of the GNU Affero General Public License
     along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 import os
 
 from astropy.coordinates import SkyCoord
@@ -33,11 +34,58 @@ from mysql.connector import errorcode
 from mysql.connector.connection import MySQLConnection
 from mysql.connector.cursor import MySQLCursor
 
+from model.constants import FIXED_KEYWORDS, MAX_IMPORT_ATTEMPTS
 from model.ds.report_types import ImportedReport, ReportResult
 from model.ds.search_filters import SearchFilters, DateFilter, KeywordMode
 from model.ds.alias_result import AliasResult
+from model.ds.pagination import PageCursor
+from model.ds.report_graph import ReportGraph
+from model.ds.import_job import ImportJob, ImportLease, JobState
+from model.ds.import_ledger import LedgerEntry
+from model.ds.reference_check import ReferenceCheck
+from model.ds.report_fingerprint import ReportFingerprint, ReportSection
+from model.db.alias_resolver import AliasResolver, normalize_alias
+from model.db.citation_graph import CitationGraph
+from typing import Iterator
 from controller.helper.type_checking import list_is_type
 
+# The default number of reports fetched from the server at a time when iterating over query results.
+STREAM_BATCH_SIZE: int = 100
+
+# The text fields of a report that can be selected individually.
+REPORT_TEXT_FIELDS: tuple[str] = ("title", "authors", "body")
+
+# The bit representing each fixed keyword in the keywords set column.
+# MySQL numbers set members in the order they are defined, which is the order of FIXED_KEYWORDS.
+_KEYWORD_BITS: dict[str, int] = {kw: 1 << i for i, kw in enumerate(FIXED_KEYWORDS)}
+
+# The SQL expression giving the first date of the bin containing a date, for each timeline bin length.
+# Weeks start on Monday.
+_TIMELINE_BIN_STARTS: dict[str, str] = {
+    "day": "date({0})",
+    "week": "date_sub(date({0}), interval weekday({0}) day)",
+    "month": "date_sub(date({0}), interval dayofmonth({0}) - 1 day)",
+    "year": "makedate(year({0}), 1)",
+}
+
+# Selects the ATel numbers of a report and every report related to it by a reference or a shared object, whose threads are joined.
+_RELATED_REPORTS_QUERY: str = ("select %s "
+                               "union select refReport from ReportRefs where atelNum = %s "
+                               "union select atelNum from ReportRefs where refReport = %s "
+                               "union select other.atelNumFK from ObjectRefs as own "
+                               "inner join ObjectRefs as other on other.objectIDFK = own.objectIDFK "
+                               "where own.atelNumFK = %s")
+
+# The column of the ReportFingerprints table storing the hash of each section of a report.
+_FINGERPRINT_COLUMNS: dict[ReportSection, str] = {
+    ReportSection.REPORT: "reportHash",
+    ReportSection.OBJECTS: "objectsHash",
+    ReportSection.OBSERVATION_DATES: "datesHash",
+    ReportSection.COORDINATES: "coordsHash",
+    ReportSection.REFERENCES: "refsHash",
+    ReportSection.REFERENCED_BY: "referencedByHash",
+}
+
 # Public functions
 def get_hashed_password(username: str) -> str:
     """
@@ -123,12 +171,13 @@ def add_admin_user(username: str, password: str):
         )
 
 
-def add_report(report: ImportedReport):
+def add_report(report: ImportedReport, fingerprint: ReportFingerprint = None):
     """
     Stores a new report in the database with all the fields specified in the given report object. This method also creates relational records between reports and objects, related reports and coordinates.
 
     Args:
         report (ImportedReport): The report to be stored in the database.
+        fingerprint (ReportFingerprint, optional): The report's fingerprint, stored so an unchanged report is skipped when it is re-imported. Defaults to None.
 
     Raises:
         ExistingReportError: When the ATel number of the specified report is already associated with a report stored in the database.
@@ -140,10 +189,10 @@ def add_report(report: ImportedReport):
     sub_date = report.submission_date.strftime("%Y-%m-%d %H:%M:%S")
 
     report_query = ("insert into Reports "
-                    "(atelNum, title, authors, body, submissionDate, keywords) "
-                    "values (%s, %s, %s, %s, %s, %s)")
+                    "(atelNum, title, authors, body, submissionDate, keywords, threadId) "
+                    "values (%s, %s, %s, %s, %s, %s, %s)")
 
-    data = (report.atel_num, report.title, report.authors, report.body, sub_date, keywords)
+    data = (report.atel_num, report.title, report.authors, report.body, sub_date, keywords, report.atel_num)
 
     metadata_query = ("update Metadata "
                       "set lastUpdatedDate = CURDATE()")                
@@ -242,12 +291,233 @@ def add_report(report: ImportedReport):
             finally:
                 cn.commit()
 
+        # Join the threads of related reports
+        _merge_report_threads(cur, _RELATED_REPORTS_QUERY, (report.atel_num,) * 4)
+        cn.commit()
+
+        # Update report count summaries
+        _increment_facet_counts(cur, report)
+        cn.commit()
+
+        if fingerprint is not None:
+            _store_report_fingerprint(cur, fingerprint)
+            cn.commit()
+
+        # Invalidate cached search results
+        _bump_data_generation(cur)
+        cn.commit()
+
+        # Update this worker's report counts used to rank aliases. Other workers reload them periodically.
+        _alias_resolver.count_reports(set(report.objects))
+
+        # Update this worker's citation graph in place, rather than reloading it
+        references = ([(report.atel_num, other_report) for other_report in report.referenced_reports]
+                      + [(other_report, report.atel_num) for other_report in report.referenced_by])
+        _citation_graph.add_references(references)
+
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+
+def update_report(report: ImportedReport, fingerprint: ReportFingerprint, sections: list[ReportSection]):
+    """
+    Updates a stored report with the fields of a re-imported report, rewriting only the specified sections. Only the rows of each section that differ are deleted or inserted, rather than every row, and references to the report by other reports are only added, as they are also stored when those reports are imported.
+
+    Args:
+        report (ImportedReport): The re-imported report.
+        fingerprint (ReportFingerprint): The re-imported report's fingerprint, replacing the stored fingerprint.
+        sections (list[ReportSection]): The sections that changed, e.g. from ReportFingerprint.changed_sections.
+    """
+    atel_num = report.atel_num
+    child_rows = {
+        ReportSection.OBJECTS: ("ObjectRefs", "atelNumFK", "objectIDFK", set(report.objects)),
+        ReportSection.OBSERVATION_DATES: ("ObservationDates", "atelNumFK", "obDate",
+                                          set(date.replace(microsecond=0) for date in report.observation_dates)),
+        ReportSection.COORDINATES: ("ReportCoords", "atelNumFK", "ra, declination",
+                                    set((Decimal(f"{coord.ra.deg:.10f}"), Decimal(f"{coord.dec.deg:.10f}")) for coord in report.coordinates)),
+        ReportSection.REFERENCES: ("ReportRefs", "atelNum", "refReport", set(int(num) for num in report.referenced_reports)),
+        ReportSection.REFERENCED_BY: ("ReportRefs", "refReport", "atelNum", set(int(num) for num in report.referenced_by)),
+    }
+
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    try:
+        if ReportSection.REPORT in sections:
+            # Move the report's counts in the summaries from its stored keywords and year to its new ones
+            cur.execute("select keywords + 0, submissionDate from Reports where atelNum = %s", (atel_num,))
+            mask, old_date = cur.fetchone()
+            _decrement_facet_counts(cur, [kw for kw, bit in _KEYWORD_BITS.items() if int(mask) & bit], old_date.year)
+            _increment_facet_counts(cur, report)
+
+            query = ("update Reports "
+                     "set title = %s, authors = %s, body = %s, submissionDate = %s, keywords = %s "
+                     "where atelNum = %s")
+            cur.execute(query, (report.title, report.authors, report.body, report.submission_date.strftime("%Y-%m-%d %H:%M:%S"),
+                                ",".join(report.keywords), atel_num))
+
+        added_refs = []
+        removed_refs = False
+        added_objects, removed_objects = [], []
+        for section, (table, key_column, columns, rows) in child_rows.items():
+            if section not in sections:
+                continue
+            if section is ReportSection.COORDINATES:
+                added, removed = _sync_child_rows(cur, table, key_column, columns, atel_num, rows)
+            else:
+                added, removed = _sync_child_rows(cur, table, key_column, columns, atel_num, set((row,) for row in rows),
+                                                  remove=section is not ReportSection.REFERENCED_BY)
+
+            if section is ReportSection.OBJECTS:
+                added_objects, removed_objects = [row[0] for row in added], [row[0] for row in removed]
+            elif section is ReportSection.REFERENCES:
+                added_refs += [(atel_num, row[0]) for row in added]
+                removed_refs = removed_refs or len(removed) > 0
+            elif section is ReportSection.REFERENCED_BY:
+                added_refs += [(row[0], atel_num) for row in added]
+
+        changed = len(sections) > 0
+        if changed:
+            cur.execute("update Metadata set lastUpdatedDate = CURDATE()")
+
+            # Join the threads of newly related reports. Threads are not split when relations are removed.
+            if any(section in sections for section in (ReportSection.OBJECTS, ReportSection.REFERENCES, ReportSection.REFERENCED_BY)):
+                _merge_report_threads(cur, _RELATED_REPORTS_QUERY, (atel_num,) * 4)
+
+            # Invalidate cached search results
+            _bump_data_generation(cur)
+
+            # Every worker's citation graph is reloaded if references were removed
+            if removed_refs:
+                cur.execute("update Metadata set referenceVersion = referenceVersion + 1")
+
+        _store_report_fingerprint(cur, fingerprint)
+        cn.commit()
+
+        # Update this worker's report counts used to rank aliases
+        _alias_resolver.count_reports(added_objects)
+        _alias_resolver.count_reports(removed_objects, -1)
+
+        # Update this worker's citation graph in place, unless references were removed
+        if changed and not removed_refs:
+            _citation_graph.add_references(added_refs)
+    except mysql.connector.Error as e:
+        cn.rollback()
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+
+def delete_reports(start_atel: int, end_atel: int):
+    """
+    Deletes the stored reports in a range of ATel numbers, along with their relations, fingerprints and import ledger entries, removing them from the report count summaries. Used to clean up reports imported for testing, such as by benchmarks. Threads joined by the reports are not split.
+
+    Args:
+        start_atel (int): The ATel number of the first report to delete.
+        end_atel (int): The ATel number after the last report to delete.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    try:
+        cur.execute("select keywords + 0, submissionDate from Reports where atelNum >= %s and atelNum < %s", (start_atel, end_atel))
+        for mask, date in cur.fetchall():
+            _decrement_facet_counts(cur, [kw for kw, bit in _KEYWORD_BITS.items() if int(mask) & bit], date.year)
+
+        cur.execute("select objectIDFK from ObjectRefs where atelNumFK >= %s and atelNumFK < %s", (start_atel, end_atel))
+        unlinked_objects = [row[0] for row in cur.fetchall()]
+
+        # References have no foreign keys, so are deleted in both directions. Other rows are deleted with their report.
+        cur.execute("delete from ReportRefs where (atelNum >= %s and atelNum < %s) or (refReport >= %s and refReport < %s)",
+                    (start_atel, end_atel, start_atel, end_atel))
+        removed_refs = cur.rowcount > 0
+        cur.execute("delete from ImportLedger where atelNum >= %s and atelNum < %s", (start_atel, end_atel))
+        cur.execute("delete from Reports where atelNum >= %s and atelNum < %s", (start_atel, end_atel))
+
+        # Invalidate cached search results, and every worker's citation graph if references were removed
+        _bump_data_generation(cur)
+        if removed_refs:
+            cur.execute("update Metadata set referenceVersion = referenceVersion + 1")
+        cn.commit()
+
+        _alias_resolver.count_reports(unlinked_objects, -1)
+    except mysql.connector.Error as e:
+        cn.rollback()
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+
+def get_report_fingerprint(atel_num: int) -> ReportFingerprint:
+    """
+    Retrieves the fingerprint of a stored report.
+
+    Args:
+        atel_num (int): The ATel number of the report.
+
+    Returns:
+        ReportFingerprint: The fingerprint, or None if the report was stored without one.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    query = ("select atelNumFK, htmlHash, parserVersion, " + ", ".join(_FINGERPRINT_COLUMNS.values()) + ", updatedAt "
+             "from ReportFingerprints where atelNumFK = %s")
+
+    try:
+        cur.execute(query, (atel_num,))
+        row = cur.fetchone()
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    if row is None:
+        return None
+    section_hashes = dict(zip(_FINGERPRINT_COLUMNS.keys(), row[3:-1]))
+    return ReportFingerprint(row[0], row[1], row[2], section_hashes, row[-1])
+
+
+def get_reparse_candidates(parser_version: int = None, after_atel: int = 0, limit: int = 100) -> list[int]:
+    """
+    Retrieves the stored reports to re-import, in order of ATel number: reports parsed by an older version of the parser, or stored without a fingerprint.
+
+    Args:
+        parser_version (int, optional): The version of the current parser. Defaults to None, retrieving every stored report.
+        after_atel (int, optional): Only retrieves reports after this ATel number, to retrieve the next page. Defaults to 0.
+        limit (int, optional): The maximum number of reports retrieved. Defaults to 100.
+
+    Returns:
+        list[int]: The ATel numbers of the reports.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    query = "select atelNum from Reports left join ReportFingerprints on atelNumFK = atelNum where atelNum > %s "
+    data = (after_atel,)
+    if parser_version is not None:
+        query += "and (parserVersion is null or parserVersion < %s) "
+        data += (parser_version,)
+    query += "order by atelNum limit %s"
+    data += (limit,)
+
+    try:
+        cur.execute(query, data)
+        atel_nums = [int(row[0]) for row in cur.fetchall()]
     except mysql.connector.Error as e:
         raise e
     finally:
         cur.close()
         cn.close()
 
+    return atel_nums
+
 
 def report_exists(atel_num: int) -> bool:
     """
@@ -370,6 +640,189 @@ def get_last_updated_date() -> datetime:
     return date
 
 
+def get_data_generation() -> int:
+    """
+    Retrieves the data generation number. This is increased every time reports, objects or aliases are added, and can be compared to a previously retrieved value to check whether cached search results are still valid.
+
+    Returns:
+        int: The current data generation number.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    query = "select dataGeneration from Metadata"
+
+    try:
+        cur.execute(query)
+        result = cur.fetchone()
+
+        generation = result[0]
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return generation
+
+
+def get_facet_counts(filters: SearchFilters = None, date_range: DateFilter = None, object_name: str = None) -> tuple[dict[str, int], dict[int, int]]:
+    """
+    Counts the reports matching the specified criteria with each keyword and submitted in each year. Without criteria, the counts are read from summary tables maintained by add_report(), without scanning the reports.
+
+    Args:
+        filters (SearchFilters, optional): A valid search filters object. Defaults to None.
+        date_range (DateFilter, optional): A valid date filter object. Defaults to None.
+        object_name (str, optional): An object ID or alias that reports must be linked to. Defaults to None.
+
+    Returns:
+        dict[str, int]: The number of matching reports with each fixed keyword.
+        dict[int, int]: The number of matching reports submitted in each year, in year order. Years without reports are omitted. Both are empty of counts if the object is not stored.
+    """
+    keyword_counts = {kw: 0 for kw in FIXED_KEYWORDS}
+    year_counts = {}
+
+    if not filters and not date_range and not object_name:
+        cn = _connect()
+        cur: MySQLCursor = cn.cursor()
+        try:
+            cur.execute("select keyword, reportCount from KeywordCounts")
+            for keyword, count in cur.fetchall():
+                if keyword in keyword_counts:
+                    keyword_counts[keyword] = int(count)
+
+            cur.execute("select year, reportCount from YearCounts order by year")
+            for year, count in cur.fetchall():
+                if count > 0:
+                    year_counts[int(year)] = int(count)
+        except mysql.connector.Error as e:
+            raise e
+        finally:
+            cur.close()
+            cn.close()
+
+        return keyword_counts, year_counts
+
+    try:
+        join_clause, join_data = _build_name_join_clause(object_name)
+    except (ObjectNotFoundError): # if object name is not a valid alias/id, no reports match.
+        return keyword_counts, year_counts
+    where_clause, where_data = _build_where_clause(filters, date_range)
+
+    # Group by the keywords bitmask, so each report is only read once.
+    query = ("select keywords + 0, year(submissionDate), count(*) "
+             "from Reports " + join_clause + where_clause +
+             "group by keywords, year(submissionDate)")
+
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+    try:
+        cur.execute(query, join_data + where_data)
+        for mask, year, count in cur.fetchall():
+            for kw, bit in _KEYWORD_BITS.items():
+                if int(mask) & bit:
+                    keyword_counts[kw] += int(count)
+            year_counts[int(year)] = year_counts.get(int(year), 0) + int(count)
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return keyword_counts, dict(sorted(year_counts.items()))
+
+
+def get_timeline_counts(filters: SearchFilters = None, date_range: DateFilter = None, object_name: str = None, bin_size: str = "month", date_field: str = "submission") -> list[tuple[date, int]]:
+    """
+    Counts the reports matching the specified criteria in each bin of a timeline, grouped by the database so only the counts are returned. Without criteria, yearly counts of submissions are read from the summary table maintained by add_report().
+
+    Args:
+        filters (SearchFilters, optional): A valid search filters object. Defaults to None.
+        date_range (DateFilter, optional): A valid date filter object. Defaults to None.
+        object_name (str, optional): An object ID or alias that reports must be linked to. Defaults to None.
+        bin_size (str, optional): The length of each bin, one of "day", "week", "month" or "year". Weeks start on Monday. Defaults to "month".
+        date_field (str, optional): The date reports are binned by, either "submission" or "observation". A report is counted once in each bin containing one of its observation dates. Defaults to "submission".
+
+    Returns:
+        list[tuple[date, int]]: The first date and number of matching reports of each bin, in date order. Bins without reports are omitted, and the list is empty if the object is not stored.
+
+    Raises:
+        ValueError: When the bin size or date field is invalid.
+    """
+    if bin_size not in _TIMELINE_BIN_STARTS:
+        raise ValueError(f"Invalid timeline bin: {bin_size}")
+    if date_field not in ("submission", "observation"):
+        raise ValueError(f"Invalid timeline date field: {date_field}")
+
+    if not filters and not date_range and not object_name and bin_size == "year" and date_field == "submission":
+        _, year_counts = get_facet_counts()
+        return [(date(year, 1, 1), count) for year, count in year_counts.items()]
+
+    try:
+        query, data = _build_timeline_query(filters, date_range, object_name, bin_size, date_field)
+    except (ObjectNotFoundError): # if object name is not a valid alias/id, no reports match.
+        return []
+
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    bins = []
+
+    try:
+        cur.execute(query, data)
+        for start, count in cur.fetchall():
+            if isinstance(start, datetime):
+                start = start.date()
+            bins.append((start, int(count)))
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return bins
+
+
+def get_alias_version() -> int:
+    """
+    Retrieves the alias version number. This is increased every time objects or aliases are added, and is used to keep each worker's alias resolver up to date.
+
+    Returns:
+        int: The current alias version number.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    query = "select aliasVersion from Metadata"
+
+    try:
+        cur.execute(query)
+        result = cur.fetchone()
+
+        version = result[0]
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return version
+
+
+def find_aliases_by_prefix(prefix: str, limit: int) -> list[tuple[str, str, int]]:
+    """
+    Finds the stored objects with an ID or alias starting with the specified prefix, ignoring letter case, whitespace and SIMBAD prefixes. Uses the in-memory alias resolver, so the database is only queried when it needs to be reloaded.
+
+    Args:
+        prefix (str): The partially typed object ID or alias.
+        limit (int): The maximum number of objects to return.
+
+    Returns:
+        list[tuple[str, str, int]]: The matching alias, main object ID and number of linked reports of each object, most reports first.
+    """
+    return _alias_resolver.complete(prefix, limit)
+
+
 def add_object(object_id: str, coords: SkyCoord, aliases: list[str]=[]):
     """
     Stores a new celestial object with the specified coordinates and it’s known aliases in the database.
@@ -444,14 +897,16 @@ def add_aliases(object_id: str, aliases: list[str]):
 
             # setup query
             add_query = ("insert into Aliases"
-                    " (alias, objectIDFK)"
-                    " values (%s, %s);")
+                    " (alias, objectIDFK, normalizedAlias)"
+                    " values (%s, %s, %s);")
 
+            inserted = 0
             for alias in aliases:
-                add_data = (alias, object_id)
+                add_data = (alias, object_id, normalize_alias(alias))
                 # execute query and handle errors
                 try:
                     cur.execute(add_query, add_data)
+                    inserted += cur.rowcount
                 except mysql.connector.Error as e:
                     if e.errno == errorcode.ER_DUP_ENTRY:
                         pass #ignore any duplicate aliases
@@ -485,7 +940,26 @@ def add_aliases(object_id: str, aliases: list[str]):
             cn.close()
 
             # Link reports
-            _link_reports(object_id,aliases)
+            linked = _link_reports(object_id,aliases)
+
+            # Invalidate cached search results, and other workers' aliases if aliases were added, unless nothing
+            # changed, e.g. when refreshing an object SIMBAD has no new aliases for
+            if inserted > 0 or linked > 0:
+                cn = _connect()
+                cur = cn.cursor()
+                try:
+                    _bump_data_generation(cur)
+                    if inserted > 0:
+                        _bump_alias_version(cur)
+                    cn.commit()
+                finally:
+                    cn.commit()
+                    cur.close()
+                    cn.close()
+
+            _alias_resolver.count_reports([object_id] * linked)
+
+            _alias_resolver.add(object_id, aliases)
         else:
             raise ObjectNotFoundError("The specified object ID is not stored in the database.")
     else:
@@ -493,6 +967,35 @@ def add_aliases(object_id: str, aliases: list[str]):
 
 
 
+def delete_objects(object_ids: list[str]):
+    """
+    Deletes the specified stored objects, along with their aliases and links to reports. Used to clean up objects added while importing reports for testing, such as by benchmarks.
+
+    Args:
+        object_ids (list[str]): The main IDs of the objects.
+    """
+    if len(object_ids) == 0:
+        return
+
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    try:
+        cur.executemany("delete from Objects where objectID = %s", [(object_id,) for object_id in object_ids])
+
+        # Invalidate cached search results and every worker's aliases
+        _bump_data_generation(cur)
+        _bump_alias_version(cur)
+        cn.commit()
+    except mysql.connector.Error as e:
+        cn.rollback()
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    _alias_resolver.invalidate()
+
 def object_exists(alias:str)->tuple[bool,datetime]:
     """
     Checks whether an object with the specified alias exists in the database.
@@ -557,7 +1060,41 @@ def get_object_coords(alias: str) -> SkyCoord:
         raise ObjectNotFoundError("The specified object ID is not stored in the database.")
 
 
-def find_reports_by_object(filters: SearchFilters = None, date_range: DateFilter = None, object_name: str = None) -> list[ReportResult]:
+def get_stale_objects(before: datetime, limit: int) -> list[str]:
+    """
+    Retrieves the IDs of stored objects last updated via SIMBAD before the specified date, least recently updated first.
+
+    Args:
+        before (datetime): Objects last updated before this date are considered stale.
+        limit (int): The maximum number of object IDs to return.
+
+    Returns:
+        list[str]: The main IDs of the stale objects.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    query = ("select objectID from Objects "
+             "where lastUpdated < %s "
+             "order by lastUpdated "
+             "limit %s")
+
+    object_ids = []
+
+    try:
+        cur.execute(query, (before, limit))
+        for row in cur.fetchall():
+            object_ids.append(row[0])
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return object_ids
+
+
+def find_reports_by_object(filters: SearchFilters = None, date_range: DateFilter = None, object_name: str = None, limit: int = None, after: PageCursor = None, fields: list[str] = None, body_window: tuple[str, int] = None) -> list[ReportResult]:
     """
     Queries the local database for reports matching the specified search filters and related to the specified object if given.
 
@@ -565,6 +1102,10 @@ def find_reports_by_object(filters: SearchFilters = None, date_range: DateFilter
         filters (SearchFilters, optional): The search criteria to filter the report query with. Defaults to None.
         date_range (DateFilter, optional): The date range to filter the report query by. Defaults to None.
         object_name (str, optional): An object ID or alias to search  by. Defaults to None.
+        limit (int, optional): The maximum number of reports to return. If given, reports are returned newest first. Defaults to None.
+        after (PageCursor, optional): Only return reports following this cursor in the result order. Defaults to None.
+        fields (list[str], optional): The text fields (title, authors and/or body) to select. Fields not selected are returned as empty strings. Defaults to None, selecting all fields.
+        body_window (tuple[str, int], optional): If the body is not selected, select only the window of the body around the first match of the given term, extending the given number of characters either side. Defaults to None.
 
     Returns:
         list[ReportResult]: A list of reports matching all the search criteria and related to the specified object.
@@ -574,7 +1115,7 @@ def find_reports_by_object(filters: SearchFilters = None, date_range: DateFilter
         cur:MySQLCursor = cn.cursor()
 
         try:
-            query, data = _build_report_name_query(filters, date_range, object_name)
+            query, data = _build_report_name_query(filters, date_range, object_name, after, limit, fields=fields, body_window=body_window)
         except (ObjectNotFoundError): # if object name is not a valid alias/id, return empty list.
             return []
 
@@ -605,7 +1146,7 @@ def find_reports_by_object(filters: SearchFilters = None, date_range: DateFilter
     else: # If no parameters given, return empty list.
         return []
 
-def find_reports_in_coord_range(filters:SearchFilters=None, date_range:DateFilter=None, coords:SkyCoord=None, radius:float=None)->list[ReportResult]:
+def find_reports_in_coord_range(filters:SearchFilters=None, date_range:DateFilter=None, coords:SkyCoord=None, radius:float=None, limit:int=None, after:PageCursor=None, fields:list[str]=None, body_window:tuple[str, int]=None)->list[ReportResult]:
     """
     Queries the local database for reports matching the specified search filters and related to the specified object if given.
 
@@ -614,6 +1155,10 @@ def find_reports_in_coord_range(filters:SearchFilters=None, date_range:DateFilte
         date_range (DateFilter, optional): The date range to filter the report query by. Defaults to None.
         coords (SkyCoord): The coordinates to search around.
         radius (float): The radius defining the range around the specified coordinates to search, in arcseconds.
+        limit (int, optional): The maximum number of reports to return. If given, reports are returned newest first. Defaults to None.
+        after (PageCursor, optional): Only return reports following this cursor in the result order. Defaults to None.
+        fields (list[str], optional): The text fields (title, authors and/or body) to select. Fields not selected are returned as empty strings. Defaults to None, selecting all fields.
+        body_window (tuple[str, int], optional): If the body is not selected, select only the window of the body around the first match of the given term, extending the given number of characters either side. Defaults to None.
 
     Returns:
         list[ReportResult]: A list of reports matching all the search criteria and related to the specified object.
@@ -623,6 +1168,10 @@ def find_reports_in_coord_range(filters:SearchFilters=None, date_range:DateFilte
 
     filter_coords = (coords is not None) and (radius is not None)
 
+    if (limit is not None or after is not None or fields is not None or body_window is not None):
+        # Coordinate range is checked by the query, so results can be limited exactly and only the required fields selected.
+        return _find_reports_page_in_coord_range(filters, date_range, coords, radius, limit, after, fields, body_window)
+
     if (filters or filter_coords):
         cn = _connect()
         cur: MySQLCursor = cn.cursor()
@@ -673,102 +1222,1364 @@ def find_reports_in_coord_range(filters:SearchFilters=None, date_range:DateFilte
 
     #TODO: Check in coord range.
 
-# Exceptions
-class ExistingUserError(Exception):
-    """
-    Raised when the specified username is already associated with another user stored in the database.
-    """
-
-class ExistingReportError(Exception):
-    """
-    Raised when the ATel number of the specified report is already associated with a report stored in the database.
+def find_report_nums_by_object(filters: SearchFilters = None, date_range: DateFilter = None, object_name: str = None) -> set[int]:
+    """
+    Queries the local database for the ATel numbers of reports matching the specified search filters and related to the specified object if given. This is much cheaper than retrieving the reports themselves, e.g. for counting results.
+
+    Args:
+        filters (SearchFilters, optional): The search criteria to filter the report query with. Defaults to None.
+        date_range (DateFilter, optional): The date range to filter the report query by. Defaults to None.
+        object_name (str, optional): An object ID or alias to search  by. Defaults to None.
+
+    Returns:
+        set[int]: The ATel numbers of reports matching all the search criteria and related to the specified object.
+    """
+    if (filters or object_name):
+        try:
+            join_clause, join_data = _build_name_join_clause(object_name)
+        except (ObjectNotFoundError): # if object name is not a valid alias/id, return empty set.
+            return set()
+
+        where_clause, where_data = _build_where_clause(filters, date_range)
+
+        query = "select atelNum from Reports " + join_clause + where_clause
+        return _query_report_nums(query, join_data + where_data)
+    else: # If no parameters given, return empty set.
+        return set()
+
+def find_report_nums_in_coord_range(filters:SearchFilters=None, date_range:DateFilter=None, coords:SkyCoord=None, radius:float=None) -> set[int]:
+    """
+    Queries the local database for the ATel numbers of reports matching the specified search filters and with coordinates within range of the given coordinates if given. This is much cheaper than retrieving the reports themselves, e.g. for counting results.
+
+    Args:
+        filters (SearchFilters): The search criteria to filter the report query with.
+        date_range (DateFilter, optional): The date range to filter the report query by. Defaults to None.
+        coords (SkyCoord): The coordinates to search around.
+        radius (float): The radius defining the range around the specified coordinates to search, in arcseconds.
+
+    Returns:
+        set[int]: The ATel numbers of reports matching all the search criteria and within range of the coordinates.
+    """
+    if ((coords is not None) ^ (radius is not None)):
+        raise TypeError("Must specify both coords and radius, or neither.")
+
+    if (filters or coords is not None):
+        where_clause, where_data = _build_where_clause(filters, date_range)
+        where_clause, where_data = _append_coord_range_clause(where_clause, where_data, coords, radius)
+
+        query = "select atelNum from Reports " + where_clause
+        return _query_report_nums(query, where_data)
+    else: # If no parameters given, return empty set.
+        return set()
+
+def iter_reports_by_object(filters: SearchFilters = None, date_range: DateFilter = None, object_name: str = None, batch_size: int = STREAM_BATCH_SIZE, fields: list[str] = None, body_window: tuple[str, int] = None) -> Iterator[ReportResult]:
+    """
+    Lazily queries the local database for reports matching the specified search filters and related to the specified object if given. Reports are fetched from a server-side cursor in batches, so only one batch is held in memory at a time.
+
+    Args:
+        filters (SearchFilters, optional): The search criteria to filter the report query with. Defaults to None.
+        date_range (DateFilter, optional): The date range to filter the report query by. Defaults to None.
+        object_name (str, optional): An object ID or alias to search  by. Defaults to None.
+        batch_size (int, optional): The number of reports fetched from the server at a time. Defaults to STREAM_BATCH_SIZE.
+        fields (list[str], optional): The text fields (title, authors and/or body) to select. Fields not selected are returned as empty strings. Defaults to None, selecting all fields.
+        body_window (tuple[str, int], optional): If the body is not selected, select only the window of the body around the first match of the given term, extending the given number of characters either side. Defaults to None.
+
+    Yields:
+        ReportResult: The reports matching all the search criteria and related to the specified object, newest first.
+    """
+    if (filters or object_name):
+        try:
+            query, data = _build_report_name_query(filters, date_range, object_name, ordered=True, fields=fields, body_window=body_window)
+        except (ObjectNotFoundError): # if object name is not a valid alias/id, yield nothing.
+            return
+
+        yield from _iter_reports(query, data, batch_size)
+
+def iter_reports_in_coord_range(filters:SearchFilters=None, date_range:DateFilter=None, coords:SkyCoord=None, radius:float=None, batch_size:int=STREAM_BATCH_SIZE, fields:list[str]=None, body_window:tuple[str, int]=None) -> Iterator[ReportResult]:
+    """
+    Lazily queries the local database for reports matching the specified search filters and with coordinates within range of the given coordinates if given. Reports are fetched from a server-side cursor in batches, so only one batch is held in memory at a time.
+
+    Args:
+        filters (SearchFilters): The search criteria to filter the report query with.
+        date_range (DateFilter, optional): The date range to filter the report query by. Defaults to None.
+        coords (SkyCoord): The coordinates to search around.
+        radius (float): The radius defining the range around the specified coordinates to search, in arcseconds.
+        batch_size (int, optional): The number of reports fetched from the server at a time. Defaults to STREAM_BATCH_SIZE.
+        fields (list[str], optional): The text fields (title, authors and/or body) to select. Fields not selected are returned as empty strings. Defaults to None, selecting all fields.
+        body_window (tuple[str, int], optional): If the body is not selected, select only the window of the body around the first match of the given term, extending the given number of characters either side. Defaults to None.
+
+    Yields:
+        ReportResult: The reports matching all the search criteria and within range of the coordinates, newest first.
+    """
+    if ((coords is not None) ^ (radius is not None)):
+        raise TypeError("Must specify both coords and radius, or neither.")
+
+    if (filters or coords is not None):
+        query, data = _build_report_coords_page_query(filters, date_range, coords, radius, ordered=True, fields=fields, body_window=body_window)
+        yield from _iter_reports(query, data, batch_size)
+
+def get_reference_subgraph(atel_nums: list[int], hops: int, max_nodes: int) -> ReportGraph:
+    """
+    Finds the reports within the specified number of references of the given reports, following references in both directions, along with the references between them. The whole subgraph is found with a single recursive query.
+
+    Args:
+        atel_nums (list[int]): The ATel numbers of the reports to start from. Numbers of reports not stored in the database are ignored.
+        hops (int): The maximum number of references between a report in the subgraph and the nearest starting report.
+        max_nodes (int): The maximum number of reports in the subgraph. The reports nearest to the starting reports are kept, then the lowest ATel numbers.
+
+    Returns:
+        ReportGraph: The reports in the subgraph with their distance from the nearest starting report, and the references between them.
+    """
+    if len(atel_nums) == 0:
+        return ReportGraph({}, [])
+
+    query, data = _build_reference_graph_query(atel_nums, hops, max_nodes + 1)
+
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    nodes = {}
+    refs = []
+
+    try:
+        cur.execute(query, data)
+        for atel_num, distance, ref_report in cur.fetchall():
+            nodes[int(atel_num)] = int(distance)
+            if ref_report is not None:
+                refs.append((int(atel_num), int(ref_report)))
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    # One more report than the maximum is selected to tell whether the subgraph was cut.
+    truncated = len(nodes) > max_nodes
+    if truncated:
+        del nodes[max(nodes, key=lambda atel_num: (nodes[atel_num], atel_num))]
+
+    edges = [(source, target) for source, target in refs if source in nodes and target in nodes]
+    return ReportGraph(nodes, edges, truncated)
+
+def get_report_threads(atel_nums: list[int]) -> dict[int, tuple[int, int]]:
+    """
+    Retrieves the thread of each of the specified reports. A thread is a group of reports connected by references or shared objects, such as a discovery report and its follow-ups.
+
+    Args:
+        atel_nums (list[int]): The ATel numbers of the reports.
+
+    Returns:
+        dict[int, tuple[int, int]]: The thread ID and number of reports in the thread of each stored report. The thread ID is the lowest ATel number in the thread.
+    """
+    if len(atel_nums) == 0:
+        return {}
+
+    placeholders = ', '.join(['%s'] * len(atel_nums))
+    query = ("select Reports.atelNum, Reports.threadId, Threads.reportCount "
+             "from Reports inner join ("
+                "select threadId, count(*) as reportCount "
+                "from Reports "
+                f"where threadId in (select threadId from Reports where atelNum in ({placeholders})) "
+                "group by threadId"
+             ") as Threads on Threads.threadId = Reports.threadId "
+             f"where Reports.atelNum in ({placeholders})")
+    data = tuple(int(atel_num) for atel_num in atel_nums) * 2
+
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    threads = {}
+
+    try:
+        cur.execute(query, data)
+        for atel_num, thread_id, count in cur.fetchall():
+            threads[int(atel_num)] = (int(thread_id), int(count))
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return threads
+
+def find_reports_by_thread(atel_num: int) -> list[ReportResult]:
+    """
+    Queries the local database for every report in the same thread as the specified report, using the thread index rather than following references.
+
+    Args:
+        atel_num (int): The ATel number of a report in the thread.
+
+    Returns:
+        list[ReportResult]: The reports in the thread, oldest first, or an empty list if the report is not stored.
+    """
+    select_clause, from_clause = _build_report_base_query()
+    query = (select_clause + from_clause +
+             "where threadId = (select threadId from Reports where atelNum = %s) "
+             "order by submissionDate, atelNum")
+
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    reports = []
+
+    try:
+        cur.execute(query, (atel_num,))
+        for row in cur.fetchall():
+            reports.append(ReportResult(row[0], row[1], row[2], row[3], row[4]))
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return _populate_referenced_reports(reports)
+
+def load_citation_graph():
+    """
+    Loads the in-memory graph of references between reports, if it is not already loaded and up to date. Called when a worker starts, so the first search does not wait for it to load.
+    """
+    _citation_graph.load()
+
+def get_citation_scores(atel_nums: list[int]) -> dict[int, tuple[int, float]]:
+    """
+    Retrieves the number of reports referencing each of the specified reports, and its PageRank score relative to the average report. Uses the in-memory citation graph, so the database is only queried when it needs to be reloaded.
+
+    Args:
+        atel_nums (list[int]): The ATel numbers of the reports.
+
+    Returns:
+        dict[int, tuple[int, float]]: The number of referencing reports and the relative score of each report.
+    """
+    return {atel_num: (_citation_graph.in_degree(atel_num), _citation_graph.score(atel_num)) for atel_num in atel_nums}
+
+def add_import_job(start_atel: int, delay_seconds: float = 0.0, range_size: int = 0, newest_atel: int = None) -> ImportJob:
+    """
+    Queues a job to import every new report from the specified ATel number. Only one job can be active at a time, so if a job is already queued or running, that job is returned instead.
+
+    Args:
+        start_atel (int): The ATel number of the first report to import.
+        delay_seconds (float, optional): The number of seconds to wait between reports, to throttle the import. Defaults to 0.
+        range_size (int, optional): The number of ATel numbers to lease to a worker at a time, so workers on every host import the job in parallel. Defaults to 0, where a single worker imports every report in order.
+        newest_atel (int, optional): The ATel number of the newest report. Reports missing before it are skipped rather than ending the job. Defaults to None, if unknown.
+
+    Returns:
+        ImportJob: The queued job, or the job that was already active.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    insert_query = ("insert into ImportJobs "
+                    "(startATel, currentATel, delaySeconds, rangeSize, newestATel) "
+                    "values (%s, %s, %s, %s, %s)")
+
+    try:
+        # Lock the metadata row, so concurrent requests cannot both queue a job
+        cur.execute("select metadata from Metadata for update")
+        cur.fetchall()
+
+        job = _select_import_job(cur, "where state in ('queued', 'running', 'cancelling') order by jobID limit 1", ())
+        if job is None:
+            cur.execute(insert_query, (start_atel, start_atel, delay_seconds, range_size, newest_atel))
+            job = _select_import_job(cur, "where jobID = %s", (cur.lastrowid,))
+        cn.commit()
+    except mysql.connector.Error as e:
+        cn.rollback()
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return job
+
+def get_import_job(job_id: int = None) -> ImportJob:
+    """
+    Retrieves an import job and its progress.
+
+    Args:
+        job_id (int, optional): The ID of the job. Defaults to None, retrieving the most recently queued job.
+
+    Returns:
+        ImportJob: The job, or None if there is no such job.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    try:
+        if job_id is None:
+            job = _select_import_job(cur, "order by jobID desc limit 1", ())
+        else:
+            job = _select_import_job(cur, "where jobID = %s", (job_id,))
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return job
+
+def acquire_worker_lease(lease_name: str, worker_id: str, lease_seconds: float) -> bool:
+    """
+    Acquires or renews a named lease for the specified worker, so a background task shared by every worker runs in one worker at a time. A lease held by another worker can only be acquired once it has expired, e.g. because the worker's process stopped.
+
+    Args:
+        lease_name (str): The name of the lease, identifying the task.
+        worker_id (str): A unique identifier of the acquiring worker.
+        lease_seconds (float): The number of seconds the lease is held for, unless it is renewed.
+
+    Returns:
+        bool: Whether the worker holds the lease.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    # The workerID assignment is made first, so the expiry is only extended if this worker now holds the lease
+    query = ("insert into WorkerLeases (leaseName, workerID, expiresAt) "
+             "values (%s, %s, now() + interval %s second) "
+             "on duplicate key update "
+             "workerID = if(workerID = values(workerID) or expiresAt < now(), values(workerID), workerID), "
+             "expiresAt = if(workerID = values(workerID), values(expiresAt), expiresAt)")
+
+    try:
+        cur.execute(query, (lease_name, worker_id, lease_seconds))
+        cur.execute("select workerID from WorkerLeases where leaseName = %s", (lease_name,))
+        holder = cur.fetchone()[0]
+        cn.commit()
+    except mysql.connector.Error as e:
+        cn.rollback()
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return holder == worker_id
+
+def claim_import_job(worker_id: str, stale_seconds: float) -> ImportJob:
+    """
+    Claims the next import job imported by a single worker for the specified worker. A running job is resumed from its current ATel number if its worker has not recorded progress within the specified time, e.g. because the worker's process stopped. No job is claimed while another worker is running a job.
+
+    Args:
+        worker_id (str): A unique identifier of the claiming worker.
+        stale_seconds (float): The number of seconds without progress after which a running job can be claimed by another worker.
+
+    Returns:
+        ImportJob: The claimed job, or None if there is no job to claim.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    claim_query = ("update ImportJobs "
+                   "set state = if(state = 'cancelling', 'cancelling', 'running'), workerID = %s, "
+                   "startedAt = coalesce(startedAt, now()), heartbeatAt = now() "
+                   "where jobID = %s")
+
+    try:
+        # Lock the metadata row, so only one worker claims a job at a time
+        cur.execute("select metadata from Metadata for update")
+        cur.fetchall()
+
+        stale = "(heartbeatAt is null or heartbeatAt < now() - interval %s second)"
+        busy = _select_import_job(cur, f"where state in ('running', 'cancelling') and not {stale} limit 1", (stale_seconds,))
+
+        job = None
+        if busy is None:
+            job = _select_import_job(cur, f"where rangeSize = 0 and (state = 'queued' or (state in ('running', 'cancelling') and {stale})) order by jobID limit 1", (stale_seconds,))
+        if job is not None:
+            cur.execute(claim_query, (worker_id, job.job_id))
+            job = _select_import_job(cur, "where jobID = %s", (job.job_id,))
+        cn.commit()
+    except mysql.connector.Error as e:
+        cn.rollback()
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return job
+
+def record_import_progress(job: ImportJob, worker_id: str) -> JobState:
+    """
+    Stores the progress of a running import job, and records that its worker is still running it.
+
+    Args:
+        job (ImportJob): The job, with its current ATel number, counts, rate and last error updated.
+        worker_id (str): The identifier of the worker running the job.
+
+    Returns:
+        JobState: The state of the job, e.g. CANCELLING if it was cancelled, or None if the job was claimed by another worker.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    query = ("update ImportJobs "
+             "set currentATel = %s, importedCount = %s, skippedCount = %s, failedCount = %s, "
+             "rate = %s, requestRate = %s, lastError = %s, heartbeatAt = now() "
+             "where jobID = %s and workerID = %s")
+    data = (job.current_atel, job.imported, job.skipped, job.failed, job.rate, job.request_rate, _truncate_error(job.last_error), job.job_id, worker_id)
+
+    try:
+        cur.execute(query, data)
+        cn.commit()
+        cur.execute("select state from ImportJobs where jobID = %s and workerID = %s", (job.job_id, worker_id))
+        result = cur.fetchone()
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return JobState(result[0]) if result is not None else None
+
+def finish_import_job(job: ImportJob, worker_id: str, state: JobState):
+    """
+    Stores the final progress and state of an import job.
+
+    Args:
+        job (ImportJob): The job, with its progress updated.
+        worker_id (str): The identifier of the worker running the job.
+        state (JobState): The final state, one of COMPLETED, CANCELLED or FAILED.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    query = ("update ImportJobs "
+             "set state = %s, currentATel = %s, importedCount = %s, skippedCount = %s, failedCount = %s, "
+             "rate = %s, requestRate = %s, lastError = %s, heartbeatAt = now(), finishedAt = now() "
+             "where jobID = %s and workerID = %s")
+    data = (state.value, job.current_atel, job.imported, job.skipped, job.failed, job.rate, job.request_rate, _truncate_error(job.last_error), job.job_id, worker_id)
+
+    try:
+        cur.execute(query, data)
+        cn.commit()
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+def cancel_import_job(job_id: int = None) -> ImportJob:
+    """
+    Cancels an active import job. A queued job is cancelled immediately, while a running job is stopped by its worker after the current report.
+
+    Args:
+        job_id (int, optional): The ID of the job. Defaults to None, cancelling the active job.
+
+    Returns:
+        ImportJob: The job after cancelling it, or None if there is no such active job.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    # MySQL assigns columns from left to right, so finishedAt sees the new state
+    query = ("update ImportJobs "
+             "set state = if(state = 'queued', 'cancelled', 'cancelling'), "
+             "finishedAt = if(state = 'cancelled', now(), finishedAt) "
+             "where state in ('queued', 'running') ")
+
+    try:
+        if job_id is None:
+            cur.execute(query)
+        else:
+            cur.execute(query + "and jobID = %s", (job_id,))
+        cancelled = cur.rowcount > 0
+        cn.commit()
+
+        if not cancelled:
+            job = None
+        elif job_id is None:
+            job = _select_import_job(cur, "where state in ('cancelling', 'cancelled') order by jobID desc limit 1", ())
+        else:
+            job = _select_import_job(cur, "where jobID = %s and state in ('cancelling', 'cancelled')", (job_id,))
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return job
+
+def claim_import_lease(worker_id: str, stale_seconds: float) -> ImportLease:
+    """
+    Leases the next range of ATel numbers of the active sharded import job to the specified worker. A range whose worker has not recorded progress within the specified time is resumed from its current ATel number. Otherwise, the lowest range not yet leased is leased, up to the first ATel number found not to exist. The job is finished once every range up to that number is completed, or once every range is stopped after the job is cancelled.
+
+    Args:
+        worker_id (str): A unique identifier of the claiming worker.
+        stale_seconds (float): The number of seconds without progress after which a leased range can be resumed by another worker.
+
+    Returns:
+        ImportLease: The leased range, or None if there is no range to lease.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    stale = "heartbeatAt < now() - interval %s second"
+    insert_query = ("insert into ImportLeases "
+                    "(jobIDFK, startATel, endATel, currentATel, workerID) "
+                    "values (%s, %s, %s, %s, %s)")
+    resume_query = ("update ImportLeases "
+                    "set workerID = %s, heartbeatAt = now() "
+                    "where jobIDFK = %s and startATel = %s")
+    start_query = ("update ImportJobs "
+                   "set state = if(state = 'queued', 'running', state), startedAt = coalesce(startedAt, now()), heartbeatAt = now() "
+                   "where jobID = %s")
+
+    try:
+        # Lock the metadata row, so only one worker leases a range at a time
+        cur.execute("select nextATelNum from Metadata for update")
+        next_atel = cur.fetchone()[0]
+
+        lease = None
+        job = _select_import_job(cur, "where rangeSize > 0 and state in ('queued', 'running', 'cancelling') order by jobID limit 1", ())
+        if job is not None and job.state == JobState.CANCELLING:
+            # Ranges abandoned by stopped workers are not resumed once the job is cancelled
+            cur.execute(f"delete from ImportLeases where jobIDFK = %s and stopATel is null and {stale}", (job.job_id, stale_seconds))
+        elif job is not None:
+            lease = _select_import_lease(cur, f"where jobIDFK = %s and stopATel is null and ImportLeases.{stale} order by startATel limit 1", (job.job_id, stale_seconds))
+            if lease is not None:
+                cur.execute(resume_query, (worker_id, job.job_id, lease.start_atel))
+            else:
+                cur.execute("select startATel, endATel, stopATel from ImportLeases where jobIDFK = %s order by startATel", (job.job_id,))
+                free_range = _next_free_range(cur.fetchall(), next_atel, job.range_size)
+                if free_range is not None:
+                    cur.execute(insert_query, (job.job_id, free_range[0], free_range[1], free_range[0], worker_id))
+                    lease = ImportLease(job.job_id, free_range[0], free_range[1], free_range[0], delay_seconds=job.delay_seconds, newest_atel=job.newest_atel)
+
+        if lease is not None:
+            cur.execute(start_query, (job.job_id,))
+        elif job is not None:
+            _settle_sharded_job(cur, job, next_atel)
+        cn.commit()
+    except mysql.connector.Error as e:
+        cn.rollback()
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return lease
+
+def record_lease_progress(lease: ImportLease, worker_id: str) -> JobState:
+    """
+    Stores the progress of a leased range of a sharded import job, and records that its worker is still importing it.
+
+    Args:
+        lease (ImportLease): The leased range, with its current ATel number and counts updated.
+        worker_id (str): The identifier of the worker the range is leased to.
+
+    Returns:
+        JobState: The state of the job, e.g. CANCELLING if it was cancelled, or None if the range was leased to another worker.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    query = ("update ImportLeases "
+             "set currentATel = %s, importedCount = %s, skippedCount = %s, failedCount = %s, heartbeatAt = now() "
+             "where jobIDFK = %s and startATel = %s and workerID = %s and stopATel is null")
+    data = (lease.current_atel, lease.imported, lease.skipped, lease.failed, lease.job_id, lease.start_atel, worker_id)
+    state_query = ("select state from ImportJobs "
+                   "inner join ImportLeases on jobIDFK = jobID "
+                   "where jobID = %s and startATel = %s and workerID = %s and stopATel is null")
+
+    try:
+        cur.execute(query, data)
+        cn.commit()
+        cur.execute(state_query, (lease.job_id, lease.start_atel, worker_id))
+        result = cur.fetchone()
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return JobState(result[0]) if result is not None else None
+
+def complete_import_lease(lease: ImportLease, worker_id: str, stop_atel: int, failed: bool = False) -> JobState:
+    """
+    Completes a leased range of a sharded import job, adding its counts to the job. The next ATel number to import is advanced across every completed range following it, stopping at a range that was stopped before its end.
+
+    Args:
+        lease (ImportLease): The leased range, with its counts and last error updated.
+        worker_id (str): The identifier of the worker the range is leased to.
+        stop_atel (int): The ATel number the worker stopped at: the end of the range, the first ATel number found not to exist, or the report the worker could not import.
+        failed (bool, optional): Whether the worker stopped as a report could not be downloaded, failing the job. Defaults to False.
+
+    Returns:
+        JobState: The state of the job, or None if the range was leased to another worker.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    lease_query = ("update ImportLeases "
+                   "set currentATel = %s, stopATel = %s, importedCount = %s, skippedCount = %s, failedCount = %s, heartbeatAt = now() "
+                   "where jobIDFK = %s and startATel = %s and workerID = %s and stopATel is null")
+    lease_data = (stop_atel, stop_atel, lease.imported, lease.skipped, lease.failed, lease.job_id, lease.start_atel, worker_id)
+    job_query = ("update ImportJobs "
+                 "set currentATel = %s, importedCount = importedCount + %s, skippedCount = skippedCount + %s, failedCount = failedCount + %s, "
+                 "rate = (importedCount + skippedCount + failedCount) / greatest(1, timestampdiff(second, startedAt, now())), "
+                 "requestRate = %s, lastError = coalesce(%s, lastError), heartbeatAt = now() "
+                 "where jobID = %s")
+    fail_query = ("update ImportJobs "
+                  "set state = 'failed', finishedAt = now() "
+                  "where jobID = %s")
+
+    try:
+        # Lock the metadata row, so the next ATel number is advanced by one worker at a time
+        cur.execute("select nextATelNum from Metadata for update")
+        next_atel = cur.fetchone()[0]
+
+        cur.execute(lease_query, lease_data)
+        if cur.rowcount == 0:
+            cn.commit()
+            return None
+
+        cur.execute("select startATel, endATel, stopATel from ImportLeases where jobIDFK = %s order by startATel", (lease.job_id,))
+        next_atel = _consolidate_leases(cur.fetchall(), next_atel)
+        cur.execute("update Metadata set nextATelNum = %s", (next_atel,))
+        # Completed ranges behind the next ATel number are no longer needed, except a range stopped before its end, which marks the newest report
+        cur.execute("delete from ImportLeases where jobIDFK = %s and endATel <= %s and stopATel = endATel", (lease.job_id, next_atel))
+
+        cur.execute(job_query, (next_atel, lease.imported, lease.skipped, lease.failed, lease.request_rate, _truncate_error(lease.last_error), lease.job_id))
+        if failed:
+            cur.execute(fail_query, (lease.job_id,))
+            cur.execute("delete from ImportLeases where jobIDFK = %s", (lease.job_id,))
+
+        job = _select_import_job(cur, "where jobID = %s", (lease.job_id,))
+        state = _settle_sharded_job(cur, job, next_atel) if job.state.active else job.state
+        cn.commit()
+    except mysql.connector.Error as e:
+        cn.rollback()
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return state
+
+def record_ledger_entry(entry: LedgerEntry):
+    """
+    Stores the outcome of an attempt at importing a report in the import ledger, replacing the outcome of any earlier attempt and counting the attempt.
+
+    Args:
+        entry (LedgerEntry): The outcome of the attempt. Its attempts field is ignored.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    query = ("insert into ImportLedger "
+             "(atelNum, status, failureClass, lastError, parserVersion, downloadSeconds, parseSeconds, insertSeconds) "
+             "values (%s, %s, %s, %s, %s, %s, %s, %s) "
+             "on duplicate key update status = values(status), failureClass = values(failureClass), "
+             "lastError = values(lastError), parserVersion = values(parserVersion), "
+             "downloadSeconds = values(downloadSeconds), parseSeconds = values(parseSeconds), "
+             "insertSeconds = values(insertSeconds), attempts = attempts + 1")
+    data = (entry.atel_num, entry.status.value, entry.failure_class, _truncate_error(entry.last_error), entry.parser_version,
+            entry.download_seconds, entry.parse_seconds, entry.insert_seconds)
+
+    try:
+        cur.execute(query, data)
+        cn.commit()
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+def get_ledger_entry(atel_num: int) -> LedgerEntry:
+    """
+    Retrieves the outcome of the most recent attempt at importing a report.
+
+    Args:
+        atel_num (int): The ATel number of the report.
+
+    Returns:
+        LedgerEntry: The outcome, or None if the report has not been attempted since the ledger was added.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    try:
+        entries = _select_ledger_entries(cur, "where atelNum = %s", (atel_num,))
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return entries[0] if len(entries) > 0 else None
+
+def get_retry_candidates(parser_version: int, failure_class: str = None, after_atel: int = 0, limit: int = 100, max_attempts: int = MAX_IMPORT_ATTEMPTS) -> list[LedgerEntry]:
+    """
+    Retrieves the reports to retry importing, in order of ATel number: reports that could not be parsed by an older version of the parser, and reports that could not be downloaded or stored and have not been attempted the maximum number of times.
+
+    Args:
+        parser_version (int): The version of the current parser.
+        failure_class (str, optional): Only retrieves reports that failed with the error of this name. Defaults to None, retrieving reports that failed with any error.
+        after_atel (int, optional): Only retrieves reports after this ATel number, to retrieve the next page. Defaults to 0.
+        limit (int, optional): The maximum number of reports retrieved. Defaults to 100.
+        max_attempts (int, optional): The number of attempts after which a report that could not be downloaded or stored is no longer retried. Defaults to MAX_IMPORT_ATTEMPTS.
+
+    Returns:
+        list[LedgerEntry]: The outcomes of the most recent attempts at the reports.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    clauses = ("where ((status = 'failed' and parserVersion < %s) or (status = 'error' and attempts < %s)) "
+               "and atelNum > %s ")
+    data = (parser_version, max_attempts, after_atel)
+    if failure_class is not None:
+        clauses += "and failureClass = %s "
+        data += (failure_class,)
+    clauses += "order by atelNum limit %s"
+    data += (limit,)
+
+    try:
+        entries = _select_ledger_entries(cur, clauses, data)
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return entries
+
+def get_ledger_summary() -> list[tuple[str, str, int]]:
+    """
+    Counts the reports in the import ledger by the outcome of their most recent attempt.
+
+    Returns:
+        list[tuple[str, str, int]]: The status, failure class (None for imported reports) and number of reports of each outcome, in order of status and failure class.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    query = ("select status, failureClass, count(*) from ImportLedger "
+             "group by status, failureClass "
+             "order by status, failureClass")
+
+    try:
+        cur.execute(query)
+        summary = [(str(status), failure_class, int(count)) for status, failure_class, count in cur.fetchall()]
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return summary
+
+def get_due_reference_checks(published_after: datetime, limit: int) -> list[ReferenceCheck]:
+    """
+    Retrieves the reports whose "Referred to by" links are due to be checked: reports published after the specified date that have not been checked, or whose next check is due, most recently published first.
+
+    Args:
+        published_after (datetime): Only reports submitted after this date are checked.
+        limit (int): The maximum number of reports retrieved.
+
+    Returns:
+        list[ReferenceCheck]: The state of each report's check, or a new check for a report that has not been checked.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    query = ("select atelNum, etag, lastModified, contentHash, coalesce(unchangedCount, 0), checkedAt, nextCheckAt "
+             "from Reports left join ReferenceChecks on atelNumFK = atelNum "
+             "where submissionDate > %s and (nextCheckAt is null or nextCheckAt <= now()) "
+             "order by submissionDate desc, atelNum desc limit %s")
+
+    try:
+        cur.execute(query, (published_after.strftime("%Y-%m-%d %H:%M:%S"), limit))
+        checks = [ReferenceCheck(*row) for row in cur.fetchall()]
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return checks
+
+def record_reference_check(check: ReferenceCheck):
+    """
+    Stores the outcome of checking a report's "Referred to by" links, and when they are checked next.
+
+    Args:
+        check (ReferenceCheck): The state of the check.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    query = ("insert into ReferenceChecks "
+             "(atelNumFK, etag, lastModified, contentHash, unchangedCount, checkedAt, nextCheckAt) "
+             "values (%s, %s, %s, %s, %s, %s, %s) "
+             "on duplicate key update etag = values(etag), lastModified = values(lastModified), "
+             "contentHash = values(contentHash), unchangedCount = values(unchangedCount), "
+             "checkedAt = values(checkedAt), nextCheckAt = values(nextCheckAt)")
+    data = (check.atel_num, check.etag, check.last_modified, check.content_hash, check.unchanged_count,
+            check.checked_at, check.next_check_at)
+
+    try:
+        cur.execute(query, data)
+        cn.commit()
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+def add_referenced_by(atel_num: int, referenced_by: list[int]) -> list[int]:
+    """
+    Stores the references to a report by later reports that are not already stored, joining the threads of the reports.
+
+    Args:
+        atel_num (int): The ATel number of the referenced report.
+        referenced_by (list[int]): The ATel numbers of the reports referring to it.
+
+    Returns:
+        list[int]: The ATel numbers of the reports whose references were not already stored.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    try:
+        cur.execute("select atelNum from ReportRefs where refReport = %s", (atel_num,))
+        stored = set(int(row[0]) for row in cur.fetchall())
+        new_refs = [int(other_report) for other_report in dict.fromkeys(referenced_by)
+                    if int(other_report) not in stored and int(other_report) != atel_num]
+
+        if len(new_refs) > 0:
+            cur.executemany("insert ignore into ReportRefs (atelNum, refReport) values (%s, %s)",
+                            [(other_report, atel_num) for other_report in new_refs])
+            _merge_report_threads(cur, ", ".join(["%s"] * (len(new_refs) + 1)), (atel_num, *new_refs))
+
+            # Invalidate cached search results, and update this worker's citation graph in place
+            _bump_data_generation(cur)
+            cn.commit()
+            _citation_graph.add_references([(other_report, atel_num) for other_report in new_refs])
+    except mysql.connector.Error as e:
+        cn.rollback()
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return new_refs
+
+# Exceptions
+class ExistingUserError(Exception):
+    """
+    Raised when the specified username is already associated with another user stored in the database.
+    """
+
+class ExistingReportError(Exception):
+    """
+    Raised when the ATel number of the specified report is already associated with a report stored in the database.
     """
 
 
 class ExistingObjectError(Exception):
     """
-    Raised when the specified object ID is already associated with an object stored in the database.
+    Raised when the specified object ID is already associated with an object stored in the database.
+    """
+
+class ExistingAliasError(Exception):
+    """
+    Raised when the specified object ID is already associated with an object stored in the database.
+    """
+
+class UserNotFoundError(Exception):
+    """
+    Raised when the specified user is not found in the database.
+    """
+
+class ObjectNotFoundError(Exception):
+    """
+    Raised when the specified object ID is not stored in the database.
+    """
+
+# Private functions
+def _link_reports(object_id: str, aliases: list[str]) -> int:
+    """
+    Adds records relating reports and the specified object ID, where the report contains one or more of the specified aliases.
+
+    Args:
+        object_id (str): The object’s main ID from SIMBAD.
+        aliases (list[str]): List of strings representing new alternative ID’s/aliases to search for in reports.
+
+    Returns:
+        int: The number of reports newly related to the object.
+
+    Raises:
+        ObjectNotFoundError: Raised when the specified object ID is not stored in the database.
+    """
+    cn = _connect()
+    cur:MySQLCursor = cn.cursor()
+
+    reports:list[int] = []
+    linked = 0
+
+    #query to find all reports with alias in body or title
+    find_query = ("select atelNum"
+            " from Reports"
+            " where title like concat('%', %s, '%')"
+            " or body like concat('%', %s, '%');")
+
+    add_query = ("insert into ObjectRefs"
+                " (atelNumFK, objectIDFK)"
+                " values (%s, %s);")
+
+    if (object_exists(object_id)):
+        try:
+            #loop through every alias and the main id
+            aliases.append(object_id)
+            for alias in aliases:
+                find_data = (alias, alias)
+                
+                cur.execute(find_query, find_data)
+                for row in cur.fetchall():
+                    #extract data
+                    atel_num = row[0]
+                    #add to list of reports to link
+                    reports.append(atel_num)
+
+            #TODO: link by coords? This is in SRS but not specified where implemented in SAS.
+
+            #loop through each report found and add a record relating it to the specified object
+            for atel_num in reports:
+                add_data = (atel_num, object_id)
+                try:
+                    cur.execute(add_query, add_data)
+                    linked += cur.rowcount
+                except mysql.connector.Error as e:
+                    if e.errno == errorcode.ER_DUP_ENTRY:
+                        pass  # ignore any duplicate entries
+                    else:
+                        raise e
+
+            #join the threads of every report of the object
+            _merge_report_threads(cur, "select atelNumFK from ObjectRefs where objectIDFK = %s", (object_id,))
+        finally:
+            cn.commit()
+            cur.close()
+            cn.close()
+    else:
+        raise ObjectNotFoundError("The specified object ID is not stored in the database.")
+
+    return linked
+
+
+def _merge_report_threads(cur: MySQLCursor, atel_nums_query: str, data: tuple):
+    """
+    Merges the threads of the specified reports into one thread, identified by the lowest thread ID. The calling method must commit the change.
+
+    Args:
+        cur (MySQLCursor): An open cursor to execute the update with.
+        atel_nums_query (str): A query selecting the ATel numbers of the reports.
+        data (tuple): The data to inject into the query on execution.
+    """
+    cur.execute("select distinct threadId from Reports where atelNum in (" + atel_nums_query + ")", data)
+    thread_ids = sorted(int(row[0]) for row in cur.fetchall())
+
+    if len(thread_ids) > 1:
+        query = ("update Reports "
+                 "set threadId = %s "
+                 f"where threadId in ({', '.join(['%s'] * (len(thread_ids) - 1))})")
+        cur.execute(query, tuple(thread_ids))
+
+
+def _bump_data_generation(cur: MySQLCursor):
+    """
+    Increases the data generation number, invalidating any cached search results. The calling method must commit the change.
+
+    Args:
+        cur (MySQLCursor): An open cursor to execute the update with.
+    """
+    query = ("update Metadata "
+             "set dataGeneration = dataGeneration + 1")
+
+    cur.execute(query)
+
+
+def _increment_facet_counts(cur: MySQLCursor, report: ImportedReport):
+    """
+    Adds a newly stored report to the keyword and year report count summary tables. The calling method must commit the change.
+
+    Args:
+        cur (MySQLCursor): An open cursor to execute the updates with.
+        report (ImportedReport): The report that was stored.
+    """
+    keyword_query = ("insert into KeywordCounts (keyword, reportCount) "
+                     "values (%s, 1) "
+                     "on duplicate key update reportCount = reportCount + 1")
+    for kw in set(str(kw).lower() for kw in report.keywords):
+        if kw in _KEYWORD_BITS:
+            cur.execute(keyword_query, (kw,))
+
+    year_query = ("insert into YearCounts (year, reportCount) "
+                  "values (%s, 1) "
+                  "on duplicate key update reportCount = reportCount + 1")
+    cur.execute(year_query, (report.submission_date.year,))
+
+
+def _decrement_facet_counts(cur: MySQLCursor, keywords: list[str], year: int):
+    """
+    Removes a stored report's previous keywords and year from the report count summary tables, such as before it is updated. The calling method must commit the change.
+
+    Args:
+        cur (MySQLCursor): An open cursor to execute the updates with.
+        keywords (list[str]): The report's previous keywords.
+        year (int): The year of the report's previous submission date.
+    """
+    keyword_query = ("update KeywordCounts "
+                     "set reportCount = reportCount - 1 "
+                     "where keyword = %s and reportCount > 0")
+    for kw in set(str(kw).lower() for kw in keywords):
+        if kw in _KEYWORD_BITS:
+            cur.execute(keyword_query, (kw,))
+
+    year_query = ("update YearCounts "
+                  "set reportCount = reportCount - 1 "
+                  "where year = %s and reportCount > 0")
+    cur.execute(year_query, (year,))
+
+
+def _store_report_fingerprint(cur: MySQLCursor, fingerprint: ReportFingerprint):
+    """
+    Stores a report's fingerprint, replacing any previous fingerprint. The calling method must commit the change.
+
+    Args:
+        cur (MySQLCursor): An open cursor to execute the update with.
+        fingerprint (ReportFingerprint): The fingerprint.
+    """
+    columns = ["atelNumFK", "htmlHash", "parserVersion"] + list(_FINGERPRINT_COLUMNS.values())
+    query = ("insert into ReportFingerprints (" + ", ".join(columns) + ") "
+             "values (" + ", ".join(["%s"] * len(columns)) + ") "
+             "on duplicate key update " + ", ".join(f"{column} = values({column})" for column in columns[1:]))
+    data = ((fingerprint.atel_num, fingerprint.html_hash, fingerprint.parser_version)
+            + tuple(fingerprint.section_hashes[section] for section in _FINGERPRINT_COLUMNS))
+
+    cur.execute(query, data)
+
+
+def _sync_child_rows(cur: MySQLCursor, table: str, key_column: str, columns: str, atel_num: int, rows: set[tuple], remove: bool = True) -> tuple[list[tuple], list[tuple]]:
+    """
+    Makes the rows of a table relating to a report match the given rows, deleting and inserting only the rows that differ. The calling method must commit the change.
+
+    Args:
+        cur (MySQLCursor): An open cursor to execute the updates with.
+        table (str): The name of the table.
+        key_column (str): The column holding the report's ATel number.
+        columns (str): The comma separated columns holding each row's values.
+        atel_num (int): The ATel number of the report.
+        rows (set[tuple]): The values of each row the report should have, in the order of the columns.
+        remove (bool, optional): Whether stored rows not given are deleted. Defaults to True.
+
+    Returns:
+        tuple[list[tuple], list[tuple]]: The rows inserted, and the rows deleted.
+    """
+    cur.execute(f"select {columns} from {table} where {key_column} = %s", (atel_num,))
+    stored = set(tuple(row) for row in cur.fetchall())
+
+    added = sorted(rows - stored)
+    removed = sorted(stored - rows) if remove else []
+    conditions = " and ".join(f"{column.strip()} = %s" for column in columns.split(","))
+
+    if len(removed) > 0:
+        cur.executemany(f"delete from {table} where {key_column} = %s and {conditions}",
+                        [(atel_num, *row) for row in removed])
+    if len(added) > 0:
+        cur.executemany(f"insert ignore into {table} ({key_column}, {columns}) values (%s, " + ", ".join(["%s"] * len(added[0])) + ")",
+                        [(atel_num, *row) for row in added])
+
+    return added, removed
+
+
+def _bump_alias_version(cur: MySQLCursor):
+    """
+    Increases the alias version number, so each worker's alias resolver is reloaded. The calling method must commit the change.
+
+    Args:
+        cur (MySQLCursor): An open cursor to execute the update with.
+    """
+    query = ("update Metadata "
+             "set aliasVersion = aliasVersion + 1")
+
+    cur.execute(query)
+
+
+def _load_alias_map() -> list[tuple[str, str]]:
+    """
+    Retrieves every alias and object ID, along with the object each refers to, to load the alias resolver.
+
+    Returns:
+        list[tuple[str, str]]: The (alias, object ID) pairs. Aliases are listed before object IDs.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    query = ("select alias, objectIDFK from Aliases "
+             "union all "
+             "select objectID, objectID from Objects")
+
+    try:
+        cur.execute(query)
+        rows = [(row[0], row[1]) for row in cur.fetchall()]
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return rows
+
+
+def _load_report_counts() -> dict[str, int]:
+    """
+    Retrieves the number of reports linked to each object, to rank objects in the alias resolver.
+
+    Returns:
+        dict[str, int]: The number of reports linked to each object ID. Objects without reports are omitted.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    query = ("select objectIDFK, count(*) from ObjectRefs "
+             "group by objectIDFK")
+
+    try:
+        cur.execute(query)
+        counts = {row[0]: int(row[1]) for row in cur.fetchall()}
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return counts
+
+
+def _get_reference_version() -> tuple[int, int]:
+    """
+    Retrieves the reference version number, which is increased every time references between reports are removed, and the ID of the last stored reference, used to check whether the citation graph is up to date.
+
+    Returns:
+        tuple[int, int]: The reference version number and the last reference ID, or 0 if no references are stored.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    query = "select referenceVersion, (select coalesce(max(refID), 0) from ReportRefs) from Metadata"
+
+    try:
+        cur.execute(query)
+        result = cur.fetchone()
+
+        version = (int(result[0]), int(result[1]))
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return version
+
+
+def _load_references(after_id: int = 0) -> list[tuple[int, int, int]]:
+    """
+    Retrieves the stored references between reports with an ID greater than the given ID, used to load the citation graph.
+
+    Args:
+        after_id (int, optional): The ID after which references are retrieved. Defaults to 0, retrieving every reference.
+
+    Returns:
+        list[tuple[int, int, int]]: The ID, referencing and referenced ATel number of each reference.
+    """
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    query = "select refID, atelNum, refReport from ReportRefs where refID > %s"
+
+    try:
+        cur.execute(query, (after_id,))
+        references = [(int(row[0]), int(row[1]), int(row[2])) for row in cur.fetchall()]
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    return references
+
+
+def _select_import_job(cur: MySQLCursor, clauses: str, data: tuple) -> ImportJob:
+    """
+    Selects the first import job matching the given clauses.
+
+    Args:
+        cur (MySQLCursor): An open cursor to execute the query with.
+        clauses (str): The where, order by and/or limit clauses of the query.
+        data (tuple): The data to inject into the clauses on execution.
+
+    Returns:
+        ImportJob: The job, or None if no job matches.
     """
+    query = ("select jobID, state, startATel, currentATel, importedCount, skippedCount, failedCount, "
+             "rate, lastError, delaySeconds, createdAt, startedAt, heartbeatAt, finishedAt, rangeSize, newestATel, requestRate "
+             "from ImportJobs " + clauses)
 
-class ExistingAliasError(Exception):
+    cur.execute(query, data)
+    rows = cur.fetchall()
+    if len(rows) == 0:
+        return None
+    return ImportJob(*rows[0])
+
+
+def _select_ledger_entries(cur: MySQLCursor, clauses: str, data: tuple) -> list[LedgerEntry]:
     """
-    Raised when the specified object ID is already associated with an object stored in the database.
+    Selects the import ledger entries matching the given clauses.
+
+    Args:
+        cur (MySQLCursor): An open cursor to execute the query with.
+        clauses (str): The where, order by and/or limit clauses of the query.
+        data (tuple): The data to inject into the clauses on execution.
+
+    Returns:
+        list[LedgerEntry]: The entries.
     """
+    query = ("select atelNum, status, parserVersion, failureClass, lastError, "
+             "downloadSeconds, parseSeconds, insertSeconds, attempts, updatedAt "
+             "from ImportLedger " + clauses)
 
-class UserNotFoundError(Exception):
+    cur.execute(query, data)
+    return [LedgerEntry(*row) for row in cur.fetchall()]
+
+
+def _select_import_lease(cur: MySQLCursor, clauses: str, data: tuple) -> ImportLease:
     """
-    Raised when the specified user is not found in the database.
+    Selects the first leased range of an import job matching the given clauses.
+
+    Args:
+        cur (MySQLCursor): An open cursor to execute the query with.
+        clauses (str): The where, order by and/or limit clauses of the query.
+        data (tuple): The data to inject into the clauses on execution.
+
+    Returns:
+        ImportLease: The leased range, or None if no range matches.
     """
+    query = ("select jobIDFK, startATel, endATel, ImportLeases.currentATel, "
+             "ImportLeases.importedCount, ImportLeases.skippedCount, ImportLeases.failedCount, delaySeconds, newestATel "
+             "from ImportLeases "
+             "inner join ImportJobs on jobID = jobIDFK " + clauses)
 
-class ObjectNotFoundError(Exception):
+    cur.execute(query, data)
+    rows = cur.fetchall()
+    if len(rows) == 0:
+        return None
+    return ImportLease(*rows[0])
+
+
+def _next_free_range(leases: list[tuple[int, int, int]], next_atel: int, range_size: int) -> tuple[int, int]:
     """
-    Raised when the specified object ID is not stored in the database.
+    Finds the lowest range of ATel numbers from the next ATel number to import that is not leased, ending before any other leased range and before the first ATel number found not to exist.
+
+    Args:
+        leases (list[tuple[int, int, int]]): The start, end and stop ATel number of each leased range, ordered by start. The stop ATel number is None if the range is not completed.
+        next_atel (int): The next ATel number to import.
+        range_size (int): The maximum number of ATel numbers in the range.
+
+    Returns:
+        tuple[int, int]: The first ATel number of the range and the ATel number after its last, or None if every ATel number before the first ATel number found not to exist is leased.
     """
+    # A range stopped before its end found the newest report
+    newest = min((stop for _, end, stop in leases if stop is not None and stop < end), default=None)
 
-# Private functions
-def _link_reports(object_id: str, aliases: list[str]):
+    start = next_atel
+    end = start + range_size
+    for lease_start, lease_end, _ in leases:
+        if lease_end <= start:
+            continue
+        if lease_start > start:
+            end = min(end, lease_start)
+            break
+        start = lease_end
+        end = start + range_size
+
+    if newest is not None:
+        if start >= newest:
+            return None
+        end = min(end, newest)
+    return start, end
+
+
+def _consolidate_leases(leases: list[tuple[int, int, int]], next_atel: int) -> int:
     """
-    Adds records relating reports and the specified object ID, where the report contains one or more of the specified aliases.
+    Advances the next ATel number to import across the completed ranges following it.
 
     Args:
-        object_id (str): The object’s main ID from SIMBAD.
-        aliases (list[str]): List of strings representing new alternative ID’s/aliases to search for in reports.
+        leases (list[tuple[int, int, int]]): The start, end and stop ATel number of each leased range, ordered by start. The stop ATel number is None if the range is not completed.
+        next_atel (int): The next ATel number to import.
 
-    Raises:
-        ObjectNotFoundError: Raised when the specified object ID is not stored in the database.
+    Returns:
+        int: The next ATel number to import after the completed ranges, stopping at the first range that is not completed or was stopped before its end.
     """
-    cn = _connect()
-    cur:MySQLCursor = cn.cursor()
+    for start, end, stop in leases:
+        if end <= next_atel and stop == end:
+            continue
+        if start > next_atel or stop is None:
+            break
+        next_atel = max(next_atel, stop)
+        if stop < end:
+            break
+    return next_atel
 
-    reports:list[int] = []
 
-    #query to find all reports with alias in body or title
-    find_query = ("select atelNum"
-            " from Reports"
-            " where title like concat('%', %s, '%')"
-            " or body like concat('%', %s, '%');")
+def _settle_sharded_job(cur: MySQLCursor, job: ImportJob, next_atel: int) -> JobState:
+    """
+    Finishes a sharded import job if none of its ranges are being imported and there are no more ranges to lease, removing its leases. A cancelled job is finished once none of its ranges are being imported.
 
-    add_query = ("insert into ObjectRefs"
-                " (atelNumFK, objectIDFK)"
-                " values (%s, %s);")
+    Args:
+        cur (MySQLCursor): An open cursor to execute the updates with. The calling method must commit the changes.
+        job (ImportJob): The active job.
+        next_atel (int): The next ATel number to import.
 
-    if (object_exists(object_id)):
-        try:
-            #loop through every alias and the main id
-            aliases.append(object_id)
-            for alias in aliases:
-                find_data = (alias, alias)
-                
-                cur.execute(find_query, find_data)
-                for row in cur.fetchall():
-                    #extract data
-                    atel_num = row[0]
-                    #add to list of reports to link
-                    reports.append(atel_num)
+    Returns:
+        JobState: The state of the job after settling it.
+    """
+    cur.execute("select startATel, endATel, stopATel from ImportLeases where jobIDFK = %s order by startATel", (job.job_id,))
+    leases = cur.fetchall()
+    if any(stop is None for _, _, stop in leases):
+        return job.state
+    if job.state != JobState.CANCELLING and _next_free_range(leases, next_atel, job.range_size) is not None:
+        return job.state
 
-            #TODO: link by coords? This is in SRS but not specified where implemented in SAS.
+    state = JobState.CANCELLED if job.state == JobState.CANCELLING else JobState.COMPLETED
+    cur.execute("update ImportJobs "
+                "set state = %s, currentATel = %s, heartbeatAt = now(), finishedAt = now() "
+                "where jobID = %s", (state.value, next_atel, job.job_id))
+    cur.execute("delete from ImportLeases where jobIDFK = %s", (job.job_id,))
+    return state
 
-            #loop through each report found and add a record relating it to the specified object
-            for atel_num in reports:
-                add_data = (atel_num, object_id)
-                cur.execute(add_query, add_data)
-        except mysql.connector.Error as e:
-            if e.errno == errorcode.ER_DUP_ENTRY:
-                pass  # ignore any duplicate entries
-            else:
-                raise e
-        finally:
-            cn.commit()
-            cur.close()
-            cn.close()
-    else:
-        raise ObjectNotFoundError("The specified object ID is not stored in the database.")
 
+def _truncate_error(message: str) -> str:
+    """
+    Truncates an error message to fit the lastError column of the ImportJobs and ImportLedger tables.
+
+    Args:
+        message (str): The error message, or None.
+
+    Returns:
+        str: The message, cut to at most 2048 characters.
+    """
+    if message is None:
+        return None
+    return str(message)[:2048]
 
-def _connect() -> MySQLConnection:
+
+def _connect(consume_results: bool = False) -> MySQLConnection:
     """
     Connects to the MySQL server and database and returns the connection object.
 
+    Args:
+        consume_results (bool, optional): Whether unread rows are discarded when a cursor is closed. Required for unbuffered cursors that may be closed early. Defaults to False.
+
     Returns:
         MySQLConnection: Connection to the MySQL Server. Must be closed by the calling method once finished.
     """
@@ -777,6 +2588,7 @@ def _connect() -> MySQLConnection:
         user=os.getenv("MYSQL_USER"),
         password=os.getenv("MYSQL_PASSWORD"),
         database=os.getenv("MYSQL_DB"),
+        consume_results=consume_results,
     )
 
 
@@ -820,13 +2632,53 @@ def _build_report_base_query()->tuple[str,str]:
     return select_clause, from_clause
 
 
-def _build_report_name_query(filters: SearchFilters = None, date_range: DateFilter = None, object_name: str = None):
+def _build_report_select_clause(fields: list[str] = None, body_window: tuple[str, int] = None) -> tuple[str, tuple]:
+    """
+    Builds the select clause of the SQL query to select reports, selecting only the specified text fields. The columns are always in the same order as _build_report_base_query(), with empty strings in place of fields that are not selected.
+
+    Args:
+        fields (list[str], optional): The text fields (title, authors and/or body) to select. Defaults to None, selecting all fields.
+        body_window (tuple[str, int], optional): The term and number of characters either side of it defining the window of the body to select, if the body is not selected. If the term is not found, the window starts at the beginning of the body. Defaults to None.
+
+    Returns:
+        str: The SQL select clause.
+        tuple: The data to inject into the query on execution.
+    """
+    if fields is None and body_window is None:
+        select_clause, _ = _build_report_base_query()
+        return select_clause, ()
+
+    if fields is None:
+        fields = REPORT_TEXT_FIELDS
+
+    columns = ["atelNum"]
+    data = ()
+    for field in REPORT_TEXT_FIELDS:
+        if field in fields:
+            columns.append(field)
+        elif field == "body" and body_window is not None:
+            term, chars = body_window
+            columns.append("substring(body, greatest(1, locate(%s, body) - %s), 2 * %s + char_length(%s))")
+            data = data + (term, int(chars), int(chars), term)
+        else:
+            columns.append("''")
+    columns.append("submissionDate")
+
+    return "select " + ", ".join(columns) + " ", data
+
+def _build_report_name_query(filters: SearchFilters = None, date_range: DateFilter = None, object_name: str = None, after: PageCursor = None, limit: int = None, ordered: bool = False, fields: list[str] = None, body_window: tuple[str, int] = None):
     """
     Builds the SQL query to select reports based on the specified search filters and/or object name.
 
     Args:
         filters (SearchFilters, optional): A valid search filters object to build the query with.
         date_filters (DateFilters, optional): A valid search filters object to build the query with. Defaults to None.
+        object_name (str, optional): An object ID or alias to search by. Defaults to None.
+        after (PageCursor, optional): Only select reports following this cursor in the result order. Defaults to None.
+        limit (int, optional): The maximum number of reports to select. Defaults to None.
+        ordered (bool, optional): Whether to order the reports newest first, even if not selecting a page. Defaults to False.
+        fields (list[str], optional): The text fields to select. Defaults to None, selecting all fields.
+        body_window (tuple[str, int], optional): The term and number of characters either side of it defining the window of the body to select, if the body is not selected. Defaults to None.
 
     Returns:
         str: The SQL where clause.
@@ -835,12 +2687,14 @@ def _build_report_name_query(filters: SearchFilters = None, date_range: DateFilt
 
     #Build query clauses.
     select_clause, from_clause = _build_report_base_query()
+    select_clause, select_data = _build_report_select_clause(fields, body_window)
     join_clause, join_data = _build_name_join_clause(object_name)
-    where_clause, where_data = _build_where_clause(filters, date_range)
+    where_clause, where_data = _build_where_clause(filters, date_range, after)
+    order_clause, order_data = _build_order_clause(after, limit, ordered)
 
     # Build final query and compile data
-    query = select_clause + from_clause + join_clause + where_clause
-    data = join_data + where_data
+    query = select_clause + from_clause + join_clause + where_clause + order_clause
+    data = select_data + join_data + where_data + order_data
 
     return query, data
 
@@ -877,13 +2731,101 @@ def _build_report_coords_query(filters: SearchFilters = None, date_range: DateFi
 
     return query, data
 
-def _build_where_clause(filters: SearchFilters = None, date_range: DateFilter = None)->tuple[str,tuple]:
+def _build_report_coords_page_query(filters: SearchFilters = None, date_range: DateFilter = None, coords: SkyCoord = None, radius: float = None, after: PageCursor = None, limit: int = None, ordered: bool = False, fields: list[str] = None, body_window: tuple[str, int] = None):
+    """
+    Builds the SQL query to select a page of reports based on the specified search filters and/or coordinate range. Unlike _build_report_coords_query(), the coordinate range is checked by the query itself, so each report is selected at most once.
+
+    Args:
+        filters (SearchFilters, optional): A valid search filters object to build the query with.
+        date_filters (DateFilters, optional): A valid search filters object to build the query with. Defaults to None.
+        coords (SkyCoord, optional): The coordinates to search around. Defaults to None.
+        radius (float, optional): The radius around the coordinates to search, in arcseconds. Defaults to None.
+        after (PageCursor, optional): Only select reports following this cursor in the result order. Defaults to None.
+        limit (int, optional): The maximum number of reports to select. Defaults to None.
+        ordered (bool, optional): Whether to order the reports newest first, even if not selecting a page. Defaults to False.
+        fields (list[str], optional): The text fields to select. Defaults to None, selecting all fields.
+        body_window (tuple[str, int], optional): The term and number of characters either side of it defining the window of the body to select, if the body is not selected. Defaults to None.
+
+    Returns:
+        str: The SQL query.
+        tuple: The data to inject into the query on execution.
+    """
+
+    #Build query clauses.
+    select_clause, from_clause = _build_report_base_query()
+    select_clause, select_data = _build_report_select_clause(fields, body_window)
+    where_clause, where_data = _build_where_clause(filters, date_range, after)
+    where_clause, where_data = _append_coord_range_clause(where_clause, where_data, coords, radius)
+    order_clause, order_data = _build_order_clause(after, limit, ordered)
+
+    # Build final query and compile data
+    query = select_clause + from_clause + where_clause + order_clause
+    data = select_data + where_data + order_data
+
+    return query, data
+
+def _append_coord_range_clause(where_clause: str, where_data: tuple, coords: SkyCoord = None, radius: float = None) -> tuple[str, tuple]:
+    """
+    Appends a clause to the given where clause, selecting only reports with coordinates within range of the specified coordinates. The angular separation is calculated using the haversine formula.
+
+    Args:
+        where_clause (str): The SQL where clause to append to. May be empty.
+        where_data (tuple): The data to inject into the where clause.
+        coords (SkyCoord, optional): The coordinates to search around. If None, the where clause is returned unchanged.
+        radius (float, optional): The radius around the coordinates to search, in arcseconds.
+
+    Returns:
+        str: The SQL where clause.
+        tuple: The data to inject into the query on execution.
+    """
+    if coords is None:
+        return where_clause, where_data
+
+    coord_clause = ("exists (select * from ReportCoords "
+                    "where ReportCoords.atelNumFK = Reports.atelNum "
+                    "and degrees(2 * asin(least(1, sqrt("
+                    "pow(sin(radians(ReportCoords.declination - %s) / 2), 2) "
+                    "+ cos(radians(ReportCoords.declination)) * cos(radians(%s)) "
+                    "* pow(sin(radians(ReportCoords.ra - %s) / 2), 2))))) * 3600 <= %s) ")
+    ra = round(coords.ra.deg, 10)
+    dec = round(coords.dec.deg, 10)
+    coord_data = (dec, dec, ra, float(radius))
+
+    if where_clause:
+        return where_clause + "and " + coord_clause, where_data + coord_data
+    else:
+        return "where " + coord_clause, coord_data
+
+def _build_order_clause(after: PageCursor = None, limit: int = None, ordered: bool = False) -> tuple[str, tuple]:
+    """
+    Builds the order and limit clauses of the SQL query to select a page of reports. Reports are ordered newest first, then by ATel number.
+
+    Args:
+        after (PageCursor, optional): The cursor the page follows. Defaults to None.
+        limit (int, optional): The maximum number of reports to select. Defaults to None.
+        ordered (bool, optional): Whether to order the reports even if not selecting a page. Defaults to False.
+
+    Returns:
+        str: The SQL order and limit clauses, or an empty string if not selecting a page or ordering.
+        tuple: The data to inject into the query on execution.
+    """
+    if after is None and limit is None and not ordered:
+        return "", ()
+
+    order_clause = "order by submissionDate desc, atelNum desc "
+    if limit is None:
+        return order_clause, ()
+    else:
+        return order_clause + "limit %s ", (int(limit),)
+
+def _build_where_clause(filters: SearchFilters = None, date_range: DateFilter = None, after: PageCursor = None)->tuple[str,tuple]:
     """
     Builds the where clause of the SQL query to select reports based on the specified search filters.
 
     Args:
         filters (SearchFilters, optional): A valid search filters object to build the query with.
         date_filters (DateFilters, optional): A valid search filters object to build the query with. Defaults to None.
+        after (PageCursor, optional): Only select reports following this cursor in the result order. Defaults to None.
 
     Returns:
         str: The SQL where clause.
@@ -905,6 +2847,17 @@ def _build_where_clause(filters: SearchFilters = None, date_range: DateFilter =
             clauses.append("submissionDate < %s ")
             data = data + (date_range.end_date+timedelta(days=1),)
 
+        if date_range.observed_start_date or date_range.observed_end_date:
+            # Append semi-join on observation dates, using the observedReports index
+            ob_clauses = []
+            if date_range.observed_start_date:
+                ob_clauses.append("obDate >= %s ")
+                data = data + (date_range.observed_start_date,)
+            if date_range.observed_end_date:
+                ob_clauses.append("obDate < %s ")
+                data = data + (date_range.observed_end_date+timedelta(days=1),)
+            clauses.append("atelNum in (select atelNumFK from ObservationDates where " + "and ".join(ob_clauses) + ") ")
+
     if filters:
         # Append term clause and data
         if filters.term:
@@ -914,27 +2867,29 @@ def _build_where_clause(filters: SearchFilters = None, date_range: DateFilter =
 
         # Append keyword clauses and data
         if filters.keywords:
-            kw_clauses = []
+            # The keywords set is compared as a bitmask, with one bit per fixed keyword.
+            mask = _keyword_mask(filters.keywords)
             if filters.keyword_mode == KeywordMode.NONE:
-                # Add a clause for each keyword in filters to not be in set
-                for kw in filters.keywords:
-                    kw_clauses.append("FIND_IN_SET(%s, keywords) = 0")  # If kw not in set
-                    data = data + (kw,)
-                kw_sep = " and "
-            else:
-                # Append a clause for each keyword to be in set
-                for kw in filters.keywords:
-                    kw_clauses.append("FIND_IN_SET(%s, keywords) > 0")  # If kw in set.
-                    data = data + (kw,)
-
-                # Set or/and condition
-                if filters.keyword_mode == KeywordMode.ALL:
-                    kw_sep = " and "
-                elif filters.keyword_mode == KeywordMode.ANY:
-                    kw_sep = " or "
-            # Join keyword clauses into one clause
-            kw_clause = "(" + kw_sep.join(kw_clauses)+") "
-            clauses.append(kw_clause)
+                # No keyword in mask may be in set
+                clauses.append("(keywords & %s) = 0 ")
+                data = data + (mask,)
+            elif filters.keyword_mode == KeywordMode.ALL:
+                if _keyword_mask_is_complete(filters.keywords):
+                    # Every keyword in mask must be in set
+                    clauses.append("(keywords & %s) = %s ")
+                    data = data + (mask, mask)
+                else:
+                    # A keyword that is not a fixed keyword can never be in set
+                    clauses.append("false ")
+            elif filters.keyword_mode == KeywordMode.ANY:
+                # Any keyword in mask must be in set
+                clauses.append("(keywords & %s) != 0 ")
+                data = data + (mask,)
+
+    if after:
+        # Append keyset clause continuing after the cursor
+        clauses.append("(submissionDate < %s or (submissionDate = %s and atelNum < %s)) ")
+        data = data + (after.submission_date, after.submission_date, after.atel_num)
 
     # Join where clauses together
     if clauses:
@@ -943,6 +2898,37 @@ def _build_where_clause(filters: SearchFilters = None, date_range: DateFilter =
 
     return where_clause, data
 
+def _keyword_mask(keywords: list[str]) -> int:
+    """
+    Converts a list of keywords to the bitmask of the keywords set column, in which each fixed keyword is represented by the bit at its index in FIXED_KEYWORDS. Keywords that are not fixed keywords are ignored.
+
+    Args:
+        keywords (list[str]): The keywords to convert.
+
+    Returns:
+        int: The bitmask of the keywords.
+    """
+    mask = 0
+    for kw in keywords:
+        bit = _KEYWORD_BITS.get(str(kw).lower())
+        if bit is not None:
+            mask |= bit
+    return mask
+
+
+def _keyword_mask_is_complete(keywords: list[str]) -> bool:
+    """
+    Checks whether every keyword in the list is a fixed keyword, and therefore represented in its bitmask.
+
+    Args:
+        keywords (list[str]): The keywords to check.
+
+    Returns:
+        bool: True if every keyword is a fixed keyword.
+    """
+    return all(str(kw).lower() in _KEYWORD_BITS for kw in keywords)
+
+
 def _build_name_join_clause(object_name:str = None)->tuple[str,tuple]:
     """
     Builds the join clause of the SQL query to select reports linked to the specified object.
@@ -986,39 +2972,198 @@ def _build_coords_join_clause() -> str:
 
     return join_clause
 
-def _populate_referenced_reports(reports:list[ReportResult])->list[ReportResult]:
+def _build_reference_graph_query(atel_nums: list[int], hops: int, max_nodes: int) -> tuple[str, tuple]:
     """
-    Populates the referenced reports fields of each returned report in the given list from the database.
+    Builds a query selecting the reports within the specified number of references of the given reports, in both directions. Each selected row contains the ATel number of a report, its distance from the nearest starting report and a report it references within the subgraph, or null if it references none.
 
     Args:
-        reports (list[ReportResult]): A list of reports returned from the database.
+        atel_nums (list[int]): The ATel numbers of the reports to start from.
+        hops (int): The maximum distance, in references, from the nearest starting report.
+        max_nodes (int): The maximum number of reports to select, nearest first.
+
+    Returns:
+        tuple[str, tuple]: The query and the data to inject into it on execution.
+    """
+    # Union (rather than union all) discards repeated visits to a report at the same distance,
+    # so the walk is bounded by the number of reports times the number of hops, even through cycles.
+    query = ("with recursive Walk (atelNum, hops) as ( "
+                "select atelNum, cast(0 as unsigned) "
+                "from Reports "
+                f"where atelNum in ({', '.join(['%s'] * len(atel_nums))}) "
+                "union "
+                "select ReportRefs.refReport, Walk.hops + 1 "
+                "from Walk join ReportRefs on ReportRefs.atelNum = Walk.atelNum "
+                "where Walk.hops < %s "
+                "union "
+                "select ReportRefs.atelNum, Walk.hops + 1 "
+                "from Walk join ReportRefs on ReportRefs.refReport = Walk.atelNum "
+                "where Walk.hops < %s "
+             "), "
+             "Nodes (atelNum, hops) as ( "
+                "select atelNum, min(hops) "
+                "from Walk "
+                "group by atelNum "
+                "order by min(hops), atelNum "
+                "limit %s "
+             ") "
+             "select Nodes.atelNum, Nodes.hops, ReportRefs.refReport "
+             "from Nodes left join ReportRefs "
+             "on ReportRefs.atelNum = Nodes.atelNum "
+             "and ReportRefs.refReport in (select atelNum from Nodes) "
+             "order by Nodes.hops, Nodes.atelNum;")
+
+    data = tuple(int(atel_num) for atel_num in atel_nums) + (hops, hops, max_nodes)
+    return query, data
+
+def _build_timeline_query(filters: SearchFilters = None, date_range: DateFilter = None, object_name: str = None, bin_size: str = "month", date_field: str = "submission") -> tuple[str, tuple]:
+    """
+    Builds a query counting the reports matching the specified criteria in each bin of a timeline.
+
+    Args:
+        filters (SearchFilters, optional): A valid search filters object. Defaults to None.
+        date_range (DateFilter, optional): A valid date filter object. Defaults to None.
+        object_name (str, optional): An object ID or alias that reports must be linked to. Defaults to None.
+        bin_size (str, optional): The length of each bin, a key of _TIMELINE_BIN_STARTS. Defaults to "month".
+        date_field (str, optional): The date reports are binned by, either "submission" or "observation". Defaults to "submission".
+
+    Returns:
+        tuple[str, tuple]: The query, selecting the first date and number of reports of each bin, and the data to inject into it on execution.
+
+    Raises:
+        ObjectNotFoundError: When the object name is not stored in the database.
+    """
+    if date_field == "observation":
+        dates_join = ("inner join ObservationDates as TimelineDates "
+                      "on Reports.atelNum = TimelineDates.atelNumFK ")
+        bin_start = _TIMELINE_BIN_STARTS[bin_size].format("TimelineDates.obDate")
+    else:
+        dates_join = ""
+        bin_start = _TIMELINE_BIN_STARTS[bin_size].format("Reports.submissionDate")
+
+    join_clause, join_data = _build_name_join_clause(object_name)
+    where_clause, where_data = _build_where_clause(filters, date_range)
+
+    query = (f"select {bin_start} as binStart, count(distinct Reports.atelNum) "
+             "from Reports " + dates_join + join_clause + where_clause +
+             "group by binStart "
+             "order by binStart")
+
+    return query, join_data + where_data
+
+def _find_reports_page_in_coord_range(filters: SearchFilters = None, date_range: DateFilter = None, coords: SkyCoord = None, radius: float = None, limit: int = None, after: PageCursor = None, fields: list[str] = None, body_window: tuple[str, int] = None) -> list[ReportResult]:
+    """
+    Queries the local database for a page of reports matching the specified search filters and with coordinates within range of the given coordinates if given. The coordinate range is checked by the query itself.
+
+    Args:
+        filters (SearchFilters): The search criteria to filter the report query with.
+        date_range (DateFilter, optional): The date range to filter the report query by. Defaults to None.
+        coords (SkyCoord): The coordinates to search around.
+        radius (float): The radius defining the range around the specified coordinates to search, in arcseconds.
+        limit (int, optional): The maximum number of reports to return. Defaults to None.
+        after (PageCursor, optional): Only return reports following this cursor in the result order. Defaults to None.
+        fields (list[str], optional): The text fields to select. Defaults to None, selecting all fields.
+        body_window (tuple[str, int], optional): The term and number of characters either side of it defining the window of the body to select, if the body is not selected. Defaults to None.
+
+    Returns:
+        list[ReportResult]: The page of matching reports, newest first if paging.
+    """
+    if not (filters or coords is not None):
+        return []
+
+    cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    query, data = _build_report_coords_page_query(filters, date_range, coords, radius, after, limit, fields=fields, body_window=body_window)
+
+    reports = []
+
+    try:
+        cur.execute(query, data)
+        for row in cur.fetchall():
+            reports.append(ReportResult(row[0], row[1], row[2], row[3], row[4]))
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+    # Populate each returned report with their referenced report and return the list of results.
+    return _populate_referenced_reports(reports)
+
+def _iter_reports(query: str, data: tuple, batch_size: int) -> Iterator[ReportResult]:
+    """
+    Executes a query selecting reports using an unbuffered (server-side) cursor, fetching and yielding the reports one batch at a time. The connection is closed once the reports are exhausted or the iterator is closed.
+
+    Args:
+        query (str): The SQL query, selecting the report base columns.
+        data (tuple): The data to inject into the query on execution.
+        batch_size (int): The number of reports fetched from the server at a time.
+
+    Yields:
+        ReportResult: The selected reports, with their referenced reports populated.
+    """
+    cn = _connect(consume_results=True)
+    cur: MySQLCursor = cn.cursor(buffered=False)
+
+    try:
+        cur.execute(query, data)
+        rows = cur.fetchmany(batch_size)
+        while rows:
+            batch = [ReportResult(row[0], row[1], row[2], row[3], row[4]) for row in rows]
+            yield from _populate_referenced_reports(batch)
+            rows = cur.fetchmany(batch_size)
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
+
+def _query_report_nums(query: str, data: tuple) -> set[int]:
+    """
+    Executes a query selecting ATel numbers.
+
+    Args:
+        query (str): The SQL query, selecting the ATel number as the first column.
+        data (tuple): The data to inject into the query on execution.
 
     Returns:
-        list[ReportResult]: The same list of reports with the referenced reports field populated from the database.
+        set[int]: The selected ATel numbers.
     """
     cn = _connect()
+    cur: MySQLCursor = cn.cursor()
+
+    atel_nums = set()
+
+    try:
+        cur.execute(query, data)
+        for row in cur.fetchall():
+            atel_nums.add(int(row[0]))
+    except mysql.connector.Error as e:
+        raise e
+    finally:
+        cur.close()
+        cn.close()
 
-    query = ("select refReport "
-             "from ReportRefs "
-             "where atelNum = %s;")
+    return atel_nums
 
+def _populate_referenced_reports(reports:list[ReportResult])->list[ReportResult]:
+    """
+    Populates the referenced reports fields of each returned report in the given list from the in-memory citation graph.
+
+    Args:
+        reports (list[ReportResult]): A list of reports returned from the database.
+
+    Returns:
+        list[ReportResult]: The same list of reports with the referenced reports field populated.
+    """
     for report in reports:
-        cur:MySQLCursor = cn.cursor()
-        try:
-            cur.execute(query,(report.atel_num,))
-            results = cur.fetchall()
-            ref_reports = []
-            for result in results:
-                ref_reports.append(int(result[0]))
-            report.referenced_reports = ref_reports
-        finally:
-            cur.close()
+        report.referenced_reports = _citation_graph.references(report.atel_num)
 
     return reports
 
 def _get_object_id(alias:str)->str:
     """
-    Finds the main object ID that the given alias refers to.
+    Finds the main object ID that the given alias refers to. Aliases are matched by their normalized form, using the in-memory alias resolver, and the database is only queried when the alias is not known to the resolver.
 
     Args:
         alias (str): The alias to lookup.
@@ -1029,22 +3174,26 @@ def _get_object_id(alias:str)->str:
     Raises:
         ObjectNotFoundError: When an object with the given alias is not stored in the database.
     """
+    object_id = _alias_resolver.resolve(alias)
+    if object_id is not None:
+        return object_id
+
+    # The alias may have been added by another worker since the resolver was last reloaded.
     query = ("select objectIDFK "
              "from Aliases "
-             "where alias like %s "
-             "or objectIDFK like %s "
+             "where normalizedAlias = %s "
              "limit 1;")
 
     cn = _connect()
     cur:MySQLCursor = cn.cursor()
 
     try:
-        cur.execute(query, (alias, alias))
+        cur.execute(query, (normalize_alias(alias),))
         result = cur.fetchone()
         if result is None:
             object_id_query = ("select objectID "
                      "from Objects "
-                     "where objectID like %s "
+                     "where objectID = %s "
                      "limit 1;")
             cur.execute(object_id_query, (alias,))
             result = cur.fetchone()
@@ -1060,4 +3209,12 @@ def _get_object_id(alias:str)->str:
         cur.close()
         cn.close()
 
+    _alias_resolver.cache(alias, object_id)
     return object_id
+
+
+# Alias resolver shared by all requests handled by this worker.
+_alias_resolver = AliasResolver(_load_alias_map, get_alias_version, _load_report_counts)
+
+# Citation graph shared by all requests handled by this worker.
+_citation_graph = CitationGraph(_load_references, _get_reference_version)
@@ -0,0 +1,113 @@
+"""
+Contains the DisjointSet data structure, used to group reports into threads of related reports.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from typing import Iterable, Iterator
+
+class DisjointSet:
+    """
+    A union-find structure partitioning integers into disjoint sets. Each set is identified by its lowest member.
+    """
+
+    def __init__(self, members: Iterable[int] = ()):
+        """
+        Creates a disjoint set with each of the given members in its own set.
+
+        Args:
+            members (Iterable[int], optional): The initial members. Defaults to none.
+        """
+        self._parents: dict[int, int] = {}
+        for member in members:
+            self.add(member)
+
+    def add(self, member: int):
+        """
+        Adds a member in its own set, if it is not already a member.
+
+        Args:
+            member (int): The member to add.
+        """
+        self._parents.setdefault(int(member), int(member))
+
+    def find(self, member: int) -> int:
+        """
+        Finds the set containing a member, adding the member if it is not already a member.
+
+        Args:
+            member (int): The member to find.
+
+        Returns:
+            int: The lowest member of the set.
+        """
+        member = int(member)
+        self.add(member)
+
+        root = member
+        while self._parents[root] != root:
+            root = self._parents[root]
+
+        # Compress the path, so later finds of these members take one step.
+        while self._parents[member] != root:
+            self._parents[member], member = root, self._parents[member]
+
+        return root
+
+    def union(self, first: int, second: int) -> int:
+        """
+        Merges the sets containing two members.
+
+        Args:
+            first (int): A member of the first set.
+            second (int): A member of the second set.
+
+        Returns:
+            int: The lowest member of the merged set.
+        """
+        first_root = self.find(first)
+        second_root = self.find(second)
+        root = min(first_root, second_root)
+        self._parents[max(first_root, second_root)] = root
+        return root
+
+    def union_all(self, members: Iterable[int]) -> int:
+        """
+        Merges the sets containing each of the given members.
+
+        Args:
+            members (Iterable[int]): The members whose sets are merged.
+
+        Returns:
+            int: The lowest member of the merged set, or None if no members were given.
+        """
+        root = None
+        for member in members:
+            root = self.find(member) if root is None else self.union(root, member)
+        return root
+
+    def __contains__(self, member: int) -> bool:
+        return int(member) in self._parents
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._parents)
+
+    def __len__(self) -> int:
+        return len(self._parents)
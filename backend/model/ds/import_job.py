@@ -0,0 +1,215 @@
+"""
+Contains the ImportJob data structure, representing a queued or running import of new ATel reports and its progress, and the ImportLease data structure, representing a range of ATel numbers leased to one worker of a sharded import.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from datetime import datetime
+from enum import Enum
+from typing import Union
+
+class JobState(Enum):
+    """
+    Enum representing the state of an import job.
+
+    QUEUED: Waiting for the import worker.
+    RUNNING: Being processed by the import worker.
+    CANCELLING: Cancelled while running. The worker stops after the current report.
+    CANCELLED: Stopped before all reports were imported.
+    COMPLETED: Every new report was imported.
+    FAILED: Stopped by a failure the worker cannot recover from, such as a database error.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    CANCELLING = "cancelling"
+    CANCELLED = "cancelled"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    @property
+    def active(self) -> bool:
+        """
+        Whether the job is queued or still being processed.
+        """
+        return self in (JobState.QUEUED, JobState.RUNNING, JobState.CANCELLING)
+
+class ImportJob:
+    """
+    An import of every new ATel report from a starting ATel number, along with its progress.
+    """
+
+    def __init__(self,
+                 job_id: int,
+                 state: JobState,
+                 start_atel: int,
+                 current_atel: int,
+                 imported: int = 0,
+                 skipped: int = 0,
+                 failed: int = 0,
+                 rate: float = 0.0,
+                 last_error: Union[str, None] = None,
+                 delay_seconds: float = 0.0,
+                 created_at: Union[datetime, None] = None,
+                 started_at: Union[datetime, None] = None,
+                 heartbeat_at: Union[datetime, None] = None,
+                 finished_at: Union[datetime, None] = None,
+                 range_size: int = 0,
+                 newest_atel: Union[int, None] = None,
+                 request_rate: float = 0.0):
+        """
+        Creates an import job.
+
+        Args:
+            job_id (int): The unique ID of the job.
+            state (JobState): The state of the job.
+            start_atel (int): The ATel number the job started importing from.
+            current_atel (int): The ATel number of the next report to import.
+            imported (int, optional): The number of reports imported. Defaults to 0.
+            skipped (int, optional): The number of reports skipped as they were already imported. Defaults to 0.
+            failed (int, optional): The number of reports that could not be imported as they were missing important data. Defaults to 0.
+            rate (float, optional): The number of reports processed per second by the most recent run of the job. Defaults to 0.
+            last_error (str, optional): The message of the most recent error, or None if there was no error. Defaults to None.
+            delay_seconds (float, optional): The number of seconds the worker waits between reports, to throttle the import. Defaults to 0.
+            created_at (datetime, optional): When the job was queued. Defaults to None.
+            started_at (datetime, optional): When the job was first run, or None if it has not run. Defaults to None.
+            heartbeat_at (datetime, optional): When the worker running the job last recorded its progress. Defaults to None.
+            finished_at (datetime, optional): When the job stopped, or None if it is active. Defaults to None.
+            range_size (int, optional): The number of ATel numbers leased to a worker at a time, so workers on every host import the job in parallel, or 0 if a single worker imports every report in order. Defaults to 0.
+            newest_atel (int, optional): The ATel number of the newest report found when the job was queued, or None if unknown. Reports missing before it are skipped rather than ending the job. Defaults to None.
+            request_rate (float, optional): The number of requests per second made to the AT website by the worker that last recorded the job's progress. Defaults to 0.
+        """
+        self.job_id = int(job_id)
+        self.state = JobState(state)
+        self.start_atel = int(start_atel)
+        self.current_atel = int(current_atel)
+        self.imported = int(imported)
+        self.skipped = int(skipped)
+        self.failed = int(failed)
+        self.rate = float(rate)
+        self.last_error = last_error
+        self.delay_seconds = float(delay_seconds)
+        self.created_at = created_at
+        self.started_at = started_at
+        self.heartbeat_at = heartbeat_at
+        self.finished_at = finished_at
+        self.range_size = int(range_size)
+        self.newest_atel = int(newest_atel) if newest_atel is not None else None
+        self.request_rate = float(request_rate)
+        # The number of times the worker has failed to download the report at the current ATel number
+        self.report_attempts = 0
+
+    @property
+    def pending(self) -> int:
+        """
+        The number of reports waiting to be imported up to the newest report found when the job was queued, or None if unknown.
+        """
+        if self.newest_atel is None:
+            return None
+        return max(0, self.newest_atel - self.current_atel + 1)
+
+    @property
+    def sharded(self) -> bool:
+        """
+        Whether the job's reports are imported in parallel by leasing ranges of ATel numbers to workers.
+        """
+        return self.range_size > 0
+
+    def __eq__(self, other) -> bool:
+        """
+        Checks whether the given object is equal to this ImportJob.
+
+        Args:
+            other (Any): The object to compare.
+
+        Returns:
+            bool: Whether the object is equal.
+        """
+        if isinstance(other, ImportJob):
+            return vars(self) == vars(other)
+        else:
+            return False
+
+    def __str__(self) -> str:
+        return f"Import job {self.job_id} ({self.state.value}): next ATel #{self.current_atel}"
+
+class ImportLease:
+    """
+    A range of ATel numbers of a sharded import job, leased to one worker, along with its progress.
+    """
+
+    def __init__(self,
+                 job_id: int,
+                 start_atel: int,
+                 end_atel: int,
+                 current_atel: int,
+                 imported: int = 0,
+                 skipped: int = 0,
+                 failed: int = 0,
+                 delay_seconds: float = 0.0,
+                 newest_atel: Union[int, None] = None,
+                 last_error: Union[str, None] = None,
+                 request_rate: float = 0.0):
+        """
+        Creates an import lease.
+
+        Args:
+            job_id (int): The ID of the job the range belongs to.
+            start_atel (int): The first ATel number of the range.
+            end_atel (int): The ATel number after the last ATel number of the range.
+            current_atel (int): The ATel number of the next report of the range to import.
+            imported (int, optional): The number of reports of the range imported. Defaults to 0.
+            skipped (int, optional): The number of reports of the range skipped as they were already imported. Defaults to 0.
+            failed (int, optional): The number of reports of the range that could not be imported as they were missing important data. Defaults to 0.
+            delay_seconds (float, optional): The number of seconds the worker waits between reports, from the job. Defaults to 0.
+            newest_atel (int, optional): The ATel number of the newest report found when the job was queued, or None if unknown. Defaults to None.
+            last_error (str, optional): The message of the most recent error importing a report of the range, or None if there was no error. Defaults to None.
+            request_rate (float, optional): The number of requests per second made to the AT website by the worker. Defaults to 0.
+        """
+        self.job_id = int(job_id)
+        self.start_atel = int(start_atel)
+        self.end_atel = int(end_atel)
+        self.current_atel = int(current_atel)
+        self.imported = int(imported)
+        self.skipped = int(skipped)
+        self.failed = int(failed)
+        self.delay_seconds = float(delay_seconds)
+        self.newest_atel = int(newest_atel) if newest_atel is not None else None
+        self.last_error = last_error
+        self.request_rate = float(request_rate)
+        # The number of times the worker has failed to download the report at the current ATel number
+        self.report_attempts = 0
+
+    def __eq__(self, other) -> bool:
+        """
+        Checks whether the given object is equal to this ImportLease.
+
+        Args:
+            other (Any): The object to compare.
+
+        Returns:
+            bool: Whether the object is equal.
+        """
+        if isinstance(other, ImportLease):
+            return vars(self) == vars(other)
+        else:
+            return False
+
+    def __str__(self) -> str:
+        return f"Import job {self.job_id} range ATel #{self.start_atel} to #{self.end_atel - 1}: next ATel #{self.current_atel}"
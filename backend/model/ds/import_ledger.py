@@ -0,0 +1,100 @@
+"""
+Contains the LedgerEntry data structure, recording the outcome of the most recent attempt at importing an ATel report, so reports that could not be imported can be found and retried.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from datetime import datetime
+from enum import Enum
+from typing import Union
+
+class LedgerStatus(Enum):
+    """
+    Enum representing the outcome of importing a report.
+
+    IMPORTED: The report was stored.
+    FAILED: The report could not be parsed, as it is missing important data. Retried once the parser version changes.
+    ERROR: The report could not be downloaded or stored. Retried until it has been attempted MAX_IMPORT_ATTEMPTS times.
+    """
+    IMPORTED = "imported"
+    FAILED = "failed"
+    ERROR = "error"
+
+class LedgerEntry:
+    """
+    The outcome of the most recent attempt at importing an ATel report, along with the time taken by each stage of the import.
+    """
+
+    def __init__(self,
+                 atel_num: int,
+                 status: LedgerStatus,
+                 parser_version: int,
+                 failure_class: Union[str, None] = None,
+                 last_error: Union[str, None] = None,
+                 download_seconds: float = 0.0,
+                 parse_seconds: float = 0.0,
+                 insert_seconds: float = 0.0,
+                 attempts: int = 1,
+                 updated_at: Union[datetime, None] = None):
+        """
+        Creates a ledger entry.
+
+        Args:
+            atel_num (int): The ATel number of the report.
+            status (LedgerStatus): The outcome of the most recent attempt.
+            parser_version (int): The version of the parser used by the most recent attempt.
+            failure_class (str, optional): The name of the error that stopped the most recent attempt, or None if the report was imported. Defaults to None.
+            last_error (str, optional): The message of the error that stopped the most recent attempt, or None if the report was imported. Defaults to None.
+            download_seconds (float, optional): The number of seconds taken to download the report. Defaults to 0.
+            parse_seconds (float, optional): The number of seconds taken to parse the report. Defaults to 0.
+            insert_seconds (float, optional): The number of seconds taken to store the report. Defaults to 0.
+            attempts (int, optional): The number of attempts at importing the report. Defaults to 1.
+            updated_at (datetime, optional): When the most recent attempt was recorded. Defaults to None.
+        """
+        self.atel_num = int(atel_num)
+        self.status = LedgerStatus(status)
+        self.parser_version = int(parser_version)
+        self.failure_class = failure_class
+        self.last_error = last_error
+        self.download_seconds = float(download_seconds)
+        self.parse_seconds = float(parse_seconds)
+        self.insert_seconds = float(insert_seconds)
+        self.attempts = int(attempts)
+        self.updated_at = updated_at
+
+    def __eq__(self, other) -> bool:
+        """
+        Checks whether the given object is equal to this LedgerEntry.
+
+        Args:
+            other (Any): The object to compare.
+
+        Returns:
+            bool: Whether the object is equal.
+        """
+        if isinstance(other, LedgerEntry):
+            return vars(self) == vars(other)
+        else:
+            return False
+
+    def __str__(self) -> str:
+        if self.failure_class is None:
+            return f"ATel #{self.atel_num}: {self.status.value}"
+        return f"ATel #{self.atel_num}: {self.status.value} ({self.failure_class})"
@@ -0,0 +1,193 @@
+"""
+Contains the PageCursor, ReportPage and ReportStream data structures, used to return search results one page at a time or lazily.
+
+Results are ordered by submission date (newest first) and then by ATel number (highest first). A page cursor records the position of the last report on a page, so the next page can be retrieved using a keyset predicate rather than an offset.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Iterator, Union
+
+from model.ds.report_types import ReportResult
+
+class PageCursor:
+    """
+    Immutable object representing the position of a report in the ordered search results.
+    """
+
+    def __init__(self, submission_date: datetime, atel_num: int):
+        """
+        Creates a page cursor positioned at the given report.
+
+        Args:
+            submission_date (datetime): The submission date of the report.
+            atel_num (int): The ATel number of the report.
+
+        Raises:
+            TypeError: When the submission date is not a datetime object.
+            ValueError: When the ATel number is not a positive integer.
+        """
+        if type(submission_date) != datetime:
+            raise TypeError("Submission date must be a valid datetime object.")
+        if int(atel_num) < 1:
+            raise ValueError("ATel Number must be a valid positive integer.")
+
+        self._submission_date = submission_date
+        self._atel_num = int(atel_num)
+
+    @classmethod
+    def after(cls, report: ReportResult) -> 'PageCursor':
+        """
+        Creates a page cursor positioned at the given report.
+
+        Args:
+            report (ReportResult): The last report on a page.
+
+        Returns:
+            PageCursor: A cursor to retrieve the reports following the given report.
+        """
+        return cls(report.submission_date, report.atel_num)
+
+    @classmethod
+    def decode(cls, token: str) -> 'PageCursor':
+        """
+        Creates a page cursor from a token returned by encode().
+
+        Args:
+            token (str): The encoded cursor.
+
+        Returns:
+            PageCursor: The decoded cursor.
+
+        Raises:
+            ValueError: When the token is not a valid encoded cursor.
+        """
+        try:
+            decoded = base64.urlsafe_b64decode(str(token).encode("ascii")).decode("ascii")
+            date_str, atel_str = decoded.split("|")
+            return cls(datetime.fromisoformat(date_str), int(atel_str))
+        except (binascii.Error, UnicodeError, ValueError, TypeError):
+            raise ValueError("Invalid page cursor.")
+
+    def encode(self) -> str:
+        """
+        Returns:
+            str: An opaque, URL-safe token representing this cursor.
+        """
+        raw = f"{self.submission_date.isoformat()}|{self.atel_num}"
+        return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+
+    def __str__(self) -> str:
+        """
+        Returns:
+            str: A description of the cursor position.
+        """
+        return f"After ATel #{self.atel_num} submitted {self.submission_date}"
+
+    def __eq__(self, other) -> bool:
+        """
+        Checks if the given object is equal to this PageCursor.
+
+        Args:
+            other (Any): The object to compare.
+
+        Returns:
+            bool: Whether the object is equal.
+        """
+        if isinstance(other, PageCursor):
+            return (self.submission_date == other.submission_date
+                    and self.atel_num == other.atel_num)
+        else:
+            return False
+
+    def __hash__(self) -> int:
+        return hash((self.submission_date, self.atel_num))
+
+    @property
+    def submission_date(self) -> datetime:
+        """
+        The submission date of the last report on the previous page.
+        """
+        return self._submission_date
+
+    @property
+    def atel_num(self) -> int:
+        """
+        The ATel number of the last report on the previous page.
+        """
+        return self._atel_num
+
+class ReportPage(list):
+    """
+    A list of reports forming one page of search results, along with the cursor to retrieve the next page.
+    """
+
+    def __init__(self, reports: list[ReportResult] = [], next_cursor: Union[PageCursor, None] = None, total: Union[int, None] = None, degraded: bool = False):
+        """
+        Creates a page of reports.
+
+        Args:
+            reports (list[ReportResult], optional): The reports on this page, in result order. Defaults to an empty list.
+            next_cursor (PageCursor, optional): The cursor to retrieve the next page, or None if this is the last page. Defaults to None.
+            total (int, optional): The total number of reports matching the search, or None if not counted. Defaults to None.
+            degraded (bool, optional): Whether SIMBAD was unavailable, so only the local database was searched. Defaults to False.
+        """
+        super().__init__(reports)
+        self.next_cursor = next_cursor
+        self.total = total
+        self.degraded = degraded
+
+class ReportStream:
+    """
+    An iterator over search results that are retrieved lazily, in result order.
+    """
+
+    def __init__(self, reports: Iterator[ReportResult], degraded: bool = False):
+        """
+        Creates a stream of reports.
+
+        Args:
+            reports (Iterator[ReportResult]): The reports, in result order.
+            degraded (bool, optional): Whether SIMBAD was unavailable, so only the local database was searched. Defaults to False.
+        """
+        self._reports = iter(reports)
+        self.degraded = degraded
+
+    def __iter__(self) -> 'ReportStream':
+        return self
+
+    def __next__(self) -> ReportResult:
+        return next(self._reports)
+
+
+def sort_key(report: ReportResult) -> tuple[datetime, int]:
+    """
+    Returns the key used to order search results. Sort in reverse to order results newest first.
+
+    Args:
+        report (ReportResult): The report to order.
+
+    Returns:
+        tuple[datetime, int]: The report's submission date and ATel number.
+    """
+    return report.submission_date, report.atel_num
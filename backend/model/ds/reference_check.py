@@ -0,0 +1,76 @@
+"""
+Contains the ReferenceCheck data structure, recording when a stored report's "Referred to by" links were last checked on the AT website, what they looked like, and when they are checked next.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from datetime import datetime
+from typing import Union
+
+class ReferenceCheck:
+    """
+    The state of the periodic check of a report's "Referred to by" links.
+    """
+
+    def __init__(self,
+                 atel_num: int,
+                 etag: Union[str, None] = None,
+                 last_modified: Union[str, None] = None,
+                 content_hash: Union[str, None] = None,
+                 unchanged_count: int = 0,
+                 checked_at: Union[datetime, None] = None,
+                 next_check_at: Union[datetime, None] = None):
+        """
+        Creates a reference check.
+
+        Args:
+            atel_num (int): The ATel number of the report.
+            etag (str, optional): The ETag header of the report's page when it was last checked, sent back so an unchanged page is not downloaded again. Defaults to None.
+            last_modified (str, optional): The Last-Modified header of the report's page when it was last checked, used like the ETag. Defaults to None.
+            content_hash (str, optional): The SHA-256 hash of the report's references block when it was last checked, or None if it has not been checked. Defaults to None.
+            unchanged_count (int, optional): The number of consecutive checks that found the references unchanged. Defaults to 0.
+            checked_at (datetime, optional): When the report was last checked, or None if it has not been checked. Defaults to None.
+            next_check_at (datetime, optional): When the report is checked next. Defaults to None.
+        """
+        self.atel_num = int(atel_num)
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.unchanged_count = int(unchanged_count)
+        self.checked_at = checked_at
+        self.next_check_at = next_check_at
+
+    def __eq__(self, other) -> bool:
+        """
+        Checks whether the given object is equal to this ReferenceCheck.
+
+        Args:
+            other (Any): The object to compare.
+
+        Returns:
+            bool: Whether the object is equal.
+        """
+        if isinstance(other, ReferenceCheck):
+            return vars(self) == vars(other)
+        else:
+            return False
+
+    def __str__(self) -> str:
+        return f"ATel #{self.atel_num} references: next check at {self.next_check_at}"
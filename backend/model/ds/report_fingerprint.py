@@ -0,0 +1,117 @@
+"""
+Contains the ReportFingerprint data structure, recording hashes of a stored report's downloaded page and of each section of the data parsed from it, so a report can be re-imported without rewriting the data that has not changed.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from datetime import datetime
+from enum import Enum
+from typing import Union
+
+class ReportSection(Enum):
+    """
+    Enum representing a section of a report's data, each stored in its own table.
+
+    REPORT: The title, authors, body, submission date and keywords, stored in the Reports table.
+    OBJECTS: The objects the report is about, stored in the ObjectRefs table.
+    OBSERVATION_DATES: The observation dates, stored in the ObservationDates table.
+    COORDINATES: The coordinates, stored in the ReportCoords table.
+    REFERENCES: The reports the report refers to, stored in the ReportRefs table.
+    REFERENCED_BY: The reports referring to the report, stored in the ReportRefs table.
+    """
+    REPORT = "report"
+    OBJECTS = "objects"
+    OBSERVATION_DATES = "observation_dates"
+    COORDINATES = "coordinates"
+    REFERENCES = "references"
+    REFERENCED_BY = "referenced_by"
+
+class ReportFingerprint:
+    """
+    Hashes of a report's downloaded page and of each section of its parsed data.
+    """
+
+    def __init__(self,
+                 atel_num: int,
+                 html_hash: str,
+                 parser_version: int,
+                 section_hashes: dict[ReportSection, str],
+                 updated_at: Union[datetime, None] = None):
+        """
+        Creates a fingerprint.
+
+        Args:
+            atel_num (int): The ATel number of the report.
+            html_hash (str): The SHA-256 hash of the report's page, ignoring differences in whitespace.
+            parser_version (int): The version of the parser the report was parsed with.
+            section_hashes (dict[ReportSection, str]): The SHA-256 hash of each section of the parsed report.
+            updated_at (datetime, optional): When the fingerprint was stored. Defaults to None.
+        """
+        self.atel_num = int(atel_num)
+        self.html_hash = html_hash
+        self.parser_version = int(parser_version)
+        self.section_hashes = {ReportSection(section): section_hash for section, section_hash in section_hashes.items()}
+        self.updated_at = updated_at
+
+    def is_unchanged(self, html_hash: str, parser_version: int) -> bool:
+        """
+        Checks whether a downloaded page would parse to the same data as the stored report, as it is unchanged and was parsed by the same parser.
+
+        Args:
+            html_hash (str): The hash of the downloaded page.
+            parser_version (int): The version of the current parser.
+
+        Returns:
+            bool: Whether the page does not have to be parsed again.
+        """
+        return self.html_hash == html_hash and self.parser_version == parser_version
+
+    def changed_sections(self, previous: Union["ReportFingerprint", None]) -> list[ReportSection]:
+        """
+        Finds the sections whose hashes differ from a previous fingerprint of the report.
+
+        Args:
+            previous (ReportFingerprint): The previous fingerprint, or None if the report has none, in which case every section is treated as changed.
+
+        Returns:
+            list[ReportSection]: The changed sections.
+        """
+        if previous is None:
+            return list(ReportSection)
+        return [section for section in ReportSection
+                if self.section_hashes.get(section) != previous.section_hashes.get(section)]
+
+    def __eq__(self, other) -> bool:
+        """
+        Checks whether the given object is equal to this ReportFingerprint.
+
+        Args:
+            other (Any): The object to compare.
+
+        Returns:
+            bool: Whether the object is equal.
+        """
+        if isinstance(other, ReportFingerprint):
+            return vars(self) == vars(other)
+        else:
+            return False
+
+    def __str__(self) -> str:
+        return f"ATel #{self.atel_num} fingerprint: parser version {self.parser_version}"
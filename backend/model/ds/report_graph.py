@@ -0,0 +1,81 @@
+"""
+Contains the ReportGraph data structure, representing the reports within a number of references of a set of reports.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+class ReportGraph:
+    """
+    Immutable object representing a subgraph of the report reference graph.
+    """
+
+    def __init__(self, nodes: dict[int, int], edges: list[tuple[int, int]], truncated: bool = False):
+        """
+        Creates a report graph.
+
+        Args:
+            nodes (dict[int, int]): The ATel number of each report in the graph, mapped to its distance in references from the nearest starting report.
+            edges (list[tuple[int, int]]): The references between reports in the graph, each a pair of the referencing and referenced ATel numbers.
+            truncated (bool, optional): Whether reports were left out of the graph because it reached the maximum number of reports. Defaults to False.
+        """
+        self._nodes = {int(atel_num): int(hops) for atel_num, hops in nodes.items()}
+        self._edges = [(int(source), int(target)) for source, target in edges]
+        self._truncated = bool(truncated)
+
+    def __eq__(self, other) -> bool:
+        """
+        Checks whether the given object is equal to this ReportGraph.
+
+        Args:
+            other (Any): The object to compare.
+
+        Returns:
+            bool: Whether the object is equal.
+        """
+        if isinstance(other, ReportGraph):
+            return (self.nodes == other.nodes
+                and sorted(self.edges) == sorted(other.edges)
+                and self.truncated == other.truncated)
+        else:
+            return False
+
+    def __str__(self) -> str:
+        return f"Report graph: {len(self._nodes)} reports, {len(self._edges)} references"
+
+    @property
+    def nodes(self) -> dict[int, int]:
+        """
+        The ATel number of each report in the graph, mapped to its distance in references from the nearest starting report.
+        """
+        return dict(self._nodes)
+
+    @property
+    def edges(self) -> list[tuple[int, int]]:
+        """
+        The references between reports in the graph, each a pair of the referencing and referenced ATel numbers.
+        """
+        return list(self._edges)
+
+    @property
+    def truncated(self) -> bool:
+        """
+        Whether reports were left out of the graph because it reached the maximum number of reports.
+        """
+        return self._truncated
@@ -162,23 +162,27 @@ class SearchFilters:
 
 class DateFilter:
     """
-    Data structure representing a date range used to filter reports.
+    Data structure representing a date range used to filter reports, by submission date and/or by the dates of observations mentioned in the report.
     """
 
-    def __init__(self, start_date: Union[datetime, None] = None, end_date: Union[datetime, None] = None):
+    def __init__(self, start_date: Union[datetime, None] = None, end_date: Union[datetime, None] = None, observed_start_date: Union[datetime, None] = None, observed_end_date: Union[datetime, None] = None):
         """
-        Creates a DateFilter object with the given criteria. Either start or end date must be not None for the object to be valid.
+        Creates a DateFilter object with the given criteria. At least one date must be not None for the object to be valid.
 
         Args:
-            start_date (datetime, optional): Datetime object representing the start of the date range to filter by. Defaults to None.
-            end_date (datetime, optional): Datetime object representing the start of the date range to filter by. Defaults to None.
+            start_date (datetime, optional): Datetime object representing the start of the submission date range to filter by. Defaults to None.
+            end_date (datetime, optional): Datetime object representing the end of the submission date range to filter by. Defaults to None.
+            observed_start_date (datetime, optional): Datetime object representing the start of the observation date range to filter by. Defaults to None.
+            observed_end_date (datetime, optional): Datetime object representing the end of the observation date range to filter by. Defaults to None.
 
         Raises:
-            TypeError: When neither start or end date is specified.
+            TypeError: When no date is specified.
         """
-        if start_date or end_date:
+        if start_date or end_date or observed_start_date or observed_end_date:
             self.start_date = start_date
             self.end_date = end_date
+            self.observed_start_date = observed_start_date
+            self.observed_end_date = observed_end_date
         else:
             raise TypeError("Either start or end date must be specfied to create a valid DateFilter object.")
 
@@ -187,7 +191,10 @@ class DateFilter:
         Returns:
             str: A string describing the search filters specified by this object.
         """
-        return f"Submitted between {self.start_date} and {self.end_date}"
+        description = f"Submitted between {self.start_date} and {self.end_date}"
+        if self.observed_start_date or self.observed_end_date:
+            description += f", observed between {self.observed_start_date} and {self.observed_end_date}"
+        return description
 
     def __eq__(self, other) -> bool:
         """
@@ -201,7 +208,9 @@ class DateFilter:
         """
         if isinstance(other, DateFilter):
             return (self.start_date == other.start_date
-                    and self.end_date == other.end_date)
+                    and self.end_date == other.end_date
+                    and self.observed_start_date == other.observed_start_date
+                    and self.observed_end_date == other.observed_end_date)
         else:
             return False
 
@@ -244,3 +253,43 @@ class DateFilter:
             self._end_date = date
         else:
             raise TypeError("End date must be a valid datetime object.")
+
+    @property
+    def observed_start_date(self) -> datetime:
+        """
+        The start of the observation date range to filter by.
+        """
+        return self._observed_start_date
+
+    @observed_start_date.setter
+    def observed_start_date(self, date: datetime):
+        """
+        Sets the start observation date to filter by.
+
+        Args:
+            date (datetime): The start of the observation date range to filter by.
+        """
+        if date is None or type(date) == datetime:
+            self._observed_start_date = date
+        else:
+            raise TypeError("Observed start date must be a valid datetime object.")
+
+    @property
+    def observed_end_date(self) -> datetime:
+        """
+        The end of the observation date range to filter by.
+        """
+        return self._observed_end_date
+
+    @observed_end_date.setter
+    def observed_end_date(self, date: datetime):
+        """
+        Sets the end observation date to filter by.
+
+        Args:
+            date (datetime): The end of the observation date range to filter by.
+        """
+        if date is None or type(date) == datetime:
+            self._observed_end_date = date
+        else:
+            raise TypeError("Observed end date must be a valid datetime object.")
@@ -1,5 +1,7 @@
 create table if not exists Aliases (
     alias varchar(255) primary key,
     objectIDFK varchar(255) not null,
-    foreign key (objectIDFK) references Objects(objectID) on update cascade on delete cascade
+    normalizedAlias varchar(255) not null default '',
+    foreign key (objectIDFK) references Objects(objectID) on update cascade on delete cascade,
+    index normalizedAliasIndex (normalizedAlias)
 )
\ No newline at end of file
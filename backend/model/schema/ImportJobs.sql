@@ -0,0 +1,21 @@
+create table if not exists ImportJobs (
+    jobID int unsigned auto_increment primary key,
+    state enum('queued', 'running', 'cancelling', 'cancelled', 'completed', 'failed') not null default 'queued',
+    startATel int unsigned not null,
+    currentATel int unsigned not null,
+    newestATel int unsigned,
+    importedCount int unsigned not null default 0,
+    skippedCount int unsigned not null default 0,
+    failedCount int unsigned not null default 0,
+    rate double not null default 0,
+    requestRate double not null default 0,
+    lastError varchar(2048),
+    delaySeconds double not null default 0,
+    rangeSize int unsigned not null default 0,
+    workerID varchar(255),
+    createdAt timestamp not null default current_timestamp,
+    startedAt timestamp null,
+    heartbeatAt timestamp null,
+    finishedAt timestamp null,
+    index jobStates (state, jobID)
+)
\ No newline at end of file
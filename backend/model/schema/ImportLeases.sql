@@ -0,0 +1,14 @@
+create table if not exists ImportLeases (
+    jobIDFK int unsigned not null,
+    startATel int unsigned not null,
+    endATel int unsigned not null,
+    currentATel int unsigned not null,
+    stopATel int unsigned,
+    importedCount int unsigned not null default 0,
+    skippedCount int unsigned not null default 0,
+    failedCount int unsigned not null default 0,
+    workerID varchar(255) not null,
+    heartbeatAt timestamp not null default current_timestamp,
+    foreign key (jobIDFK) references ImportJobs(jobID) on update cascade on delete cascade,
+    primary key (jobIDFK, startATel)
+)
\ No newline at end of file
@@ -0,0 +1,13 @@
+create table if not exists ImportLedger (
+    atelNum int unsigned primary key,
+    status enum('imported', 'failed', 'error') not null,
+    failureClass varchar(64),
+    lastError varchar(2048),
+    parserVersion int unsigned not null,
+    downloadSeconds double not null default 0,
+    parseSeconds double not null default 0,
+    insertSeconds double not null default 0,
+    attempts int unsigned not null default 1,
+    updatedAt timestamp not null default current_timestamp on update current_timestamp,
+    index ledgerStatus (status, parserVersion, atelNum)
+)
\ No newline at end of file
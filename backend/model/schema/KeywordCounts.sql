@@ -0,0 +1,4 @@
+create table if not exists KeywordCounts (
+    keyword varchar(255) primary key,
+    reportCount int unsigned not null default 0
+)
\ No newline at end of file
@@ -2,5 +2,8 @@ create table if not exists Metadata (
     metadata enum('metadata') primary key,
     lastUpdatedDate timestamp not null default now(),
     nextATelnum int not null default 1,
-    schemaVersion int not null default 0
+    schemaVersion int not null default 0,
+    dataGeneration bigint unsigned not null default 0,
+    aliasVersion bigint unsigned not null default 0,
+    referenceVersion bigint unsigned not null default 0
 )
\ No newline at end of file
@@ -2,5 +2,6 @@ create table if not exists ObservationDates (
     atelNumFK int unsigned not null,
     obDate datetime not null,
     foreign key (atelNumFK) references Reports(atelNum) on update cascade on delete cascade,
-    primary key (atelNumFK, obDate)
+    primary key (atelNumFK, obDate),
+    index observedReports (obDate, atelNumFK)
 )
\ No newline at end of file
@@ -0,0 +1,11 @@
+create table if not exists ReferenceChecks (
+    atelNumFK int unsigned not null primary key,
+    etag varchar(255),
+    lastModified varchar(64),
+    contentHash char(64),
+    unchangedCount int unsigned not null default 0,
+    checkedAt timestamp null,
+    nextCheckAt timestamp not null default current_timestamp,
+    foreign key (atelNumFK) references Reports(atelNum) on update cascade on delete cascade,
+    index nextChecks (nextCheckAt)
+)
\ No newline at end of file
@@ -0,0 +1,14 @@
+create table if not exists ReportFingerprints (
+    atelNumFK int unsigned not null primary key,
+    htmlHash char(64) not null,
+    parserVersion int unsigned not null,
+    reportHash char(64) not null,
+    objectsHash char(64) not null,
+    datesHash char(64) not null,
+    coordsHash char(64) not null,
+    refsHash char(64) not null,
+    referencedByHash char(64) not null,
+    updatedAt timestamp not null default current_timestamp on update current_timestamp,
+    foreign key (atelNumFK) references Reports(atelNum) on update cascade on delete cascade,
+    index fingerprintVersions (parserVersion, atelNumFK)
+)
\ No newline at end of file
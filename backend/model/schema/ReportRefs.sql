@@ -1,5 +1,8 @@
 create table if not exists ReportRefs (
     atelNum int unsigned not null,
     refReport int unsigned not null,
-    primary key (atelNum, refReport)
+    refID bigint unsigned not null auto_increment,
+    primary key (atelNum, refReport),
+    unique key referenceIDs (refID),
+    index referencingReports (refReport, atelNum)
 )
\ No newline at end of file
@@ -4,5 +4,8 @@ create table if not exists Reports (
     authors varchar(8192) not null,
     body varchar(5120) not null,
     submissionDate timestamp not null,
-    keywords set('{}') not null default ''
+    keywords set('{}') not null default '',
+    threadId int unsigned not null default 0,
+    index submissionOrder (submissionDate, atelNum),
+    index threadReports (threadId, submissionDate, atelNum)
 )
\ No newline at end of file
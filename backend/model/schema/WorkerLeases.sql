@@ -0,0 +1,5 @@
+create table if not exists WorkerLeases (
+    leaseName varchar(64) primary key,
+    workerID varchar(255) not null,
+    expiresAt timestamp not null default current_timestamp
+)
\ No newline at end of file
@@ -0,0 +1,4 @@
+create table if not exists YearCounts (
+    year smallint unsigned primary key,
+    reportCount int unsigned not null default 0
+)
\ No newline at end of file
@@ -0,0 +1,2 @@
+alter table Aliases add column normalizedAlias varchar(255) not null default '';
+alter table Aliases add index normalizedAliasIndex (normalizedAlias);
\ No newline at end of file
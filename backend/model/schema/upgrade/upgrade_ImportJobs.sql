@@ -0,0 +1,3 @@
+alter table ImportJobs add column rangeSize int unsigned not null default 0;
+alter table ImportJobs add column newestATel int unsigned;
+alter table ImportJobs add column requestRate double not null default 0;
\ No newline at end of file
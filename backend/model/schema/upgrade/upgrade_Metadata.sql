@@ -0,0 +1,3 @@
+alter table Metadata add column dataGeneration bigint unsigned not null default 0;
+alter table Metadata add column aliasVersion bigint unsigned not null default 0;
+alter table Metadata add column referenceVersion bigint unsigned not null default 0;
\ No newline at end of file
@@ -0,0 +1,2 @@
+alter table ObservationDates
+add index observedReports (obDate, atelNumFK);
\ No newline at end of file
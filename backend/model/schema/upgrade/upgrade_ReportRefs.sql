@@ -0,0 +1,3 @@
+alter table ReportRefs
+add index referencingReports (refReport, atelNum);
+alter table ReportRefs add column refID bigint unsigned not null auto_increment, add unique key referenceIDs (refID);
\ No newline at end of file
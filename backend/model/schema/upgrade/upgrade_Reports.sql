@@ -1,2 +1,3 @@
-alter table Reports
-modify column authors varchar(8192) not null;
\ No newline at end of file
+alter table Reports add index submissionOrder (submissionDate, atelNum);
+alter table Reports add column threadId int unsigned not null default 0;
+alter table Reports add index threadReports (threadId, submissionDate, atelNum);
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+Backend integration benchmark for the importer, importing reports from a local mock of the AT website through the whole download, render, parse and insert pipeline, so regressions in reports per second are caught without the real website.
+
+Requires the database and the headless browser used to render reports.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import time
+import unittest
+from unittest import mock
+
+from controller.importer.download_scheduler import DownloadScheduler
+from controller.importer.importer import import_all_reports
+from model.db import db_interface as db
+from test.mock_atel import MockATelServer
+
+# The ATel number of the first benchmark report, after any real report so none are overwritten.
+BENCHMARK_START_ATEL = 900000
+
+# The number of reports imported by the benchmark.
+BENCHMARK_REPORTS = 50
+
+# The number of seconds the mock website waits before each response.
+BENCHMARK_LATENCY = 0.05
+
+# The lowest accepted number of reports imported per second.
+MIN_REPORTS_PER_SECOND = 0.5
+
+class TestImportThroughput(unittest.TestCase):
+    def setUp(self):
+        self.next_atel = db.get_next_atel_num()
+        self.object_ids = self._stored_objects()
+        db.delete_reports(BENCHMARK_START_ATEL, BENCHMARK_START_ATEL + BENCHMARK_REPORTS)
+
+        self.server = MockATelServer(BENCHMARK_START_ATEL + BENCHMARK_REPORTS - 1, BENCHMARK_LATENCY)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+        db.delete_reports(BENCHMARK_START_ATEL, BENCHMARK_START_ATEL + BENCHMARK_REPORTS)
+        db.delete_objects(sorted(self._stored_objects() - self.object_ids))
+        db.set_next_atel_num(self.next_atel)
+
+    def test_reports_per_second(self):
+        db.set_next_atel_num(BENCHMARK_START_ATEL)
+
+        # The mock website is not rate limited, so only the pipeline is measured
+        scheduler = DownloadScheduler(rate=1000, burst=1000)
+        with mock.patch.dict(os.environ, {'ATEL_BASE_URL': self.server.base_url}), \
+                mock.patch('controller.importer.importer.download_scheduler', scheduler):
+            start = time.monotonic()
+            import_all_reports()
+            elapsed = time.monotonic() - start
+            scheduler.close_session()
+
+        self.assertEqual(db.get_next_atel_num(), BENCHMARK_START_ATEL + BENCHMARK_REPORTS)
+        for atel_num in (BENCHMARK_START_ATEL, BENCHMARK_START_ATEL + BENCHMARK_REPORTS - 1):
+            self.assertTrue(db.report_exists(atel_num))
+
+        rate = BENCHMARK_REPORTS / elapsed
+        print(f'Imported {BENCHMARK_REPORTS} reports in {elapsed:.1f}s ({rate:.2f} reports/s)', flush=True)
+        self.assertGreaterEqual(rate, MIN_REPORTS_PER_SECOND)
+
+    def _stored_objects(self) -> set[str]:
+        # Objects found in the benchmark reports are added from SIMBAD, so are removed afterwards
+        cn = db._connect()
+        cur = cn.cursor()
+        cur.execute("select objectID from Objects")
+        object_ids = set(row[0] for row in cur.fetchall())
+        cur.close()
+        cn.close()
+        return object_ids
+
+if __name__ == '__main__':
+    unittest.main()
@@ -26,6 +26,8 @@ import statistics as st
 import unittest
 
 from model.constants import FIXED_KEYWORDS
+from model.ds.search_filters import DateFilter, SearchFilters
+import model.db.db_interface as db
 from app import app
 
 class TestNFR5(unittest.TestCase):
@@ -109,3 +111,92 @@ class TestNFR14(unittest.TestCase):
         response = self.app.post('/authenticate', json=username_injection)
         self.assertEqual(response.json,"Invalid credentials")
     
+
+class TestAutocompleteSpeed(unittest.TestCase):
+    """
+    Object name suggestions must be returned within 5 ms, so they can be shown as the user types.
+    """
+
+    def setUp(self):
+        self.app = app.test_client()
+
+    def test_autocomplete_speed(self):
+        # Load the alias index
+        response = self.app.get('/autocomplete', query_string={"q": "m"})
+        self.assertEqual(response.json.get("flag"), 1)
+
+        response_times = []
+        for prefix in ["m", "sn", "ngc", "at 2021", "v* v"]:
+            start_time = datetime.now()
+            response = self.app.get('/autocomplete', query_string={"q": prefix})
+            response_times.append(datetime.now() - start_time)
+            self.assertEqual(response.json.get("flag"), 1)
+
+        # Check the median suggestion time is under 5 ms.
+        if st.median(response_times) > timedelta(milliseconds=5):
+            self.fail("Autocomplete took longer than 5 ms.")
+
+class TestObservationDateSpeed(unittest.TestCase):
+    """
+    Benchmark of observation date filtering on a synthetic corpus of reports, each mentioning several observation dates.
+    """
+
+    # Range of ATel numbers used for the synthetic reports.
+    FIRST_ATEL = 900000
+    CORPUS_SIZE = 20000
+    DATES_PER_REPORT = 3
+
+    def setUp(self):
+        cn = db._connect()
+        cur = cn.cursor()
+        base = datetime(2010, 1, 1)
+        reports = []
+        ob_dates = []
+        for i in range(self.CORPUS_SIZE):
+            atel_num = self.FIRST_ATEL + i
+            submitted = base + timedelta(hours=6 * i)
+            reports.append((atel_num, "nfr_benchmark", "A", "B", submitted, "optical"))
+            for d in range(self.DATES_PER_REPORT):
+                ob_dates.append((atel_num, submitted - timedelta(days=d)))
+        cur.executemany("insert into Reports (atelNum, title, authors, body, submissionDate, keywords) "
+                        "values (%s, %s, %s, %s, %s, %s)", reports)
+        cur.executemany("insert into ObservationDates (atelNumFK, obDate) values (%s, %s)", ob_dates)
+        cn.commit()
+        cur.close()
+        cn.close()
+
+    def tearDown(self):
+        cn = db._connect()
+        cur = cn.cursor()
+        cur.execute("delete from Reports where atelNum >= %s", (self.FIRST_ATEL,))
+        cn.commit()
+        cur.close()
+        cn.close()
+
+    def test_observed_date_speed(self):
+        filters = SearchFilters(keywords=["optical"])
+        date_filter = DateFilter(observed_start_date=datetime(2012, 1, 1), observed_end_date=datetime(2012, 1, 31))
+
+        response_times = []
+        for _ in range(5):
+            start_time = datetime.now()
+            results = db.find_reports_by_object(filters, date_filter)
+            response_times.append(datetime.now() - start_time)
+
+        # 4 reports a day are submitted, each observed on that day and the two days before.
+        self.assertTrue(len(results) >= 4 * 31)
+        self.assertTrue(all(r.title == "nfr_benchmark" or r.atel_num < self.FIRST_ATEL for r in results))
+
+        # The index on observation dates is used, rather than scanning every report.
+        cn = db._connect()
+        cur = cn.cursor()
+        where_clause, data = db._build_where_clause(None, date_filter)
+        cur.execute("explain select atelNum from Reports " + where_clause, data)
+        plan = cur.fetchall()
+        cur.close()
+        cn.close()
+        self.assertTrue(any(row[6] == "observedReports" for row in plan))
+
+        print(f"Observation date filter on {self.CORPUS_SIZE} reports: median {st.median(response_times)}", flush=True)
+        if st.median(response_times) > timedelta(seconds=1):
+            self.fail("Observation date filtering took longer than 1 second.")
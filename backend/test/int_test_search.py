@@ -103,6 +103,39 @@ class TestFR6(ut.TestCase):
         self.assertIn(79, atel_nums)
         self.assertIn(82, atel_nums)
 
+
+    def test_facets_A(self):
+        response = self.app.post('/search', json=self.test_data_A)
+        reports_list = response.json.get('report_list')
+
+        response = self.app.post('/facets', json=self.test_data_A)
+        self.assertEqual(response.json.get('flag'), 1)
+
+        # Each report is counted once in its submission year.
+        years = response.json.get('years')
+        self.assertEqual(sum(y['count'] for y in years), len(reports_list))
+
+        # Unfiltered counts include every report.
+        response = self.app.post('/facets', json={})
+        self.assertEqual(response.json.get('flag'), 1)
+        self.assertTrue(sum(y['count'] for y in response.json.get('years')) >= len(reports_list))
+
+
+    def test_timeline_A(self):
+        response = self.app.post('/search', json=self.test_data_A)
+        reports_list = response.json.get('report_list')
+
+        # Each report is counted once in its submission month.
+        response = self.app.post('/timeline', json=self.test_data_A)
+        self.assertEqual(response.json.get('flag'), 1)
+        bins = response.json.get('bins')
+        self.assertEqual(sum(b['count'] for b in bins), len(reports_list))
+        self.assertEqual([b['start'] for b in bins], sorted(b['start'] for b in bins))
+        self.assertTrue(all(b['start'].endswith('-01') for b in bins))
+
+        response = self.app.post('/timeline', json=dict(self.test_data_A, bin='fortnight'))
+        self.assertEqual(response.json.get('flag'), 2)
+
     
     def test_search_data_B(self):
         response = self.app.post('/search', json=self.test_data_B) 
@@ -0,0 +1,201 @@
+"""
+A local mock of The Astronomer's Telegram website, serving the test/res/atel*.html fixtures under the same ?read=N URLs, so the importer can be tested and benchmarked offline.
+
+Reports with a fixture are served as they are, tagged with an ETag so unchanged pages can be requested conditionally. Every other report up to the newest report is a synthetic variant of a fixture, renumbered and retitled so each report is distinct. Reports after the newest report, or listed as missing, are served the website's "does not exist" page.
+
+To import from the mock website, run it with:
+    python -m test.mock_atel --port 8081 --newest 1000 --latency 0.2
+and start the backend with the ATEL_BASE_URL environment variable set to http://localhost:8081/.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from urllib.parse import parse_qs, urlparse
+import argparse
+import hashlib
+import os
+import re
+import time
+
+# The folder containing the fixtures, named atel<ATel number>.html.
+FIXTURES_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'res')
+
+# The page served for a report that does not exist, laid out like the AT website's.
+MISSING_PAGE: str = ('<html><head><title>The Astronomer\'s Telegram</title></head><body>'
+                     '<p>The Astronomer\'s Telegram</p><p>This ATel does not appear to exist.</p>'
+                     '</body></html>')
+
+def load_fixtures(fixtures_dir: str = FIXTURES_DIR) -> dict[int, str]:
+    """
+    Loads the fixtures of ATel reports' pages.
+
+    Args:
+        fixtures_dir (str, optional): The folder containing the fixtures. Defaults to FIXTURES_DIR.
+
+    Returns:
+        dict[int, str]: The HTML of each fixture, by ATel number.
+    """
+    fixtures = {}
+    for name in os.listdir(fixtures_dir):
+        match = re.fullmatch(r'atel(\d+)\.html', name)
+        if match is not None:
+            with open(os.path.join(fixtures_dir, name), 'r') as f:
+                fixtures[int(match.group(1))] = f.read()
+    return fixtures
+
+class MockATelServer:
+    """
+    A local HTTP server serving ATel reports' pages, run on a background thread.
+    """
+
+    def __init__(self,
+                 newest_atel: int,
+                 latency: float = 0.0,
+                 missing: set[int] = frozenset(),
+                 port: int = 0,
+                 fixtures: dict[int, str] = None):
+        """
+        Creates a server, which is not started.
+
+        Args:
+            newest_atel (int): The ATel number of the newest report. Reports after it do not exist.
+            latency (float, optional): The number of seconds the server waits before responding. Defaults to 0.
+            missing (set[int], optional): The ATel numbers of reports before the newest report that do not exist. Defaults to none.
+            port (int, optional): The port to listen on, or 0 for any free port. Defaults to 0.
+            fixtures (dict[int, str], optional): The HTML of reports' pages by ATel number. Defaults to the fixtures in FIXTURES_DIR.
+        """
+        self.newest_atel = newest_atel
+        self.latency = latency
+        self.missing = set(missing)
+        self.fixtures = fixtures if fixtures is not None else load_fixtures()
+        self.requests = 0
+
+        self._lock = Lock()
+        self._templates = sorted(self.fixtures.items())
+        self._httpd = ThreadingHTTPServer(('localhost', port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """
+        The URL of the server's website, to set as the ATEL_BASE_URL environment variable.
+        """
+        return f'http://localhost:{self._httpd.server_address[1]}/'
+
+    def start(self):
+        """
+        Starts serving on a background thread.
+        """
+        self._thread = Thread(target=self._httpd.serve_forever, name='mock-atel', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops serving and closes the server's socket.
+        """
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def page(self, atel_num: int) -> str:
+        """
+        Generates the page of a report.
+
+        Args:
+            atel_num (int): The ATel number of the report.
+
+        Returns:
+            str: The HTML of the report's page, or of the "does not exist" page.
+        """
+        if atel_num < 1 or atel_num > self.newest_atel or atel_num in self.missing:
+            return MISSING_PAGE
+        if atel_num in self.fixtures:
+            return self.fixtures[atel_num]
+
+        # Renumbers and retitles a fixture, chosen by the ATel number so a report's page is always the same
+        template_num, html = self._templates[atel_num % len(self._templates)]
+        html = re.sub(rf'ATel #{template_num}\b', f'ATel #{atel_num}', html)
+        return html.replace('<h1 class="title">', f'<h1 class="title">Synthetic report {atel_num}: ', 1)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _handler(self) -> type:
+        """
+        Returns:
+            type: The request handler class, serving this server's pages.
+        """
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.latency > 0:
+                    time.sleep(server.latency)
+
+                read = parse_qs(urlparse(self.path).query).get('read', [''])[0]
+                body = server.page(int(read) if read.isdigit() else 0).encode('utf-8')
+
+                # Pages are tagged by their content, so conditional requests for unchanged pages are answered without them
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Requests are not logged, as benchmarks make thousands of them
+                pass
+
+        return Handler
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serves a local mock of The Astronomer\'s Telegram website.')
+    parser.add_argument('--port', type=int, default=8081, help='the port to listen on')
+    parser.add_argument('--newest', type=int, default=max(load_fixtures()), help='the ATel number of the newest report')
+    parser.add_argument('--latency', type=float, default=0.0, help='the number of seconds to wait before each response')
+    args = parser.parse_args()
+
+    server = MockATelServer(args.newest, args.latency, port=args.port)
+    print(f'Serving ATel #1 to #{args.newest} at {server.base_url}', flush=True)
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,200 @@
+""" Test suite for the alias resolver.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import unittest as ut
+from threading import Thread
+from unittest.mock import MagicMock
+
+from model.db.alias_resolver import AliasResolver, PrefixIndex, normalize_alias
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+##############################
+# Testing: normalize_alias() #
+##############################
+class TestNormalizeAlias(ut.TestCase):
+    def test_case_and_whitespace(self):
+        '''
+        Case 1: Letter case and whitespace are ignored.
+        '''
+        self.assertEqual(normalize_alias("M  31"), "m31")
+        self.assertEqual(normalize_alias(" m31 "), "m31")
+        self.assertEqual(normalize_alias("SN 2011fe"), normalize_alias("sn2011FE"))
+
+
+    def test_simbad_prefixes(self):
+        '''
+        Case 2: SIMBAD prefixes are ignored, but not when they are the whole name.
+        '''
+        self.assertEqual(normalize_alias("NAME Crab Nebula"), "crabnebula")
+        self.assertEqual(normalize_alias("V* V1500 Cyg"), "v1500cyg")
+        self.assertEqual(normalize_alias("V*V1500 Cyg"), "v1500cyg")
+        self.assertEqual(normalize_alias("* alf Cen"), "alfcen")
+        self.assertEqual(normalize_alias("** STF 2272"), "stf2272")
+        self.assertEqual(normalize_alias("Name"), "name")
+        self.assertEqual(normalize_alias("NAMEless"), "nameless")
+
+
+##########################
+# Testing: PrefixIndex() #
+##########################
+class TestPrefixIndex(ut.TestCase):
+    def test_matches(self):
+        '''
+        Case 1: Aliases starting with the prefix are found in normalized order,
+        including aliases added later.
+        '''
+        index = PrefixIndex([("SN 2011fe", "SN 2011fe"), ("M  31", "M  31"), ("SN 2014J", "SN 2014J")])
+        index.add("NAME SN Andromeda", "M  31")
+        index.add("SN 2011fe", "SN 2011fe")
+
+        self.assertEqual(len(index), 4)
+        self.assertEqual(list(index.matches("sn 201")), [("SN 2011fe", "SN 2011fe"), ("SN 2014J", "SN 2014J")])
+        self.assertEqual(list(index.matches("SN")), [("SN 2011fe", "SN 2011fe"), ("SN 2014J", "SN 2014J"), ("NAME SN Andromeda", "M  31")])
+        self.assertEqual(list(index.matches("sn", limit=1)), [("SN 2011fe", "SN 2011fe")])
+        self.assertEqual(list(index.matches("x")), [])
+
+
+############################
+# Testing: AliasResolver() #
+############################
+class TestAliasResolver(ut.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.version = 1
+        self.load = MagicMock(return_value=[("V* V1500 Cyg", "Nova Cyg 1975"), ("Nova Cyg 1975", "Nova Cyg 1975")])
+        self.resolver = AliasResolver(self.load, lambda: self.version, lambda: {"Nova Cyg 1975": 3}, check_interval=5.0, clock=self.clock)
+
+
+    def test_resolve(self):
+        '''
+        Case 1: Aliases are resolved by their normalized form, loading them once.
+        '''
+        self.assertEqual(self.resolver.resolve("v1500 cyg"), "Nova Cyg 1975")
+        self.assertEqual(self.resolver.resolve("NOVA CYG 1975"), "Nova Cyg 1975")
+        self.assertIsNone(self.resolver.resolve("M 31"))
+        self.load.assert_called_once()
+
+
+    def test_add(self):
+        '''
+        Case 2: Added aliases are resolved immediately, without replacing existing ones.
+        '''
+        self.resolver.resolve("m31")
+        self.resolver.add("M  31", ["NAME Andromeda Galaxy", "V1500 Cyg"])
+        self.assertEqual(self.resolver.resolve("m31"), "M  31")
+        self.assertEqual(self.resolver.resolve("Andromeda Galaxy"), "M  31")
+        self.assertEqual(self.resolver.resolve("V1500 Cyg"), "Nova Cyg 1975")
+        self.load.assert_called_once()
+
+
+    def test_version_reload(self):
+        '''
+        Case 3: The aliases are reloaded when the version changes, checked at most once per interval.
+        '''
+        self.resolver.resolve("m31")
+        self.load.return_value = [("M 31", "M  31")]
+        self.version = 2
+
+        self.assertIsNone(self.resolver.resolve("m31"))
+        self.clock.now = 5.0
+        self.assertEqual(self.resolver.resolve("m31"), "M  31")
+        self.assertIsNone(self.resolver.resolve("V1500 Cyg"))
+        self.assertEqual(self.load.call_count, 2)
+
+
+    def test_complete(self):
+        '''
+        Case 4: Completions list each object once, ranked by its number of reports.
+        '''
+        self.resolver.resolve("m31")
+        self.resolver.add("NOVA Her 1991", ["V* V838 Her"])
+
+        self.assertEqual(self.resolver.complete("v", 10), [("V* V1500 Cyg", "Nova Cyg 1975", 3), ("V* V838 Her", "NOVA Her 1991", 0)])
+        self.assertEqual(self.resolver.complete("nova", 1), [("Nova Cyg 1975", "Nova Cyg 1975", 3)])
+
+
+
+    def test_report_counts(self):
+        '''
+        Case 5: Report counts are updated in place, and reloaded on their own interval
+        without reloading the aliases.
+        '''
+        counts = {"Nova Cyg 1975": 3}
+        resolver = AliasResolver(self.load, lambda: self.version, lambda: dict(counts),
+                                 check_interval=5.0, count_interval=60.0, clock=self.clock)
+        resolver.resolve("m31")
+        resolver.count_reports(["Nova Cyg 1975", "M  31"])
+        resolver.count_reports(["M  31"], -1)
+        self.assertEqual(resolver.complete("nova", 1), [("Nova Cyg 1975", "Nova Cyg 1975", 4)])
+
+        counts["Nova Cyg 1975"] = 7
+        self.clock.now = 5.0
+        self.assertEqual(resolver.complete("nova", 1), [("Nova Cyg 1975", "Nova Cyg 1975", 4)])
+        self.clock.now = 60.0
+        self.assertEqual(resolver.complete("nova", 1), [("Nova Cyg 1975", "Nova Cyg 1975", 7)])
+        self.load.assert_called_once()
+
+
+    def test_cache(self):
+        '''
+        Case 6: Cached aliases are resolved without being suggested as completions.
+        '''
+        self.resolver.resolve("m31")
+        self.resolver.cache("v1500   CYG", "Nova Cyg 1975")
+        self.resolver.cache("m  31", "M  31")
+        self.assertEqual(self.resolver.resolve("M31"), "M  31")
+        self.assertEqual(self.resolver.complete("m", 10), [])
+        self.assertEqual(self.resolver.complete("v", 10), [("V* V1500 Cyg", "Nova Cyg 1975", 3)])
+        self.load.assert_called_once()
+
+
+    def test_reload_outside_lock(self):
+        '''
+        Case 7: Lookups use the current aliases while they are being reloaded.
+        '''
+        self.resolver.resolve("m31")
+        results = []
+
+        def load():
+            lookup = Thread(target=lambda: results.append(self.resolver.resolve("V1500 Cyg")))
+            lookup.start()
+            lookup.join(timeout=5.0)
+            return [("M 31", "M  31")]
+
+        self.load.side_effect = load
+        self.version = 2
+        self.clock.now = 5.0
+
+        self.assertEqual(self.resolver.resolve("m31"), "M  31")
+        self.assertEqual(results, ["Nova Cyg 1975"])
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,237 @@
+""" Test suite for the citation graph.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import unittest as ut
+from threading import Thread
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from model.db import citation_graph
+from model.db.citation_graph import CitationGraph, OVERLAY_MAX_REFERENCES, REFERENCE_ID_OVERLAP, SCORE_REFRESH_SECONDS, pagerank
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+#######################
+# Testing: pagerank() #
+#######################
+class TestPageRank(ut.TestCase):
+    def test_cycle(self):
+        '''
+        Case 1: Nodes of a cycle have equal scores, summing to one.
+        '''
+        scores = pagerank(np.array([0, 1, 2, 3]), np.array([1, 2, 0]))
+        self.assertAlmostEqual(scores.sum(), 1.0)
+        np.testing.assert_allclose(scores, [1 / 3] * 3)
+
+
+    def test_star(self):
+        '''
+        Case 2: A node referenced by every other node scores highest, and
+        nodes without references spread their score over all nodes.
+        '''
+        # 1, 2 and 3 each reference 0, which references nothing.
+        scores = pagerank(np.array([0, 0, 1, 2, 3]), np.array([0, 0, 0]))
+        self.assertAlmostEqual(scores.sum(), 1.0)
+        self.assertEqual(int(np.argmax(scores)), 0)
+        self.assertAlmostEqual(scores[1], scores[3])
+
+
+    def test_empty(self):
+        '''
+        Case 3: An empty graph has no scores.
+        '''
+        self.assertEqual(len(pagerank(np.array([0]), np.array([], dtype=np.int32))), 0)
+
+
+############################
+# Testing: CitationGraph() #
+############################
+class TestCitationGraph(ut.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.version = 1
+        self.rows = [(1000, 2, 1), (1001, 3, 1), (1002, 3, 2), (1003, 4, 3), (1004, 3, 1)]
+        self.load = MagicMock(side_effect=lambda after_id: [row for row in self.rows if row[0] > after_id])
+        self.graph = CitationGraph(self.load, lambda: (self.version, max([0] + [row[0] for row in self.rows])),
+                                   check_interval=5.0, clock=self.clock)
+
+
+    def test_lookup(self):
+        '''
+        Case 1: References are found in both directions, ignoring duplicates,
+        and loaded once.
+        '''
+        self.assertEqual(self.graph.references(3), [1, 2])
+        self.assertEqual(self.graph.referenced_by(1), [2, 3])
+        self.assertEqual(self.graph.in_degree(1), 2)
+        self.assertEqual(self.graph.references(1), [])
+        self.assertEqual(self.graph.references(100), [])
+        self.assertEqual(len(self.graph), 4)
+        self.load.assert_called_once_with(0)
+
+
+    def test_score(self):
+        '''
+        Case 2: The most referenced report scores highest, and reports not part
+        of any reference score zero.
+        '''
+        self.assertGreater(self.graph.score(1), self.graph.score(2))
+        self.assertGreater(self.graph.score(2), self.graph.score(4))
+        self.assertEqual(self.graph.score(0), 0.0)
+        self.assertEqual(self.graph.score(100), 0.0)
+
+
+    def test_add_references(self):
+        '''
+        Case 3: Added references are found immediately and change the scores
+        once the overlay is merged, and loading them again from the database
+        does not duplicate them.
+        '''
+        self.graph.load()
+        score = self.graph.score(4)
+        self.graph.add_references([(5, 4), (6, 4), (3, 1)])
+        self.rows += [(1005, 5, 4), (1006, 6, 4)]
+
+        self.assertEqual(self.graph.referenced_by(4), [5, 6])
+        self.assertEqual(self.graph.referenced_by(1), [2, 3])
+        self.assertEqual(len(self.graph), 6)
+        self.assertEqual(self.graph.score(4), score)
+
+        self.clock.now = 5.0
+        self.assertEqual(self.graph.referenced_by(4), [5, 6])
+        self.assertEqual(len(self.graph), 6)
+        self.load.assert_called_with(1004 - REFERENCE_ID_OVERLAP)
+        self.assertEqual(self.graph.score(4), score)
+
+        self.clock.now = SCORE_REFRESH_SECONDS
+        self.assertGreater(self.graph.score(4), score)
+        self.assertGreater(self.graph.score(5), 0.0)
+        self.assertEqual(self.graph.referenced_by(4), [5, 6])
+        self.assertEqual(len(self.graph), 6)
+
+
+    def test_overlay_merge(self):
+        '''
+        Case 4: Adding many references rebuilds the arrays, keeping every reference.
+        '''
+        self.graph.load()
+        self.graph.add_references([(10 + i, 1) for i in range(OVERLAY_MAX_REFERENCES + 1)])
+
+        self.assertEqual(len(self.graph), 4 + OVERLAY_MAX_REFERENCES + 1)
+        self.assertEqual(self.graph.in_degree(1), 2 + OVERLAY_MAX_REFERENCES + 1)
+        self.assertEqual(self.graph.references(3), [1, 2])
+
+
+    def test_new_references(self):
+        '''
+        Case 5: References stored by other workers are loaded incrementally,
+        checked at most once per interval.
+        '''
+        self.graph.load()
+        self.rows += [(1005, 8, 3)]
+
+        self.assertEqual(self.graph.referenced_by(3), [4])
+        self.clock.now = 5.0
+        self.assertEqual(self.graph.referenced_by(3), [4, 8])
+        self.assertEqual(self.graph.references(3), [1, 2])
+        self.assertEqual(self.load.call_count, 2)
+        self.load.assert_called_with(1004 - REFERENCE_ID_OVERLAP)
+
+
+    def test_version_reload(self):
+        '''
+        Case 6: Every reference is reloaded when references are removed,
+        or the stored references are replaced.
+        '''
+        self.graph.load()
+        self.rows = [(1005, 7, 3)]
+        self.version = 2
+
+        self.clock.now = 5.0
+        self.assertEqual(self.graph.referenced_by(3), [7])
+        self.assertEqual(self.graph.references(3), [])
+        self.load.assert_called_with(0)
+
+        self.rows = [(1, 9, 3)]
+        self.clock.now = 10.0
+        self.assertEqual(self.graph.referenced_by(3), [9])
+        self.load.assert_called_with(0)
+
+
+    def test_reload_outside_lock(self):
+        '''
+        Case 7: Lookups use the current graph while it is being reloaded.
+        '''
+        self.graph.load()
+        results = []
+
+        def load(after_id):
+            lookup = Thread(target=lambda: results.append(self.graph.referenced_by(3)))
+            lookup.start()
+            lookup.join(timeout=5.0)
+            return [(1005, 7, 3)]
+
+        self.load.side_effect = load
+        self.version = 2
+        self.clock.now = 5.0
+
+        self.assertEqual(self.graph.referenced_by(3), [7])
+        self.assertEqual(results, [[4]])
+
+
+    def test_scores_outside_lock(self):
+        '''
+        Case 8: The previous scores are used while the overlay is merged and
+        the scores recomputed, and references added meanwhile are kept.
+        '''
+        self.graph.load()
+        score = self.graph.score(1)
+        results = []
+
+        def relative_scores(arrays):
+            lookup = Thread(target=lambda: results.append(self.graph.score(1)))
+            lookup.start()
+            lookup.join(timeout=5.0)
+            self.graph.add_references([(20, 3)])
+            return scores(arrays)
+
+        scores = citation_graph._relative_scores
+        with patch.object(citation_graph, '_relative_scores', side_effect=relative_scores):
+            self.graph.add_references([(10 + i, 1) for i in range(OVERLAY_MAX_REFERENCES + 1)])
+
+        self.assertEqual(results, [score])
+        self.assertGreater(self.graph.score(1), score)
+        self.assertEqual(self.graph.referenced_by(3), [4, 20])
+        self.assertEqual(len(self.graph), 4 + OVERLAY_MAX_REFERENCES + 2)
+
+
+if __name__ == '__main__':
+    ut.main()
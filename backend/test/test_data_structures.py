@@ -29,6 +29,8 @@ from astropy.coordinates.sky_coordinate import SkyCoord
 from model.ds.alias_result import AliasResult
 from model.ds.search_filters import SearchFilters, DateFilter, KeywordMode
 from model.ds.report_types import ImportedReport, ReportResult
+from model.ds.pagination import PageCursor, ReportPage
+from model.ds.disjoint_set import DisjointSet
 from model.constants import valid_keyword
 
 class TestAliasResult(unittest.TestCase):
@@ -149,6 +151,21 @@ class TestSearchFilters(unittest.TestCase):
         # test not equal
         sf3 = SearchFilters("term",["key","word"],KeywordMode.ANY)
         self.assertNotEqual(self.sf, sf3)
+        df3 = DateFilter(datetime(2021, 7, 30), datetime(2021, 7, 31), datetime(2021, 7, 1))
+        self.assertNotEqual(self.df, df3)
+
+    #test observation dates
+    def test_observed_dates(self):
+        self.assertIsNone(self.df.observed_start_date)
+        self.assertIsNone(self.df.observed_end_date)
+
+        df2 = DateFilter(observed_start_date=datetime(2021, 7, 1))
+        self.assertIsNone(df2.start_date)
+        self.assertEqual(df2.observed_start_date, datetime(2021, 7, 1))
+        self.assertIsNone(df2.observed_end_date)
+
+        with self.assertRaises(TypeError):
+            df2.observed_end_date = 1
 
 class TestReportTypes(unittest.TestCase):
     def setUp(self):
@@ -251,6 +268,74 @@ class TestReportTypes(unittest.TestCase):
         with self.assertRaises(TypeError):
             self.ir.referenced_reports = ["str"]
 
+class TestPagination(unittest.TestCase):
+    def setUp(self):
+        self.pc = PageCursor(datetime(2021,7,30,12,30), 14000)
+
+    #test creation, getters
+    def test_creation(self):
+        self.assertEqual(self.pc.submission_date, datetime(2021,7,30,12,30))
+        self.assertEqual(self.pc.atel_num, 14000)
+
+        rr = ReportResult(14000, "ATel Title", "R. Khayech", "Body text", datetime(2021,7,30,12,30), [])
+        self.assertEqual(PageCursor.after(rr), self.pc)
+
+    #test encoding round trip
+    def test_encode_decode(self):
+        token = self.pc.encode()
+        self.assertEqual(PageCursor.decode(token), self.pc)
+        self.assertEqual(hash(PageCursor.decode(token)), hash(self.pc))
+
+    def test_invalid(self):
+        with self.assertRaises(TypeError):
+            PageCursor("2021-07-30", 14000)
+        with self.assertRaises(ValueError):
+            PageCursor(datetime(2021,7,30), 0)
+        with self.assertRaises(ValueError):
+            PageCursor.decode("not a cursor")
+        with self.assertRaises(ValueError):
+            PageCursor.decode(None)
+
+    def test_report_page(self):
+        page = ReportPage([1, 2], self.pc, 10)
+        self.assertListEqual(page, [1, 2])
+        self.assertEqual(page.next_cursor, self.pc)
+        self.assertEqual(page.total, 10)
+
+        empty = ReportPage()
+        self.assertListEqual(empty, [])
+        self.assertIsNone(empty.next_cursor)
+        self.assertIsNone(empty.total)
+
+class TestDisjointSet(unittest.TestCase):
+    def test_union_find(self):
+        threads = DisjointSet([5, 3, 9])
+        self.assertEqual(threads.find(9), 9)
+        self.assertEqual(threads.union(9, 5), 5)
+        self.assertEqual(threads.union(3, 5), 3)
+        self.assertEqual(threads.find(9), 3)
+        self.assertEqual(threads.union_all([12, 11, 9]), 3)
+        self.assertEqual(threads.find(12), 3)
+        self.assertIsNone(threads.union_all([]))
+
+        self.assertIn(11, threads)
+        self.assertNotIn(4, threads)
+        self.assertEqual(len(threads), 5)
+        self.assertListEqual(sorted(threads), [3, 5, 9, 11, 12])
+
+    def test_separate_sets(self):
+        threads = DisjointSet(range(1, 7))
+        threads.union(1, 2)
+        threads.union(4, 6)
+        threads.union(6, 5)
+        self.assertListEqual([threads.find(i) for i in range(1, 7)], [1, 1, 3, 4, 4, 4])
+
+        # a long chain is compressed by find
+        chain = DisjointSet()
+        for i in range(1000, 0, -1):
+            chain.union(i, i + 1)
+        self.assertEqual(chain.find(1001), 1)
+
 class TestConstants(unittest.TestCase):
     def testValid(self):
         self.assertTrue(valid_keyword("Radio"))
@@ -21,17 +21,29 @@ License Terms and Copyright:
     along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 import unittest
-from datetime import datetime, timedelta
+import time
+from datetime import date, datetime, timedelta
 from astropy import coordinates
 
 import mysql.connector
+from mysql.connector import errorcode
 from mysql.connector.cursor import MySQLCursor
+from unittest.mock import DEFAULT, MagicMock, patch
 from astropy.coordinates.sky_coordinate import SkyCoord
 
+from model.constants import FIXED_KEYWORDS
 from model.db import db_interface as db
+from model.db import db_init
 from model.ds.alias_result import AliasResult
+from model.ds.import_job import JobState
+from model.ds.import_ledger import LedgerEntry, LedgerStatus
+from model.ds.reference_check import ReferenceCheck
+from model.ds.report_fingerprint import ReportSection
 from model.ds.report_types import ImportedReport
+from model.ds.pagination import PageCursor
+from model.ds.report_graph import ReportGraph
 from model.ds.search_filters import DateFilter, KeywordMode, SearchFilters
+from controller.importer.fingerprint import fingerprint_report, hash_html
 
 
 
@@ -47,6 +59,62 @@ class TestInitTables(unittest.TestCase):
         _verifyTable(self, "ReportRefs")
         _verifyTable(self, "ReportCoords")
         _verifyTable(self, "ObservationDates")
+        _verifyTable(self, "KeywordCounts")
+        _verifyTable(self, "YearCounts")
+        _verifyTable(self, "ImportJobs")
+        _verifyTable(self, "ImportLeases")
+        _verifyTable(self, "ImportLedger")
+        _verifyTable(self, "ReferenceChecks")
+        _verifyTable(self, "ReportFingerprints")
+        _verifyTable(self, "WorkerLeases")
+
+class TestSchemaUpgrade(unittest.TestCase):
+    #Verify each upgrade statement is applied once, whatever the version upgraded from
+    def testApplyUpgrade(self):
+        cur = MagicMock()
+        def execute(statement):
+            if "threadId" in statement:
+                raise mysql.connector.Error(errno=errorcode.ER_DUP_FIELDNAME)
+        cur.execute.side_effect = execute
+
+        upgrade = ("alter table Reports add index submissionOrder (submissionDate, atelNum);\n"
+                   "alter table Reports add column threadId int unsigned not null default 0;\n")
+        db_init._apply_upgrade(cur, upgrade)
+        self.assertEqual([c[0][0].strip() for c in cur.execute.call_args_list],
+                         ["alter table Reports add index submissionOrder (submissionDate, atelNum)",
+                          "alter table Reports add column threadId int unsigned not null default 0"])
+
+        db_init._apply_upgrade(cur, "")
+        self.assertEqual(cur.execute.call_count, 2)
+
+        cur.execute.side_effect = mysql.connector.Error(errno=errorcode.ER_NO_SUCH_TABLE)
+        with self.assertRaises(mysql.connector.Error):
+            db_init._apply_upgrade(cur, upgrade)
+
+    #Verify every upgrade schema can be read
+    def testUpgradeSchemas(self):
+        for table_name in db_init._UPGRADED_TABLES:
+            db_init._read_table_upgrade(table_name)
+
+    #Verify the backfills only run when upgrading from a version before they were added
+    def testBackfillVersions(self):
+        backfills = ["_backfill_normalized_aliases", "_backfill_facet_counts", "_backfill_report_threads"]
+        for old_version, expected in [(8, 1), (9, 1), (10, 0), (11, 0)]:
+            with patch.object(db_init, "_connect"), patch.object(db_init, "_read_table_upgrade", return_value=""), \
+                    patch.object(db_init, "_warn_schema_upgraded"), \
+                    patch.multiple(db_init, **{name: DEFAULT for name in backfills}) as mocks:
+                db_init._upgrade_db(old_version)
+                for name in backfills:
+                    self.assertEqual(mocks[name].call_count, expected)
+
+    #Verify every keyword count is written, including keywords without reports
+    def testBackfillFacetCounts(self):
+        cur = MagicMock()
+        cur.fetchall.return_value = [(1, 2020, 3)]
+        db_init._backfill_facet_counts(cur)
+
+        keyword_counts = {c[0][1][0]: c[0][1][1] for c in cur.execute.call_args_list if "KeywordCounts" in c[0][0]}
+        self.assertEqual(keyword_counts, {kw: 3 if i == 0 else 0 for i, kw in enumerate(FIXED_KEYWORDS)})
 
 def _verifyTable(self:TestInitTables, table_name):
     cn = db._connect()
@@ -100,10 +168,216 @@ class TestAuth(unittest.TestCase):
         cn.commit()
         cn.close()
 
+class TestImportJobs(unittest.TestCase):
+    def setUp(self):
+        _deleteImportJobs()
+
+    def testImportJobs(self):
+        # only one job is active at a time
+        job = db.add_import_job(1000, 1.5)
+        self.assertEqual(job.state, JobState.QUEUED)
+        self.assertEqual((job.start_atel, job.current_atel, job.delay_seconds), (1000, 1000, 1.5))
+        self.assertEqual(db.add_import_job(2000), job)
+        self.assertEqual(db.get_import_job(), job)
+
+        # claim the job and record progress
+        claimed = db.claim_import_job("worker-1", 60)
+        self.assertEqual(claimed.job_id, job.job_id)
+        self.assertEqual(claimed.state, JobState.RUNNING)
+        self.assertIsNone(db.claim_import_job("worker-2", 60))
+
+        claimed.current_atel = 1002
+        claimed.imported = 2
+        claimed.rate = 0.5
+        self.assertEqual(db.record_import_progress(claimed, "worker-1"), JobState.RUNNING)
+        self.assertIsNone(db.record_import_progress(claimed, "worker-2"))
+        stored = db.get_import_job(job.job_id)
+        self.assertEqual((stored.current_atel, stored.imported, stored.rate), (1002, 2, 0.5))
+
+        # a stale job is resumed by another worker
+        cn = db._connect()
+        cur:MySQLCursor = cn.cursor()
+        cur.execute("update ImportJobs set heartbeatAt = now() - interval 120 second")
+        cur.close()
+        cn.commit()
+        cn.close()
+        resumed = db.claim_import_job("worker-2", 60)
+        self.assertEqual((resumed.job_id, resumed.current_atel), (job.job_id, 1002))
+        self.assertIsNone(db.record_import_progress(claimed, "worker-1"))
+
+        # cancel the running job
+        cancelled = db.cancel_import_job()
+        self.assertEqual(cancelled.state, JobState.CANCELLING)
+        self.assertEqual(db.record_import_progress(resumed, "worker-2"), JobState.CANCELLING)
+        db.finish_import_job(resumed, "worker-2", JobState.CANCELLED)
+        finished = db.get_import_job(job.job_id)
+        self.assertEqual(finished.state, JobState.CANCELLED)
+        self.assertIsNotNone(finished.finished_at)
+        self.assertIsNone(db.cancel_import_job())
+
+        # a queued job is cancelled immediately, and a new job can be queued after it
+        queued = db.add_import_job(1002)
+        self.assertNotEqual(queued.job_id, job.job_id)
+        self.assertEqual(db.cancel_import_job(queued.job_id).state, JobState.CANCELLED)
+        self.assertIsNone(db.claim_import_job("worker-1", 60))
+        self.assertIsNone(db.get_import_job(queued.job_id + 1))
+
+    def testShardedImportJob(self):
+        old_num = db.get_next_atel_num()
+        db.set_next_atel_num(1000)
+
+        job = db.add_import_job(1000, range_size=10)
+        self.assertTrue(job.sharded)
+        # sharded jobs are not claimed by a single worker
+        self.assertIsNone(db.claim_import_job("worker-1", 60))
+
+        # workers lease consecutive ranges
+        first = db.claim_import_lease("worker-1", 60)
+        second = db.claim_import_lease("worker-2", 60)
+        self.assertEqual((first.start_atel, first.end_atel, first.current_atel), (1000, 1010, 1000))
+        self.assertEqual((second.start_atel, second.end_atel), (1010, 1020))
+        self.assertEqual(db.get_import_job().state, JobState.RUNNING)
+
+        # the next ATel number only advances across completed ranges
+        second.imported = 10
+        self.assertEqual(db.complete_import_lease(second, "worker-2", 1020), JobState.RUNNING)
+        self.assertEqual(db.get_next_atel_num(), 1000)
+        first.current_atel = 1005
+        first.imported = 5
+        self.assertEqual(db.record_lease_progress(first, "worker-1"), JobState.RUNNING)
+        self.assertIsNone(db.record_lease_progress(first, "worker-2"))
+        first.imported = 10
+        self.assertEqual(db.complete_import_lease(first, "worker-1", 1010), JobState.RUNNING)
+        self.assertEqual(db.get_next_atel_num(), 1020)
+        self.assertEqual(db.get_import_job().imported, 20)
+
+        # a range abandoned by a stopped worker is resumed from its current ATel number
+        third = db.claim_import_lease("worker-1", 60)
+        fourth = db.claim_import_lease("worker-2", 60)
+        third.current_atel = 1023
+        db.record_lease_progress(third, "worker-1")
+        cn = db._connect()
+        cur:MySQLCursor = cn.cursor()
+        cur.execute("update ImportLeases set heartbeatAt = now() - interval 120 second where startATel = 1020")
+        cur.close()
+        cn.commit()
+        cn.close()
+        resumed = db.claim_import_lease("worker-3", 60)
+        self.assertEqual((resumed.start_atel, resumed.current_atel), (1020, 1023))
+        self.assertIsNone(db.complete_import_lease(third, "worker-1", 1030))
+
+        # a report not found ends the job once every range before it is completed
+        self.assertEqual(db.complete_import_lease(fourth, "worker-2", 1034), JobState.RUNNING)
+        self.assertIsNone(db.claim_import_lease("worker-2", 60))
+        self.assertEqual(db.complete_import_lease(resumed, "worker-3", 1030), JobState.COMPLETED)
+        self.assertEqual(db.get_next_atel_num(), 1034)
+        finished = db.get_import_job()
+        self.assertEqual((finished.state, finished.current_atel), (JobState.COMPLETED, 1034))
+        self.assertIsNone(db.claim_import_lease("worker-1", 60))
+
+        db.set_next_atel_num(old_num)
+
+    def tearDown(self):
+        _deleteImportJobs()
+
+class TestWorkerLeases(unittest.TestCase):
+    def tearDown(self):
+        cn = db._connect()
+        cur: MySQLCursor = cn.cursor()
+        cur.execute("delete from WorkerLeases where leaseName = 'db_test_lease'")
+        cn.commit()
+        cur.close()
+        cn.close()
+
+    def testAcquireWorkerLease(self):
+        self.assertTrue(db.acquire_worker_lease("db_test_lease", "worker-1", 60))
+        # held by another worker until it expires, and renewed by its holder
+        self.assertFalse(db.acquire_worker_lease("db_test_lease", "worker-2", 60))
+        self.assertTrue(db.acquire_worker_lease("db_test_lease", "worker-1", 0))
+        time.sleep(1.5)
+        self.assertTrue(db.acquire_worker_lease("db_test_lease", "worker-2", 60))
+        self.assertFalse(db.acquire_worker_lease("db_test_lease", "worker-1", 60))
+
+class TestImportLeaseRanges(unittest.TestCase):
+    def testNextFreeRange(self):
+        self.assertEqual(db._next_free_range([], 100, 10), (100, 110))
+        # ranges behind the next ATel number are ignored, and gaps between ranges are filled first
+        leases = [(80, 90, 90), (100, 110, None), (115, 125, None)]
+        self.assertEqual(db._next_free_range(leases, 100, 10), (110, 115))
+        self.assertEqual(db._next_free_range(leases[:2], 100, 10), (110, 120))
+        # no range is leased at or after the first ATel number found not to exist
+        leases = [(100, 110, None), (110, 120, 114)]
+        self.assertIsNone(db._next_free_range(leases, 100, 10))
+        # a range stopped at its end does not
+        self.assertEqual(db._next_free_range([(100, 110, 110)], 100, 10), (110, 120))
+
+    def testConsolidateLeases(self):
+        self.assertEqual(db._consolidate_leases([], 100), 100)
+        self.assertEqual(db._consolidate_leases([(100, 110, 110), (110, 120, 120), (130, 140, 140)], 100), 120)
+        self.assertEqual(db._consolidate_leases([(100, 110, None), (110, 120, 120)], 100), 100)
+        # a range stopped before its end is not passed
+        self.assertEqual(db._consolidate_leases([(100, 110, 110), (110, 120, 114), (120, 130, 130)], 100), 114)
+        self.assertEqual(db._consolidate_leases([(110, 120, 114)], 114), 114)
+
+def _deleteImportJobs():
+    cn = db._connect()
+    cur:MySQLCursor = cn.cursor()
+    cur.execute("delete from ImportJobs")
+    cur.close()
+    cn.commit()
+    cn.close()
+
+class TestImportLedger(unittest.TestCase):
+    def setUp(self):
+        _deleteImportLedger()
+
+    def testImportLedger(self):
+        db.record_ledger_entry(LedgerEntry(100, LedgerStatus.IMPORTED, 1, download_seconds=1.5))
+        db.record_ledger_entry(LedgerEntry(101, LedgerStatus.FAILED, 1, 'MissingReportElementError', 'Title is missing'))
+        db.record_ledger_entry(LedgerEntry(102, LedgerStatus.ERROR, 1, 'NetworkError', 'Connection refused'))
+        db.record_ledger_entry(LedgerEntry(103, LedgerStatus.FAILED, 2, 'MissingReportElementError', 'Title is missing'))
+
+        stored = db.get_ledger_entry(100)
+        self.assertEqual((stored.status, stored.download_seconds, stored.attempts), (LedgerStatus.IMPORTED, 1.5, 1))
+        self.assertIsNone(db.get_ledger_entry(999))
+
+        # reports failed by an older parser, and reports with errors, are retried
+        self.assertEqual([entry.atel_num for entry in db.get_retry_candidates(2)], [101, 102])
+        self.assertEqual([entry.atel_num for entry in db.get_retry_candidates(2, 'NetworkError')], [102])
+        self.assertEqual([entry.atel_num for entry in db.get_retry_candidates(2, after_atel=101, limit=1)], [102])
+        self.assertEqual([entry.atel_num for entry in db.get_retry_candidates(1)], [102])
+
+        # a report with errors is no longer retried after the maximum number of attempts
+        db.record_ledger_entry(LedgerEntry(102, LedgerStatus.ERROR, 1, 'NetworkError', 'Connection refused'))
+        self.assertEqual(db.get_ledger_entry(102).attempts, 2)
+        self.assertEqual(db.get_retry_candidates(1, max_attempts=2), [])
+
+        # a retried report replaces its earlier outcome
+        db.record_ledger_entry(LedgerEntry(101, LedgerStatus.IMPORTED, 2))
+        stored = db.get_ledger_entry(101)
+        self.assertEqual((stored.status, stored.failure_class, stored.parser_version, stored.attempts), (LedgerStatus.IMPORTED, None, 2, 2))
+
+        self.assertEqual(db.get_ledger_summary(), [("imported", None, 2), ("failed", "MissingReportElementError", 1), ("error", "NetworkError", 1)])
+
+    def tearDown(self):
+        _deleteImportLedger()
+
+def _deleteImportLedger():
+    cn = db._connect()
+    cur:MySQLCursor = cn.cursor()
+    cur.execute("delete from ImportLedger")
+    cur.close()
+    cn.commit()
+    cn.close()
+
 class TestReports(unittest.TestCase):
     def setUp(self):
         pass
 
+    def tearDown(self):
+        # test data is deleted directly, so discard references cached in memory
+        db._citation_graph.invalidate()
+
     def testNextATelNum(self):
         #set up
         old_num = db.get_next_atel_num()
@@ -134,6 +408,8 @@ class TestReports(unittest.TestCase):
         
         db.add_object("test_main_id", self.ex_coords)
 
+        keyword_counts, year_counts = db.get_facet_counts()
+
         #add reports
         db.add_report(report1)
         db.add_report(report2)
@@ -170,6 +446,49 @@ class TestReports(unittest.TestCase):
             self.assertAlmostEqual(float(result[0]), self.ex_coords.ra.deg, 10)
             self.assertAlmostEqual(float(result[1]), self.ex_coords.dec.deg, 10)
 
+            # test summary counts
+            new_keyword_counts, new_year_counts = db.get_facet_counts()
+            self.assertEqual(new_keyword_counts["star"], keyword_counts["star"] + 3)
+            self.assertEqual(new_keyword_counts["planet"], keyword_counts["planet"])
+            self.assertEqual(new_year_counts[2021], year_counts.get(2021, 0) + 3)
+
+            # test filtered counts
+            keyword_counts, year_counts = db.get_facet_counts(SearchFilters(term="db_test_report"), object_name="test_main_id")
+            self.assertEqual(keyword_counts["star"], 1)
+            self.assertEqual(keyword_counts["radio"], 1)
+            self.assertEqual(keyword_counts["planet"], 0)
+            self.assertEqual(year_counts, {2021: 1})
+
+            keyword_counts, year_counts = db.get_facet_counts(object_name="test_other_alias")
+            self.assertEqual(keyword_counts["star"], 0)
+            self.assertEqual(year_counts, {})
+
+            # test timeline counts
+            self.assertEqual(db.get_timeline_counts(SearchFilters(term="db_test_report"), bin_size="week"), [(date(2021, 8, 9), 3)])
+            self.assertEqual(db.get_timeline_counts(SearchFilters(term="db_test_report"), object_name="test_main_id", bin_size="day"), [(date(2021, 8, 12), 1)])
+            self.assertEqual(db.get_timeline_counts(SearchFilters(term="db_test_report"), date_field="observation"), [])
+            self.assertEqual(db.get_timeline_counts(object_name="test_other_alias"), [])
+
+            # test threads, joined by references
+            self.assertEqual(db.get_report_threads([20000, 20001, 1]), {20000: (19999, 3), 20001: (19999, 3)})
+            self.assertEqual([r.atel_num for r in db.find_reports_by_thread(20001)], [19999, 20000, 20001])
+            self.assertEqual(db.find_reports_by_thread(19998), [])
+
+            # test reference graph, in both directions
+            graph = db.get_reference_subgraph([20000], 1, 10)
+            self.assertEqual(graph, ReportGraph({20000: 0, 19999: 1, 20001: 1}, [(20000, 19999), (20001, 20000)]))
+
+            graph = db.get_reference_subgraph([20000], 2, 10)
+            self.assertEqual(graph.nodes, {20000: 0, 19999: 1, 20001: 1, 19998: 2, 20002: 2})
+            self.assertEqual(len(graph.edges), 4)
+            self.assertFalse(graph.truncated)
+
+            graph = db.get_reference_subgraph([20000], 2, 2)
+            self.assertEqual(graph, ReportGraph({20000: 0, 19999: 1}, [(20000, 19999)], True))
+
+            self.assertEqual(db.get_reference_subgraph([20000], 0, 10), ReportGraph({20000: 0}, []))
+            self.assertEqual(db.get_reference_subgraph([19998], 2, 10), ReportGraph({}, []))
+
         finally:
             # clean up test data
             cur.execute("delete from Reports where atelNum between 19999 and 20001")
@@ -179,6 +498,99 @@ class TestReports(unittest.TestCase):
             cn.commit()
             cn.close()
 
+    def testReferencedBy(self):
+        report = ImportedReport(29999,"db_test_report","A","B",datetime.now() - timedelta(days=1),referenced_by=[30000])
+        db.add_report(report)
+        cn = db._connect()
+        cur: MySQLCursor = cn.cursor()
+        try:
+            # a recently published report is due to be checked until it has been checked
+            due = db.get_due_reference_checks(datetime.now() - timedelta(days=7), 100)
+            self.assertIn(ReferenceCheck(29999), due)
+            self.assertEqual(db.get_due_reference_checks(datetime.now(), 100), [])
+
+            # only new references are stored
+            self.assertEqual(db.add_referenced_by(29999, [30000, 30001, 30001, 29999]), [30001])
+            self.assertEqual(db.add_referenced_by(29999, [30000, 30001]), [])
+            cur.execute("select atelNum from ReportRefs where refReport = 29999 order by atelNum")
+            self.assertEqual(cur.fetchall(), [(30000,), (30001,)])
+
+            check = ReferenceCheck(29999, '"abc"', None, "0" * 64, 1, datetime.now().replace(microsecond=0), (datetime.now() + timedelta(days=2)).replace(microsecond=0))
+            db.record_reference_check(check)
+            self.assertNotIn(29999, [due.atel_num for due in db.get_due_reference_checks(datetime.now() - timedelta(days=7), 100)])
+
+            cur.execute("update ReferenceChecks set nextCheckAt = now() - interval 1 minute where atelNumFK = 29999")
+            cn.commit()
+            due = [due for due in db.get_due_reference_checks(datetime.now() - timedelta(days=7), 100) if due.atel_num == 29999]
+            self.assertEqual((due[0].etag, due[0].content_hash, due[0].unchanged_count), ('"abc"', "0" * 64, 1))
+        finally:
+            cur.execute("delete from Reports where atelNum = 29999")
+            cur.execute("delete from ReportRefs where refReport = 29999")
+            cur.close()
+            cn.commit()
+            cn.close()
+
+    def testUpdateReport(self):
+        report = ImportedReport(29998,"db_test_report","A","B",datetime(2021, 1, 2, 3, 4),referenced_reports=[29990, 29991],
+                                observation_dates=[datetime(2021, 1, 1)],keywords=["radio"],coordinates=[SkyCoord(10.5, -20.25, unit="deg")])
+        fingerprint = fingerprint_report(report, hash_html("<html></html>"), 1)
+        db.add_report(report, fingerprint)
+        cn = db._connect()
+        cur: MySQLCursor = cn.cursor()
+        try:
+            self.assertEqual(db.get_report_fingerprint(29998).section_hashes, fingerprint.section_hashes)
+            self.assertIn(29998, db.get_reparse_candidates(2, 29997, 10))
+            self.assertNotIn(29998, db.get_reparse_candidates(1, 29997, 10))
+
+            # only the rows of the changed sections that differ are written
+            report.title = "db_test_report_updated"
+            report.referenced_reports = [29991, 29992]
+            report.coordinates = [SkyCoord(10.5, -20.25, unit="deg"), SkyCoord(11.0, 5.0, unit="deg")]
+            updated = fingerprint_report(report, hash_html("<html><p></p></html>"), 2)
+            sections = updated.changed_sections(fingerprint)
+            self.assertEqual(sections, [ReportSection.REPORT, ReportSection.COORDINATES, ReportSection.REFERENCES])
+            db.update_report(report, updated, sections)
+
+            cur.execute("select title, keywords from Reports where atelNum = 29998")
+            self.assertEqual(cur.fetchone()[0], "db_test_report_updated")
+            cur.execute("select refReport from ReportRefs where atelNum = 29998 order by refReport")
+            self.assertEqual(cur.fetchall(), [(29991,), (29992,)])
+            cur.execute("select count(*) from ReportCoords where atelNumFK = 29998")
+            self.assertEqual(cur.fetchone()[0], 2)
+            cur.execute("select count(*) from ObservationDates where atelNumFK = 29998")
+            self.assertEqual(cur.fetchone()[0], 1)
+            self.assertEqual(db.get_report_fingerprint(29998).parser_version, 2)
+            self.assertNotIn(29998, db.get_reparse_candidates(2, 29997, 10))
+        finally:
+            cur.execute("delete from Reports where atelNum = 29998")
+            cur.execute("delete from ReportRefs where atelNum = 29998")
+            cur.close()
+            cn.commit()
+            cn.close()
+
+    def testDeleteReports(self):
+        report = ImportedReport(29997,"db_test_report","A","B",datetime(2021, 1, 2, 3, 4),referenced_reports=[29990],keywords=["radio"])
+        db.add_report(report, fingerprint_report(report, hash_html("<html></html>"), 1))
+        keyword_counts, year_counts = db.get_facet_counts()
+
+        db.delete_reports(29997, 29998)
+        self.assertFalse(db.report_exists(29997))
+        self.assertIsNone(db.get_report_fingerprint(29997))
+        keyword_counts_after, year_counts_after = db.get_facet_counts()
+        self.assertEqual(keyword_counts_after.get("radio", 0), keyword_counts["radio"] - 1)
+        self.assertEqual(year_counts_after.get(2021, 0), year_counts[2021] - 1)
+
+        cn = db._connect()
+        cur: MySQLCursor = cn.cursor()
+        try:
+            cur.execute("select count(*) from ReportRefs where atelNum = 29997")
+            self.assertEqual(cur.fetchone()[0], 0)
+            cur.execute("select count(*) from ImportLedger where atelNum = 29997")
+            self.assertEqual(cur.fetchone()[0], 0)
+        finally:
+            cur.close()
+            cn.close()
+
     def testBuildBaseQuery(self):
         self.assertEqual(db._build_report_base_query(), ("select atelNum, title, authors, body, submissionDate ","from Reports "))
 
@@ -188,19 +600,58 @@ class TestReports(unittest.TestCase):
         df = DateFilter(datetime(2021, 8, 17), datetime(2021, 8, 17))
         query, data = db._build_where_clause(sf,df)
         self.maxDiff = None
-        self.assertEqual(query, "where submissionDate >= %s and submissionDate < %s and (title like concat('%', %s, '%') or body like concat('%', %s, '%')) and (FIND_IN_SET(%s, keywords) > 0 or FIND_IN_SET(%s, keywords) > 0) ")
-        self.assertTupleEqual(data,(df.start_date,df.end_date+timedelta(days=1),sf.term,sf.term,sf.keywords[0],sf.keywords[1]))
+        self.assertEqual(query, "where submissionDate >= %s and submissionDate < %s and (title like concat('%', %s, '%') or body like concat('%', %s, '%')) and (keywords & %s) != 0 ")
+        self.assertTupleEqual(data,(df.start_date,df.end_date+timedelta(days=1),sf.term,sf.term,db._keyword_mask(sf.keywords)))
 
         #Test keyword modes / single filter
         sf2 = SearchFilters(term=None, keywords=["star","planet"], keyword_mode=KeywordMode.ALL)
         query2, data2 = db._build_where_clause(sf2)
-        self.assertEqual(query2,"where (FIND_IN_SET(%s, keywords) > 0 and FIND_IN_SET(%s, keywords) > 0) ")
-        self.assertTupleEqual(data2,(sf.keywords[0],sf.keywords[1]))
+        self.assertEqual(query2,"where (keywords & %s) = %s ")
+        self.assertTupleEqual(data2,(db._keyword_mask(sf.keywords),db._keyword_mask(sf.keywords)))
 
         sf2.keyword_mode = KeywordMode.NONE
         query3, data3 = db._build_where_clause(sf2)
-        self.assertEqual(query3,"where (FIND_IN_SET(%s, keywords) = 0 and FIND_IN_SET(%s, keywords) = 0) ")
-        self.assertTupleEqual(data3,(sf.keywords[0],sf.keywords[1]))
+        self.assertEqual(query3,"where (keywords & %s) = 0 ")
+        self.assertTupleEqual(data3,(db._keyword_mask(sf.keywords),))
+
+        #Test observation dates
+        df2 = DateFilter(observed_start_date=datetime(2021, 8, 1), observed_end_date=datetime(2021, 8, 17))
+        query5, data5 = db._build_where_clause(None, df2)
+        self.assertEqual(query5, "where atelNum in (select atelNumFK from ObservationDates where obDate >= %s and obDate < %s ) ")
+        self.assertTupleEqual(data5, (df2.observed_start_date, df2.observed_end_date+timedelta(days=1)))
+
+        #Test keyword that is not a fixed keyword
+        sf2.keyword_mode = KeywordMode.ALL
+        sf2.keywords = ["star", "unknown"]
+        query4, data4 = db._build_where_clause(sf2)
+        self.assertEqual(query4,"where false ")
+        self.assertTupleEqual(data4,())
+
+    def testBuildTimelineQuery(self):
+        sf = SearchFilters(keywords=["star"])
+        query, data = db._build_timeline_query(sf, None, None, "month", "submission")
+        self.assertEqual(query, "select date_sub(date(Reports.submissionDate), interval dayofmonth(Reports.submissionDate) - 1 day) as binStart, count(distinct Reports.atelNum) "
+                                "from Reports where (keywords & %s) != 0 group by binStart order by binStart")
+        self.assertTupleEqual(data, (db._keyword_mask(sf.keywords),))
+
+        query, data = db._build_timeline_query(None, None, None, "year", "observation")
+        self.assertIn("inner join ObservationDates as TimelineDates on Reports.atelNum = TimelineDates.atelNumFK ", query)
+        self.assertIn("makedate(year(TimelineDates.obDate), 1) as binStart", query)
+        self.assertTupleEqual(data, ())
+
+    def testBuildReferenceGraphQuery(self):
+        query, data = db._build_reference_graph_query([20000, 20001], 3, 11)
+        self.assertIn("where atelNum in (%s, %s) ", query)
+        self.assertIn("join ReportRefs on ReportRefs.atelNum = Walk.atelNum ", query)
+        self.assertIn("join ReportRefs on ReportRefs.refReport = Walk.atelNum ", query)
+        self.assertEqual(query.count("%s"), len(data))
+        self.assertEqual(data, (20000, 20001, 3, 3, 11))
+
+    def testKeywordMask(self):
+        self.assertEqual(db._keyword_mask(["radio"]), 1)
+        self.assertEqual(db._keyword_mask(["Radio", "optical"]), 1 | 1 << 5)
+        self.assertEqual(db._keyword_mask(["unknown"]), 0)
+        self.assertEqual(db._keyword_mask(FIXED_KEYWORDS), (1 << len(FIXED_KEYWORDS)) - 1)
 
         #Test empty query
         sf = None
@@ -385,6 +836,11 @@ class TestObjects(unittest.TestCase):
         exists, updated = db.object_exists("test_add_aliases")
         self.assertNotEqual(updated, datetime(2020,1,1))
 
+        # adding aliases that are already stored does not invalidate cached search results or aliases
+        generation, alias_version = db.get_data_generation(), db.get_alias_version()
+        db.add_aliases("test_add_aliases",["test-alias-3","test-alias-4"])
+        self.assertEqual((db.get_data_generation(), db.get_alias_version()), (generation, alias_version))
+
         with self.assertRaises(db.ObjectNotFoundError):
             db.add_aliases("test-invalid-id",["test-alias"])
 
@@ -410,10 +866,18 @@ class TestObjects(unittest.TestCase):
         self.assertEqual(db._get_object_id("test-alIas-1"),"test_main_id")
         self.assertEqual(db._get_object_id("test-AlIas-2"), "test_main_id")
         self.assertEqual(db._get_object_id("test_main_ID"), "test_main_id")
+        self.assertEqual(db._get_object_id(" TEST -alias-1"), "test_main_id")
+        self.assertEqual(db._get_object_id("NAME test-alias-2"), "test_main_id")
 
         with self.assertRaises(db.ObjectNotFoundError):
             db._get_object_id("test-other-alias")
 
+        # Resolved without the resolver, as if added by another worker
+        db._alias_resolver.invalidate()
+        db._alias_resolver._checked_at = float("inf")
+        self.assertEqual(db._get_object_id("Test-Alias-1"), "test_main_id")
+        db._alias_resolver.invalidate()
+
     def testGetObjectCoords(self):
         coords = db.get_object_coords("test-alias-1")
         self.assertAlmostEqual(coords.ra.deg, self.ex_coords.ra.deg)
@@ -501,13 +965,13 @@ class TestObjects(unittest.TestCase):
 
         # Test only filters
         query, data = db._build_report_name_query(sf,df)
-        self.assertEqual(query, "select atelNum, title, authors, body, submissionDate from Reports where submissionDate >= %s and submissionDate < %s and (title like concat('%', %s, '%') or body like concat('%', %s, '%')) and (FIND_IN_SET(%s, keywords) > 0 or FIND_IN_SET(%s, keywords) > 0) ")
-        self.assertTupleEqual(data, (df.start_date, df.end_date+timedelta(days=1), sf.term, sf.term, sf.keywords[0], sf.keywords[1]))
+        self.assertEqual(query, "select atelNum, title, authors, body, submissionDate from Reports where submissionDate >= %s and submissionDate < %s and (title like concat('%', %s, '%') or body like concat('%', %s, '%')) and (keywords & %s) != 0 ")
+        self.assertTupleEqual(data, (df.start_date, df.end_date+timedelta(days=1), sf.term, sf.term, db._keyword_mask(sf.keywords)))
 
         # Test full query
         query, data = db._build_report_name_query(sf,df,"test_main_id")
-        self.assertEqual(query, "select atelNum, title, authors, body, submissionDate from Reports inner join ObjectRefs on Reports.atelNum = ObjectRefs.atelNumFK and ObjectRefs.objectIDFK = %s where submissionDate >= %s and submissionDate < %s and (title like concat('%', %s, '%') or body like concat('%', %s, '%')) and (FIND_IN_SET(%s, keywords) > 0 or FIND_IN_SET(%s, keywords) > 0) ")
-        self.assertTupleEqual(data, ("test_main_id", df.start_date, df.end_date+timedelta(days=1), sf.term, sf.term, sf.keywords[0], sf.keywords[1]))
+        self.assertEqual(query, "select atelNum, title, authors, body, submissionDate from Reports inner join ObjectRefs on Reports.atelNum = ObjectRefs.atelNumFK and ObjectRefs.objectIDFK = %s where submissionDate >= %s and submissionDate < %s and (title like concat('%', %s, '%') or body like concat('%', %s, '%')) and (keywords & %s) != 0 ")
+        self.assertTupleEqual(data, ("test_main_id", df.start_date, df.end_date+timedelta(days=1), sf.term, sf.term, db._keyword_mask(sf.keywords)))
 
     def testBuildReportCoordsQuery(self):
         self.maxDiff = None
@@ -529,15 +993,50 @@ class TestObjects(unittest.TestCase):
 
         # Test only filters
         query, data = db._build_report_coords_query(sf, df)
-        self.assertEqual(query, "select atelNum, title, authors, body, submissionDate from Reports where submissionDate >= %s and submissionDate < %s and (title like concat('%', %s, '%') or body like concat('%', %s, '%')) and (FIND_IN_SET(%s, keywords) > 0 or FIND_IN_SET(%s, keywords) > 0) ")
+        self.assertEqual(query, "select atelNum, title, authors, body, submissionDate from Reports where submissionDate >= %s and submissionDate < %s and (title like concat('%', %s, '%') or body like concat('%', %s, '%')) and (keywords & %s) != 0 ")
         self.assertTupleEqual(data, (df.start_date, df.end_date+timedelta(days=1),
-                              sf.term, sf.term, sf.keywords[0], sf.keywords[1]))
+                              sf.term, sf.term, db._keyword_mask(sf.keywords)))
 
         # Test full query
         query, data = db._build_report_coords_query(sf, df, filter_coords=True)
-        self.assertEqual(query, "select atelNum, title, authors, body, submissionDate , ra, declination from Reports inner join ReportCoords on Reports.atelNum = ReportCoords.atelNumFK where submissionDate >= %s and submissionDate < %s and (title like concat('%', %s, '%') or body like concat('%', %s, '%')) and (FIND_IN_SET(%s, keywords) > 0 or FIND_IN_SET(%s, keywords) > 0) ")
+        self.assertEqual(query, "select atelNum, title, authors, body, submissionDate , ra, declination from Reports inner join ReportCoords on Reports.atelNum = ReportCoords.atelNumFK where submissionDate >= %s and submissionDate < %s and (title like concat('%', %s, '%') or body like concat('%', %s, '%')) and (keywords & %s) != 0 ")
         self.assertTupleEqual(data, (df.start_date,
-                              df.end_date+timedelta(days=1), sf.term, sf.term, sf.keywords[0], sf.keywords[1]))
+                              df.end_date+timedelta(days=1), sf.term, sf.term, db._keyword_mask(sf.keywords)))
+
+    def testBuildOrderClause(self):
+        cursor = PageCursor(datetime(2021, 8, 16), 14000)
+
+        # Test unordered query
+        self.assertEqual(db._build_order_clause(), ("", ()))
+
+        # Test ordered query
+        query, data = db._build_order_clause(ordered=True)
+        self.assertEqual(query, "order by submissionDate desc, atelNum desc ")
+        self.assertTupleEqual(data, ())
+
+        # Test page query
+        query, data = db._build_order_clause(cursor, 20)
+        self.assertEqual(query, "order by submissionDate desc, atelNum desc limit %s ")
+        self.assertTupleEqual(data, (20,))
+
+        # Test keyset clause
+        query, data = db._build_report_name_query(after=cursor, limit=20)
+        self.assertEqual(query, "select atelNum, title, authors, body, submissionDate from Reports where (submissionDate < %s or (submissionDate = %s and atelNum < %s)) order by submissionDate desc, atelNum desc limit %s ")
+        self.assertTupleEqual(data, (cursor.submission_date, cursor.submission_date, cursor.atel_num, 20))
+
+    def testBuildSelectClause(self):
+        # Test all fields
+        self.assertEqual(db._build_report_select_clause(), ("select atelNum, title, authors, body, submissionDate ", ()))
+
+        # Test projected fields
+        query, data = db._build_report_select_clause(["title"])
+        self.assertEqual(query, "select atelNum, title, '', '', submissionDate ")
+        self.assertTupleEqual(data, ())
+
+        # Test body window
+        query, data = db._build_report_select_clause(["title", "authors"], ("nova", 160))
+        self.assertEqual(query, "select atelNum, title, authors, substring(body, greatest(1, locate(%s, body) - %s), 2 * %s + char_length(%s)), submissionDate ")
+        self.assertTupleEqual(data, ("nova", 160, 160, "nova"))
 
     def testFindByObject(self):
         report = ImportedReport(99999, "db_test_report", "db_test_authors_text","db_test_body_text", datetime(2021, 8, 12), keywords=["star", "radio"], objects=["test_main_id"])
@@ -677,6 +1176,7 @@ class TestObjects(unittest.TestCase):
         cn.commit()
         cur.close()
         cn.close()
+        db._citation_graph.invalidate()
         
         
 
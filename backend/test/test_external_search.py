@@ -29,12 +29,14 @@ import unittest as ut
 import numpy as np
 import random as r
 from enum import Enum 
+import time
 from unittest import mock
 
 from unittest.mock import MagicMock
 
 from controller.search import query_simbad
-from controller.search.query_simbad import QuerySimbadError
+from controller.search.query_simbad import QuerySimbadError, SimbadUnavailableError
+from controller.helper.resilience import Deadline
 from model.constants import DEFAULT_RADIUS
 
 from astropy.table import Table
@@ -234,6 +236,10 @@ def mocked_region_table(*args, **kwargs):
 # Unit testing: query_simbad_by_name() #
 ########################################
 class TestNameSearch(ut.TestCase):
+    def setUp(self):
+        query_simbad.simbad_breaker.reset()
+
+
     # Test network error (no connection, mocked). 
     @mock.patch('controller.search.query_simbad.Simbad._request', new=mocked_no_network)
     def test_no_network(self):
@@ -278,6 +284,7 @@ class TestNameSearch(ut.TestCase):
 ##########################################
 class TestCoordSearch(ut.TestCase):
     def setUp(self): 
+        query_simbad.simbad_breaker.reset()
         # Sample SkyCoord object for testing.
         # Derived from the Hardvard SIMBAD mirror.
         # Reference: http://simbad.cfa.harvard.edu/simbad/sim-fcoo 
@@ -359,6 +366,42 @@ class TestCoordSearch(ut.TestCase):
             self.fail(f"Function raised ValueError for valid radius: ${str(e)}")
 
 
+##########################################
+# Unit testing: SIMBAD circuit breaker   #
+##########################################
+class TestSimbadBreaker(ut.TestCase):
+    def setUp(self):
+        query_simbad.simbad_breaker.reset()
+
+
+    def tearDown(self):
+        query_simbad.simbad_breaker.reset()
+
+
+    # Test that repeated network errors stop further requests. 
+    def test_open_after_failures(self):
+        request = MagicMock(side_effect=requests.exceptions.ConnectionError("Mocked error message."))
+        with mock.patch('controller.search.query_simbad.Simbad.query_object', new=request):
+            for _ in range(query_simbad.SIMBAD_FAILURE_THRESHOLD):
+                with self.assertRaises(QuerySimbadError):
+                    query_simbad.query_simbad_by_name("test")
+            calls = request.call_count
+
+            with self.assertRaises(SimbadUnavailableError):
+                query_simbad.query_simbad_by_name("test")
+            self.assertEqual(request.call_count, calls)
+
+
+    # Test that a query is abandoned when the deadline passes. 
+    def test_deadline(self):
+        with mock.patch('controller.search.query_simbad.Simbad.query_object', new=lambda *args, **kwargs: time.sleep(0.5)):
+            with self.assertRaises(SimbadUnavailableError):
+                query_simbad.query_simbad_by_name("test", deadline=Deadline(0.05))
+
+        with self.assertRaises(SimbadUnavailableError):
+            query_simbad.query_simbad_by_name("test", deadline=Deadline(0))
+
+
 # Run suite. 
 if __name__ == '__main__':
     ut.main()
\ No newline at end of file
@@ -22,6 +22,10 @@ License Terms and Copyright:
 """
 
 import os
+import random
+import re
+import threading
+import time
 import unittest
 
 from model.ds.alias_result import AliasResult
@@ -29,11 +33,25 @@ from model.ds.report_types import ImportedReport
 from model.db.db_interface import ExistingReportError
 from controller.importer.importer import *
 from controller.importer.parser import *
-
-from unittest.mock import call
+from controller.importer.import_jobs import ImportWorker, FAILURE_PAUSE_SECONDS, MAX_REPORT_ATTEMPTS
+from controller.importer.download_scheduler import DownloadScheduler
+from test.mock_atel import MockATelServer
+from controller.importer.frontier import choose_range_size, find_newest_report, DEFAULT_IMPORT_RANGE_SIZE
+from model.constants import MAX_IMPORT_RANGE_SIZE
+from model.ds.import_job import ImportJob, ImportLease, JobState
+from model.ds.import_ledger import LedgerEntry, LedgerStatus
+from controller.importer.ledger_retry import LedgerRetrier
+from controller.importer.reference_refresh import ReferenceRefresher, check_interval, REFERENCE_CHECK_BASE_HOURS, REFERENCE_CHECK_MAX_DAYS, REFERENCE_REFRESH_DAYS
+from model.ds.reference_check import ReferenceCheck
+from controller.importer.fingerprint import fingerprint_report, hash_html
+from controller.importer.reparse import Reparser
+from controller.importer import regex_backend
+from model.ds.report_fingerprint import ReportFingerprint, ReportSection
+
+from unittest.mock import MagicMock, call
 from unittest import mock
 from bs4 import BeautifulSoup
-from datetime import datetime
+from datetime import datetime, timedelta
 from astropy.coordinates import SkyCoord
 from requests.exceptions import ConnectionError, HTTPError
 from pyppeteer.errors import TimeoutError
@@ -55,7 +73,7 @@ class TestImporterFunctions(unittest.TestCase):
 
         # Checks that add_report is called with expected ImportedReport object
         import_report(1000)
-        mock_add_report.assert_called_with(parse_report(1000, html_string))
+        mock_add_report.assert_called_with(parse_report(1000, html_string), mock.ANY)
 
         # Reads HTML string of ATel #10000
         f = open(os.path.join('test', 'res', 'atel10000.html'), 'r')
@@ -65,7 +83,7 @@ class TestImporterFunctions(unittest.TestCase):
 
         # Checks that add_report is called with expected ImportedReport object
         import_report(10000)
-        mock_add_report.assert_called_with(parse_report(10000, html_string))
+        mock_add_report.assert_called_with(parse_report(10000, html_string), mock.ANY)
 
     # Tests import_all_reports function
     @mock.patch('controller.importer.importer.set_next_atel_num')
@@ -129,6 +147,699 @@ class TestImporterFunctions(unittest.TestCase):
         html_string = download_report(9999999999)
         self.assertIsNone(html_string, 'Detecting non-existing ATel report has failed')
 
+# Import worker
+class TestImportWorker(unittest.TestCase):
+    def setUp(self):
+        self.job = ImportJob(1, JobState.RUNNING, 100, 100)
+        self.imported = []
+        self.missing = set()
+        self.record_progress = MagicMock(return_value=JobState.RUNNING)
+        self.finish_job = MagicMock()
+        self.set_next_atel = MagicMock()
+        self.sleep = MagicMock()
+        self.complete_lease = MagicMock(return_value=JobState.RUNNING)
+        self.now = 0.0
+
+        def import_one(atel_num):
+            # Each report takes half a second, and ATel #103 is the newest report
+            self.now += 0.5
+            if atel_num > 103:
+                raise ReportNotFoundError('Not found')
+            if atel_num in self.missing:
+                raise MissingReportElementError('Missing title')
+            if atel_num in self.imported:
+                raise ReportAlreadyExistsError('Exists')
+            self.imported.append(atel_num)
+
+        self.worker = ImportWorker(
+            claim_job=MagicMock(return_value=None),
+            record_progress=self.record_progress,
+            finish_job=self.finish_job,
+            import_one=import_one,
+            set_next_atel=self.set_next_atel,
+            record_lease=self.record_progress,
+            complete_lease=self.complete_lease,
+            clock=lambda: self.now,
+            sleep=self.sleep,
+            request_rate=lambda: 0.0,
+        )
+
+    # Tests that a job imports every new report and stores its progress after each one
+    def test_completed(self):
+        self.imported.append(101)
+        self.missing.add(102)
+
+        self.assertEqual(self.worker.run_job(self.job), JobState.COMPLETED)
+        self.assertEqual(self.imported, [101, 100, 103])
+        self.assertEqual((self.job.imported, self.job.skipped, self.job.failed), (2, 1, 1))
+        self.assertEqual(self.job.current_atel, 104)
+        self.assertEqual(self.job.rate, 2.0)
+        self.assertIn('ATel #102', self.job.last_error)
+        self.assertEqual(self.record_progress.call_count, 4)
+        self.set_next_atel.assert_has_calls([call(101), call(102), call(103), call(104)])
+        self.finish_job.assert_called_once_with(self.job, self.worker.worker_id, JobState.COMPLETED)
+        self.sleep.assert_not_called()
+
+    # Tests that a cancelled job stops after the current report
+    def test_cancelled(self):
+        self.record_progress.side_effect = [JobState.RUNNING, JobState.CANCELLING]
+
+        self.assertEqual(self.worker.run_job(self.job), JobState.CANCELLED)
+        self.assertEqual(self.imported, [100, 101])
+        self.finish_job.assert_called_once_with(self.job, self.worker.worker_id, JobState.CANCELLED)
+
+        # A job cancelled before it was resumed imports nothing
+        self.finish_job.reset_mock()
+        job = ImportJob(2, JobState.CANCELLING, 100, 102)
+        self.assertEqual(self.worker.run_job(job), JobState.CANCELLED)
+        self.assertEqual(self.imported, [100, 101])
+        self.finish_job.assert_called_once_with(job, self.worker.worker_id, JobState.CANCELLED)
+
+    # Tests that a download failure pauses the job and retries the report, while other failures fail the job
+    def test_failed(self):
+        import_one = self.worker._import_one
+        failures = [ImportFailError('Network error')]
+        def import_after_failure(atel_num):
+            if failures:
+                raise failures.pop()
+            import_one(atel_num)
+        self.worker._import_one = import_after_failure
+
+        self.assertEqual(self.worker.run_job(self.job), JobState.COMPLETED)
+        self.assertEqual(self.imported, [100, 101, 102, 103])
+        self.assertEqual(self.job.last_error, 'ATel #100: Network error')
+        self.assertEqual(self.record_progress.call_count, 5)
+        self.sleep.assert_called_once_with(FAILURE_PAUSE_SECONDS)
+
+        self.finish_job.reset_mock()
+        self.set_next_atel.reset_mock()
+        self.worker._import_one = MagicMock(side_effect=Exception('Database error'))
+        job = ImportJob(2, JobState.RUNNING, 100, 100)
+        self.assertEqual(self.worker.run_job(job), JobState.FAILED)
+        self.assertEqual(job.current_atel, 100)
+        self.assertEqual(job.last_error, 'ATel #100: Database error')
+        self.finish_job.assert_called_once_with(job, self.worker.worker_id, JobState.FAILED)
+        self.set_next_atel.assert_not_called()
+
+    # Tests that a job is left running, to be resumed, when it is claimed by another worker or the worker stops
+    def test_resumable(self):
+        self.record_progress.return_value = None
+        self.assertEqual(self.worker.run_job(self.job), JobState.RUNNING)
+        self.assertEqual(self.job.current_atel, 101)
+        self.finish_job.assert_not_called()
+
+        self.record_progress.return_value = JobState.RUNNING
+        self.worker.stop()
+        self.assertEqual(self.worker.run_job(self.job), JobState.RUNNING)
+        self.assertEqual(self.job.current_atel, 102)
+        self.finish_job.assert_not_called()
+
+    # Tests that a throttled job waits between reports
+    def test_delay(self):
+        self.job.delay_seconds = 2.5
+
+        self.assertEqual(self.worker.run_job(self.job), JobState.COMPLETED)
+        self.sleep.assert_has_calls([call(2.5)] * 4)
+
+    # Tests that a leased range is imported to its end and completed, without storing the next ATel number
+    def test_lease_completed(self):
+        self.imported.append(98)
+        lease = ImportLease(1, 96, 100, 97)
+
+        self.assertEqual(self.worker.run_lease(lease), JobState.RUNNING)
+        self.assertEqual(self.imported, [98, 97, 99])
+        self.assertEqual((lease.imported, lease.skipped, lease.current_atel), (2, 1, 100))
+        self.assertEqual(self.record_progress.call_count, 2)
+        self.complete_lease.assert_called_once_with(lease, self.worker.worker_id, 100, False)
+        self.set_next_atel.assert_not_called()
+
+    # Tests that a report not found stops a leased range at that report
+    def test_lease_not_found(self):
+        self.complete_lease.return_value = JobState.COMPLETED
+        lease = ImportLease(1, 100, 110, 100)
+
+        self.assertEqual(self.worker.run_lease(lease), JobState.COMPLETED)
+        self.assertEqual(self.imported, [100, 101, 102, 103])
+        self.complete_lease.assert_called_once_with(lease, self.worker.worker_id, 104, False)
+
+        # a failure other than a download failure fails the job
+        self.complete_lease.reset_mock()
+        self.worker._import_one = MagicMock(side_effect=Exception('Database error'))
+        self.worker.run_lease(ImportLease(1, 110, 120, 110))
+        self.complete_lease.assert_called_once_with(ImportLease(1, 110, 120, 110, last_error='ATel #110: Database error'), self.worker.worker_id, 110, True)
+
+    # Tests that a download failure pauses a leased range and retries the report
+    def test_lease_paused(self):
+        self.worker._import_one = MagicMock(side_effect=[ImportFailError('Network error'), None, None])
+        lease = ImportLease(1, 96, 98, 96)
+
+        self.assertEqual(self.worker.run_lease(lease), JobState.RUNNING)
+        self.assertEqual(self.worker._import_one.call_args_list, [call(96), call(96), call(97)])
+        self.assertEqual(lease.imported, 2)
+        self.assertEqual(lease.last_error, 'ATel #96: Network error')
+        self.sleep.assert_called_once_with(FAILURE_PAUSE_SECONDS)
+        self.complete_lease.assert_called_once_with(lease, self.worker.worker_id, 98, False)
+
+    # Tests that a report that cannot be downloaded is counted as failed and skipped once it has been attempted MAX_REPORT_ATTEMPTS times
+    def test_attempt_cap(self):
+        import_one = self.worker._import_one
+        def import_one_failing(atel_num):
+            if atel_num == 101:
+                raise ImportFailError('Render error')
+            import_one(atel_num)
+        self.worker._import_one = import_one_failing
+
+        self.assertEqual(self.worker.run_job(self.job), JobState.COMPLETED)
+        self.assertEqual(self.imported, [100, 102, 103])
+        self.assertEqual((self.job.imported, self.job.failed), (3, 1))
+        self.assertEqual(self.job.last_error, 'ATel #101: Render error')
+        self.assertEqual(self.job.report_attempts, 0)
+        self.assertEqual(self.sleep.call_args_list, [call(FAILURE_PAUSE_SECONDS)] * (MAX_REPORT_ATTEMPTS - 1))
+
+    # Tests that a leased range stops when cancelled, and is left to be resumed when leased to another worker
+    def test_lease_stopped(self):
+        self.record_progress.return_value = JobState.CANCELLING
+        lease = ImportLease(1, 90, 100, 90)
+        self.complete_lease.return_value = JobState.CANCELLED
+        self.assertEqual(self.worker.run_lease(lease), JobState.CANCELLED)
+        self.complete_lease.assert_called_once_with(lease, self.worker.worker_id, 91, False)
+
+        self.complete_lease.reset_mock()
+        self.record_progress.return_value = None
+        self.assertEqual(self.worker.run_lease(ImportLease(1, 90, 100, 91)), JobState.RUNNING)
+        self.complete_lease.assert_not_called()
+
+    # Tests that reports missing before the newest report are skipped
+    def test_gap_skipped(self):
+        import_one = self.worker._import_one
+        def import_with_gap(atel_num):
+            if atel_num == 101:
+                raise ReportNotFoundError('Not found')
+            import_one(atel_num)
+        self.worker._import_one = import_with_gap
+        self.job.newest_atel = 103
+
+        self.assertEqual(self.worker.run_job(self.job), JobState.COMPLETED)
+        self.assertEqual(self.imported, [100, 102, 103])
+        self.assertEqual(self.job.skipped, 1)
+        self.assertEqual(self.job.last_error, 'ATel #101 does not exist')
+        self.assertEqual(self.job.current_atel, 104)
+
+# Download scheduler
+class TestDownloadScheduler(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.waits = []
+        self.sessions = []
+
+        self.scheduler = self.make_scheduler(rate=1.0, burst=2)
+
+    def make_scheduler(self, rate, burst):
+        def sleep(seconds):
+            self.waits.append(seconds)
+            self.now += seconds
+
+        def open_session():
+            self.sessions.append(MagicMock())
+            return self.sessions[-1]
+
+        return DownloadScheduler(rate=rate, burst=burst, attempts=3, backoff_base=0.5, backoff_max=60.0,
+            open_session=open_session, clock=lambda: self.now, sleep=sleep, jitter=lambda: 1.0)
+
+    # Tests that requests are limited to the rate after a burst, reusing the thread's session
+    def test_rate_limited(self):
+        request = MagicMock(return_value='page')
+        for _ in range(4):
+            self.assertEqual(self.scheduler.fetch('https://www.astronomerstelegram.org/?read=1', request), 'page')
+
+        self.assertEqual(self.waits, [1.0, 1.0])
+        self.assertEqual(len(self.sessions), 1)
+        request.assert_called_with(self.sessions[0], 'https://www.astronomerstelegram.org/?read=1')
+        self.assertEqual(self.scheduler.requests_per_second(), 4 / 60)
+
+        self.now += 60
+        self.assertEqual(self.scheduler.requests_per_second(), 0.0)
+
+    # Tests that a failed request pauses every request with exponential backoff before it is retried
+    def test_retried(self):
+        # Requests are not limited by rate, so only pauses after failures are waited for
+        self.scheduler = self.make_scheduler(rate=1000, burst=1000)
+        request = MagicMock(side_effect=[ConnectionError(), HTTPError(), 'page'])
+        self.assertEqual(self.scheduler.fetch('https://www.astronomerstelegram.org/?read=1', request), 'page')
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual(self.waits, [0.5, 1.0])
+        self.assertEqual(self.scheduler.paused_for(), 0.0)
+
+        # Consecutive failures are counted from zero again after a success
+        request = MagicMock(side_effect=ConnectionError())
+        with self.assertRaises(ConnectionError):
+            self.scheduler.fetch('https://www.astronomerstelegram.org/?read=2', request)
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual(self.waits[2:], [0.5, 1.0])
+        self.assertEqual(self.scheduler.paused_for(), 2.0)
+
+        # Other errors are not retried
+        request = MagicMock(side_effect=ValueError())
+        with self.assertRaises(ValueError):
+            self.scheduler.fetch('https://www.astronomerstelegram.org/?read=3', request)
+        self.assertEqual(request.call_count, 1)
+
+    # Tests that a render timeout opens a new session for the next attempt
+    def test_render_timeout(self):
+        request = MagicMock(side_effect=[TimeoutError(), 'page'])
+        self.assertEqual(self.scheduler.fetch('https://www.astronomerstelegram.org/?read=1', request), 'page')
+        self.assertEqual(len(self.sessions), 2)
+        self.sessions[0].close.assert_called_once()
+
+    # Tests that the number of requests to a host at a time is capped
+    def test_host_cap(self):
+        scheduler = DownloadScheduler(rate=1000, burst=1000, max_per_host=2)
+        active = []
+        peak = []
+        release = threading.Event()
+
+        def request(session, url):
+            active.append(url)
+            peak.append(len(active))
+            release.wait(5)
+            active.remove(url)
+
+        threads = [threading.Thread(target=scheduler.fetch, args=(f'https://example.org/?read={i}', request)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        self.assertEqual(len(active), 2)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(max(peak), 2)
+
+# Mock ATel website
+class TestMockWebsite(unittest.TestCase):
+    def setUp(self):
+        self.server = MockATelServer(10001, missing={9990})
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+        patcher = mock.patch.dict(os.environ, {'ATEL_BASE_URL': self.server.base_url})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch('controller.importer.importer.download_scheduler', DownloadScheduler(rate=1000, burst=1000, jitter=lambda: 0.0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    # Tests that reports are requested from the website set by ATEL_BASE_URL
+    def test_base_url(self):
+        self.assertEqual(report_url(5), f'{self.server.base_url}?read=5')
+        with mock.patch.dict(os.environ, {'ATEL_BASE_URL': ''}):
+            self.assertEqual(report_url(5), 'https://www.astronomerstelegram.org/?read=5')
+
+    # Tests that fixtures and synthetic reports exist, while missing reports and reports after the newest do not
+    def test_probe(self):
+        self.assertTrue(probe_report(1000))
+        self.assertTrue(probe_report(5000))
+        self.assertFalse(probe_report(9990))
+        self.assertFalse(probe_report(10002))
+        self.assertEqual(find_newest_report(9980, probe_report), 10001)
+        self.assertGreater(self.server.requests, 0)
+
+    # Tests that a downloaded fixture and synthetic report are parsed, without rendering them in a browser
+    @mock.patch('controller.importer.parser.parse_coords')
+    @mock.patch('controller.importer.parser.extract_known_aliases')
+    @mock.patch('requests_html.HTML.render')
+    def test_download_and_parse(self, mock_render, mock_extract_known_aliases, mock_parse_coords):
+        mock_extract_known_aliases.return_value = []
+        mock_parse_coords.return_value = []
+
+        report = parse_report(1000, download_report(1000))
+        self.assertEqual(report.title, 'INTEGRAL observations of GX339-4: preliminary spectral fit results')
+
+        report = parse_report(5001, download_report(5001))
+        self.assertTrue(report.title.startswith('Synthetic report 5001: '))
+        self.assertEqual(download_report(5001), download_report(5001))
+
+        self.assertIsNone(download_report(10002))
+
+    # Tests that an unmodified page is not downloaded again
+    def test_conditional_download(self):
+        html, etag, last_modified = download_if_modified(932)
+        self.assertIn('Referred to by ATel #', html)
+        self.assertIsNotNone(etag)
+
+        self.assertEqual(download_if_modified(932, etag, last_modified), (None, etag, last_modified))
+        self.assertIsNotNone(download_if_modified(933, etag)[0])
+
+    # Tests that responses are delayed by the latency
+    def test_latency(self):
+        self.server.latency = 0.2
+        start = time.monotonic()
+        probe_report(1000)
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+
+# Import ledger
+class TestImportLedger(unittest.TestCase):
+    def setUp(self):
+        patchers = {
+            'report_exists': mock.patch('controller.importer.importer.report_exists', return_value=False),
+            'download_report': mock.patch('controller.importer.importer.download_report', return_value='<html></html>'),
+            'parse_report': mock.patch('controller.importer.importer.parse_report'),
+            'add_report': mock.patch('controller.importer.importer.add_report'),
+            'fingerprint_report': mock.patch('controller.importer.importer.fingerprint_report'),
+            'record': mock.patch('controller.importer.importer.record_ledger_entry'),
+        }
+        self.mocks = {name: patcher.start() for name, patcher in patchers.items()}
+        for patcher in patchers.values():
+            self.addCleanup(patcher.stop)
+
+    def recorded(self):
+        self.mocks['record'].assert_called_once()
+        return self.mocks['record'].call_args[0][0]
+
+    # Tests that an imported report is recorded with the parser version and the time taken by each stage
+    def test_imported(self):
+        import_report(1000)
+        entry = self.recorded()
+        self.assertEqual((entry.atel_num, entry.status, entry.parser_version), (1000, LedgerStatus.IMPORTED, PARSER_VERSION))
+        self.assertIsNone(entry.failure_class)
+        self.assertGreaterEqual(entry.download_seconds, 0)
+        self.assertGreaterEqual(entry.parse_seconds, 0)
+        self.assertGreaterEqual(entry.insert_seconds, 0)
+
+    # Tests that reports which could not be parsed, downloaded or stored are recorded with the class of the failure
+    def test_failures(self):
+        self.mocks['parse_report'].side_effect = MissingReportElementError('Title is missing')
+        with self.assertRaises(MissingReportElementError):
+            import_report(1000)
+        entry = self.recorded()
+        self.assertEqual((entry.status, entry.failure_class, entry.last_error), (LedgerStatus.FAILED, 'MissingReportElementError', 'Title is missing'))
+
+        self.mocks['record'].reset_mock()
+        self.mocks['download_report'].side_effect = NetworkError('Connection refused')
+        with self.assertRaises(ImportFailError):
+            import_report(1000)
+        self.assertEqual((self.recorded().status, self.recorded().failure_class), (LedgerStatus.ERROR, 'NetworkError'))
+
+        self.mocks['record'].reset_mock()
+        self.mocks['download_report'].side_effect = None
+        self.mocks['parse_report'].side_effect = None
+        self.mocks['add_report'].side_effect = ValueError('Database error')
+        with self.assertRaises(ValueError):
+            import_report(1000)
+        self.assertEqual((self.recorded().status, self.recorded().failure_class), (LedgerStatus.ERROR, 'ValueError'))
+
+    # Tests that reports which already exist or are not found are not recorded, and a failure to record is not raised
+    def test_not_recorded(self):
+        self.mocks['report_exists'].return_value = True
+        with self.assertRaises(ReportAlreadyExistsError):
+            import_report(1000)
+
+        self.mocks['report_exists'].return_value = False
+        self.mocks['download_report'].return_value = None
+        with self.assertRaises(ReportNotFoundError):
+            import_report(1000)
+        self.mocks['record'].assert_not_called()
+
+        self.mocks['download_report'].return_value = '<html></html>'
+        self.mocks['record'].side_effect = Exception('Database error')
+        import_report(1000)
+
+# Ledger retrier
+class TestLedgerRetrier(unittest.TestCase):
+    def setUp(self):
+        self.entries = [LedgerEntry(atel_num, LedgerStatus.FAILED, 1, 'MissingReportElementError') for atel_num in (10, 20, 30, 40, 50)]
+        self.pages = []
+        self.outcomes = {}
+        self.record_entry = MagicMock()
+
+        def get_candidates(parser_version, failure_class, after_atel, limit):
+            self.pages.append((parser_version, failure_class, after_atel, limit))
+            return [entry for entry in self.entries if entry.atel_num > after_atel][:limit]
+
+        def import_one(atel_num):
+            if atel_num in self.outcomes:
+                raise self.outcomes[atel_num]
+
+        self.retrier = LedgerRetrier(get_candidates, import_one, self.record_entry, parser_version=2, batch_size=2)
+
+    # Tests that each report to retry is retried once, in pages, counting the outcomes
+    def test_outcomes(self):
+        self.outcomes = {20: MissingReportElementError('Title is missing'), 30: ReportAlreadyExistsError('Exists'), 40: ReportNotFoundError('Not found')}
+
+        outcomes = self.retrier.run('MissingReportElementError')
+        self.assertEqual(outcomes, {LedgerStatus.IMPORTED: 3, LedgerStatus.FAILED: 1, LedgerStatus.ERROR: 1})
+        self.assertEqual(self.pages, [(2, 'MissingReportElementError', 0, 2), (2, 'MissingReportElementError', 20, 2), (2, 'MissingReportElementError', 40, 2), (2, 'MissingReportElementError', 50, 2)])
+        self.record_entry.assert_has_calls([
+            call(LedgerEntry(30, LedgerStatus.IMPORTED, 2)),
+            call(LedgerEntry(40, LedgerStatus.ERROR, 2, 'ReportNotFoundError', 'Not found')),
+        ])
+
+    # Tests that retrying stops at the limit, or when a report cannot be downloaded
+    def test_stopped(self):
+        self.assertEqual(sum(self.retrier.run(limit=3).values()), 3)
+        self.assertEqual(self.pages[-1], (2, None, 20, 1))
+
+        self.outcomes = {20: ImportFailError('Network error')}
+        outcomes = self.retrier.run()
+        self.assertEqual(outcomes, {LedgerStatus.IMPORTED: 1, LedgerStatus.FAILED: 0, LedgerStatus.ERROR: 1})
+
+# Report fingerprints
+class TestFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.report = ImportedReport(1000, 'Title', 'Authors', 'Body', datetime(2021, 1, 2, 3, 4),
+                                     referenced_reports=[10, 20], observation_dates=[datetime(2021, 1, 1), datetime(2020, 12, 31)],
+                                     keywords=['radio', 'optical'], objects=['Vela X-1'],
+                                     coordinates=[SkyCoord(10.5, -20.25, unit='deg')], referenced_by=[2000])
+
+    def fingerprint(self, report):
+        return fingerprint_report(report, hash_html('<html></html>'), PARSER_VERSION)
+
+    # Tests that a fingerprint does not depend on the order of extracted values, or the whitespace of the page
+    def test_stable(self):
+        reordered = ImportedReport(1000, 'Title', 'Authors', 'Body', datetime(2021, 1, 2, 3, 4),
+                                   referenced_reports=[20, 10, 20], observation_dates=[datetime(2020, 12, 31), datetime(2021, 1, 1)],
+                                   keywords=['optical', 'radio'], objects=['Vela X-1'],
+                                   coordinates=[SkyCoord(10.5, -20.25, unit='deg')], referenced_by=[2000])
+        self.assertEqual(self.fingerprint(self.report), self.fingerprint(reordered))
+        self.assertEqual(hash_html('<html>\n  <body> </body></html>'), hash_html('<html> <body> </body></html>'))
+        self.assertNotEqual(hash_html('<html></html>'), hash_html('<html><p></p></html>'))
+
+    # Tests that only the sections whose data differ are changed
+    def test_changed_sections(self):
+        previous = self.fingerprint(self.report)
+        self.assertEqual(previous.changed_sections(None), list(ReportSection))
+        self.assertEqual(previous.changed_sections(previous), [])
+
+        self.report.title = 'New title'
+        self.report.referenced_by = [2000, 2001]
+        self.assertEqual(self.fingerprint(self.report).changed_sections(previous), [ReportSection.REPORT, ReportSection.REFERENCED_BY])
+
+        self.assertTrue(previous.is_unchanged(hash_html('<html></html>'), PARSER_VERSION))
+        self.assertFalse(previous.is_unchanged(hash_html('<html></html>'), PARSER_VERSION + 1))
+
+# Re-importing reports
+class TestReimport(unittest.TestCase):
+    def setUp(self):
+        self.html = '<html><p>Report</p></html>'
+        self.report = ImportedReport(1000, 'Title', 'Authors', 'Body', datetime(2021, 1, 2, 3, 4), referenced_by=[2000])
+        self.stored = fingerprint_report(self.report, hash_html(self.html), PARSER_VERSION)
+
+        patchers = {
+            'report_exists': mock.patch('controller.importer.importer.report_exists', return_value=True),
+            'download_report': mock.patch('controller.importer.importer.download_report', side_effect=lambda atel_num: self.html),
+            'parse_report': mock.patch('controller.importer.importer.parse_report', side_effect=lambda atel_num, html: self.report),
+            'get_report_fingerprint': mock.patch('controller.importer.importer.get_report_fingerprint', side_effect=lambda atel_num: self.stored),
+            'add_report': mock.patch('controller.importer.importer.add_report'),
+            'update_report': mock.patch('controller.importer.importer.update_report'),
+            'record': mock.patch('controller.importer.importer.record_ledger_entry'),
+        }
+        self.mocks = {name: patcher.start() for name, patcher in patchers.items()}
+        for patcher in patchers.values():
+            self.addCleanup(patcher.stop)
+
+    # Tests that an unchanged page is not parsed or stored again
+    def test_unchanged(self):
+        self.assertEqual(reimport_report(1000), [])
+        self.mocks['parse_report'].assert_not_called()
+        self.mocks['update_report'].assert_not_called()
+        self.assertEqual(self.mocks['record'].call_args[0][0].status, LedgerStatus.IMPORTED)
+
+        # a page that parses to the same data only updates the fingerprint
+        self.html = '<html><p>Report</p><p>Advert</p></html>'
+        self.assertEqual(reimport_report(1000), [])
+        self.mocks['update_report'].assert_called_once_with(self.report, fingerprint_report(self.report, hash_html(self.html), PARSER_VERSION), [])
+
+    # Tests that only the changed sections are written
+    def test_changed(self):
+        self.html = '<html><p>Report</p><p>Referred to by ATel #2001</p></html>'
+        self.report = ImportedReport(1000, 'Title', 'Authors', 'Body', datetime(2021, 1, 2, 3, 4), referenced_by=[2000, 2001])
+        self.assertEqual(reimport_report(1000), [ReportSection.REFERENCED_BY])
+        self.assertEqual(self.mocks['update_report'].call_args[0][2], [ReportSection.REFERENCED_BY])
+
+        # a report parsed by an older parser is parsed again, and one without a fingerprint is rewritten
+        self.stored = ReportFingerprint(1000, hash_html(self.html), PARSER_VERSION - 1, self.stored.section_hashes)
+        reimport_report(1000)
+        self.mocks['parse_report'].assert_called()
+        self.stored = None
+        self.assertEqual(reimport_report(1000), list(ReportSection))
+
+        # a report that is not stored is imported
+        self.mocks['report_exists'].return_value = False
+        self.assertEqual(reimport_report(1000), list(ReportSection))
+        self.mocks['add_report'].assert_called_once_with(self.report, fingerprint_report(self.report, hash_html(self.html), PARSER_VERSION))
+
+# Reparser
+class TestReparser(unittest.TestCase):
+    def setUp(self):
+        self.reports = [10, 20, 30, 40, 50]
+        self.pages = []
+        self.outcomes = {}
+
+        def get_candidates(parser_version, after_atel, limit):
+            self.pages.append((parser_version, after_atel, limit))
+            return [atel_num for atel_num in self.reports if atel_num > after_atel][:limit]
+
+        def reimport_one(atel_num):
+            if isinstance(self.outcomes.get(atel_num), Exception):
+                raise self.outcomes[atel_num]
+            return self.outcomes.get(atel_num, [])
+
+        self.reparser = Reparser(get_candidates, reimport_one, parser_version=2, batch_size=2)
+
+    # Tests that each report is re-imported once, in pages, counting the outcomes
+    def test_outcomes(self):
+        self.outcomes = {20: [ReportSection.COORDINATES], 40: MissingReportElementError('Title is missing')}
+        self.assertEqual(self.reparser.run(), (3, 1, 1))
+        self.assertEqual(self.pages, [(2, 0, 2), (2, 20, 2), (2, 40, 2), (2, 50, 2)])
+
+        self.pages = []
+        self.reparser.run(all_reports=True, limit=3)
+        self.assertEqual(self.pages, [(None, 0, 2), (None, 20, 1)])
+
+    # Tests that re-importing stops when a report cannot be downloaded
+    def test_stopped(self):
+        self.outcomes = {30: ImportFailError('Network error')}
+        self.assertEqual(self.reparser.run(), (2, 0, 1))
+
+# Reference refresher
+class TestReferenceRefresher(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime(2021, 10, 1)
+        self.page = '<div id="references"><p>Referred to by ATel #: <a>101</a>, <a>102</a></p></div>'
+        self.stored_refs = {101}
+        self.record_check = MagicMock()
+
+        def download(atel_num, etag, last_modified):
+            if etag == 'current':
+                return None, etag, last_modified
+            return self.page, None, None
+
+        def add_refs(atel_num, referenced_by):
+            new_refs = [num for num in referenced_by if num not in self.stored_refs]
+            self.stored_refs.update(new_refs)
+            return new_refs
+
+        self.add_refs = MagicMock(side_effect=add_refs)
+        self.get_due = MagicMock(return_value=[])
+        self.refresher = ReferenceRefresher(self.get_due, self.record_check, self.add_refs, download, lambda: self.now)
+
+    # Tests that only new references are stored, and unchanged references are checked less often
+    def test_refresh(self):
+        check = ReferenceCheck(100)
+        self.assertEqual(self.refresher.refresh(check), [102])
+        self.assertEqual((check.unchanged_count, check.checked_at), (0, self.now))
+        self.assertEqual(check.next_check_at, self.now + timedelta(hours=REFERENCE_CHECK_BASE_HOURS))
+        self.record_check.assert_called_once_with(check)
+
+        # an unchanged references block is not parsed or stored again
+        self.assertEqual(self.refresher.refresh(check), [])
+        self.add_refs.assert_called_once()
+        self.assertEqual(check.unchanged_count, 1)
+        self.assertEqual(check.next_check_at, self.now + timedelta(hours=REFERENCE_CHECK_BASE_HOURS * 2))
+
+        # nor is an unmodified page
+        check.etag = 'current'
+        self.refresher.refresh(check)
+        self.assertEqual(check.unchanged_count, 2)
+
+        check.etag = None
+        self.page = self.page.replace('</p>', ', <a>103</a></p>')
+        self.assertEqual(self.refresher.refresh(check), [103])
+        self.assertEqual(check.unchanged_count, 0)
+
+    # Tests that the time between checks is capped
+    def test_check_interval(self):
+        self.assertEqual(check_interval(0), timedelta(hours=REFERENCE_CHECK_BASE_HOURS))
+        self.assertEqual(check_interval(100), timedelta(days=REFERENCE_CHECK_MAX_DAYS))
+
+    # Tests that recently published reports are checked, stopping when the AT website is unavailable
+    def test_run(self):
+        self.get_due.return_value = [ReferenceCheck(100), ReferenceCheck(200), ReferenceCheck(300)]
+        self.assertEqual(self.refresher.run(10), (3, 1))
+        self.get_due.assert_called_once_with(self.now - timedelta(days=REFERENCE_REFRESH_DAYS), 10)
+
+        self.refresher._download = MagicMock(side_effect=NetworkError('Connection refused'))
+        self.assertEqual(self.refresher.run(), (0, 0))
+
+# Frontier probe
+class TestFrontier(unittest.TestCase):
+    def setUp(self):
+        # Downloads are retried without pausing, so failures are raised quickly
+        patcher = mock.patch('controller.importer.importer.download_scheduler', DownloadScheduler(rate=1000, burst=1000, jitter=lambda: 0.0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def find(self, start, newest, gaps=(), max_gap=3):
+        probes = []
+        def exists(atel_num):
+            probes.append(atel_num)
+            return atel_num <= newest and atel_num not in gaps
+        return find_newest_report(start, exists, max_gap), probes
+
+    # Tests that the newest report is found with a logarithmic number of probes
+    def test_newest(self):
+        newest, probes = self.find(1000, 15000)
+        self.assertEqual(newest, 15000)
+        self.assertLess(len(probes), 60)
+        self.assertEqual(len(probes), len(set(probes)))
+
+        self.assertEqual(self.find(1000, 1000)[0], 1000)
+        self.assertEqual(self.find(1000, 1001)[0], 1001)
+
+    # Tests that no new reports are found when the next report does not exist
+    def test_no_new_reports(self):
+        newest, probes = self.find(1000, 999)
+        self.assertEqual(newest, 999)
+        self.assertEqual(probes, [1000, 1001, 1002])
+
+    # Tests that isolated missing reports are skipped, while longer gaps end the search
+    def test_gaps(self):
+        self.assertEqual(self.find(1000, 1200, gaps={1001, 1002, 1100, 1198, 1199})[0], 1200)
+        self.assertEqual(self.find(1000, 1200, gaps=set(range(1001, 1200)))[0], 1000)
+
+    # Tests that ranges are sized from the number of waiting reports
+    def test_range_size(self):
+        self.assertEqual(choose_range_size(None), DEFAULT_IMPORT_RANGE_SIZE)
+        self.assertEqual(choose_range_size(0), 1)
+        self.assertEqual(choose_range_size(3200), 100)
+        self.assertEqual(choose_range_size(10 ** 9), MAX_IMPORT_RANGE_SIZE)
+
+    # Tests that a probe checks the page without rendering it
+    @mock.patch('requests_html.HTMLSession.get')
+    def test_probe(self, mock_get):
+        f = open(os.path.join('test', 'res', 'atel1000.html'), 'r')
+        mock_get.return_value.text = f.read()
+        f.close()
+        mock_get.return_value.status_code = 200
+        self.assertTrue(probe_report(1000))
+
+        mock_get.return_value.text = '<p>Header</p><p>This ATel does not appear to exist.</p>'
+        self.assertFalse(probe_report(9999999))
+
+        mock_get.side_effect = ConnectionError('Connection refused')
+        with self.assertRaises(NetworkError):
+            probe_report(1000)
+
 # Parser functions
 class TestParserFunctions(unittest.TestCase):
     # Tests parse_report function
@@ -442,6 +1153,18 @@ class TestParserFunctions(unittest.TestCase):
         self.assertCountEqual(extract_known_aliases('alias-for-object and .(z)+'), ['object', '.(z)+'])
         self.assertCountEqual(extract_known_aliases('s.p\ecial\ char+ac()ters and .(z)+'), ['.(z)+'])
 
+    # Tests extract_references and parse_referenced_by functions
+    def test_references_extractor(self):
+        f = open(os.path.join('test', 'res', 'atel14000.html'), 'r')
+        references_text = extract_references(f.read())
+        f.close()
+        self.assertEqual(parse_referenced_by(references_text), [14003, 14100, 14168])
+
+        f = open(os.path.join('test', 'res', 'atel1000.html'), 'r')
+        self.assertEqual(extract_references(f.read()), '')
+        f.close()
+        self.assertEqual(parse_referenced_by('Referred to by ATel #: 5, 6, 5'), [5, 6])
+
     # Tests extract_keywords function
     def test_keywords_extractor(self):
         self.assertCountEqual(extract_keywords('This is a test'), [])
@@ -457,8 +1180,92 @@ class TestParserFunctions(unittest.TestCase):
         self.assertCountEqual(extract_keywords('sub millimeter, suns, pre-MaiN Sequence stars and binaries'), ['millimeter', 'sub-millimeter', 'the sun', 'pre-main-sequence star', 'star', 'binary'])
         self.assertCountEqual(extract_keywords('supernovae and asteroids (binary)'), ['supernovae', 'asteroid', 'asteroid(binary)', 'binary'])
 
+# The highest accepted time taken to extract coordinates and dates from a text, per KB, as a multiple of the time taken for ordinary report text measured in the same run.
+# Linear extraction is within 10 times; backtracking was hundreds of times slower.
+MAX_EXTRACTION_SLOWDOWN = 50.0
+
+# Text like the body of an ordinary report, used to measure the baseline extraction time.
+BASELINE_TEXT = ('We report the discovery of a new transient in the field of M 31 on 2021 Jan 5.3 UT. '
+                 'The source is located at RA = 00:42:44.3, Dec = +41:16:09 (J2000), with an uncertainty of 0.5 arcsec. '
+                 'Follow-up observations with the 2-m telescope confirmed a magnitude of 18.2 in the r band. ') * 60
+
+# Parser performance
+class TestParserPerformance(unittest.TestCase):
+    # Builds texts that make backtracking regexes slow: long runs of whitespace between coordinate-like values, and tables of numbers
+    def corpus(self):
+        rng = random.Random(50)
+        tokens = ['ra', 'r.a.', 'dec', 'decl.', '(j2000)', '=', ':', ',', ';', 'h', 'm', 's', 'd', "'", "''", '"', '.', '+', '-', '(', ')', ' ', '  ', '\n', '\t', '\xa0']
+        tokens += [str(num) for num in range(100)]
+
+        texts = {
+            'space runs': ('RA 12 ' + ' ' * 1000) * 8,
+            'space runs before dec': 'RA 1 2 3 DEC' + ' ' * 3000,
+            'non-breaking space runs': ('RA 12 ' + '\xa0 ' * 500) * 8,
+            'mixed whitespace': ('RA 1\t2\t3 DEC\n' + '\t \n' * 50) * 100,
+            'number table': '\n'.join(' '.join(f'{rng.randint(0, 99):>5}' for _ in range(12)) for _ in range(200)),
+            'coordinate table': '\n'.join(f'RA {rng.randint(0, 23)}:{rng.randint(0, 59)}:{rng.randint(0, 59)}.{rng.randint(0, 99)}   DEC -{rng.randint(0, 89)}:{rng.randint(0, 59)}:{rng.randint(0, 59)}' for _ in range(300)),
+        }
+        for i in range(20):
+            texts[f'fuzz {i}'] = ' '.join(rng.choice(tokens) for _ in range(1000))
+        return texts
+
+    # Measures the fastest of several extractions from a text, in seconds per KB, so a busy machine slows the baseline and the texts alike
+    def seconds_per_kb(self, text, repeats=3):
+        fastest = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            extract_coords(text)
+            extract_dates(text)
+            elapsed = time.perf_counter() - start
+            fastest = elapsed if fastest is None else min(fastest, elapsed)
+        return fastest / (len(text) / 1024)
+
+    # Tests that extraction time is linear in the length of the text, compared to ordinary report text
+    def test_extraction_time(self):
+        baseline = self.seconds_per_kb(BASELINE_TEXT)
+        for name, text in self.corpus().items():
+            self.assertLessEqual(self.seconds_per_kb(text), baseline * MAX_EXTRACTION_SLOWDOWN, name)
+
+    # Tests that long runs of whitespace are shortened rather than skipped
+    def test_whitespace_runs(self):
+        self.assertEqual(extract_coords('RA' + ' ' * 50 + '10.0, DEC: 20.0'), ['ra' + ' ' * MAX_WHITESPACE_RUN + '10.0, dec: 20.0'])
+
+    # Tests that extraction stops once the parse budget is spent, failing the report like one missing data
+    def test_budget(self):
+        with self.assertRaises(ParseBudgetExceededError):
+            extract_coords('RA: 10.0, DEC: 20.0', time.monotonic() - 1)
+        with self.assertRaises(MissingReportElementError):
+            extract_dates('1 Jan 2021', time.monotonic() - 1)
+        self.assertEqual(extract_coords('RA: 10.0, DEC: 20.0', time.monotonic() + 60), ['ra: 10.0, dec: 20.0'])
+
+    # Tests that the regex backend is chosen by the environment variable
+    def test_regex_backend(self):
+        with mock.patch.dict(os.environ, {'REGEX_BACKEND': 're'}):
+            self.assertIs(regex_backend.regex_backend(), re)
+            self.assertIs(regex_backend.compile_pattern('ra'), regex_backend.compile_pattern('ra'))
+        with mock.patch.dict(os.environ, {'REGEX_BACKEND': 'pcre'}):
+            with self.assertRaises(ValueError):
+                regex_backend.regex_backend()
+        with mock.patch.object(regex_backend, 're2', None):
+            with mock.patch.dict(os.environ, {'REGEX_BACKEND': 'auto'}):
+                self.assertIs(regex_backend.regex_backend(), re)
+            with mock.patch.dict(os.environ, {'REGEX_BACKEND': 're2'}):
+                with self.assertRaises(ValueError):
+                    regex_backend.regex_backend()
+
+        # patterns the backend does not support are compiled with re
+        backend = MagicMock()
+        backend.compile.side_effect = Exception('Unsupported')
+        self.assertEqual(regex_backend._compile('(?=ra)', backend).pattern, '(?=ra)')
+
 # Custom exceptions
 class TestCustomExceptions(unittest.TestCase):
+    def setUp(self):
+        # Downloads are retried without pausing, so failures are raised quickly
+        patcher = mock.patch('controller.importer.importer.download_scheduler', DownloadScheduler(rate=1000, burst=1000, jitter=lambda: 0.0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     # Tests that ReportAlreadyExistsError is being raised
     @mock.patch('controller.importer.importer.add_report')
     @mock.patch('controller.importer.importer.parse_report')
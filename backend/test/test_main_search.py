@@ -28,14 +28,24 @@ from model.db.db_interface import ExistingObjectError
 from controller.search.search import UPDATE_OBJECT_DAYS
 from model.constants import DEFAULT_RADIUS
 from model.ds.report_types import ReportResult
+from model.ds.pagination import PageCursor, ReportPage
 from astropy.coordinates import SkyCoord
 from model.ds.search_filters import SearchFilters
-from controller.search.query_simbad import QuerySimbadError
+from controller.search.query_simbad import QuerySimbadError, SimbadUnavailableError
 from datetime import datetime, timedelta
 import unittest as ut 
 from unittest.mock import MagicMock, call
 
 from controller.search import search
+from controller.search.refresher import ObjectRefresher
+from controller.helper.resilience import Deadline
+from controller.search.snippets import SNIPPET_WINDOW_CHARS
+import threading
+import time
+
+# Other tests replace these module attributes, so keep the originals.
+_check_object_updates = search.check_object_updates
+_refresher = search.refresher
 
 
 ###################################
@@ -111,6 +121,121 @@ class TestCheckObjectUpdates(ut.TestCase):
         mock.qs.get_aliases.assert_called_with("test2")
 
 
+##############################
+# Testing: ObjectRefresher() #
+##############################
+class TestObjectRefresher(ut.TestCase):
+    def setUp(self):
+        self.refreshed = []
+        self.done = threading.Event()
+
+        def refresh(name):
+            self.refreshed.append(name)
+            if len(self.refreshed) == 3:
+                self.done.set()
+
+        self.refresher = ObjectRefresher(refresh, lambda limit: [], interval=0.0, scan_period=3600.0)
+
+    def tearDown(self):
+        self.refresher.stop()
+
+
+    def test_drains_queue(self):
+        '''
+        Case 1: Queued objects are refreshed in order on the background thread, and
+        duplicates are only queued once.
+        '''
+        self.assertTrue(self.refresher.enqueue("a"))
+        self.assertFalse(self.refresher.enqueue("a"))
+        self.refresher.enqueue("b")
+        self.refresher.enqueue("c")
+
+        self.refresher.start()
+        self.assertTrue(self.done.wait(5))
+        self.assertEqual(self.refreshed, ["a", "b", "c"])
+
+
+    def test_proactive_scan(self):
+        '''
+        Case 2: When idle, the refresher refreshes the stale objects from the local database.
+        '''
+        find_stale = MagicMock(return_value=["x", "y", "z"])
+        self.refresher._find_stale = find_stale
+        self.refresher._scan_period = 0.0
+
+        self.refresher.start()
+        self.assertTrue(self.done.wait(5))
+        find_stale.assert_called_with(self.refresher._batch_size)
+        self.assertEqual(self.refreshed[:3], ["x", "y", "z"])
+
+
+    def test_scan_lease(self):
+        '''
+        Case 3: Only the refresher holding the scan lease scans for stale objects.
+        '''
+        find_stale = MagicMock(return_value=["x"])
+        self.refresher._find_stale = find_stale
+        self.refresher._acquire_scan = MagicMock(return_value=False)
+
+        self.refresher._scan()
+        find_stale.assert_not_called()
+        self.assertEqual(self.refresher.pending(), 0)
+
+        self.refresher._acquire_scan.return_value = True
+        self.refresher._scan()
+        find_stale.assert_called_with(self.refresher._batch_size)
+        self.assertEqual(self.refresher.pending(), 1)
+
+
+    def test_check_object_updates_enqueues(self):
+        '''
+        Case 4: While the refresher is running, stale objects are queued rather than
+        updated during the search.
+        '''
+        mock = search
+        mock.qs.get_aliases = MagicMock()
+        mock.db.add_aliases = MagicMock()
+        mock.refresher = MagicMock()
+        mock.refresher.is_running = MagicMock(return_value=True)
+
+        try:
+            _check_object_updates("object", datetime.now() - timedelta(days=200))
+            mock.refresher.enqueue.assert_called_with("object")
+            mock.qs.get_aliases.assert_not_called()
+            mock.db.add_aliases.assert_not_called()
+        finally:
+            mock.refresher = _refresher
+
+
+    def test_scan_backlog(self):
+        '''
+        Case 5: While scans find a full batch of stale objects, the next scan is
+        made once the batch is refreshed, until a scan finds fewer objects or
+        the same objects again.
+        '''
+        stale = [f"obj{i}" for i in range(25)]
+        self.refresher._refresh = lambda name: self.refreshed.append(name) or stale.remove(name)
+        find_stale = MagicMock(side_effect=lambda limit: stale[:limit])
+        self.refresher._find_stale = find_stale
+
+        self.refresher.start()
+        deadline = time.monotonic() + 5
+        while stale and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(stale, [])
+        self.assertEqual(len(self.refreshed), 25)
+        self.assertEqual(find_stale.call_count, 3)
+        self.assertFalse(self.refresher._backlog)
+
+        self.refresher.stop()
+        self.refresher._thread.join(5)
+        find_stale.side_effect = lambda limit: [f"obj{i}" for i in range(limit)]
+        self.refresher._scan()
+        self.assertTrue(self.refresher._backlog)
+        self.refresher._scan()
+        self.assertFalse(self.refresher._backlog)
+
+
 class TestSearch(ut.TestCase):
     def setUp(self): 
         self.filters = SearchFilters(term="term")
@@ -120,6 +245,7 @@ class TestSearch(ut.TestCase):
         self.dt_exact = datetime.now() - timedelta(days=60)
         self.dt_old = datetime.now() - timedelta(days=200)
         self.sample_report = ReportResult(1000, "Title", "Authors", "Body", self.dt_old, []) 
+        search.unknown_names.clear()
 
 
 #####################################
@@ -143,7 +269,7 @@ class TestSearchByName(TestSearch):
 
         mock.check_object_updates.assert_not_called()
         mock.db.get_object_coords.assert_not_called() 
-        mock.qs.query_simbad_by_name.assert_called_with("name", True)
+        mock.qs.query_simbad_by_name.assert_called_with("name", True, deadline=None)
         mock.db.add_object.assert_not_called()
 
 
@@ -224,7 +350,7 @@ class TestSearchByName(TestSearch):
         mock.db.object_exists.assert_called_with("name")
         mock.check_object_updates.assert_not_called()
         mock.db.get_object_coords.assert_not_called()
-        mock.qs.query_simbad_by_name.assert_called_with("name", True)
+        mock.qs.query_simbad_by_name.assert_called_with("name", True, deadline=None)
         mock.db.add_object.assert_called_with("mainid", self.sample_coords, ["alias1", "alias2", "name"])
         mock.db.find_reports_by_object.assert_called_with(self.filters, None, "name")
         mock.db.find_reports_in_coord_range.assert_called_with(self.filters, None, self.sample_coords, DEFAULT_RADIUS)
@@ -292,7 +418,7 @@ class TestSearchByName(TestSearch):
         mock.db.object_exists.assert_called_with("nonalias")
         mock.check_object_updates.assert_not_called()
         mock.db.get_object_coords.assert_not_called()
-        mock.qs.query_simbad_by_name.assert_called_with("nonalias", True)
+        mock.qs.query_simbad_by_name.assert_called_with("nonalias", True, deadline=None)
         mock.db.add_object.assert_called_with("mainid", self.sample_coords, ["alias1", "alias2", "nonalias"])
         mock.db.add_aliases.assert_called_with("mainid", ["nonalias"])
         mock.db.find_reports_by_object.assert_called_with(self.filters, None, "nonalias")
@@ -360,7 +486,7 @@ class TestSearchByCoords(TestSearch):
         result = mock.search_reports_by_coords(self.filters, None, self.sample_coords) 
 
         mock.db.object_exists.assert_has_calls([call("main_1"), call("main_2")])
-        mock.qs.query_simbad_by_name.assert_has_calls([call("main_1", False), call("main_2", False)])
+        mock.qs.query_simbad_by_name.assert_has_calls([call("main_1", False, deadline=None), call("main_2", False, deadline=None)])
         mock.db.add_object.assert_has_calls([
             call("name", self.sample_coords, ["alias_1a", "alias_1b", "alias_1c"]), 
             call("name", self.sample_coords, ["alias_2a", "alias_2b"])])
@@ -420,5 +546,257 @@ class TestSearchByCoords(TestSearch):
             f.assert_not_called() 
 
 
+
+###################################
+# Testing: _lookup_unknown_object() #
+###################################
+class TestUnknownNames(TestSearch):
+    def test_negative_cache(self):
+        '''
+        Case 1: A name unknown to SIMBAD is not looked up again while remembered,
+        including when written differently.
+        '''
+        mock = search
+        mock.db.object_exists = MagicMock(return_value=(False, None))
+        mock.qs.query_simbad_by_name = MagicMock(return_value=None)
+        mock.db.find_reports_by_object = MagicMock(return_value=[])
+
+        self.assertEqual(mock.search_reports_by_name(self.filters, None, "AT 2021abc"), [])
+        self.assertEqual(mock.search_reports_by_name(self.filters, None, "at  2021ABC"), [])
+        mock.qs.query_simbad_by_name.assert_called_once_with("AT 2021abc", True, deadline=None)
+
+        # Errors are not remembered.
+        mock.qs.query_simbad_by_name = MagicMock(side_effect=QuerySimbadError("error"))
+        for _ in range(2):
+            with self.assertRaises(QuerySimbadError):
+                mock.search_reports_by_name(self.filters, None, "AT 2021xyz")
+        self.assertEqual(mock.qs.query_simbad_by_name.call_count, 2)
+
+
+    def test_concurrent_lookups(self):
+        '''
+        Case 2: Concurrent lookups of the same unknown name share one SIMBAD query.
+        '''
+        mock = search
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_query(name, aliases, deadline=None):
+            started.set()
+            release.wait(5)
+            return ("mainid", self.sample_coords, ["alias1"])
+
+        mock.qs.query_simbad_by_name = MagicMock(side_effect=slow_query)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(search._lookup_unknown_object("name"))) for _ in range(3)]
+        threads[0].start()
+        self.assertTrue(started.wait(5))
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.2) # Let the other lookups join the one in flight.
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(result[0] == "mainid" for result in results))
+        self.assertEqual(mock.qs.query_simbad_by_name.call_count, 1)
+
+
+#################################
+# Testing: degraded searches    #
+#################################
+class TestDegradedSearch(TestSearch):
+    def test_name_unavailable(self):
+        '''
+        Case 1: When SIMBAD is unavailable, a name search returns the local results
+        without remembering the name as unknown.
+        '''
+        mock = search
+        report = ReportResult(1, "Title", "Authors", "Body", self.dt_now, [])
+        mock.db.object_exists = MagicMock(return_value=(False, None))
+        mock.qs.query_simbad_by_name = MagicMock(side_effect=SimbadUnavailableError("unavailable"))
+        mock.db.find_reports_by_object = MagicMock(return_value=[report])
+        mock.db.find_reports_in_coord_range = MagicMock()
+
+        result = mock.search_reports_by_name(self.filters, None, "name")
+
+        self.assertIsInstance(result, ReportPage)
+        self.assertTrue(result.degraded)
+        self.assertEqual(list(result), [report])
+        mock.db.find_reports_in_coord_range.assert_not_called()
+        self.assertEqual(len(search.unknown_names), 0)
+
+
+    def test_update_unavailable(self):
+        '''
+        Case 2: When an existing object cannot be updated, its local reports and
+        coordinates are still searched.
+        '''
+        mock = search
+        mock.db.object_exists = MagicMock(return_value=(True, self.dt_old))
+        mock.check_object_updates = MagicMock(side_effect=SimbadUnavailableError("unavailable"))
+        mock.db.get_object_coords = MagicMock(return_value=self.sample_coords)
+        mock.db.find_reports_by_object = MagicMock(return_value=[])
+        mock.db.find_reports_in_coord_range = MagicMock(return_value=[])
+
+        result = mock.search_reports_by_name(self.filters, None, "name")
+
+        self.assertTrue(result.degraded)
+        mock.db.find_reports_in_coord_range.assert_called_with(self.filters, None, self.sample_coords, DEFAULT_RADIUS)
+
+
+    def test_coords_unavailable(self):
+        '''
+        Case 3: When SIMBAD is unavailable, a coordinate search only searches the local coordinates.
+        '''
+        mock = search
+        deadline = Deadline(1.0)
+        mock.qs.query_simbad_by_coords = MagicMock(side_effect=SimbadUnavailableError("unavailable"))
+        mock.db.object_exists = MagicMock()
+        mock.db.find_reports_by_object = MagicMock()
+        mock.db.find_reports_in_coord_range = MagicMock(return_value=[])
+
+        result = mock.search_reports_by_coords(self.filters, None, self.sample_coords, deadline=deadline)
+
+        mock.qs.query_simbad_by_coords.assert_called_with(self.sample_coords, DEFAULT_RADIUS, deadline=deadline)
+        self.assertTrue(result.degraded)
+        mock.db.object_exists.assert_not_called()
+        mock.db.find_reports_by_object.assert_not_called()
+
+        stream = mock.stream_reports_by_coords(self.filters, None, self.sample_coords)
+        self.assertTrue(stream.degraded)
+
+
+###############################
+# Testing: paginated searches #
+###############################
+class TestSearchPaging(TestSearch):
+    def setUp(self):
+        super().setUp()
+        self.reports = [ReportResult(n, "Title", "Authors", "Body", self.dt_old + timedelta(days=n), []) for n in range(1, 6)]
+
+
+    def test_make_page(self):
+        '''
+        Case 1: Merged reports are truncated to the limit, with a cursor after the last report.
+        '''
+        newest_first = list(reversed(self.reports))
+
+        page = search._make_page(newest_first, 3, [5], None)
+        self.assertEqual(list(page), newest_first[:3])
+        self.assertEqual(page.next_cursor, PageCursor.after(newest_first[2]))
+
+        # A full source page means there may be more reports.
+        page = search._make_page(newest_first[:2], 2, [2, 0], 7)
+        self.assertEqual(page.next_cursor, PageCursor.after(newest_first[1]))
+        self.assertEqual(page.total, 7)
+
+        # The last page has no cursor.
+        page = search._make_page(newest_first[:2], 3, [2], None)
+        self.assertIsNone(page.next_cursor)
+
+
+    def test_projection_args(self):
+        '''
+        Case 3: Only the requested text fields are selected, and only a window of
+        the body around the term when just a snippet is requested.
+        '''
+        self.assertEqual(search._projection_args(self.filters, None), {})
+        self.assertEqual(search._projection_args(self.filters, ["atel_num", "body", "title"]), {"fields": ["title", "body"]})
+        self.assertEqual(search._projection_args(self.filters, ["title", "snippet"]),
+                         {"fields": ["title"], "body_window": ("term", SNIPPET_WINDOW_CHARS)})
+        self.assertEqual(search._projection_args(None, ["snippet"]),
+                         {"fields": [], "body_window": ("", SNIPPET_WINDOW_CHARS)})
+
+
+    def test_name_page(self):
+        '''
+        Case 2: A paginated name search passes the limit and cursor to the local
+        database and counts the distinct matching reports.
+        '''
+        mock = search
+        cursor = PageCursor.after(self.reports[4])
+        mock.db.object_exists = MagicMock(return_value=(True, self.dt_now))
+        mock.check_object_updates = MagicMock()
+        mock.db.get_object_coords = MagicMock(return_value=self.sample_coords)
+        mock.db.find_reports_by_object = MagicMock(return_value=[self.reports[3], self.reports[1]])
+        mock.db.find_reports_in_coord_range = MagicMock(return_value=[self.reports[2], self.reports[1]])
+        mock.db.find_report_nums_by_object = MagicMock(return_value={1, 2, 4})
+        mock.db.find_report_nums_in_coord_range = MagicMock(return_value={2, 3})
+
+        result = mock.search_reports_by_name(self.filters, None, "name", limit=2, after=cursor, count=True)
+
+        mock.db.find_reports_by_object.assert_called_with(self.filters, None, "name", limit=2, after=cursor)
+        mock.db.find_reports_in_coord_range.assert_called_with(self.filters, None, self.sample_coords, DEFAULT_RADIUS, limit=2, after=cursor)
+        self.assertIsInstance(result, ReportPage)
+        self.assertEqual(list(result), [self.reports[3], self.reports[2]])
+        self.assertEqual(result.next_cursor, PageCursor.after(self.reports[2]))
+        self.assertEqual(result.total, 4)
+
+
+
+##############################
+# Testing: streamed searches #
+##############################
+class TestSearchStreaming(TestSearch):
+    def setUp(self):
+        super().setUp()
+        self.reports = [ReportResult(n, "Title", "Authors", "Body", self.dt_old + timedelta(days=n), []) for n in range(1, 6)]
+
+
+    def test_merge_reports(self):
+        '''
+        Case 1: Sorted streams are merged lazily, newest first, without duplicates.
+        '''
+        r = self.reports
+        merged = search._merge_reports([iter([r[4], r[2], r[0]]), iter([r[3], r[2], r[1]])])
+
+        self.assertEqual(next(merged), r[4])
+        self.assertEqual(list(merged), [r[3], r[2], r[1], r[0]])
+
+
+    def test_stream_by_name(self):
+        '''
+        Case 2: SIMBAD and update checks happen immediately, while the local
+        database is only read as the reports are consumed.
+        '''
+        mock = search
+        r = self.reports
+        mock.db.object_exists = MagicMock(return_value=(True, self.dt_now))
+        mock.check_object_updates = MagicMock()
+        mock.db.get_object_coords = MagicMock(return_value=self.sample_coords)
+        mock.db.iter_reports_by_object = MagicMock(return_value=iter([r[3], r[1]]))
+        mock.db.iter_reports_in_coord_range = MagicMock(return_value=iter([r[2], r[1]]))
+
+        result = mock.stream_reports_by_name(self.filters, None, "name")
+
+        mock.check_object_updates.assert_called_with("name", self.dt_now)
+        mock.db.iter_reports_by_object.assert_called_with(self.filters, None, "name")
+        mock.db.iter_reports_in_coord_range.assert_called_with(self.filters, None, self.sample_coords, DEFAULT_RADIUS)
+        self.assertEqual(list(result), [r[3], r[2], r[1]])
+
+
+    def test_stream_by_coords(self):
+        '''
+        Case 3: A streamed coordinate search merges the reports of each object in range.
+        '''
+        mock = search
+        r = self.reports
+        mock.qs.query_simbad_by_coords = MagicMock(return_value={
+            "main_1" : ["alias_1a"],
+            "main_2" : ["alias_2a"]
+        })
+        mock.db.object_exists = MagicMock(return_value=(True, self.dt_now))
+        mock.check_object_updates = MagicMock()
+        mock.db.iter_reports_by_object = MagicMock(side_effect=[iter([r[4]]), iter([r[4], r[0]])])
+        mock.db.iter_reports_in_coord_range = MagicMock(return_value=iter([r[2]]))
+
+        result = mock.stream_reports_by_coords(self.filters, None, self.sample_coords)
+
+        mock.db.iter_reports_by_object.assert_has_calls([call(self.filters, None, "main_1"), call(self.filters, None, "main_2")])
+        self.assertEqual(list(result), [r[4], r[2], r[0]])
+
+
 if __name__ == '__main__':
     ut.main()
\ No newline at end of file
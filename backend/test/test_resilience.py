@@ -0,0 +1,198 @@
+""" Test suite for the circuit breaker, deadline, rate limiting and backoff helpers.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import unittest as ut
+
+from controller.helper.resilience import CircuitBreaker, CircuitState, Deadline, TokenBucket, backoff_delay
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+#######################
+# Testing: Deadline() #
+#######################
+class TestDeadline(ut.TestCase):
+    def test_remaining(self):
+        '''
+        Case 1: The remaining time counts down to zero, then the deadline has expired.
+        '''
+        clock = FakeClock()
+        deadline = Deadline(5.0, clock)
+        self.assertEqual(deadline.remaining(), 5.0)
+        self.assertFalse(deadline.expired())
+
+        clock.now = 7.0
+        self.assertEqual(deadline.remaining(), 0.0)
+        self.assertTrue(deadline.expired())
+
+
+#############################
+# Testing: CircuitBreaker() #
+#############################
+class TestCircuitBreaker(ut.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(2, 30.0, slow_call_seconds=5.0, clock=self.clock)
+
+
+    def test_opens_after_failures(self):
+        '''
+        Case 1: The circuit opens after consecutive failures, and a success resets the count.
+        '''
+        self.breaker.record_failure()
+        self.breaker.record_success(1.0)
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+
+    def test_slow_calls(self):
+        '''
+        Case 2: Slow calls count as failures.
+        '''
+        self.breaker.record_success(6.0)
+        self.breaker.record_success(6.0)
+        self.assertFalse(self.breaker.allow())
+
+
+    def test_half_open(self):
+        '''
+        Case 3: After the reset timeout, one trial call is allowed, which closes
+        the circuit if it succeeds or reopens it if it fails.
+        '''
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+        self.clock.now = 30.0
+        self.assertEqual(self.breaker.state, CircuitState.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+
+        self.clock.now = 60.0
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success(1.0)
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+
+    def test_invalid_threshold(self):
+        '''
+        Case 4: The failure threshold must be positive.
+        '''
+        with self.assertRaises(ValueError):
+            CircuitBreaker(0, 30.0)
+
+
+##########################
+# Testing: TokenBucket() #
+##########################
+class TestTokenBucket(ut.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.waits = []
+
+        def sleep(seconds):
+            self.waits.append(seconds)
+            self.clock.now += seconds
+
+        self.bucket = TokenBucket(2.0, 3, self.clock, sleep)
+
+
+    def test_burst(self):
+        '''
+        Case 1: A full bucket allows a burst, then calls at the bucket's rate.
+        '''
+        for _ in range(3):
+            self.assertEqual(self.bucket.try_acquire(), 0.0)
+        self.assertEqual(self.bucket.try_acquire(), 0.5)
+
+        self.clock.now = 0.5
+        self.assertEqual(self.bucket.try_acquire(), 0.0)
+        self.assertEqual(self.bucket.try_acquire(), 0.5)
+
+
+    def test_acquire_waits(self):
+        '''
+        Case 2: Acquiring from an empty bucket waits until a token is added.
+        '''
+        for _ in range(4):
+            self.bucket.acquire()
+        self.assertEqual(self.waits, [0.5])
+        self.assertEqual(self.clock.now, 0.5)
+
+
+    def test_refill_capped(self):
+        '''
+        Case 3: An idle bucket holds no more than its capacity.
+        '''
+        self.clock.now = 100.0
+        for _ in range(3):
+            self.assertEqual(self.bucket.try_acquire(), 0.0)
+        self.assertGreater(self.bucket.try_acquire(), 0.0)
+
+
+    def test_invalid(self):
+        '''
+        Case 4: The rate must be positive and the capacity at least one.
+        '''
+        with self.assertRaises(ValueError):
+            TokenBucket(0.0, 1)
+        with self.assertRaises(ValueError):
+            TokenBucket(1.0, 0)
+
+
+############################
+# Testing: backoff_delay() #
+############################
+class TestBackoffDelay(ut.TestCase):
+    def test_exponential(self):
+        '''
+        Case 1: The delay doubles after each failure, up to the maximum.
+        '''
+        delays = [backoff_delay(attempt, 0.5, 10.0, lambda: 1.0) for attempt in range(7)]
+        self.assertEqual(delays, [0.5, 1.0, 2.0, 4.0, 8.0, 10.0, 10.0])
+        self.assertEqual(backoff_delay(10 ** 6, 0.5, 10.0, lambda: 1.0), 10.0)
+
+
+    def test_jitter(self):
+        '''
+        Case 2: The delay is scaled by the jitter.
+        '''
+        self.assertEqual(backoff_delay(2, 0.5, 10.0, lambda: 0.25), 0.5)
+        self.assertEqual(backoff_delay(2, 0.5, 10.0, lambda: 0.0), 0.0)
+
+
+if __name__ == '__main__':
+    ut.main()
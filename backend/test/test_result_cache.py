@@ -0,0 +1,284 @@
+""" Test suite for the search result cache and the caching helpers.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+from datetime import datetime
+import threading
+import time
+import unittest as ut
+from unittest.mock import MagicMock, patch
+
+from astropy.coordinates import SkyCoord
+
+from controller.helper.caching import SingleFlight, TTLCache
+from controller.helper.resilience import Deadline
+from controller.search import search
+from controller.search.result_cache import SearchResultCache
+from model.ds.pagination import PageCursor, ReportPage
+from model.ds.report_types import ReportResult
+from model.ds.search_filters import SearchFilters, DateFilter, KeywordMode
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+#######################
+# Testing: TTLCache() #
+#######################
+class TestTTLCache(ut.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache(2, 10.0, self.clock)
+
+
+    def test_get_put(self):
+        '''
+        Case 1: Stored values are returned until they expire.
+        '''
+        self.cache.put("a", 1)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertIsNone(self.cache.get("b"))
+
+        self.clock.now = 10.0
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(len(self.cache), 0)
+
+
+    def test_evicts_least_recently_used(self):
+        '''
+        Case 2: When full, the least recently used entry is evicted.
+        '''
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        self.cache.get("a")
+        self.cache.put("c", 3)
+
+        self.assertIn("a", self.cache)
+        self.assertNotIn("b", self.cache)
+        self.assertIn("c", self.cache)
+
+
+    def test_invalid_size(self):
+        '''
+        Case 3: The cache must hold at least one entry.
+        '''
+        with self.assertRaises(ValueError):
+            TTLCache(0, 10.0)
+
+
+###########################
+# Testing: SingleFlight() #
+###########################
+class TestSingleFlight(ut.TestCase):
+    def setUp(self):
+        self.group = SingleFlight()
+
+
+    def test_shares_result(self):
+        '''
+        Case 1: Callers waiting on a call in flight share its result.
+        '''
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def slow():
+            calls.append(1)
+            release.wait(5)
+            return "result"
+
+        leader = threading.Thread(target=lambda: results.append(self.group.do("key", slow)))
+        leader.start()
+        while not calls:
+            time.sleep(0.01)
+        followers = [threading.Thread(target=lambda: results.append(self.group.do("key", slow))) for _ in range(2)]
+        for thread in followers:
+            thread.start()
+        time.sleep(0.2) # Let the followers join the call in flight.
+        self.assertEqual(results, [])
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(5)
+
+        self.assertEqual(results, ["result"] * 3)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.group.in_flight(), 0)
+
+
+    def test_sequential_calls(self):
+        '''
+        Case 2: Calls that do not overlap are not coalesced, and errors are raised.
+        '''
+        self.assertEqual(self.group.do("key", lambda: 1), 1)
+        self.assertEqual(self.group.do("key", lambda: 2), 2)
+
+        def fail():
+            raise ValueError("error")
+
+        with self.assertRaises(ValueError):
+            self.group.do("key", fail)
+        self.assertEqual(self.group.in_flight(), 0)
+
+
+################################
+# Testing: SearchResultCache() #
+################################
+class TestSearchResultCache(ut.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.generation = MagicMock(return_value=1)
+        self.cache = SearchResultCache(self.generation, max_entries=8, ttl=60.0, check_interval=5.0, clock=self.clock)
+        self.reports = [ReportResult(1000, "Title", "Authors", "Body", datetime(2020, 1, 1), [])]
+        self.coords = SkyCoord("20 54 05.689", "+37 01 17.38", unit=('hourangle','deg'))
+
+
+    def test_hit_skips_search(self):
+        '''
+        Case 1: Equivalent name searches share a single cached result.
+        '''
+        with patch.object(search, "search_reports_by_name", MagicMock(return_value=self.reports)) as mock_search:
+            filters_a = SearchFilters("Nova", ["radio", "optical"], KeywordMode.ALL)
+            filters_b = SearchFilters("nova", ["optical", "radio"], KeywordMode.ALL)
+            dates = DateFilter(datetime(2020, 1, 1), None)
+
+            self.assertEqual(self.cache.search_by_name(filters_a, dates, "SN 2011fe"), self.reports)
+            self.assertEqual(self.cache.search_by_name(filters_b, dates, " sn  2011FE "), self.reports)
+            mock_search.assert_called_once_with(filters_a, dates, "SN 2011fe")
+
+            # Different criteria are cached separately.
+            self.cache.search_by_name(filters_a, None, "SN 2011fe")
+            self.assertEqual(mock_search.call_count, 2)
+
+
+    def test_coords_key(self):
+        '''
+        Case 2: Coordinate searches are keyed by region.
+        '''
+        with patch.object(search, "search_reports_by_coords", MagicMock(return_value=self.reports)) as mock_search:
+            self.cache.search_by_coords(None, None, self.coords, 10.0)
+            self.cache.search_by_coords(None, None, self.coords, 10)
+            self.assertEqual(mock_search.call_count, 1)
+
+            self.cache.search_by_coords(None, None, self.coords, 5.0)
+            self.assertEqual(mock_search.call_count, 2)
+
+
+    def test_generation_invalidates(self):
+        '''
+        Case 3: Cached searches are discarded once the generation number changes,
+        which is only checked after the check interval.
+        '''
+        with patch.object(search, "search_reports_by_name", MagicMock(return_value=self.reports)) as mock_search:
+            self.cache.search_by_name(None, None, "name")
+            self.generation.return_value = 2
+
+            self.clock.now = 1.0
+            self.cache.search_by_name(None, None, "name")
+            self.assertEqual(mock_search.call_count, 1)
+            self.assertEqual(self.generation.call_count, 1)
+
+            self.clock.now = 6.0
+            self.cache.search_by_name(None, None, "name")
+            self.assertEqual(mock_search.call_count, 2)
+
+
+    def test_errors_not_cached(self):
+        '''
+        Case 4: Failed searches are not cached.
+        '''
+        with patch.object(search, "search_reports_by_name", MagicMock(side_effect=ValueError("error"))) as mock_search:
+            with self.assertRaises(ValueError):
+                self.cache.search_by_name(None, None, None)
+            with self.assertRaises(ValueError):
+                self.cache.search_by_name(None, None, None)
+            self.assertEqual(mock_search.call_count, 2)
+
+
+    def test_pages_cached_separately(self):
+        '''
+        Case 5: Each page is cached separately and keeps its cursor and total.
+        '''
+        cursor = PageCursor.after(self.reports[0])
+        page = ReportPage(self.reports, cursor, 10)
+        with patch.object(search, "search_reports_by_name", MagicMock(return_value=page)) as mock_search:
+            result = self.cache.search_by_name(None, None, "name", limit=1, after=None, count=True)
+            self.cache.search_by_name(None, None, "name", limit=1, after=None, count=True)
+            self.assertEqual(mock_search.call_count, 1)
+            mock_search.assert_called_with(None, None, "name", limit=1, after=None, count=True)
+
+            cached = self.cache.search_by_name(None, None, "name", limit=1, after=None, count=True)
+            self.assertIsInstance(cached, ReportPage)
+            self.assertEqual(cached.next_cursor, cursor)
+            self.assertEqual(cached.total, 10)
+            self.assertIsNot(cached, result)
+
+            self.cache.search_by_name(None, None, "name", limit=1, after=cursor, count=True)
+            self.cache.search_by_name(None, None, "name")
+            self.assertEqual(mock_search.call_count, 3)
+
+
+    def test_degraded_not_cached(self):
+        '''
+        Case 6: Degraded results are not cached, and the deadline does not change the key.
+        '''
+        page = ReportPage(self.reports, degraded=True)
+        deadline = Deadline(10.0)
+        with patch.object(search, "search_reports_by_name", MagicMock(return_value=page)) as mock_search:
+            self.assertTrue(self.cache.search_by_name(None, None, "name", deadline=deadline).degraded)
+            self.cache.search_by_name(None, None, "name", deadline=deadline)
+            self.assertEqual(mock_search.call_count, 2)
+            mock_search.assert_called_with(None, None, "name", deadline=deadline)
+
+            mock_search.return_value = self.reports
+            self.cache.search_by_name(None, None, "name", deadline=deadline)
+            self.cache.search_by_name(None, None, "name", deadline=Deadline(5.0))
+            self.assertEqual(mock_search.call_count, 3)
+
+
+
+    def test_outdated_search_not_cached(self):
+        '''
+        Case 7: A search that finishes after the generation number changed while it
+        ran is returned but not cached.
+        '''
+        def search_during_update(*args):
+            # Another request finds the new generation number while this search runs
+            self.generation.return_value = 2
+            self.clock.now += 6.0
+            self.cache.search_by_coords(None, None, self.coords, 10.0)
+            return self.reports
+
+        with patch.object(search, "search_reports_by_coords", MagicMock(return_value=[])), \
+                patch.object(search, "search_reports_by_name", MagicMock(side_effect=search_during_update)) as mock_search:
+            self.assertEqual(self.cache.search_by_name(None, None, "name"), self.reports)
+            mock_search.side_effect = None
+            mock_search.return_value = self.reports
+            self.cache.search_by_name(None, None, "name")
+            self.assertEqual(mock_search.call_count, 2)
+
+if __name__ == '__main__':
+    ut.main()
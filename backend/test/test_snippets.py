@@ -0,0 +1,73 @@
+""" Test suite for the search result snippet generator.
+
+Author:
+    ATel Lookup contributors
+
+License Terms and Copyright:
+    Copyright (C) 2026 ATel Lookup contributors
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import unittest as ut
+
+from controller.search.snippets import make_snippet, ELLIPSIS
+
+
+###########################
+# Testing: make_snippet() #
+###########################
+class TestMakeSnippet(ut.TestCase):
+    def setUp(self):
+        self.body = ("Lorem ipsum dolor sit amet " * 10) + "a new Nova was found " + ("consectetur adipiscing elit " * 10)
+
+
+    def test_window_around_term(self):
+        '''
+        Case 1: The snippet is a window of whole words around the term, which is highlighted.
+        '''
+        snippet = make_snippet(self.body, "nova", 20)
+        text = snippet["text"]
+
+        self.assertEqual(text, ELLIPSIS + "sit amet a new Nova was found" + ELLIPSIS)
+        self.assertEqual(len(snippet["highlights"]), 1)
+        start, end = snippet["highlights"][0]
+        self.assertEqual(text[start:end], "Nova")
+
+
+    def test_no_match(self):
+        '''
+        Case 2: Without a match, the snippet is the start of the body.
+        '''
+        for term in [None, "", "supernova remnant"]:
+            snippet = make_snippet(self.body, term, 20)
+            self.assertTrue(snippet["text"].startswith("Lorem ipsum"))
+            self.assertTrue(snippet["text"].endswith(ELLIPSIS))
+            self.assertEqual(snippet["highlights"], [])
+
+
+    def test_short_body(self):
+        '''
+        Case 3: A body shorter than the window is returned whole, with every match highlighted.
+        '''
+        snippet = make_snippet("nova and NOVA (n.o.v.a)", "nova")
+        self.assertEqual(snippet["text"], "nova and NOVA (n.o.v.a)")
+        self.assertEqual(snippet["highlights"], [[0, 4], [9, 13]])
+
+        self.assertEqual(make_snippet(None, "nova"), {"text": "", "highlights": []})
+
+
+if __name__ == '__main__':
+    ut.main()
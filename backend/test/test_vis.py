@@ -28,6 +28,7 @@ import string
 
 from view import vis 
 from model.ds.report_types import ReportResult
+from model.ds.report_graph import ReportGraph
 
 
 def gen_reports(num_reports: int, related: bool) -> tuple[list[int], list[ReportResult]]:
@@ -92,7 +93,22 @@ class TestVis(ut.TestCase):
         for edge in edges_result:
             self.assertTrue(edge[0] in self.related_atel_pool)
             self.assertTrue(edge[1] in self.related_atel_pool)
-            
+
+
+    def test_subgraph(self):
+        '''
+        Case 3: Nodes of an expanded graph are ordered by distance from the starting reports.
+        '''
+        graph = ReportGraph({5: 1, 3: 0, 9: 2, 4: 1}, [(9, 5), (5, 3), (3, 4)], True)
+        nodes_result, edges_result = vis.create_subgraph_lists(graph)
+        self.assertEqual(nodes_result, [(3, 0), (4, 1), (5, 1), (9, 2)])
+        self.assertEqual(edges_result, [(3, 4), (5, 3), (9, 5)])
+        self.assertTrue(graph.truncated)
+
+        nodes_result, edges_result = vis.create_subgraph_lists(ReportGraph({}, []))
+        self.assertEqual(nodes_result, [])
+        self.assertEqual(edges_result, [])
+
 
 if __name__ == '__main__':
     ut.main()
\ No newline at end of file
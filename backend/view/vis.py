@@ -25,11 +25,13 @@ License Terms and Copyright:
 
 from datetime import datetime
 from model.ds.report_types import ReportResult
+from model.ds.report_graph import ReportGraph
 
 
 # Type aliasing for the list data structures.
 NodesList = list[tuple[int, datetime]]
 EdgesList = list[tuple[int, int]]
+HopNodesList = list[tuple[int, int]]
 
 
 def create_nodes_list(reports_list: list[ReportResult]) -> tuple[NodesList, EdgesList]:
@@ -61,3 +63,26 @@ def create_nodes_list(reports_list: list[ReportResult]) -> tuple[NodesList, Edge
             edges.append(tuple((report.atel_num, related_report)))
 
     return nodes, edges
+
+
+def create_subgraph_lists(graph: ReportGraph) -> tuple[HopNodesList, EdgesList]:
+    """Constructs the nodes and edges lists of a graph of the reports related
+        to a set of starting reports, as returned by a graph query. Unlike
+        create_nodes_list(), the graph includes reports that are only
+        indirectly related through other reports.
+
+    Args:
+        graph (ReportGraph): The reports within a number of references of the
+            starting reports.
+
+    Returns:
+        HopNodesList: the nodes list for the graph, nearest reports first. The
+            list contains a tuple of the ATel number and the number of
+            references between the report and the nearest starting report.
+        EdgesList: the edge list. An edge is represented by a pair of ATel
+            numbers, the referencing report first.
+    """
+    nodes = sorted(graph.nodes.items(), key=lambda node: (node[1], node[0]))
+    edges = sorted(graph.edges)
+
+    return nodes, edges
@@ -28,7 +28,18 @@ from typing import Tuple
 from model.ds.search_filters import KeywordMode
 from enum import Enum
 import re
-from model.constants import FIXED_KEYWORDS
+from model.constants import (
+    FIXED_KEYWORDS,
+    MAX_GRAPH_HOPS,
+    MAX_GRAPH_NODES,
+    MAX_IMPORT_DELAY_SECONDS,
+    MAX_IMPORT_RANGE_SIZE,
+    MAX_PAGE_SIZE,
+    SEARCH_RESULT_FIELDS,
+    TIMELINE_BINS,
+    TIMELINE_DATE_FIELDS,
+)
+from model.ds.pagination import PageCursor
 
 class InvalidKeywordError(Exception):
     pass
@@ -403,4 +414,258 @@ def parse_term(term_in: str) -> str:
     if term_in == "":
         term_in = None
 
-    return term_in
\ No newline at end of file
+    return term_in
+
+
+def parse_limit(limit_in, max_limit: int = MAX_PAGE_SIZE) -> int:
+    '''Validates and parses the maximum number of reports to return in a page of results.
+
+    Args:
+        limit_in (int | str): The page size given in the request, or None/blank for no limit.
+        max_limit (int): The largest page size allowed. Defaults to MAX_PAGE_SIZE.
+
+    Returns:
+        int: The page size, or None if no limit was given.
+
+    '''
+    if limit_in == None or limit_in == "":
+        return None
+
+    try:
+        limit = int(limit_in)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid page size.")
+
+    if limit < 1 or limit > max_limit:
+        raise ValueError(f"Page size is out of range (1 to {max_limit})")
+
+    return limit
+
+
+def parse_cursor(cursor_in: str) -> PageCursor:
+    '''Parses the cursor of the page of results to return.
+
+    Args:
+        cursor_in (str): The cursor returned with the previous page, or None/blank for the first page.
+
+    Returns:
+        PageCursor: The decoded cursor, or None if no cursor was given.
+
+    '''
+    if cursor_in == None or cursor_in == "":
+        return None
+
+    return PageCursor.decode(cursor_in)
+
+
+def parse_flag(flag_in) -> bool:
+    '''Parses an optional boolean flag given in a request, such as count or stream.
+
+    Args:
+        flag_in (bool | str): The flag given in the request.
+
+    Returns:
+        bool: True if the flag is set.
+
+    '''
+    if isinstance(flag_in, str):
+        return flag_in.lower() in ("true", "1", "yes")
+
+    return bool(flag_in)
+
+
+def parse_fields(fields_in) -> list[str]:
+    '''Validates and parses the fields to return for each search result.
+
+    Args:
+        fields_in (list[str]): The fields given in the request, or None/blank for all fields.
+
+    Returns:
+        list[str]: The requested fields, or None if all fields should be returned.
+
+    '''
+    if fields_in == None or fields_in == "" or fields_in == []:
+        return None
+
+    if isinstance(fields_in, str):
+        fields_in = fields_in.split(",")
+
+    fields = []
+    for field in fields_in:
+        field = str(field).strip().lower()
+        if field not in SEARCH_RESULT_FIELDS:
+            raise ValueError(f"Invalid result field: {field}")
+        if field not in fields:
+            fields.append(field)
+
+    return fields
+
+
+def parse_atel_nums(atel_nums_in) -> list[int]:
+    '''Validates and parses the ATel numbers of the reports to start a graph of related reports from.
+
+    Args:
+        atel_nums_in (list[str] | str): The ATel numbers given in the request, as a list or comma separated string.
+
+    Returns:
+        list[int]: The ATel numbers, without duplicates.
+
+    '''
+    if isinstance(atel_nums_in, str):
+        atel_nums_in = atel_nums_in.split(",")
+
+    atel_nums = []
+    for atel_num_in in atel_nums_in or []:
+        if str(atel_num_in).strip() == "":
+            continue
+        try:
+            atel_num = int(str(atel_num_in).strip())
+        except ValueError:
+            raise ValueError(f"Invalid ATel number: {atel_num_in}")
+        if atel_num < 1:
+            raise ValueError(f"Invalid ATel number: {atel_num_in}")
+        if atel_num not in atel_nums:
+            atel_nums.append(atel_num)
+
+    if len(atel_nums) == 0:
+        raise ValueError("At least one ATel number must be given.")
+    if len(atel_nums) > MAX_GRAPH_NODES:
+        raise ValueError(f"Too many ATel numbers (maximum {MAX_GRAPH_NODES})")
+
+    return atel_nums
+
+
+def parse_hops(hops_in) -> int:
+    '''Validates and parses the number of references to follow when expanding a graph of related reports.
+
+    Args:
+        hops_in (int | str): The number of references given in the request, or None/blank for the default.
+
+    Returns:
+        int: The number of references, or None if none was given.
+
+    '''
+    if hops_in == None or hops_in == "":
+        return None
+
+    try:
+        hops = int(hops_in)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid number of hops.")
+
+    if hops < 0 or hops > MAX_GRAPH_HOPS:
+        raise ValueError(f"Number of hops is out of range (0 to {MAX_GRAPH_HOPS})")
+
+    return hops
+
+
+def parse_import_delay(delay_in) -> float:
+    '''Validates and parses the number of seconds an import job waits between reports.
+
+    Args:
+        delay_in (float | str): The delay given in the request, or None/blank for no delay.
+
+    Returns:
+        float: The delay in seconds.
+
+    '''
+    if delay_in == None or delay_in == "":
+        return 0.0
+
+    try:
+        delay = float(delay_in)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid import delay.")
+
+    if not 0 <= delay <= MAX_IMPORT_DELAY_SECONDS:
+        raise ValueError(f"Import delay is out of range (0 to {MAX_IMPORT_DELAY_SECONDS:g} seconds)")
+
+    return delay
+
+
+def parse_import_range_size(range_size_in) -> int:
+    '''Validates and parses the number of ATel numbers leased to each worker at a time by a sharded import job.
+
+    Args:
+        range_size_in (int | str): The range size given in the request, or None/blank for an import by a single worker.
+
+    Returns:
+        int: The range size, or 0 for an import by a single worker.
+
+    '''
+    if range_size_in == None or range_size_in == "":
+        return 0
+
+    try:
+        range_size = int(range_size_in)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid import range size.")
+
+    if range_size < 0 or range_size > MAX_IMPORT_RANGE_SIZE:
+        raise ValueError(f"Import range size is out of range (0 to {MAX_IMPORT_RANGE_SIZE})")
+
+    return range_size
+
+
+def parse_job_id(job_id_in) -> int:
+    '''Validates and parses the ID of an import job.
+
+    Args:
+        job_id_in (int | str): The job ID given in the request, or None/blank for the most recent job.
+
+    Returns:
+        int: The job ID, or None if none was given.
+
+    '''
+    if job_id_in == None or job_id_in == "":
+        return None
+
+    try:
+        job_id = int(job_id_in)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid import job ID.")
+
+    if job_id < 1:
+        raise ValueError("Invalid import job ID.")
+
+    return job_id
+
+
+def parse_timeline_bin(bin_in: str) -> str:
+    '''Validates and parses the length of the bins to count a timeline of reports in.
+
+    Args:
+        bin_in (str): The bin length given in the request, or None/blank for monthly bins.
+
+    Returns:
+        str: One of "day", "week", "month" or "year".
+
+    '''
+    if bin_in == None or bin_in == "":
+        return "month"
+
+    bin_size = str(bin_in).strip().lower()
+    if bin_size not in TIMELINE_BINS:
+        raise ValueError(f"Invalid timeline bin: {bin_in}")
+
+    return bin_size
+
+
+def parse_timeline_date_field(date_field_in: str) -> str:
+    '''Validates and parses the date that reports are binned by in a timeline.
+
+    Args:
+        date_field_in (str): The date field given in the request, or None/blank for the submission date.
+
+    Returns:
+        str: Either "submission" or "observation".
+
+    '''
+    if date_field_in == None or date_field_in == "":
+        return "submission"
+
+    date_field = str(date_field_in).strip().lower()
+    if date_field not in TIMELINE_DATE_FIELDS:
+        raise ValueError(f"Invalid timeline date field: {date_field_in}")
+
+    return date_field